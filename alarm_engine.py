@@ -0,0 +1,270 @@
+# alarm_engine.py
+# Kayıtlı alarmlar bellekte, (sembol, tf, yön) anahtarıyla indekslenmiş tutulur. Sinyal kontrolü dosya
+# okumadan ve alarm listesini taramadan tek bir sözlük araması yapar; değerlendirme sadece sinyal
+# değiştiğinde (signal_bus olaylarıyla) çağrılır.
+# Ekleme / silme / aç-kapa bellekte hemen uygulanır; diske yazma arka planda, gecikmeli (debounce)
+# ve tek seferde yapılır: art arda değişiklikler tek yazmaya iner. Yazma config_store üzerinden
+# user_state.json'un diğer anahtarlarını koruyarak ve atomik (geçici dosya + os.replace) yapılır.
+
+import copy
+import threading
+import time
+import uuid
+
+try:
+    from settings import ALARM_SAVE_DELAY
+except ImportError:
+    ALARM_SAVE_DELAY = 1.0
+
+DIRECTIONS = {'up': 'UP', 'down': 'DOWN'}
+
+
+class AlarmEngine:
+    """
+    Alarmlar {id: alarm} ve {(sembol, tf, yön): {id: alarm}} indeksinde tutulur.
+    evaluate(sembol, tf, sinyal) -> (tetiklenen alarmlar, vurgusu kalkan alarmlar); aynı koşul nötre
+    dönene kadar tekrar tetiklenmez (eski _alarm_triggered davranışı).
+    """
+    def __init__(self, store=None, save_delay=ALARM_SAVE_DELAY):
+        if store is None:
+            from config_store import get_config_store
+            store = get_config_store()
+        self.store = store
+        self.save_delay = float(save_delay)
+        self._lock = threading.RLock()
+        self._alarms = {}
+        self._index = {}
+        self._triggered = set()  # {(sembol, tf, yön)}
+        self._timer = None
+        self._saving = False
+        self.stats = {'evaluations': 0, 'triggers': 0, 'saves': 0, 'changes': 0}
+        self._load(self.store.peek('user_state').get('alarms', []))
+        self.store.subscribe('user_state', self._on_state_changed, copy_values=False)
+
+    # --- Bellek içi indeks ---
+    def _load(self, alarms):
+        with self._lock:
+            self._alarms = {}
+            self._index = {}
+            for alarm in alarms:
+                alarm = dict(alarm)
+                alarm.setdefault('id', str(uuid.uuid4()))
+                self._insert(alarm)
+
+    def _insert(self, alarm):
+        self._alarms[alarm['id']] = alarm
+        key = (alarm.get('symbol'), alarm.get('tf'), alarm.get('direction'))
+        self._index.setdefault(key, {})[alarm['id']] = alarm
+
+    def _discard(self, alarm_id):
+        alarm = self._alarms.pop(alarm_id, None)
+        if alarm is None:
+            return None
+        key = (alarm.get('symbol'), alarm.get('tf'), alarm.get('direction'))
+        bucket = self._index.get(key, {})
+        bucket.pop(alarm_id, None)
+        if not bucket:
+            self._index.pop(key, None)
+        return alarm
+
+    def _on_state_changed(self, _name, old, new):
+        # Dosya dışarıdan düzenlendiyse indeks yeniden kurulur; alarms anahtarı olmayan yazmalar
+        # (örn. sadece bakiye/TF kaydı) bellekteki alarmları silmez. Değerler kopyasızdır (sadece okunur).
+        if self._saving or not isinstance(new, dict) or 'alarms' not in new:
+            return
+        if isinstance(old, dict) and old.get('alarms') is new['alarms']:
+            return  # patch() alarmlara dokunmadı
+        with self._lock:
+            if new['alarms'] != list(self._alarms.values()):
+                self._load(new['alarms'])
+
+    def __len__(self):
+        return len(self._alarms)
+
+    def alarms(self):
+        """Kayıt sırasıyla alarmların kopyası."""
+        with self._lock:
+            return [dict(a) for a in self._alarms.values()]
+
+    def matches(self, symbol, tf, direction):
+        """Koşula uyan açık (enabled) alarmlar."""
+        bucket = self._index.get((symbol, tf, direction))
+        if not bucket:
+            return []
+        return [dict(a) for a in bucket.values() if a.get('enabled', True)]
+
+    def symbols(self):
+        """Açık alarmı olan semboller (rate limiter önceliği için)."""
+        with self._lock:
+            return {a['symbol'] for a in self._alarms.values() if a.get('enabled', True) and a.get('symbol')}
+
+    # --- Değişiklikler ---
+    def add(self, symbol, direction, tf, created_at=None):
+        alarm = {
+            "id": str(uuid.uuid4()),
+            "symbol": symbol,
+            "direction": direction,
+            "tf": tf,
+            "created_at": created_at or time.strftime("%Y-%m-%d %H:%M"),
+            "enabled": True,
+        }
+        with self._lock:
+            self._insert(alarm)
+        self._changed()
+        return dict(alarm)
+
+    def remove(self, alarm_id=None, fallback=None):
+        """id ile, id yoksa (sembol, yön, tf) eşleşen ilk alarmı siler. Silindiyse True."""
+        with self._lock:
+            if not alarm_id and fallback:
+                key = (fallback.get('symbol'), fallback.get('tf'), fallback.get('direction'))
+                alarm_id = next(iter(self._index.get(key, {})), None)
+            removed = self._discard(alarm_id) if alarm_id else None
+        if removed is None:
+            return False
+        self._changed()
+        return True
+
+    def toggle(self, alarm_id):
+        """Alarmı açar/kapatır; yeni enabled değeri (alarm yoksa None)."""
+        with self._lock:
+            alarm = self._alarms.get(alarm_id)
+            if alarm is None:
+                return None
+            alarm['enabled'] = not alarm.get('enabled', True)
+            enabled = alarm['enabled']
+        self._changed()
+        return enabled
+
+    # --- Değerlendirme ---
+    def evaluate(self, symbol, tf, sig):
+        """
+        Sinyal değiştiğinde çağrılır. 'up'/'down': ilk kez sağlanan koşulun açık alarmları tetiklenir,
+        ters yönün kilidi kalkar. Diğer değerler (neutral): hücrenin iki yöndeki kilidi de kalkar.
+        Kilidi kalkan yönlerin alarmları vurgudan çıkarılmak üzere ikinci listede döner.
+        """
+        self.stats['evaluations'] += 1
+        direction = DIRECTIONS.get(sig)
+        released = [d for d in DIRECTIONS.values() if d != direction]
+        with self._lock:
+            cleared = []
+            for d in released:
+                key = (symbol, tf, d)
+                if key in self._triggered:
+                    self._triggered.discard(key)
+                    cleared.extend(dict(a) for a in self._index.get(key, {}).values())
+            if direction is None:
+                return [], cleared
+            key = (symbol, tf, direction)
+            if key in self._triggered:
+                return [], cleared
+            matches = self.matches(symbol, tf, direction)
+            if matches:
+                self._triggered.add(key)
+                self.stats['triggers'] += 1
+        return matches, cleared
+
+    # --- Kalıcılık ---
+    def _changed(self):
+        self.stats['changes'] += 1
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.save_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Bekleyen değişiklikleri hemen yazar (zamanlayıcıyı iptal eder). Yazma başarısızsa False."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            alarms = copy.deepcopy(list(self._alarms.values()))
+            self._saving = True
+            try:
+                ok = self.store.update('user_state', lambda state: {**state, 'alarms': alarms})
+            finally:
+                self._saving = False
+        self.stats['saves'] += 1
+        return ok
+
+    def close(self):
+        """Bekleyen (henüz yazılmamış) değişiklik varsa yazar; çıkışta çağrılır."""
+        with self._lock:
+            pending = self._timer is not None
+        if pending:
+            self.flush()
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_alarm_engine():
+    """Süreç genelinde paylaşılan alarm motoru (config_store'daki user_state üzerinde)."""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            import atexit
+            _default_engine = AlarmEngine()
+            atexit.register(_default_engine.close)
+        return _default_engine
+
+
+def _benchmark(cells=1208, changed=6, sizes=(0, 100, 10_000), file_checks=20):
+    """
+    Tablo yenilemesi başına alarm kontrolü maliyeti (150 sembol x 8 TF hücre):
+    - dosya: her hücrede user_state.json okunup alarm listesi taranır (ilk hal; birkaç kontrolden tahmin)
+    - liste: bellekteki listenin her hücrede taranması (config_store sonrası)
+    - indeks: AlarmEngine; tüm hücreler ve sadece değişen hücreler (signal_bus ile)
+    """
+    import json
+    import os
+    import random
+    import tempfile
+
+    from config_store import ConfigStore
+    rng = random.Random(4)
+    tfs = ['M5', 'M15', 'H1', 'H4', 'H6', 'D1', 'W1', '1M']
+    symbols = [f"SYM{i:03d}USDT" for i in range(cells // len(tfs) + 1)]
+    grid = [(s, tf, rng.choice(['up', 'down'])) for s in symbols for tf in tfs][:cells]
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            alarms = [{"id": str(i), "symbol": rng.choice(symbols), "direction": rng.choice(["UP", "DOWN"]),
+                       "tf": rng.choice(tfs), "enabled": True} for i in range(n)]
+            path = os.path.join(tmp, f"state_{n}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"balance": 1000.0, "alarms": alarms}, f)
+
+            def scan(alarms_list, symbol, tf, sig):
+                direction = DIRECTIONS[sig]
+                return [a for a in alarms_list if a.get("symbol") == symbol and a.get("direction") == direction
+                        and a.get("tf") == tf and a.get("enabled", True)]
+
+            t0 = time.perf_counter()
+            for symbol, tf, sig in grid[:file_checks]:
+                with open(path, 'r', encoding='utf-8') as f:
+                    scan(json.load(f).get("alarms", []), symbol, tf, sig)
+            file_ms = (time.perf_counter() - t0) / file_checks * cells * 1000.0
+            t0 = time.perf_counter()
+            for symbol, tf, sig in grid:
+                scan(alarms, symbol, tf, sig)
+            list_ms = (time.perf_counter() - t0) * 1000.0
+
+            store = ConfigStore()
+            store.register('user_state', path, {})
+            engine = AlarmEngine(store, save_delay=60)
+            t0 = time.perf_counter()
+            for symbol, tf, sig in grid:
+                engine.evaluate(symbol, tf, sig)
+            index_ms = (time.perf_counter() - t0) * 1000.0
+            t0 = time.perf_counter()
+            for symbol, tf, sig in rng.sample(grid, changed):
+                engine.evaluate(symbol, tf, 'down' if sig == 'up' else 'up')
+            changed_ms = (time.perf_counter() - t0) * 1000.0
+            print(f"{n:>6} alarm: dosya~{file_ms:9.1f}ms | liste={list_ms:8.2f}ms | "
+                  f"indeks tüm hücreler={index_ms:6.2f}ms, sadece {changed} değişen={changed_ms:6.3f}ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
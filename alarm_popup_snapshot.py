@@ -10,12 +10,11 @@ Notlar:
 """
 from __future__ import annotations
 import os
-import json
-import uuid
-import time as _time
 import tkinter as tk
 import customtkinter as ctk
 
+from alarm_engine import get_alarm_engine
+
 USER_STATE_PATH = os.path.join(os.path.dirname(__file__), "user_state.json")
 
 
@@ -119,32 +118,8 @@ class AlarmMixinSnapshot:
         close_btn.pack(pady=(0, 10))
 
     def _save_alarm(self, symbol, direction, tf_code, popup=None):
-        """Alarmı user_state.json içine kaydet."""
-        # Mevcut durumu oku
-        try:
-            with open(USER_STATE_PATH, "r", encoding="utf-8") as f:
-                state = json.load(f)
-        except Exception:
-            state = {}
-        alarms = state.get("alarms", [])
-        created_at = _time.strftime("%Y-%m-%d %H:%M")
-        alarms.append({
-            "id": str(uuid.uuid4()),
-            "symbol": symbol,
-            "direction": direction,
-            "tf": tf_code,
-            "created_at": created_at,
-            "enabled": True
-        })
-        state["alarms"] = alarms
-        # Var olan anahtarları koru
-        state.setdefault("balance", getattr(self, "balance", 1000.0))
-        state.setdefault("selected_timeframes", list(getattr(self, "_user_selected_timeframes", [])))
-        try:
-            with open(USER_STATE_PATH, "w", encoding="utf-8") as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"[ALARM SAVE ERROR]: {e}")
+        """Alarmı kaydet (bellekte hemen; user_state.json'a arka planda, gecikmeli yazılır)."""
+        get_alarm_engine().add(symbol, direction, tf_code)
         # Küçük bir bildirim
         try:
             toast = tk.Toplevel(self)
@@ -169,46 +144,17 @@ class AlarmMixinSnapshot:
                 pass
 
     def _load_alarms(self):
-        try:
-            with open(USER_STATE_PATH, "r", encoding="utf-8") as f:
-                state = json.load(f)
-        except Exception:
-            state = {}
-        return state.get("alarms", [])
+        return get_alarm_engine().alarms()
 
     def _check_trigger_for(self, symbol, tf_code, sig):
-        """Mevcut sinyale göre kayıtlı alarmı tetikle. sig: 'up' | 'down' | 'neutral'"""
+        """Sinyal değişen hücre için kayıtlı alarmı tetikle. sig: 'up' | 'down' | 'neutral'"""
         try:
-            if not hasattr(self, "_alarm_triggered"):
-                self._alarm_triggered = set()  # {(symbol, direction, tf)}
-            if sig not in ("up", "down"):
-                # Nötr durumda tetik kilidini kaldır (gelecek geçişlerde tekrar çalabilsin)
-                to_remove = {(s, d, t) for (s, d, t) in self._alarm_triggered if s == symbol and t == tf_code}
-                if to_remove:
-                    self._alarm_triggered -= to_remove
-                # Varsa ilgili satır vurgularını da kaldır
-                try:
-                    for a in self._load_alarms():
-                        if a.get("symbol") == symbol and a.get("tf") == tf_code:
-                            self._highlight_alarm_row(a.get("id"), False)
-                except Exception:
-                    pass
-                return
-            direction = "UP" if sig == "up" else "DOWN"
-            key = (symbol, direction, tf_code)
-            if key in self._alarm_triggered:
-                return  # Aynı koşul için tekrar çalma
-            alarms = self._load_alarms()
-            matches = [
-                a for a in alarms if (
-                    a.get("symbol") == symbol and a.get("direction") == direction and a.get("tf") == tf_code and a.get("enabled", True)
-                )
-            ]
-            has_match = any(
-                a.get("symbol") == symbol and a.get("direction") == direction and a.get("tf") == tf_code and a.get("enabled", True)
-                for a in matches
-            )
-            if has_match:
+            # Tetik kilidi (aynı koşulda tekrar çalmama) ve nötrde kilidin kalkması motorda tutulur
+            matches, cleared = get_alarm_engine().evaluate(symbol, tf_code, sig)
+            for a in cleared:
+                self._highlight_alarm_row(a.get("id"), False)
+            if matches:
+                direction = matches[0].get("direction")
                 # Ses çal ve küçük toast göster
                 try:
                     self._play_alarm_sound(direction)
@@ -224,7 +170,6 @@ class AlarmMixinSnapshot:
                     toast.after(1500, toast.destroy)
                 except Exception:
                     pass
-                self._alarm_triggered.add(key)
                 # Eşleşen satır(lar)ı vurgula
                 try:
                     for a in matches:
@@ -257,25 +202,7 @@ class AlarmMixinSnapshot:
 
     def _toggle_alarm_enabled(self, alarm_id):
         """Verilen id'li alarmın enabled durumunu tersine çevir ve listeyi yenile."""
-        try:
-            with open(USER_STATE_PATH, "r", encoding="utf-8") as f:
-                state = json.load(f)
-        except Exception:
-            state = {}
-        alarms = state.get("alarms", [])
-        updated = False
-        for a in alarms:
-            if a.get("id") == alarm_id:
-                a["enabled"] = not a.get("enabled", True)
-                updated = True
-                break
-        if updated:
-            state["alarms"] = alarms
-            try:
-                with open(USER_STATE_PATH, "w", encoding="utf-8") as f:
-                    json.dump(state, f, ensure_ascii=False, indent=2)
-            except Exception as e:
-                print(f"[ALARM TOGGLE SAVE ERROR]: {e}")
+        get_alarm_engine().toggle(alarm_id)
         try:
             self._render_alarm_list_panel()
         except Exception:
@@ -292,12 +219,7 @@ class AlarmMixinSnapshot:
         except Exception:
             pass
         # Veriyi oku
-        try:
-            with open(USER_STATE_PATH, "r", encoding="utf-8") as f:
-                state = json.load(f)
-        except Exception:
-            state = {}
-        alarms = state.get("alarms", [])
+        alarms = get_alarm_engine().alarms()
         if not alarms:
             # Yalnızca boşken başlığı göster
             header = ctk.CTkLabel(self._alarm_list_frame, text="Kayıtlı Alarmlar", font=("Arial", 14, "bold"), text_color="#FFD700", fg_color="#101A5A")
@@ -377,31 +299,7 @@ class AlarmMixinSnapshot:
         """Verilen id'ye sahip alarmı sil ve paneli yenile."""
         if not alarm_id and not alarm_fallback:
             return
-        try:
-            with open(USER_STATE_PATH, "r", encoding="utf-8") as f:
-                state = json.load(f)
-        except Exception:
-            state = {}
-        alarms = state.get("alarms", [])
-        if alarm_id:
-            new_alarms = [a for a in alarms if a.get('id') != alarm_id]
-        else:
-            sf = alarm_fallback or {}
-            def same(a):
-                return a.get('symbol') == sf.get('symbol') and a.get('direction') == sf.get('direction') and a.get('tf') == sf.get('tf')
-            removed = False
-            new_alarms = []
-            for a in alarms:
-                if not removed and same(a):
-                    removed = True
-                    continue
-                new_alarms.append(a)
-        state["alarms"] = new_alarms
-        try:
-            with open(USER_STATE_PATH, "w", encoding="utf-8") as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"[ALARM DELETE ERROR]: {e}")
+        get_alarm_engine().remove(alarm_id, alarm_fallback)
         try:
             toast = tk.Toplevel(self)
             toast.overrideredirect(True)
@@ -1,7 +1,39 @@
 import customtkinter as ctk
 
+# Panel satırları için okunan göstergeler (indicator_registry)
+ANALIZ_INDICATORS = ('supertrend', 'bb', 'rsi', 'macd', 'atr', 'close', 'volume')
+
+
+def analiz_rows(symbols, interval, cache=None, store=None):
+    """
+    Paylaşılan gösterge önbelleğinden panel satırları: Sinyal Supertrend yönü, Trend BB sinyali,
+    Risk ATR'nin fiyata oranıdır (%). Veri olmayan semboller atlanır.
+    """
+    from indicator_registry import get_indicator_cache
+    cache = cache or get_indicator_cache()
+    rows = []
+    for symbol in symbols:
+        v = cache.latest(symbol, interval, ANALIZ_INDICATORS, store)
+        if v['close'] is None:
+            continue
+        direction = v['supertrend']
+        rows.append({
+            "Sembol": symbol,
+            "Sinyal": {"up": "AL", "down": "SAT"}.get(direction, "-"),
+            "Trend": {"up": "Yükseliş", "down": "Düşüş"}.get(v['bb'], "Yatay"),
+            "RSI": f"{v['rsi']:.1f}" if v['rsi'] is not None else "-",
+            "MACD": f"{v['macd']:.4g}" if v['macd'] is not None else "-",
+            "Hacim": f"{v['volume']:,.0f}" if v['volume'] is not None else "-",
+            "Risk": f"%{v['atr'] / v['close'] * 100:.2f}" if v['atr'] is not None and v['close'] else "-",
+            "Renk": {"up": "yeşil", "down": "kırmızı"}.get(direction, ""),
+        })
+    return rows
+
+
 class AnalizPanel(ctk.CTkFrame):
     def __init__(self, master, width=340, height=600, *args, **kwargs):
+        # bus (signal_bus.SignalBus) verilirse panel sinyal değişikliklerine abone olur
+        bus = kwargs.pop('bus', None)
         super().__init__(master, fg_color="#16224A", corner_radius=12, width=width, height=height, *args, **kwargs)
         self.pack_propagate(False)
         self.grid_rowconfigure(0, weight=0)
@@ -13,7 +45,10 @@ class AnalizPanel(ctk.CTkFrame):
             header.grid(row=0, column=i, padx=2, pady=3, sticky="nsew")
         self.data_labels = []
         self.max_rows = 12
+        self._shown = None
         self._init_empty_grid()
+        if bus is not None:
+            bus.subscribe(self.on_signal_events)
 
     def _init_empty_grid(self):
         # Başlık altına boş grid hazırla
@@ -41,3 +76,23 @@ class AnalizPanel(ctk.CTkFrame):
             for col_idx, key in enumerate(self.analiz_headers):
                 val = signal.get(key, "")
                 self.data_labels[row_idx][col_idx].configure(text=str(val), fg_color=row_color)
+
+    def update_from_indicators(self, symbols, interval, cache=None):
+        """Satırları gösterge önbelleğinden (indicator_registry) doldurur."""
+        self._shown = (list(symbols), interval, cache)
+        self.update_signals(analiz_rows(symbols, interval, cache))
+
+    def on_signal_events(self, events):
+        """
+        signal_bus abonesi: panelde gösterilen sembollerden birinin sinyali değiştiyse satırlar yenilenir;
+        diğer değişiklikler için iş yapılmaz. Döndürülen değer panelin yenilenip yenilenmediğidir.
+        """
+        shown = self._shown
+        if shown is None:
+            return False
+        symbols, interval, cache = shown
+        watched = set(symbols)
+        if not any(event.symbol in watched for event in events):
+            return False
+        self.update_signals(analiz_rows(symbols, interval, cache))
+        return True
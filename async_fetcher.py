@@ -0,0 +1,248 @@
+# async_fetcher.py
+# Tüm (sembol, interval) çiftleri için asyncio tabanlı toplu kline çekme motoru.
+# Sınırlı sayıda eşzamanlı istek, keep-alive bağlantı havuzu ve istek başına son tarih (deadline) kullanır;
+# tamamlanan her yanıt hemen KlineStore'a yazılır ve geri çağrı ile sinyal güncellenir.
+
+import asyncio
+import gzip
+import json
+import ssl
+import time
+from urllib.parse import urlencode, urlparse
+
+from requests.structures import CaseInsensitiveDict
+
+from binance_client import BINANCE_FAPI_URL
+from kline_store import get_kline_store
+from rate_limiter import get_rate_limiter, request_weight
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_REQUEST_TIMEOUT = 8
+
+
+class _Connection:
+    __slots__ = ('reader', 'writer', 'requests')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncHTTPPool:
+    """
+    Tek host için minimal HTTP/1.1 keep-alive bağlantı havuzu (asyncio stream'leri üzerinde).
+    Content-Length, chunked ve bağlantı kapanınca biten (uzunluksuz) gövdeleri, gzip sıkıştırmayı destekler.
+    """
+    def __init__(self, base_url, max_connections=DEFAULT_CONCURRENCY):
+        u = urlparse(base_url)
+        self.host = u.hostname
+        self.https = u.scheme == 'https'
+        self.port = u.port or (443 if self.https else 80)
+        self.max_connections = max_connections
+        self._idle = []
+        self._ssl = ssl.create_default_context() if self.https else None
+        self.stats = {'opened': 0, 'reused': 0, 'requests': 0, 'errors': 0}
+
+    async def _acquire(self):
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.reader.at_eof():
+                self.stats['reused'] += 1
+                return conn
+            conn.close()
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self._ssl,
+                                                       limit=2 ** 22)
+        self.stats['opened'] += 1
+        return _Connection(reader, writer)
+
+    def _release(self, conn, keep_alive):
+        if keep_alive and len(self._idle) < self.max_connections:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    async def _read_body(self, reader, headers):
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            parts = []
+            while True:
+                size_line = await reader.readuntil(b"\r\n")
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(parts)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            # Uzunluk bildirilmemiş: gövde sunucu bağlantıyı kapatınca biter
+            body = await reader.read()
+        if headers.get('content-encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        return body
+
+    async def _request(self, path):
+        conn = await self._acquire()
+        ok = False
+        try:
+            conn.writer.write((f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                               "Accept-Encoding: gzip\r\nConnection: keep-alive\r\n\r\n").encode())
+            await conn.writer.drain()
+            head = await conn.reader.readuntil(b"\r\n\r\n")
+            lines = head.decode('latin-1').split("\r\n")
+            status = int(lines[0].split(" ")[1])
+            headers = CaseInsensitiveDict()
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip()] = v.strip()
+            body = await self._read_body(conn.reader, headers)
+            conn.requests += 1
+            self.stats['requests'] += 1
+            framed = ('content-length' in headers
+                      or headers.get('transfer-encoding', '').lower() == 'chunked')
+            ok = framed and headers.get('connection', '').lower() != 'close'
+            return status, headers, body
+        finally:
+            # Hata/iptal durumunda bağlantının durumu belirsizdir: kapat
+            self._release(conn, ok)
+
+    async def get(self, path, params=None, timeout=DEFAULT_REQUEST_TIMEOUT):
+        """(status, headers, body) döndürür; istek `timeout` içinde bitmezse TimeoutError."""
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        try:
+            return await asyncio.wait_for(self._request(path), timeout)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class AsyncKlineFetcher:
+    """
+    (sembol, interval) çiftlerini sınırlı eşzamanlılıkla çeker.
+    Her istek KlineStore.plan_request ile planlanır (tam geçmiş veya delta), rate limiter'dan izin alır,
+    yanıt gelince depoya yazılır ve on_result(symbol, interval, ok) çağrılır.
+    """
+    def __init__(self, store=None, base_url=None, concurrency=DEFAULT_CONCURRENCY,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT, limiter=None):
+        self.store = store or get_kline_store()
+        self.base_url = base_url or self.store.base_url or BINANCE_FAPI_URL
+        self.concurrency = int(concurrency)
+        self.request_timeout = request_timeout
+        self.limiter = limiter or get_rate_limiter()
+        self.stats = {'ok': 0, 'failed': 0, 'timeouts': 0}
+        self._pool = None
+
+    async def _limit(self, params):
+        weight = request_weight('/fapi/v1/klines', params)
+        priority = self.limiter.priority_for(params.get('symbol'))
+        while True:
+            wait = self.limiter.try_acquire(weight, priority)
+            if wait <= 0:
+                return
+            await asyncio.sleep(min(wait, 1.0))
+
+    async def _fetch_one(self, sem, symbol, interval, min_bars):
+        async with sem:
+            # Başka bir tüketici (örn. TF % değişimi) tamponu az önce yenilediyse ağa çıkma
+            if self.store.fresh_buffer(symbol, interval, min_bars) is not None:
+                return True
+            params, kind = self.store.plan_request(symbol, interval, min_bars)
+            await self._limit(params)
+            try:
+                status, headers, body = await self._pool.get('/fapi/v1/klines', params, self.request_timeout)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                return False
+            except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+                print(f"[ASYNC HATA] {symbol} {interval}: {e}")
+                return False
+            self.limiter.on_response(status, headers)
+            if status != 200:
+                return False
+            try:
+                data = json.loads(body)
+            except ValueError:
+                return False
+            self.store.apply_response(symbol, interval, kind, data, params['limit'])
+            return True
+
+    async def run_pass(self, pairs, min_bars, on_result=None):
+        """
+        Tüm çiftleri bir kez çeker; tamamlananlar için hemen on_result çağrılır.
+        min_bars tek sayı veya {interval: sayı} olabilir.
+        """
+        if self._pool is None:
+            self._pool = AsyncHTTPPool(self.base_url, self.concurrency)
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def run(symbol, interval):
+            bars = min_bars.get(interval, 2) if isinstance(min_bars, dict) else min_bars
+            ok = await self._fetch_one(sem, symbol, interval, bars)
+            self.stats['ok' if ok else 'failed'] += 1
+            if on_result is not None:
+                try:
+                    on_result(symbol, interval, ok)
+                except Exception as e:
+                    print(f"[ASYNC CALLBACK HATA] {symbol} {interval}: {e}")
+            return ok
+
+        results = await asyncio.gather(*(run(s, i) for s, i in pairs))
+        return sum(1 for r in results if r)
+
+    @property
+    def pool_stats(self):
+        return dict(self._pool.stats) if self._pool is not None else {}
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def _benchmark(latency=0.05, counts=(150, 500, 1000), concurrency=64):
+    """Yapılandırılabilir gecikmeli yerel sunucuya karşı tam tur süresi."""
+    from binance_stub import StubProcess
+    from kline_store import KlineStore
+    from rate_limiter import WeightRateLimiter
+    for n in counts:
+        symbols = [f"SYM{i:04d}USDT" for i in range(n)]
+        with StubProcess(symbols, latency=latency) as (rest_url, _ws_url):
+            store = KlineStore(base_url=rest_url)
+            # Benchmark tur süresini ölçer; limiter Binance limitini taklit etmesin
+            fetcher = AsyncKlineFetcher(store, concurrency=concurrency,
+                                        limiter=WeightRateLimiter(limit_per_minute=10 ** 9))
+            pairs = [(s, '1h') for s in symbols]
+
+            async def go():
+                t0 = time.perf_counter()
+                await fetcher.run_pass(pairs, 60)
+                first = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                await fetcher.run_pass(pairs, 60)
+                second = time.perf_counter() - t0
+                pool = fetcher.pool_stats
+                await fetcher.close()
+                return first, second, pool
+
+            first, second, pool = asyncio.run(go())
+        print(f"{n:>5} sembol | gecikme={latency * 1000:.0f}ms eşzamanlı={concurrency} | "
+              f"ilk tur={first:.2f}s delta tur={second:.2f}s | sıralı tahmin={n * latency:.1f}s | "
+              f"istek={pool.get('requests')} açılan bağlantı={pool.get('opened')}")
+
+
+if __name__ == "__main__":
+    _benchmark()
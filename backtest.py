@@ -0,0 +1,529 @@
+# backtest.py
+# Supertrend ve kombinasyon kurallarının geçmiş veride vektörel geriye dönük testi (backtest).
+# Mumlar yerel dosyalardan okunur: Binance veri dökümleri (<SEMBOL>-<interval>-YYYY-MM.zip|csv) ya da
+# <klasör>/<interval>/<SEMBOL>.npz|csv. Sinyaller canlı hesabın aynısıdır: her taban mum kapanışında son
+# supertrend_limit mumluk pencere (supertrend_batch.supertrend_windowed); üst TF'ler taban mumlardan
+# birleştirilir ve tablodaki gibi oluşan üst TF mumu da hesaba girer. İleriye bakış yoktur.
+# Kombinasyonlar ui'daki rise / fall / dip / top mantığıdır (tf_states: 1 yeşil, 2 kırmızı).
+# Kural başına: olay (koşulun başladığı mum) sayısı, ufuk başına isabet oranı ve ortalama ileri getiri,
+# koşul sürdükçe tutulan eşit ağırlıklı portföyün toplam getirisi ve en büyük düşüşü.
+# Semboller parçalara (shard) bölünür; parçalar isteğe bağlı süreç havuzunda, her işçi kendi dosyalarını
+# okuyarak hesaplanır ve sadece özet istatistik döner.
+
+import io
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from kline_store import INTERVAL_MS
+from resample import bucket_open_times
+from rule_dsl import TF_INTERVALS
+from supertrend_batch import DOWN, UP, supertrend_append, supertrend_carry, supertrend_windowed
+
+try:
+    from settings import BACKTEST_DATA_DIR
+except ImportError:
+    BACKTEST_DATA_DIR = "data/klines"
+
+try:
+    from settings import BACKTEST_WORKERS
+except ImportError:
+    BACKTEST_WORKERS = 0
+
+try:
+    from settings import BACKTEST_HORIZONS
+except ImportError:
+    BACKTEST_HORIZONS = (1, 4, 24)
+
+FIELDS = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+# ui._evaluate_trend_reversals ile aynı sıralama: büyük TF tarafı majör kabul edilir
+TF_RANKS = {'M5': 3, 'M15': 4, 'H1': 5, 'H4': 6, 'H6': 7, 'D1': 8, 'W1': 9, '1M': 10}
+SIDES = {'long': 1, 'short': -1}
+COMBO_SIDES = {'rise': 'long', 'fall': 'short', 'dip': 'long', 'top': 'short'}
+# Binance veri dökümü adı: BTCUSDT-1h-2024-01.zip, BTCUSDT-1h-2024-01-15.csv
+_DUMP_NAME = re.compile(r'^([A-Z0-9]+)-([0-9]+[mhdwM])-\d{4}-\d{2}(?:-\d{2})?\.(?:csv|zip)$')
+
+
+# --- Yerel mum dosyaları ---
+def find_files(root, interval, symbols=None):
+    """
+    {sembol: [dosya, ...]} (sıralı): `root` altındaki `interval` Binance dökümleri (alt klasörler dahil) ve
+    <root>/<interval>/<SEMBOL>.npz|csv dosyaları. symbols verilirse sadece onlar.
+    """
+    wanted = None if symbols is None else set(symbols)
+    files = {}
+    for dirpath, _dirs, names in os.walk(root):
+        plain = os.path.basename(dirpath) == interval
+        for name in names:
+            m = _DUMP_NAME.match(name)
+            if m:
+                if m.group(2) != interval:
+                    continue
+                symbol = m.group(1)
+            elif plain and name.endswith(('.npz', '.csv')):
+                symbol = os.path.splitext(name)[0].upper()
+            else:
+                continue
+            if wanted is None or symbol in wanted:
+                files.setdefault(symbol, []).append(os.path.join(dirpath, name))
+    return {s: sorted(files[s]) for s in sorted(files)}
+
+
+def _empty():
+    bars = {'open_time': np.zeros(0, dtype=np.int64)}
+    bars.update({name: np.zeros(0) for name in FIELDS[1:]})
+    return bars
+
+
+def _parse_csv(raw):
+    """Binance kline CSV'si (başlıklı ya da başlıksız); ilk altı sütun kullanılır."""
+    import pandas as pd
+    if not raw.strip():
+        return _empty()
+    header = None if raw[:1].isdigit() else 0
+    arr = pd.read_csv(io.BytesIO(raw), header=header, usecols=range(6)).to_numpy(dtype=np.float64)
+    open_time = arr[:, 0].astype(np.int64)
+    # 2025'ten itibaren spot dökümlerinde zaman damgaları mikrosaniye
+    open_time = np.where(open_time > 10 ** 14, open_time // 1000, open_time)
+    bars = {'open_time': open_time}
+    bars.update({name: arr[:, i] for i, name in enumerate(FIELDS[1:], 1)})
+    return bars
+
+
+def _concat(parts):
+    parts = [p for p in parts if len(p['open_time'])]
+    if not parts:
+        return _empty()
+    names = [name for name in FIELDS if all(name in p for p in parts)]
+    return {name: np.concatenate([p[name] for p in parts]) for name in names}
+
+
+def read_klines(path):
+    """Tek dosyanın mumları {alan: ndarray} (dosyadaki sırayla): .npz, .csv ya da CSV içeren .zip."""
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return {name: data[name] for name in FIELDS if name in data.files}
+    if path.endswith('.zip'):
+        with zipfile.ZipFile(path) as zf:
+            return _concat([_parse_csv(zf.read(n)) for n in zf.namelist() if n.endswith('.csv')])
+    with open(path, 'rb') as f:
+        return _parse_csv(f.read())
+
+
+def load_symbol(paths):
+    """Bir sembolün dosyalarını birleştirir: açılış zamanına göre sıralı; tekrarlanan mumda sonraki dosya geçerli."""
+    bars = _concat([read_klines(p) for p in paths])
+    t = np.asarray(bars['open_time'], dtype=np.int64)
+    order = np.argsort(t, kind='stable')
+    t = t[order]
+    keep = np.ones(len(t), dtype=bool)
+    keep[:-1] = t[1:] != t[:-1]
+    out = {'open_time': t[keep]}
+    for name in FIELDS[1:]:
+        if name in bars:
+            out[name] = np.asarray(bars[name], dtype=np.float64)[order][keep]
+    return out
+
+
+def save_npz(path, bars):
+    """Mumları hızlı okunan .npz olarak yazar (CSV/zip dökümlerini bir kez dönüştürmek için)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.savez(path, **{name: bars[name] for name in FIELDS if name in bars})
+
+
+# --- Ortak zaman ızgarası ---
+def build_panel(bars_by_symbol, interval):
+    """
+    Sembollerin mumlarını ortak ızgaraya yerleştirir: {'symbols', 'interval', 'open_time' (T,),
+    'high'/'low'/'close' (N, T), 'first'/'last' (N,) ilk/son geçerli mum, 'live' (N, T) bool}.
+    Listelenmeden önce ve son mumdan sonra NaN; aradaki eksik mumlar önceki kapanışla (düz mum) doldurulur.
+    """
+    if interval == '1M':
+        raise ValueError("1M taban interval olamaz (sabit süreli değil)")
+    step = INTERVAL_MS[interval]
+    items = [(s, b) for s, b in bars_by_symbol.items() if len(b['open_time'])]
+    panel = {'symbols': [s for s, _b in items], 'interval': interval}
+    if not items:
+        panel.update(open_time=np.zeros(0, dtype=np.int64), first=np.zeros(0, dtype=np.int64),
+                     last=np.zeros(0, dtype=np.int64), live=np.zeros((0, 0), dtype=bool))
+        panel.update({name: np.zeros((0, 0)) for name in ('high', 'low', 'close')})
+        return panel
+    t0 = min(int(b['open_time'][0]) for _s, b in items)
+    t1 = max(int(b['open_time'][-1]) for _s, b in items)
+    length = (t1 - t0) // step + 1
+    panel['open_time'] = t0 + step * np.arange(length, dtype=np.int64)
+    for name in ('high', 'low', 'close'):
+        panel[name] = np.full((len(items), length), np.nan)
+    for i, (_s, bars) in enumerate(items):
+        offset = np.asarray(bars['open_time'], dtype=np.int64) - t0
+        aligned = offset % step == 0
+        col = offset[aligned] // step
+        for name in ('high', 'low', 'close'):
+            panel[name][i, col] = np.asarray(bars[name], dtype=np.float64)[aligned]
+    close = panel['close']
+    valid = ~np.isnan(close)
+    first = valid.argmax(axis=1)
+    last = length - 1 - valid[:, ::-1].argmax(axis=1)
+    bars_idx = np.arange(length)
+    live = (bars_idx >= first[:, None]) & (bars_idx <= last[:, None]) & valid.any(axis=1)[:, None]
+    gap = live & ~valid
+    if gap.any():
+        pos = np.where(valid, bars_idx, 0)
+        np.maximum.accumulate(pos, axis=1, out=pos)
+        filled = np.take_along_axis(close, pos, axis=1)
+        for name in ('high', 'low', 'close'):
+            panel[name][gap] = filled[gap]
+    panel.update(first=first, last=last, live=live)
+    return panel
+
+
+# --- Sinyaller ---
+def _check_interval(interval, tf_interval):
+    if INTERVAL_MS[tf_interval] < INTERVAL_MS[interval]:
+        raise ValueError(f"{tf_interval} sinyali {interval} mumlarından türetilemez (taban interval daha büyük)")
+
+
+def _buckets(open_time, interval):
+    """(kova başlangıç indeksleri, her mumun kova numarası)."""
+    bucket = bucket_open_times(open_time, interval)
+    new = np.ones(len(bucket), dtype=bool)
+    new[1:] = bucket[1:] != bucket[:-1]
+    return np.flatnonzero(new), np.cumsum(new) - 1
+
+
+def _running_extremes(highs, lows, starts):
+    """Her mumda, kovasının başından o muma kadarki en yüksek / en düşük (oluşan üst TF mumu)."""
+    hi = highs.copy()
+    lo = lows.copy()
+    lengths = np.diff(np.append(starts, highs.shape[1]))
+    for offset in range(1, int(lengths.max(initial=1))):
+        cols = starts[lengths > offset] + offset
+        hi[:, cols] = np.fmax(hi[:, cols - 1], highs[:, cols])
+        lo[:, cols] = np.fmin(lo[:, cols - 1], lows[:, cols])
+    return hi, lo
+
+
+def supertrend_signals(panel, tf_interval, atr_period=10, multiplier=3.0, source='hl2', intrabar=True):
+    """
+    (N, T) int8: her taban mum kapanışında `tf_interval` Supertrend yönü (1 up, -1 down, 0 neutral).
+    Üst TF mumları taban mumlardan birleştirilir. intrabar=True: tablodaki gibi oluşan üst TF mumu o ana
+    kadarki taban mumlardan hesaba girer; False: sadece kapanmış üst TF mumları.
+    """
+    interval = panel['interval']
+    highs, lows, closes, first = panel['high'], panel['low'], panel['close'], panel['first']
+    if tf_interval == interval:
+        return supertrend_windowed(highs, lows, closes, atr_period, multiplier, source, first=first)
+    _check_interval(interval, tf_interval)
+    grid = panel['open_time']
+    starts, bucket = _buckets(grid, tf_interval)
+    ends = np.append(starts[1:], len(grid)) - 1
+    h = np.fmax.reduceat(highs, starts, axis=1)
+    lo = np.fmin.reduceat(lows, starts, axis=1)
+    c = closes[:, ends]
+    htf_first = bucket[first]
+    if intrabar:
+        carry = supertrend_carry(h, lo, c, atr_period, multiplier, source, first=htf_first)
+        hi, low = _running_extremes(highs, lows, starts)
+        index = np.broadcast_to(bucket - 1, closes.shape)
+        return supertrend_append(carry, index, hi, low, closes, atr_period, multiplier, source)
+    direction = supertrend_windowed(h, lo, c, atr_period, multiplier, source, first=htf_first)
+    # Kova k son taban mumu (ends[k]) kapanınca tamamlanır; verinin sonundaki kova eksik olabilir
+    closed = np.searchsorted(ends, np.arange(len(grid)), side='right') - 1
+    step = INTERVAL_MS[interval]
+    if bucket_open_times(grid[-1:] + step, tf_interval)[0] == bucket_open_times(grid[-1:], tf_interval)[0]:
+        closed = np.minimum(closed, len(starts) - 2)
+    out = direction[:, np.maximum(closed, 0)]
+    out[:, closed < 0] = 0
+    return out
+
+
+def _combination_kinds(tf_states):
+    """Seçimden çıkan kombinasyon türleri: rise (yeşil), fall (kırmızı), majör tarafa göre top ya da dip."""
+    green = [tf for tf, st in tf_states.items() if st == 1]
+    red = [tf for tf, st in tf_states.items() if st == 2]
+    kinds = (['rise'] if green else []) + (['fall'] if red else [])
+    if green and red:
+        max_g = max(TF_RANKS.get(tf, 0) for tf in green)
+        max_r = max(TF_RANKS.get(tf, 0) for tf in red)
+        if max_g > max_r:
+            kinds.append('top')
+        elif max_r > max_g:
+            kinds.append('dip')
+    return green, red, kinds
+
+
+def combination_masks(signals, tf_states):
+    """
+    ui._evaluate_combinations / _evaluate_trend_reversals'ın (sembol x mum) karşılığı.
+    signals: {TF: (N, T) int8 yön}; dip/top için 'H1' gerekir. Dönüş {tür: bool maske}.
+    """
+    green, red, kinds = _combination_kinds(tf_states)
+    out = {}
+    if 'rise' in kinds:
+        out['rise'] = np.logical_and.reduce([signals[tf] == UP for tf in green])
+    if 'fall' in kinds:
+        out['fall'] = np.logical_and.reduce([signals[tf] == DOWN for tf in red])
+    if 'top' in kinds or 'dip' in kinds:
+        g_up = np.logical_or.reduce([signals[tf] == UP for tf in green])
+        r_down = np.logical_or.reduce([signals[tf] == DOWN for tf in red])
+        if 'top' in kinds:
+            out['top'] = g_up & r_down & (signals['H1'] == DOWN)
+        else:
+            out['dip'] = r_down & g_up & (signals['H1'] == UP)
+    return out
+
+
+def current_combination():
+    """Tablodaki güncel seçim (user_state.json'daki tf_states); kapalı TF'ler atlanır."""
+    try:
+        from config_store import get_config_store
+        states = get_config_store().peek('user_state').get('tf_states') or {}
+        return {tf: int(st) % 3 for tf, st in states.items() if int(st) % 3}
+    except Exception as e:
+        print(f"[HATA] tf_states okunamadı: {e}")
+        return {}
+
+
+def rule_specs(timeframes=('H1', 'H4', 'D1'), params=((10, 3.0),), combos=()):
+    """
+    Test edilecek kurallar: her TF x (atr_period, multiplier) için Supertrend up (long) / down (short),
+    her tf_states seçimi için kombinasyon türleri (ilk parametre çiftiyle, tablodaki gibi).
+    """
+    specs = []
+    for tf in timeframes:
+        for p, m in params:
+            for side, sig in (('long', 'up'), ('short', 'down')):
+                specs.append({'name': f"supertrend[{tf}]({p}, {m:g}) == '{sig}'", 'kind': 'supertrend',
+                              'tf': tf, 'params': (int(p), float(m)), 'side': side})
+    for states in combos:
+        states = {tf: int(st) for tf, st in states.items() if st in (1, 2)}
+        green, red, kinds = _combination_kinds(states)
+        label = f"G={'+'.join(green) or '-'} R={'+'.join(red) or '-'}"
+        for kind in kinds:
+            specs.append({'name': f"{kind} {label}", 'kind': kind, 'states': states,
+                          'params': (int(params[0][0]), float(params[0][1])), 'side': COMBO_SIDES[kind]})
+    return specs
+
+
+def _required_signals(specs):
+    keys = []
+    for spec in specs:
+        if spec['kind'] == 'supertrend':
+            tfs = [spec['tf']]
+        else:
+            tfs = list(spec['states']) + (['H1'] if spec['kind'] in ('top', 'dip') else [])
+        for tf in tfs:
+            if (tf, spec['params']) not in keys:
+                keys.append((tf, spec['params']))
+    return keys
+
+
+# --- İstatistikler ---
+def _rule_stats(cond, side, close, live, ret, horizons):
+    """Bir kuralın parça istatistikleri; parçalar arasında toplanabilir."""
+    entry = cond.copy()
+    entry[:, 1:] &= ~cond[:, :-1]  # koşulun başladığı mumlar
+    rows, cols = np.nonzero(entry)
+    res = {'events': len(rows), 'count': [], 'sum': [], 'hits': []}
+    length = cond.shape[1]
+    for h in horizons:
+        ok = cols + h < length
+        ok[ok] = live[rows[ok], cols[ok] + h]
+        r = side * (close[rows[ok], cols[ok] + h] / close[rows[ok], cols[ok]] - 1.0)
+        res['count'].append(len(r))
+        res['sum'].append(float(r.sum()))
+        res['hits'].append(int((r > 0).sum()))
+    # Portföy: t kapanışında koşul doğruysa t -> t+1 getirisi alınır
+    hold = cond[:, :-1] & live[:, 1:]
+    res['bar_sum'] = side * np.where(hold, ret, 0.0).sum(axis=0)
+    res['bar_count'] = hold.sum(axis=0)
+    return res
+
+
+def _shard_stats(files, specs, interval, source, horizons, intrabar):
+    """Bir sembol parçası: dosyaları okur, sinyalleri ve kural istatistiklerini hesaplar (işçi sürecinde de)."""
+    panel = build_panel({s: load_symbol(paths) for s, paths in files.items()}, interval)
+    grid = panel['open_time']
+    stats = {'t0': int(grid[0]) if len(grid) else 0, 'bars': len(grid), 'symbols': len(panel['symbols']),
+             'rules': {}}
+    if not panel['symbols']:
+        return stats
+    signals = {}
+    for tf, (p, m) in _required_signals(specs):
+        signals[(tf, (p, m))] = supertrend_signals(panel, TF_INTERVALS[tf], p, m, source, intrabar)
+    close, live = panel['close'], panel['live']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ret = close[:, 1:] / close[:, :-1] - 1.0
+    ret[~(live[:, 1:] & live[:, :-1])] = 0.0
+    combos = {}
+    for spec in specs:
+        if spec['kind'] == 'supertrend':
+            sig = signals[(spec['tf'], spec['params'])]
+            cond = sig == (UP if spec['side'] == 'long' else DOWN)
+        else:
+            key = (tuple(sorted(spec['states'].items())), spec['params'])
+            if key not in combos:
+                tf_signals = {tf: s for (tf, params), s in signals.items() if params == spec['params']}
+                combos[key] = combination_masks(tf_signals, spec['states'])
+            cond = combos[key][spec['kind']]
+        stats['rules'][spec['name']] = _rule_stats(cond & live, SIDES[spec['side']], close, live, ret, horizons)
+    return stats
+
+
+def _summary(spec, horizons, events, count, total, hits, bar_sum, bar_count):
+    port = np.where(bar_count > 0, bar_sum / np.maximum(bar_count, 1), 0.0)
+    equity = np.cumprod(1.0 + port)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+    row = {'rule': spec['name'], 'side': spec['side'], 'events': int(events), 'horizons': {},
+           'total_return': float(equity[-1] - 1.0) if len(equity) else 0.0,
+           'max_drawdown': float(np.max(1.0 - equity / peak, initial=0.0)),
+           'exposure': float(bar_count.mean()) if len(bar_count) else 0.0}
+    for i, h in enumerate(horizons):
+        n = int(count[i])
+        row['horizons'][h] = {'count': n, 'hit_rate': float(hits[i] / n) if n else float('nan'),
+                              'mean_return': float(total[i] / n) if n else float('nan')}
+    return row
+
+
+def _merge(parts, specs, horizons, step):
+    parts = [p for p in parts if p['symbols']]
+    if not parts:
+        return {'symbols': 0, 'bars': 0, 'rules': []}
+    t0 = min(p['t0'] for p in parts)
+    length = max(p['t0'] + step * p['bars'] for p in parts)
+    length = (length - t0) // step
+    rows = []
+    for spec in specs:
+        name = spec['name']
+        events = 0
+        count = np.zeros(len(horizons), dtype=np.int64)
+        total = np.zeros(len(horizons))
+        hits = np.zeros(len(horizons), dtype=np.int64)
+        bar_sum = np.zeros(max(length - 1, 0))
+        bar_count = np.zeros(max(length - 1, 0), dtype=np.int64)
+        for part in parts:
+            r = part['rules'][name]
+            off = (part['t0'] - t0) // step
+            events += r['events']
+            count += r['count']
+            total += r['sum']
+            hits += r['hits']
+            bar_sum[off:off + part['bars'] - 1] += r['bar_sum']
+            bar_count[off:off + part['bars'] - 1] += r['bar_count']
+        rows.append(_summary(spec, horizons, events, count, total, hits, bar_sum, bar_count))
+    return {'symbols': sum(p['symbols'] for p in parts), 'bars': length, 'rules': rows}
+
+
+def run_backtest(root=None, interval='1h', timeframes=('H1', 'H4', 'D1'), params=((10, 3.0),), combos=None,
+                 symbols=None, horizons=BACKTEST_HORIZONS, source='hl2', intrabar=True, workers=None,
+                 shard_size=100, files=None):
+    """
+    `root` (varsayılan BACKTEST_DATA_DIR) altındaki `interval` mumlarıyla kuralları test eder.
+    combos: tf_states sözlükleri listesi (varsayılan: tablodaki güncel seçim). workers > 0 ise semboller
+    parçalara bölünüp süreç havuzunda hesaplanır (varsayılan BACKTEST_WORKERS). files: find_files çıktısı
+    verilirse klasör taranmaz. Dönüş: {'symbols', 'bars', 'interval', 'horizons', 'seconds', 'rules': [...]};
+    her kural satırı olay sayısı, ufuk başına isabet oranı / ortalama getiri, toplam getiri ve en büyük düşüş.
+    """
+    start = time.perf_counter()
+    interval = TF_INTERVALS.get(interval, interval)
+    horizons = tuple(int(h) for h in horizons)
+    if files is None:
+        files = find_files(root or BACKTEST_DATA_DIR, interval, symbols)
+    if combos is None:
+        combos = [c for c in [current_combination()] if c]
+    specs = rule_specs(timeframes, params, combos)
+    for tf, _params in _required_signals(specs):
+        if tf not in TF_INTERVALS:
+            raise ValueError(f"Bilinmeyen TF: {tf}")
+        _check_interval(interval, TF_INTERVALS[tf])
+    workers = BACKTEST_WORKERS if workers is None else int(workers)
+    names = list(files)
+    if workers > 0:
+        shard_size = max(1, min(shard_size, -(-len(names) // workers)))
+    shards = [{s: files[s] for s in names[i:i + shard_size]} for i in range(0, len(names), shard_size)]
+    args = (specs, interval, source, horizons, intrabar)
+    if workers > 0 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+            parts = list(executor.map(_shard_stats, shards, *[[a] * len(shards) for a in args]))
+    else:
+        parts = [_shard_stats(shard, *args) for shard in shards]
+    result = _merge(parts, specs, horizons, INTERVAL_MS[interval])
+    result.update(interval=interval, horizons=horizons, workers=workers, seconds=time.perf_counter() - start)
+    return result
+
+
+def format_report(result):
+    """run_backtest sonucunu tablo metnine çevirir."""
+    horizons = result['horizons']
+    lines = [f"{result['symbols']} sembol x {result['bars']} mum ({result['interval']}), "
+             f"{result['seconds']:.2f} sn, {result['workers'] or 'tek'} süreç"]
+    head = f"{'kural':<42} {'yön':<5} {'olay':>7}"
+    for h in horizons:
+        head += f" {f'isabet@{h}':>10} {f'ort@{h}':>9}"
+    lines.append(head + f" {'toplam':>9} {'maks.düşüş':>10}")
+    for row in result['rules']:
+        line = f"{row['rule']:<42} {row['side']:<5} {row['events']:>7}"
+        for h in horizons:
+            stat = row['horizons'][h]
+            line += f" {stat['hit_rate']:>10.1%} {stat['mean_return']:>9.3%}"
+        lines.append(line + f" {row['total_return']:>9.1%} {row['max_drawdown']:>10.1%}")
+    return "\n".join(lines)
+
+
+def _synthetic_files(root, symbol_count, bars, interval='1h', seed=7):
+    """Trend rejimli rastgele yürüyüş mumları; sembollerin ~%20'si sonradan listelenir. {sembol: [yol]}."""
+    rng = np.random.default_rng(seed)
+    step = INTERVAL_MS[interval]
+    t0 = 1_672_531_200_000  # 2023-01-01 UTC
+    open_time = t0 + step * np.arange(bars, dtype=np.int64)
+    files = {}
+    for i in range(symbol_count):
+        symbol = f"SYM{i:03d}USDT"
+        period = rng.uniform(200, 2000)
+        drift = 0.0006 * np.sin(2 * np.pi * np.arange(bars) / period + rng.uniform(0, 6.3))
+        close = 100.0 * np.exp(np.cumsum(drift + rng.normal(0, 0.008, bars)))
+        open_ = np.concatenate(([100.0], close[:-1]))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.003, bars)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.003, bars)))
+        start = int(rng.integers(0, bars // 2)) if rng.random() < 0.2 else 0
+        path = os.path.join(root, interval, f"{symbol}.npz")
+        save_npz(path, {'open_time': open_time[start:], 'open': open_[start:], 'high': high[start:],
+                        'low': low[start:], 'close': close[start:], 'volume': np.ones(bars - start)})
+        files[symbol] = [path]
+    return files
+
+
+def _benchmark(symbol_count=500, years=2, workers=(0, 2)):
+    """
+    500 sembol x 2 yıl H1 (~17.5k mum): H1/H4/D1 Supertrend kuralları ve dört kombinasyon seçimi.
+    Tek süreç ve süreç havuzu (sembol parçaları) süreleri; veriler geçici klasörde .npz.
+    """
+    import tempfile
+    combos = [{'H1': 1, 'H4': 1}, {'H4': 2, 'D1': 2}, {'H1': 1, 'D1': 2}, {'H4': 2, 'D1': 1}]
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        files = _synthetic_files(tmp, symbol_count, years * 365 * 24)
+        print(f"veri hazırlama: {time.perf_counter() - t0:.1f} sn ({os.cpu_count()} CPU)")
+        t0 = time.perf_counter()
+        for symbol_paths in list(files.values())[:100]:
+            load_symbol(symbol_paths)
+        print(f"dosya okuma: {(time.perf_counter() - t0) / 100 * symbol_count:.2f} sn / {symbol_count} sembol")
+        results = []
+        for w in workers:
+            result = run_backtest(tmp, '1h', combos=combos, workers=w)
+            results.append(result)
+            print(f"workers={w}: {result['seconds']:.2f} sn ({len(result['rules'])} kural)")
+        # Parça sınırları sadece toplama sırasını değiştirir
+        for result in results[1:]:
+            for a, b in zip(results[0]['rules'], result['rules']):
+                assert a['events'] == b['events'] and np.isclose(a['total_return'], b['total_return'])
+        print(format_report(results[0]))
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -1,6 +1,7 @@
-import json
 import os
 
+from config_store import get_config_store
+
 SETTINGS_FILE = os.path.join(os.path.dirname(__file__), 'bb_settings.json')
 
 # Varsayılan BB parametreleri
@@ -16,8 +17,9 @@ default_settings = {
 }
 
 def get_tf_bb_setting(tf):
-    settings = load_settings()
-    return settings.get(tf, default_settings.get(tf, {'period': 20, 'stddev': 2.0}))
+    # Dosya bir kez okunur; sonraki çağrılar config_store'daki bellek değerinden (diske gitmeden)
+    settings = get_config_store().peek('bb_settings') or default_settings
+    return dict(settings.get(tf, default_settings.get(tf, {'period': 20, 'stddev': 2.0})))
 
 def set_tf_bb_setting(tf, period, stddev):
     settings = load_settings()
@@ -25,17 +27,23 @@ def set_tf_bb_setting(tf, period, stddev):
     save_settings(settings)
 
 def load_settings():
-    if not os.path.exists(SETTINGS_FILE):
-        return default_settings.copy()
-    try:
-        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError):
-        return default_settings.copy()
+    return get_config_store().get('bb_settings') or default_settings.copy()
 
 def save_settings(settings):
-    try:
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=2)
-    except (OSError, TypeError) as e:
-        print(f"[BB Ayar kaydetme hatası]: {e}")
+    if not get_config_store().set('bb_settings', settings):
+        print("[BB Ayar kaydetme hatası]: bb_settings.json yazılamadı")
+
+def changed_timeframes(old, new):
+    """İki ayar sözlüğü arasında parametresi değişen TF'ler."""
+    old, new = old or default_settings, new or default_settings
+    return sorted(tf for tf in set(old) | set(new)
+                  if old.get(tf, default_settings.get(tf)) != new.get(tf, default_settings.get(tf)))
+
+def subscribe(callback):
+    """callback(tfs): BB ayarı değişen TF listesiyle çağrılır (popup'tan kayıt veya dosyanın dışarıdan düzenlenmesi)."""
+    def on_change(_name, old, new):
+        tfs = changed_timeframes(old, new)
+        if tfs:
+            callback(tfs)
+    get_config_store().subscribe('bb_settings', on_change)
+    return on_change
@@ -0,0 +1,34 @@
+# binance_client.py
+# Binance fapi REST çağrılarının tek giriş noktası: her istek ağırlığı kadar limiter'dan izin alır.
+
+import requests
+
+from http_session import get_session
+from rate_limiter import get_rate_limiter, request_weight
+
+BINANCE_FAPI_URL = "https://fapi.binance.com"
+# İzin için en fazla bekleme (sn); aşılırsa istek atılmadan RateLimitExceeded fırlatılır
+DEFAULT_MAX_WAIT = 15
+
+
+class RateLimitExceeded(requests.RequestException):
+    """Limiter izni zamanında vermedi veya Binance 429/418 döndürdü."""
+
+
+def fapi_get(path, params=None, symbol=None, priority=None, timeout=8, base_url=None,
+             max_wait=DEFAULT_MAX_WAIT, limiter=None):
+    """
+    /fapi uç noktasına paylaşılan havuzlu Session ile GET atar ve JSON döndürür.
+    priority verilmezse sembol öncelikli listedeyse yüksek, değilse normal öncelik kullanılır.
+    """
+    limiter = limiter or get_rate_limiter()
+    if priority is None:
+        priority = limiter.priority_for(symbol or (params or {}).get('symbol'))
+    weight = request_weight(path, params)
+    if not limiter.acquire(weight, priority, timeout=max_wait):
+        raise RateLimitExceeded(f"rate limit: {path} (weight={weight}) için izin alınamadı")
+    resp = get_session().get(f"{base_url or BINANCE_FAPI_URL}{path}", params=params, timeout=timeout)
+    limiter.on_response(resp.status_code, resp.headers)
+    if resp.status_code in (429, 418):
+        raise RateLimitExceeded(f"Binance {resp.status_code}: {path}")
+    return resp.json()
@@ -0,0 +1,468 @@
+# binance_stub.py
+# Testler ve benchmark'lar için yerel Binance taklidi (REST + WebSocket).
+# Gerçek borsaya bağlanmadan kline/ticker akışını üretir; sadece standart kütüphane kullanır.
+
+import base64
+import gzip
+import hashlib
+import json
+import math
+import socket
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+STUB_INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 180_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '1h': 3_600_000,
+    '4h': 14_400_000,
+    '6h': 21_600_000,
+    '1d': 86_400_000,
+    '1w': 604_800_000,
+    '1M': 2_592_000_000,
+}
+
+
+def _price_at(symbol, t_ms):
+    """Sembol ve zamana bağlı deterministik fiyat (aynı zaman her istekte aynı fiyatı verir)."""
+    seed = zlib.crc32(symbol.encode())
+    base = 1.0 + (seed % 50000) / 10.0
+    phase = (seed % 628) / 100.0
+    t = t_ms / 3_600_000.0
+    return base * (1.0 + 0.05 * math.sin(t / 7.0 + phase) + 0.02 * math.sin(t / 1.3 + 2 * phase)
+                   + 0.004 * math.sin(t * 3.7 + phase))
+
+
+def synthetic_kline(symbol, interval, open_time):
+    """Tek bir Binance formatlı kline satırı üretir."""
+    step = STUB_INTERVAL_MS[interval]
+    o = _price_at(symbol, open_time)
+    c = _price_at(symbol, open_time + step - 1)
+    mid = _price_at(symbol, open_time + step // 2)
+    wiggle = 0.002 * (1 + (zlib.crc32(f"{symbol}{open_time}".encode()) % 100) / 100.0)
+    h = max(o, c, mid) * (1 + wiggle)
+    lo = min(o, c, mid) * (1 - wiggle)
+    v = 1000.0 + (open_time // step) % 997
+    return [open_time, f"{o:.6f}", f"{h:.6f}", f"{lo:.6f}", f"{c:.6f}", f"{v:.3f}",
+            open_time + step - 1, f"{v * c:.3f}", 100, f"{v / 2:.3f}", f"{v * c / 2:.3f}", "0"]
+
+
+def synthetic_klines(symbol, interval, limit=60, end_ms=None, start_ms=None):
+    """Son `limit` mumu (veya start_ms'den itibaren) Binance formatında döndürür."""
+    step = STUB_INTERVAL_MS[interval]
+    now = int(time.time() * 1000) if end_ms is None else int(end_ms)
+    last_open = now - now % step
+    if start_ms is not None:
+        first = int(start_ms) - int(start_ms) % step
+        opens = list(range(first, last_open + 1, step))[:limit]
+    else:
+        opens = [last_open - step * i for i in range(limit - 1, -1, -1)]
+    return [synthetic_kline(symbol, interval, t) for t in opens]
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # eşzamanlı bağlantı patlamalarında SYN düşmesin
+
+
+class _StubHTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        parsed = urlparse(self.path)
+        qs = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        stub.count_request(parsed.path)
+        if stub.latency:
+            time.sleep(stub.latency)
+        status, body, headers = stub.handle(parsed.path, qs)
+        self._send_json(status, body, headers)
+
+    def _send_json(self, status, body, headers=None):
+        raw = json.dumps(body).encode()
+        mode = self.server.stub.response_mode
+        if mode == "gzip":
+            raw = gzip.compress(raw)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if mode == "gzip":
+            self.send_header("Content-Encoding", "gzip")
+        if mode == "chunked":
+            self.send_header("Transfer-Encoding", "chunked")
+        elif mode == "eof":
+            self.close_connection = True  # uzunluk yok: gövde bağlantı kapanınca biter
+        else:
+            self.send_header("Content-Length", str(len(raw)))
+        if mode == "close":
+            self.send_header("Connection", "close")
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        self.end_headers()
+        if mode == "chunked":
+            for i in range(0, len(raw), 1000):
+                part = raw[i:i + 1000]
+                self.wfile.write(f"{len(part):x};i={i}\r\n".encode() + part + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.wfile.write(raw)
+
+
+class _WSClient:
+    def __init__(self, conn):
+        self.conn = conn
+        self.streams = set()
+        self.lock = threading.Lock()
+        self.alive = True
+
+    def send_text(self, text):
+        payload = text.encode()
+        n = len(payload)
+        if n < 126:
+            header = struct.pack("!BB", 0x81, n)
+        elif n < 65536:
+            header = struct.pack("!BBH", 0x81, 126, n)
+        else:
+            header = struct.pack("!BBQ", 0x81, 127, n)
+        with self.lock:
+            self.conn.sendall(header + payload)
+
+    def send_raw(self, opcode, payload=b""):
+        with self.lock:
+            self.conn.sendall(struct.pack("!BB", 0x80 | opcode, len(payload)) + payload)
+
+    def close(self):
+        self.alive = False
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
+
+
+class BinanceStub:
+    """
+    Yerel REST + WebSocket sunucusu.
+    - REST: /fapi/v1/klines, /fapi/v1/ticker/24hr, /fapi/v1/exchangeInfo, /fapi/v1/time
+    - WS: /stream (SUBSCRIBE mesajları) ve /stream?streams=a/b birleşik akışları
+    `latency` ile REST gecikmesi ayarlanabilir; `push_kline` ile akışa mum basılır.
+    `response_mode` REST yanıt biçimini seçer: None (Content-Length), 'chunked', 'gzip',
+    'close' (Connection: close) ya da 'eof' (uzunluksuz, gövde bağlantı kapanınca biter).
+    """
+
+    def __init__(self, symbols=None, latency=0.0):
+        self.symbols = list(symbols or ["BTCUSDT", "ETHUSDT"])
+        self.latency = latency
+        self.response_mode = None
+        self.request_counts = {}
+        self._count_lock = threading.Lock()
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._http = None
+        self._ws_sock = None
+        self._stop = threading.Event()
+        self.subscribe_messages = 0
+        # Ağırlık limiti taklidi: dakikalık kullanılan ağırlık ve enjekte edilen hata yanıtları
+        self.weight_limit = None
+        self.used_weight = 0
+        self._weight_minute = None
+        self._injected = []  # [(status, retry_after), ...]
+
+    # --- yaşam döngüsü ---
+    def start(self):
+        self._http = _StubHTTPServer(("127.0.0.1", 0), _StubHTTPHandler)
+        self._http.stub = self
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        self._ws_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._ws_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._ws_sock.bind(("127.0.0.1", 0))
+        self._ws_sock.listen(64)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.drop_connections()
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+        if self._ws_sock is not None:
+            self._ws_sock.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.stop()
+
+    @property
+    def rest_url(self):
+        return f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    @property
+    def ws_url(self):
+        return f"ws://127.0.0.1:{self._ws_sock.getsockname()[1]}"
+
+    # --- REST ---
+    def count_request(self, path):
+        with self._count_lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+
+    def inject_status(self, status, retry_after=1, count=1):
+        """Sonraki `count` isteğe verilen durum kodunu (429/418) Retry-After ile döndürür."""
+        with self._count_lock:
+            self._injected.extend([(status, retry_after)] * count)
+
+    def handle(self, path, qs):
+        """(durum, gövde, başlıklar) döndürür; ağırlık başlığını ve limit ihlallerini uygular."""
+        from rate_limiter import request_weight
+        with self._count_lock:
+            minute = int(time.time() // 60)
+            if minute != self._weight_minute:
+                self._weight_minute, self.used_weight = minute, 0
+            self.used_weight += request_weight(path, qs)
+            headers = {"X-MBX-USED-WEIGHT-1m": self.used_weight}
+            if self._injected:
+                status, retry_after = self._injected.pop(0)
+                headers["Retry-After"] = retry_after
+                return status, {"code": -1003, "msg": "Too many requests."}, headers
+            if self.weight_limit is not None and self.used_weight > self.weight_limit:
+                headers["Retry-After"] = 60 - int(time.time() % 60)
+                return 429, {"code": -1003, "msg": "Too many requests."}, headers
+        try:
+            return 200, self.route(path, qs), headers
+        except KeyError:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}, headers
+
+    def route(self, path, qs):
+        if path == "/fapi/v1/klines":
+            symbol = qs["symbol"]
+            limit = int(qs.get("limit", 500))
+            start = qs.get("startTime")
+            return synthetic_klines(symbol, qs["interval"], limit, start_ms=start)
+        if path == "/fapi/v1/time":
+            return {"serverTime": int(time.time() * 1000)}
+        if path == "/fapi/v1/exchangeInfo":
+            return {"symbols": [
+                {"symbol": s, "contractType": "PERPETUAL", "quoteAsset": "USDT", "status": "TRADING",
+                 "onboardDate": 1569398400000} for s in self.symbols]}
+        if path == "/fapi/v1/ticker/24hr":
+            now = int(time.time() * 1000)
+            rows = []
+            for s in self.symbols:
+                p = _price_at(s, now)
+                p0 = _price_at(s, now - 86_400_000)
+                rows.append({"symbol": s, "lastPrice": f"{p:.6f}",
+                             "priceChangePercent": f"{(p - p0) / p0 * 100:.3f}",
+                             "quoteVolume": f"{p * 1e6:.2f}", "closeTime": now})
+            return rows
+        raise KeyError(path)
+
+    # --- WebSocket ---
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _addr = self._ws_sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_ws, args=(conn,), daemon=True).start()
+
+    def _serve_ws(self, conn):
+        try:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    conn.close()
+                    return
+                request += chunk
+            lines = request.decode(errors="replace").split("\r\n")
+            path = lines[0].split(" ")[1]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+            accept = base64.b64encode(
+                hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest()).decode()
+            conn.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                          f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        except (OSError, KeyError, IndexError):
+            conn.close()
+            return
+        client = _WSClient(conn)
+        qs = parse_qs(urlparse(path).query)
+        if "streams" in qs:
+            client.streams.update(s for s in qs["streams"][-1].split("/") if s)
+        with self._clients_lock:
+            self._clients.append(client)
+        try:
+            self._read_frames(client)
+        finally:
+            client.alive = False
+            with self._clients_lock:
+                if client in self._clients:
+                    self._clients.remove(client)
+
+    def _read_frames(self, client):
+        conn = client.conn
+        buf = b""
+
+        def read(n):
+            nonlocal buf
+            while len(buf) < n:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    raise ConnectionError("closed")
+                buf += chunk
+            out, buf = buf[:n], buf[n:]
+            return out
+
+        try:
+            while client.alive:
+                b1, b2 = read(2)
+                opcode = b1 & 0x0F
+                n = b2 & 0x7F
+                if n == 126:
+                    n = struct.unpack("!H", read(2))[0]
+                elif n == 127:
+                    n = struct.unpack("!Q", read(8))[0]
+                mask = read(4) if b2 & 0x80 else b"\x00\x00\x00\x00"
+                payload = bytes(x ^ mask[i % 4] for i, x in enumerate(read(n)))
+                if opcode == 0x8:
+                    client.send_raw(0x8)
+                    return
+                if opcode == 0x9:
+                    client.send_raw(0xA, payload)
+                    continue
+                if opcode == 0x1:
+                    self._handle_ws_message(client, payload.decode())
+        except (OSError, ConnectionError, ValueError):
+            return
+
+    def _handle_ws_message(self, client, text):
+        msg = json.loads(text)
+        method = msg.get("method")
+        self.subscribe_messages += 1
+        if method == "SUBSCRIBE":
+            client.streams.update(msg.get("params", []))
+        elif method == "UNSUBSCRIBE":
+            client.streams.difference_update(msg.get("params", []))
+        client.send_text(json.dumps({"result": None, "id": msg.get("id")}))
+
+    def subscribed_streams(self):
+        with self._clients_lock:
+            out = set()
+            for c in self._clients:
+                out |= c.streams
+            return out
+
+    def connection_count(self):
+        with self._clients_lock:
+            return len(self._clients)
+
+    def broadcast(self, stream, data):
+        """Verilen stream'e abone olan tüm istemcilere birleşik akış mesajı gönderir."""
+        text = json.dumps({"stream": stream, "data": data})
+        sent = 0
+        with self._clients_lock:
+            clients = list(self._clients)
+        for c in clients:
+            if stream in c.streams and c.alive:
+                try:
+                    c.send_text(text)
+                    sent += 1
+                except OSError:
+                    c.alive = False
+        return sent
+
+    def push_kline(self, symbol, interval, open_time=None, closed=False, close_price=None):
+        """Bir kline olayı yayınlar. Olay zamanı (E) gecikme ölçümü için gönderim anıdır."""
+        step = STUB_INTERVAL_MS[interval]
+        now = int(time.time() * 1000)
+        if open_time is None:
+            open_time = now - now % step
+        row = synthetic_kline(symbol, interval, open_time)
+        if close_price is not None:
+            row[4] = f"{close_price:.6f}"
+        data = {
+            "e": "kline", "E": time.time() * 1000.0, "s": symbol,
+            "k": {"t": row[0], "T": row[6], "s": symbol, "i": interval,
+                  "o": row[1], "c": row[4], "h": row[2], "l": row[3], "v": row[5],
+                  "q": row[7], "x": bool(closed)},
+        }
+        return self.broadcast(f"{symbol.lower()}@kline_{interval}", data)
+
+    def push_tickers(self, prices=None, extra_symbols=0, stream="!ticker@arr"):
+        """
+        Tüm piyasa ticker dizisi yayınlar (!ticker@arr veya !miniTicker@arr).
+        prices: {sembol: fiyat} ile belirli fiyatlar; extra_symbols kadar takip edilmeyen sembol eklenir.
+        """
+        now = int(time.time() * 1000)
+        mini = stream.startswith("!miniTicker")
+        rows = []
+        names = self.symbols + [f"EXTRA{i:04d}USDT" for i in range(extra_symbols)]
+        for s in names:
+            p = (prices or {}).get(s, _price_at(s, now))
+            p0 = _price_at(s, now - 86_400_000)
+            row = {"e": "24hrMiniTicker" if mini else "24hrTicker", "E": now, "s": s,
+                   "c": f"{p:.6f}", "o": f"{p0:.6f}", "h": f"{max(p, p0):.6f}", "l": f"{min(p, p0):.6f}",
+                   "v": "1000.0", "q": f"{p * 1e6:.2f}"}
+            if not mini:
+                row["p"] = f"{p - p0:.6f}"
+                row["P"] = f"{(p - p0) / p0 * 100:.3f}"
+            rows.append(row)
+        return self.broadcast(stream, rows)
+
+    def drop_connections(self):
+        """Tüm WS bağlantılarını koparır (yeniden bağlanma testi için)."""
+        with self._clients_lock:
+            clients = list(self._clients)
+            self._clients.clear()
+        for c in clients:
+            c.close()
+
+
+def _serve_in_process(conn, symbols, latency):
+    stub = BinanceStub(symbols, latency=latency).start()
+    conn.send((stub.rest_url, stub.ws_url))
+    try:
+        conn.recv()
+    except EOFError:
+        pass
+    stub.stop()
+
+
+class StubProcess:
+    """
+    BinanceStub'ı ayrı bir süreçte çalıştırır (benchmark'larda sunucu GIL'i ölçülen koda karışmasın diye).
+    with StubProcess(symbols, latency=0.05) as (rest_url, ws_url): ...
+    """
+    def __init__(self, symbols=None, latency=0.0):
+        import multiprocessing
+        self._parent, child = multiprocessing.Pipe()
+        self._proc = multiprocessing.Process(target=_serve_in_process, args=(child, symbols, latency),
+                                             daemon=True)
+
+    def __enter__(self):
+        self._proc.start()
+        return self._parent.recv()
+
+    def __exit__(self, *_exc):
+        try:
+            self._parent.send("stop")
+        except OSError:
+            pass
+        self._proc.join(5)
+        if self._proc.is_alive():
+            self._proc.terminate()
@@ -101,8 +101,6 @@ class ChatPanel(ctk.CTkFrame):
 
     def open_memory_popup(self):
         import tkinter as tk
-        import json
-        import os
         popup = tk.Toplevel(self)
         popup.overrideredirect(True)  # Tamamen borderless, başlık yok
         popup.resizable(True, True)   # Köşeden büyütülebilir
@@ -115,21 +113,13 @@ class ChatPanel(ctk.CTkFrame):
         label.pack(pady=(18, 7))
         text_area = tk.Text(frame, wrap="word", bg="#223066", fg="#FFF", font=("Arial", 14), relief="flat", borderwidth=0)
         text_area.pack(fill="both", expand=True, padx=24, pady=(0,18))
-        # Var olan memory varsa yükle
-        memory_path = os.path.join(os.path.dirname(__file__), "memory.json")
-        if os.path.exists(memory_path):
-            try:
-                with open(memory_path, "r", encoding="utf-8") as f:
-                    memory = json.load(f)
-                content = memory.get("content", "")
-                if not content.strip():
-                    text_area.insert("1.0", "1- ")
-                else:
-                    text_area.insert("1.0", content)
-            except Exception as err:
-                print(f"[MEMORY LOAD ERROR]: {err}")
-        else:
+        # Var olan memory varsa yükle (config_store bellekteki kopyayı verir)
+        from config_store import get_config_store
+        content = get_config_store().get('memory').get("content", "")
+        if not content.strip():
             text_area.insert("1.0", "1- ")
+        else:
+            text_area.insert("1.0", content)
         # Butonlar alt kısımda, ortada ve her zaman görünür
         btn_frame = tk.Frame(frame, bg="#18206A")
         btn_frame.pack(side="bottom", pady=(0, 14))
@@ -139,12 +129,10 @@ class ChatPanel(ctk.CTkFrame):
         close_btn.pack(side="left", padx=12)
         def save_memory():
             file_content = text_area.get("1.0", "end").strip()
-            try:
-                with open(memory_path, "w", encoding="utf-8") as file_obj:
-                    json.dump({"content": file_content}, file_obj, ensure_ascii=False, indent=2)
+            if get_config_store().set('memory', {"content": file_content}):
                 popup.destroy()
-            except Exception as save_err:
-                print(f"[MEMORY SAVE ERROR]: {save_err}")
+            else:
+                print("[MEMORY SAVE ERROR]: memory.json yazılamadı")
 
     def open_emoji_popup(self):
         # Borderless emoji popup, dışarı tıklayınca kapanır, temel yüz emojileri gösterir
@@ -304,20 +292,11 @@ class ChatPanel(ctk.CTkFrame):
 
     @staticmethod
     def generate_response(user_input):
-        import os
-        import json
-        import requests
+        from http_session import get_session
 
-        # Memory'den context oku
-        memory_path = os.path.join(os.path.dirname(__file__), "memory.json")
-        memory_content = ""
-        if os.path.exists(memory_path):
-            try:
-                with open(memory_path, "r", encoding="utf-8") as f:
-                    memory = json.load(f)
-                memory_content = memory.get("content", "").strip()
-            except (OSError, json.JSONDecodeError):  # Dosya okunamazsa veya json bozuksa hafızayı boş bırak
-                memory_content = ""
+        # Memory'den context oku (her mesajda diske gitmez; dosya değişirse config_store yeniden yükler)
+        from config_store import get_config_store
+        memory_content = get_config_store().get('memory').get("content", "").strip()
 
         # Prompt oluştur
         if memory_content:
@@ -333,7 +312,7 @@ class ChatPanel(ctk.CTkFrame):
             "stream": False
         }
         try:
-            response = requests.post(url, json=payload, timeout=60)
+            response = get_session().post(url, json=payload, timeout=60)
             if response.status_code == 200:
                 data = response.json()
                 return data.get("response", "[Ollama'dan yanıt alınamadı]")
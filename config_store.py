@@ -0,0 +1,431 @@
+# config_store.py
+# Ayar ve durum dosyaları (bb_settings.json, user_state.json, memory.json) için merkezi bellek içi depo.
+# Her dosya bir kez okunur; sonraki get() çağrıları diske gitmez. Bir izleyici thread dosyaların
+# mtime/boyutunu yoklar (os.stat, içerik okumaz): dosya dışarıdan değişirse yeniden yüklenir ve
+# abonelere (ad, eski, yeni) bildirilir. set() hem belleği hem dosyayı günceller ve aboneleri çağırır.
+# write_delay ile kaydedilen dosyalarda (user_state) set/update/patch sadece belleği günceller; yazıcı
+# thread bu sürede biriken değişiklikleri tek bir yazmada diske indirir (UI thread'i diske beklemez).
+# Yazmalar atomiktir: geçici dosya + fsync + os.replace; yazma ortasında çökme eski dosyayı bozmaz.
+# Disk okuma/yazma sayıları `stats` içinde tutulur (reads_per_minute() ile dakikalık oran).
+
+import copy
+import json
+import os
+import threading
+import time
+
+try:
+    from settings import CONFIG_WATCH_INTERVAL
+except ImportError:
+    CONFIG_WATCH_INTERVAL = 1.0
+
+try:
+    from settings import STATE_WRITE_DELAY
+except ImportError:
+    STATE_WRITE_DELAY = 0.5
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class _Entry:
+    __slots__ = ('path', 'default', 'dump_kwargs', 'value', 'signature', 'write_delay', 'dirty_since',
+                 'writing')
+
+    def __init__(self, path, default, dump_kwargs, write_delay=None):
+        self.path = path
+        self.default = default
+        self.dump_kwargs = dump_kwargs
+        self.value = None
+        self.signature = None  # (mtime_ns, size); dosya yoksa None
+        self.write_delay = write_delay  # None: her değişiklik hemen yazılır
+        self.dirty_since = None  # diske yazılmamış ilk değişikliğin zamanı (monotonic)
+        self.writing = False
+
+
+def _write_atomic(path, text):
+    """Geçici dosyaya yazar, fsync eder ve yerine taşır; hata olursa eski dosya olduğu gibi kalır."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    # Yeniden adlandırmanın kendisi de kalıcı olsun (dizin fsync'i; Windows'ta yok)
+    if hasattr(os, 'O_DIRECTORY'):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ConfigStore:
+    """
+    register(ad, yol, varsayılan) ile kaydedilen JSON dosyalarını bellekte tutar.
+    get(ad) kopya döndürür (çağıran değiştirse de depo bozulmaz); set(ad, değer) dosyaya yazar.
+    subscribe(ad, fn) -> fn(ad, eski, yeni) her değişiklikte (set veya dış düzenleme) çağrılır.
+    register(..., write_delay=sn) verilen dosyalar arka planda, birleştirilerek yazılır; flush() bekleyenleri
+    hemen yazar.
+    """
+    def __init__(self, watch_interval=CONFIG_WATCH_INTERVAL):
+        self.watch_interval = float(watch_interval)
+        self._entries = {}
+        self._subscribers = {}
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # dosya yazmaları sırayla (yazıcı thread ve flush)
+        self._dirty = threading.Condition(self._lock)
+        self._thread = None
+        self._writer = None
+        self._closed = False
+        self._stop_event = threading.Event()
+        self._started_at = time.monotonic()
+        self.stats = {'reads': 0, 'writes': 0, 'reloads': 0, 'gets': 0, 'updates': 0}
+
+    def register(self, name, path, default=None, write_delay=None, **dump_kwargs):
+        with self._lock:
+            self._entries[name] = _Entry(path, default if default is not None else {}, dump_kwargs,
+                                         None if write_delay is None else float(write_delay))
+
+    def path(self, name):
+        return self._entries[name].path
+
+    def _read(self, entry):
+        """Dosyayı okur; yoksa ya da bozuksa varsayılan değer."""
+        if os.path.exists(f"{entry.path}.tmp"):
+            # Yarıda kalmış yazmadan artan geçici dosya: asıl dosya son tam yazmadır
+            print(f"[HATA] {entry.path} yazması yarıda kalmış; geçici dosya silindi")
+            try:
+                os.remove(f"{entry.path}.tmp")
+            except OSError:
+                pass
+        signature = _signature(entry.path)
+        if signature is None:
+            return copy.deepcopy(entry.default), None
+        self.stats['reads'] += 1
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                return json.load(f), signature
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[HATA] {entry.path} okunamadı: {e}")
+            return copy.deepcopy(entry.default), signature
+
+    def _loaded(self, name):
+        entry = self._entries[name]
+        if entry.value is None:
+            entry.value, entry.signature = self._read(entry)
+        return entry
+
+    def get(self, name):
+        with self._lock:
+            self.stats['gets'] += 1
+            return copy.deepcopy(self._loaded(name).value)
+
+    def peek(self, name):
+        """Kopyalamadan bellekteki değer (sıcak yollar için); çağıran değiştirmemelidir."""
+        with self._lock:
+            self.stats['gets'] += 1
+            return self._loaded(name).value
+
+    def set(self, name, value):
+        """Değeri bellekte günceller, dosyaya yazar ve abonelere bildirir. Yazma başarısızsa False."""
+        with self._lock:
+            old, ok = self._store(name, value)
+        self._notify(name, old, value)
+        return ok
+
+    def update(self, name, fn):
+        """fn(değer) -> yeni değer; oku-değiştir-yaz tek kilit altında (araya başka yazma girmez)."""
+        with self._lock:
+            value = fn(copy.deepcopy(self._loaded(name).value))
+            old, ok = self._store(name, value)
+        self._notify(name, old, value)
+        return ok
+
+    def patch(self, name, changes):
+        """
+        Sözlük değerin sadece verilen anahtarlarını günceller; diğer anahtarlar (örn. alarmlar) korunur.
+        Sadece değişen anahtarlar kopyalanır (belge büyük olsa da ucuz).
+        """
+        with self._lock:
+            current = self._loaded(name).value
+            value = {**current, **copy.deepcopy(changes)}
+            old, ok = self._store(name, value, copy_value=False)
+        self._notify(name, old, value)
+        return ok
+
+    def _store(self, name, value, copy_value=True):
+        entry = self._loaded(name)
+        old = entry.value
+        entry.value = copy.deepcopy(value) if copy_value else value
+        self.stats['updates'] += 1
+        if entry.write_delay is not None:
+            # Gecikmeli yazma: yazıcı thread birikenleri tek seferde yazar
+            if entry.dirty_since is None:
+                entry.dirty_since = time.monotonic()
+            self._start_writer()
+            self._dirty.notify()
+            return old, True
+        # Hemen yazılan dosyalar ana kilit altında sırayla yazılır (_write_lock sadece gecikmeliler için)
+        return old, self._write(entry)
+
+    def _write(self, entry):
+        """Bellekteki değeri atomik olarak yazar. Yazma başarısızsa False."""
+        with self._lock:
+            if entry.value is None:
+                return True
+            try:
+                text = json.dumps(entry.value, **entry.dump_kwargs)
+            except (TypeError, ValueError) as e:
+                print(f"[HATA] {entry.path} yazılamadı: {e}")
+                if entry.dirty_since is not None:
+                    entry.dirty_since = time.monotonic()  # write_delay sonra tekrar denenir
+                return False
+            # Bu andan sonraki değişiklikler yeni bir yazma ister
+            entry.dirty_since = None
+            entry.writing = True
+        ok = True
+        try:
+            _write_atomic(entry.path, text)
+            self.stats['writes'] += 1
+        except OSError as e:
+            print(f"[HATA] {entry.path} yazılamadı: {e}")
+            ok = False
+        with self._lock:
+            entry.writing = False
+            if not ok and entry.write_delay is not None and entry.dirty_since is None:
+                # Hemen değil write_delay sonra tekrar denenir (yazılamayan yolda sıkı döngü olmasın)
+                entry.dirty_since = time.monotonic()
+            # Kendi yazdığımız dosya izleyicide "dış değişiklik" sayılmasın
+            entry.signature = _signature(entry.path)
+        return ok
+
+    def _start_writer(self):
+        if self._writer is None and not self._closed:
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            with self._lock:
+                due, wait = [], None
+                while not due:
+                    if self._closed:
+                        return
+                    now = time.monotonic()
+                    wait = None
+                    for entry in self._entries.values():
+                        if entry.dirty_since is None or entry.write_delay is None:
+                            continue
+                        left = entry.dirty_since + entry.write_delay - now
+                        if left <= 0:
+                            due.append(entry)
+                        else:
+                            wait = left if wait is None else min(wait, left)
+                    if not due:
+                        self._dirty.wait(wait)
+            with self._write_lock:
+                for entry in due:
+                    self._write(entry)
+
+    def pending(self):
+        """Diske henüz yazılmamış (ya da yazılmakta olan) değişikliği olan dosya adları."""
+        with self._lock:
+            return [name for name, e in self._entries.items() if e.dirty_since is not None or e.writing]
+
+    def flush(self, name=None):
+        """Bekleyen (gecikmeli) yazmaları hemen yapar. Hepsi başarılıysa True."""
+        ok = True
+        with self._write_lock:
+            with self._lock:
+                entries = [e for n, e in self._entries.items()
+                           if e.dirty_since is not None and (name is None or n == name)]
+            for entry in entries:
+                ok = self._write(entry) and ok
+        return ok
+
+    def close(self):
+        """İzleyici ve yazıcı thread'leri durdurur, bekleyen yazmaları diske indirir (çıkışta)."""
+        self.stop()
+        with self._lock:
+            self._closed = True
+            self._dirty.notify_all()
+        return self.flush()
+
+    def subscribe(self, name, callback, copy_values=True):
+        """copy_values=False: abone bellekteki değerleri kopyasız alır (peek gibi; değiştirmemelidir)."""
+        with self._lock:
+            self._subscribers.setdefault(name, []).append((callback, copy_values))
+
+    def unsubscribe(self, name, callback):
+        with self._lock:
+            self._subscribers[name] = [(cb, c) for cb, c in self._subscribers.get(name, []) if cb is not callback]
+
+    def _notify(self, name, old, new):
+        # Bellekteki değerler yerinde değiştirilmez (peek sözleşmesi); aksi istenmedikçe abone kopya alır
+        for callback, copy_values in list(self._subscribers.get(name, ())):
+            try:
+                if copy_values:
+                    callback(name, copy.deepcopy(old), copy.deepcopy(new))
+                else:
+                    callback(name, old, new)
+            except Exception as e:
+                print(f"[HATA] {name} abonesi: {e}")
+
+    def poll(self):
+        """Dosya imzalarını kontrol eder; değişen (ve daha önce yüklenmiş) dosyaları yeniden okur. Değişen adlar."""
+        changed = []
+        with self._lock:
+            for name, entry in self._entries.items():
+                if entry.value is None or _signature(entry.path) == entry.signature:
+                    continue
+                if entry.dirty_since is not None or entry.writing:
+                    continue  # yazılmamış bellek değişiklikleri öncelikli; dosya yazılınca imza güncellenir
+                old = entry.value
+                entry.value, entry.signature = self._read(entry)
+                self.stats['reloads'] += 1
+                if entry.value != old:
+                    changed.append((name, old, entry.value))
+        for name, old, new in changed:
+            self._notify(name, old, new)
+        return [name for name, _old, _new in changed]
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _watch_loop(self):
+        while not self._stop_event.wait(self.watch_interval):
+            self.poll()
+
+    def reads_per_minute(self):
+        minutes = max((time.monotonic() - self._started_at) / 60.0, 1e-9)
+        return self.stats['reads'] / minutes
+
+
+BB_SETTINGS_PATH = os.path.join(_BASE_DIR, 'bb_settings.json')
+USER_STATE_PATH = os.path.join(_BASE_DIR, 'user_state.json')
+MEMORY_PATH = os.path.join(_BASE_DIR, 'memory.json')
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_config_store():
+    """Süreç genelinde paylaşılan depo (bb_settings, user_state, memory); ilk çağrıda izleyici başlar."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            from settings import TIMEFRAMES
+            store = ConfigStore()
+            store.register('bb_settings', BB_SETTINGS_PATH, {}, indent=2)
+            store.register('user_state', USER_STATE_PATH,
+                           {"balance": 1000.0, "selected_timeframes": list(TIMEFRAMES)},
+                           write_delay=STATE_WRITE_DELAY, ensure_ascii=False, indent=2)
+            store.register('memory', MEMORY_PATH, {"content": ""}, ensure_ascii=False, indent=2)
+            _default_store = store.start()
+            import atexit
+            atexit.register(store.close)
+        return _default_store
+
+
+def _benchmark(symbols=150, timeframes=8, cycle_seconds=10, minutes=1):
+    """
+    Bir dakikalık sıcak yol: işçi her döngüde sembol x TF başına BB ayarını, UI 5 sn'de bir
+    kullanıcı durumunu ve alarmları okur. Eski yol her çağrıda dosyayı açıyordu; depo ise bir kez okur.
+    """
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        bb = {tf: {'period': 20, 'stddev': 2.0} for tf in ('M5', 'M15', 'H1', 'H4', 'H6', 'D1', 'W1', '1M')}
+        state = {"balance": 1000.0, "selected_timeframes": list(bb), "alarms": [
+            {"symbol": f"SYM{i}USDT", "direction": "UP", "tf": "H1", "enabled": True} for i in range(50)]}
+        calls = [('bb_settings', symbols * timeframes * (60 // cycle_seconds) * minutes),
+                 ('user_state', 2 * 12 * minutes)]
+
+        def make_store():
+            store = ConfigStore()
+            store.register('bb_settings', os.path.join(tmp, 'bb.json'), {}, indent=2)
+            store.register('user_state', os.path.join(tmp, 'state.json'), {})
+            return store
+        seed = make_store()
+        seed.set('bb_settings', bb)
+        seed.set('user_state', state)
+
+        legacy = make_store()
+        t0 = time.perf_counter()
+        for name, n in calls:
+            entry = legacy._entries[name]
+            for _ in range(n):
+                legacy._read(entry)
+        legacy_ms = (time.perf_counter() - t0) * 1000.0
+
+        store = make_store()
+        t0 = time.perf_counter()
+        for name, n in calls:
+            for _ in range(n):
+                store.peek(name)
+        store_ms = (time.perf_counter() - t0) * 1000.0
+        print(f"{symbols} sembol x {timeframes} TF, {minutes} dk: "
+              f"eski yol {legacy.stats['reads'] / minutes:.0f} okuma/dk ({legacy_ms:.1f}ms), "
+              f"depo {store.stats['reads'] / minutes:.0f} okuma/dk ({store_ms:.1f}ms)")
+
+
+def _benchmark_state_writes(clicks=50, alarms=200, write_delay=STATE_WRITE_DELAY):
+    """
+    TF butonuna art arda tıklama: her tıklama save_user_state ile durumu kaydeder. Hemen yazmada UI
+    thread'i her tıklamada atomik yazmayı (fsync dahil) bekler; gecikmeli yazmada sadece bellek güncellenir.
+    """
+    import tempfile
+    tfs = ['M5', 'M15', 'H1', 'H4', 'H6', 'D1', 'W1', '1M']
+    state = {"balance": 1000.0, "selected_timeframes": tfs, "alarms": [
+        {"id": str(i), "symbol": f"SYM{i}USDT", "direction": "UP", "tf": "H1", "enabled": True}
+        for i in range(alarms)]}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, delay in (("hemen", None), ("gecikmeli", write_delay)):
+            store = ConfigStore()
+            store.register('user_state', os.path.join(tmp, f'{label}.json'), {}, write_delay=delay,
+                           ensure_ascii=False, indent=2)
+            store.set('user_state', state)
+            store.flush()
+            writes_before = store.stats['writes']
+            blocked = []
+            for k in range(clicks):
+                tf_states = {tf: (k + j) % 3 for j, tf in enumerate(tfs)}
+                t0 = time.perf_counter()
+                store.patch('user_state', {"selected_timeframes": [tf for tf, st in tf_states.items() if st],
+                                           "tf_states": tf_states})
+                blocked.append(time.perf_counter() - t0)
+            store.close()
+            with open(store.path('user_state'), 'r', encoding='utf-8') as f:
+                assert len(json.load(f)["alarms"]) == alarms
+            print(f"{clicks} tıklama ({alarms} alarm), {label:>9}: UI thread ortalama "
+                  f"{sum(blocked) / clicks * 1000:.3f}ms, en fazla {max(blocked) * 1000:.3f}ms | "
+                  f"{store.stats['writes'] - writes_before} disk yazması")
+
+
+if __name__ == "__main__":
+    _benchmark()
+    _benchmark_state_writes()
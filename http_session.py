@@ -0,0 +1,89 @@
+# http_session.py
+# Uygulama genelinde paylaşılan, havuzlu requests.Session katmanı.
+# Tüm REST çağrıları (Binance, Ollama) aynı keep-alive bağlantılarını, gzip'i ve tek retry politikasını kullanır.
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Havuz boyutu işçi sayısına göre: 8 zaman dilimi thread'i + 8 thread'lik _pct_executor
+DEFAULT_POOL_SIZE = 16
+# Aynı anda havuzda tutulacak farklı host sayısı (Binance fapi, Ollama, ...)
+DEFAULT_POOL_HOSTS = 4
+
+# Tek retry politikası: sadece bağlantı hataları ve 5xx için, idempotent isteklerde.
+# 429/418 tekrar denenmez; onları rate_limiter yönetir.
+DEFAULT_RETRY = Retry(
+    total=2,
+    connect=2,
+    read=1,
+    backoff_factor=0.3,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD']),
+    respect_retry_after_header=False,
+    raise_on_status=False,
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_size=DEFAULT_POOL_SIZE, pool_hosts=DEFAULT_POOL_HOSTS, retry=DEFAULT_RETRY):
+    """
+    Havuzlu Session üretir.
+    pool_block=True sayesinde host başına en fazla pool_size bağlantı açılır, fazlası sırada bekler.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size,
+                          max_retries=retry, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+    return session
+
+
+def get_session():
+    """Süreç genelinde paylaşılan Session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def connection_stats(session=None):
+    """
+    Host başına açılan bağlantı ve atılan istek sayıları.
+    reuse_ratio: isteklerin ne kadarının mevcut bir bağlantıyı yeniden kullandığı.
+    """
+    session = session or get_session()
+    hosts = {}
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            name = f"{pool.scheme}://{pool.host}:{pool.port}"
+            opened = pool.num_connections
+            reqs = pool.num_requests
+            hosts[name] = {
+                'connections_opened': opened,
+                'requests': reqs,
+                'reuse_ratio': round(1.0 - opened / reqs, 4) if reqs else 0.0,
+            }
+    opened = sum(h['connections_opened'] for h in hosts.values())
+    reqs = sum(h['requests'] for h in hosts.values())
+    return {
+        'hosts': hosts,
+        'connections_opened': opened,
+        'requests': reqs,
+        'reuse_ratio': round(1.0 - opened / reqs, 4) if reqs else 0.0,
+    }
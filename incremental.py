@@ -0,0 +1,401 @@
+# incremental.py
+# (sembol, TF) başına durum tutan, mum güncellemesi başına O(1) çalışan göstergeler.
+# Oluşan mumun her güncellemesinde (tick) gösterge önceki kapanmış mumun durumundan yeniden hesaplanır;
+# böylece oluşan mum revize edildiğinde ya da geri alındığında (rollback) tüm seri yeniden işlenmez.
+# Sonuçlar signal_calculator.compute_supertrend / compute_bollinger ile aynıdır (aynı işlem sırası).
+
+import math
+import threading
+from collections import deque
+
+# Henüz hiç mum işlenmemiş Supertrend durumu:
+# (mum sayısı, önceki kapanış, TR toplamı, atr, üst band, alt band, trend)
+_EMPTY = (0, None, 0.0, None, None, None, 0)
+
+
+class SupertrendState:
+    """
+    Artımlı Supertrend (RMA ATR, taşınan üst/alt bandlar, trend).
+    - window=None: durum ilk mumdan itibaren taşınır; tick ve yeni mum O(1).
+    - window=N: signal_calculator.supertrend_from_store ile aynı şekilde son N mum üzerinden hesaplanır.
+      Tick O(1); pencere kaydığında ATR tohumu ve bandlar pencere başından başladığı için
+      yeni mumda durum penceredeki mumlardan bir kez yeniden kurulur (O(N), mum başına bir kez).
+    update() KlineBuffer.upsert gibi 'append', 'update' veya 'ignored' döner.
+    """
+    def __init__(self, atr_period=10, multiplier=3.0, source='hl2', window=None):
+        self.atr_period = int(atr_period)
+        self.multiplier = float(multiplier)
+        self.source = source
+        self.window = int(window) if window else None
+        self._alpha = 1.0 / self.atr_period
+        self.stats = {'ticks': 0, 'appends': 0, 'rebuilds': 0, 'rollbacks': 0}
+        self.reset()
+
+    def reset(self):
+        # Pencere modunda penceredeki mumlar, taşınan modda sadece oluşan mum tutulur
+        self._bars = deque(maxlen=self.window or 1)
+        self._base = _EMPTY      # kapanmış mumların durumu (oluşan mum hariç)
+        self._cur = _EMPTY       # oluşan mum dahil durum
+        self._forming_time = None
+        self._committed_time = None
+        self._evicted = None
+
+    def seed(self, bars):
+        """{'open_time', 'high', 'low', 'close'} dizilerinden durumu sıfırdan kurar (son mum oluşan mum sayılır)."""
+        self.reset()
+        if bars is None:
+            return
+        n = len(bars['close'])
+        start = n - self.window if self.window and n > self.window else 0
+        for t, h, lo, c in zip(bars['open_time'][start:].tolist(), bars['high'][start:].tolist(),
+                               bars['low'][start:].tolist(), bars['close'][start:].tolist()):
+            self.update(t, h, lo, c)
+
+    def update(self, open_time, high, low, close):
+        bar = (float(high), float(low), float(close))
+        t = int(open_time)
+        if t == self._forming_time:
+            self._bars[-1] = bar
+            self._cur = self._step(self._base, bar)
+            self.stats['ticks'] += 1
+            return 'update'
+        last = self._forming_time if self._forming_time is not None else self._committed_time
+        if last is not None and t <= last:
+            return 'ignored'
+        if self._forming_time is not None:
+            # Oluşan mum kapandı: durumu kalıcı hale gelir
+            self._base = self._cur
+            self._committed_time = self._forming_time
+        self._evicted = self._bars[0] if self.window and len(self._bars) == self.window else None
+        self._bars.append(bar)
+        if self._evicted is not None:
+            self._base = self._fold(list(self._bars)[:-1])
+            self.stats['rebuilds'] += 1
+        self._forming_time = t
+        self._cur = self._step(self._base, bar)
+        self.stats['appends'] += 1
+        return 'append'
+
+    def rollback(self):
+        """Oluşan mumu geri alır; durum son kapanmış muma döner. Geri alınacak mum yoksa False."""
+        if self._forming_time is None:
+            return False
+        self._bars.pop()
+        if self._evicted is not None:
+            self._bars.appendleft(self._evicted)
+            self._base = self._fold(self._bars)
+            self.stats['rebuilds'] += 1
+        self._evicted = None
+        self._cur = self._base
+        self._forming_time = None
+        self.stats['rollbacks'] += 1
+        return True
+
+    def _fold(self, bars):
+        st = _EMPTY
+        for bar in bars:
+            st = self._step(st, bar)
+        return st
+
+    def _step(self, st, bar):
+        """Bir önceki durum + bir mum -> yeni durum (compute_supertrend_state'in tek adımı)."""
+        n, prev_close, tr_sum, atr, up, dn, trend = st
+        h, lo, c = bar
+        p = self.atr_period
+        src = c if self.source == 'close' else (h + lo) / 2.0
+        tr = h - lo if n == 0 else max(h - lo, abs(h - prev_close), abs(lo - prev_close))
+        if n < p - 1:
+            return n + 1, c, tr_sum + tr, None, None, None, 0
+        m = self.multiplier
+        if n == p - 1:
+            atr = (tr_sum + tr) / p
+            up = src + m * atr
+            dn = src - m * atr
+            trend = 1 if c > dn else -1
+            return n + 1, c, tr_sum, atr, up, dn, trend
+        atr = atr + self._alpha * (tr - atr)
+        up = min(src + m * atr, up)
+        dn = max(src - m * atr, dn)
+        if trend == -1 and c > up:
+            trend = 1
+        elif trend == 1 and c < dn:
+            trend = -1
+        return n + 1, c, tr_sum, atr, up, dn, trend
+
+    @property
+    def bars(self):
+        return self._cur[0]
+
+    @property
+    def direction(self):
+        """'up' / 'down'; atr_period + 2 mumdan azsa 'neutral'."""
+        if self._cur[0] < self.atr_period + 2:
+            return 'neutral'
+        return 'up' if self._cur[6] == 1 else 'down'
+
+    @property
+    def band(self):
+        """Aktif band (yükselişte alt, düşüşte üst band); yetersiz veride None."""
+        if self._cur[0] < self.atr_period + 2:
+            return None
+        return self._cur[5] if self._cur[6] == 1 else self._cur[4]
+
+
+class BollingerState:
+    """
+    Son `period` kapanış için kayan toplamlarla Bollinger ortalaması ve varyansı.
+    Toplamlar ilk kapanışa göre kaydırılmış değerlerle tutulur (büyük fiyatlarda sayısal kayıp olmaz)
+    ve her `period` değişiklikte pencereden yeniden toplanır; böylece birikimli hata sınırlı kalır
+    (amortize O(1)).
+    """
+    def __init__(self, period=20, stddev=2.0):
+        self.period = int(period)
+        self.stddev = float(stddev)
+        self.reset()
+
+    def reset(self):
+        self._win = deque(maxlen=self.period)
+        self._forming_time = None
+        self._committed_time = None
+        self._evicted = None
+        self._shift = None
+        self._s = 0.0
+        self._ss = 0.0
+        self._ops = 0
+
+    def seed(self, open_times, closes):
+        self.reset()
+        for t, c in zip(list(open_times)[-self.period:], list(closes)[-self.period:]):
+            self.update(t, c)
+
+    def _add(self, x):
+        d = x - self._shift
+        self._s += d
+        self._ss += d * d
+
+    def _remove(self, x):
+        d = x - self._shift
+        self._s -= d
+        self._ss -= d * d
+
+    def _touch(self):
+        self._ops += 1
+        if self._ops >= self.period:
+            self._resum()
+
+    def _resum(self):
+        self._ops = 0
+        self._shift = self._win[0] if self._win else self._shift
+        self._s = 0.0
+        self._ss = 0.0
+        for x in self._win:
+            self._add(x)
+
+    def update(self, open_time, close):
+        c = float(close)
+        t = int(open_time)
+        if self._shift is None:
+            self._shift = c
+        if t == self._forming_time:
+            self._remove(self._win[-1])
+            self._win[-1] = c
+            self._add(c)
+            self._touch()
+            return 'update'
+        last = self._forming_time if self._forming_time is not None else self._committed_time
+        if last is not None and t <= last:
+            return 'ignored'
+        if self._forming_time is not None:
+            self._committed_time = self._forming_time
+        self._evicted = self._win[0] if len(self._win) == self.period else None
+        if self._evicted is not None:
+            self._remove(self._evicted)
+        self._win.append(c)
+        self._add(c)
+        self._forming_time = t
+        self._touch()
+        return 'append'
+
+    def rollback(self):
+        if self._forming_time is None:
+            return False
+        self._remove(self._win.pop())
+        if self._evicted is not None:
+            self._win.appendleft(self._evicted)
+            self._add(self._evicted)
+        self._evicted = None
+        self._forming_time = None
+        self._touch()
+        return True
+
+    def bands(self):
+        """(ortalama, üst band, alt band); pencere dolmadıysa None."""
+        if len(self._win) < self.period:
+            return None
+        mean_d = self._s / self.period
+        std = math.sqrt(max(self._ss / self.period - mean_d * mean_d, 0.0))
+        ma = self._shift + mean_d
+        return ma, ma + self.stddev * std, ma - self.stddev * std
+
+    @property
+    def signal(self):
+        """compute_bollinger ile aynı kurallar: 'up' / 'down' / 'neutral'."""
+        b = self.bands()
+        if b is None:
+            return 'neutral'
+        ma, upper, lower = b
+        last = self._win[-1]
+        if last > upper:
+            return 'up'
+        elif last < lower:
+            return 'down'
+        elif last > ma:
+            return 'up'
+        elif last < ma:
+            return 'down'
+        return 'neutral'
+
+
+class BarAggregator:
+    """
+    Kaynak interval mumlarından türetilen interval'in (örn. 1h -> 4h) oluşan mumunu O(1) günceller.
+    Kovadaki kapanmış kaynak mumlar tek bir (açılış, yüksek, düşük, kapanış) özetinde tutulur;
+    oluşan kaynak mum her güncellemede bu özetle birleştirilir (resample.resample_bars ile aynı sonuç).
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        self._bucket = None
+        self._closed = None
+        self._forming_time = None
+        self._forming = None
+
+    def seed(self, bars):
+        """Kaynak mumlardan ({'open_time', 'open', 'high', 'low', 'close'}) son kovayı kurar."""
+        import resample
+        self.reset()
+        if bars is None or not len(bars['open_time']):
+            return
+        starts = resample.bucket_open_times(bars['open_time'], self.interval)
+        first = int(starts.searchsorted(starts[-1]))
+        for i in range(first, len(starts)):
+            self.update(bars['open_time'][i], bars['open'][i], bars['high'][i], bars['low'][i], bars['close'][i])
+
+    def update(self, open_time, o, h, lo, c):
+        """Kaynak mumu işler; türetilen mumu (kova açılışı, o, h, l, c) döndürür, eski mumsa None."""
+        import resample
+        t = int(open_time)
+        bar = (float(o), float(h), float(lo), float(c))
+        if t != self._forming_time:
+            if self._forming_time is not None:
+                if t < self._forming_time:
+                    return None
+                self._closed = _merge(self._closed, self._forming)
+            bucket = int(resample.bucket_open_times([t], self.interval)[0])
+            if bucket != self._bucket:
+                self._bucket = bucket
+                self._closed = None
+            self._forming_time = t
+        self._forming = bar
+        return (self._bucket,) + _merge(self._closed, bar)
+
+
+def _merge(agg, bar):
+    if agg is None:
+        return bar
+    return agg[0], max(agg[1], bar[1]), min(agg[2], bar[2]), bar[3]
+
+
+class StreamSupertrend:
+    """
+    Bir sembolün akıştan gelen kaynak interval'i ve ondan türetilen interval'ler için artımlı Supertrend.
+    seed() depodaki mumlardan kurar (REST tamamlaması sonrası), update() her akış mesajında O(1) çalışır.
+    """
+    def __init__(self, interval, derived=(), include_base=True, window=None, atr_period=10,
+                 multiplier=3.0, source='hl2'):
+        self.interval = interval
+        self.window = window
+        self.lock = threading.Lock()
+        self.seeded = False
+
+        def make():
+            return SupertrendState(atr_period, multiplier, source, window)
+        self.base = make() if include_base else None
+        self.derived = {d: (BarAggregator(d), make()) for d in derived}
+
+    def seed(self, store, symbol):
+        import resample
+        fields = ('open_time', 'high', 'low', 'close')
+        with self.lock:
+            if self.base is not None:
+                self.base.seed(store.series(symbol, self.interval, self.window, fields))
+            if self.derived:
+                bars = store.series(symbol, self.interval, None, ('open_time', 'open', 'high', 'low', 'close'))
+                for d, (agg, state) in self.derived.items():
+                    agg.seed(bars)
+                    state.seed(resample.series(store, symbol, d, self.window, fields))
+            self.seeded = True
+
+    def update(self, open_time, o, h, lo, c):
+        """Kaynak mumu işler; {interval: yön} döndürür (kurulmadıysa boş)."""
+        out = {}
+        with self.lock:
+            if not self.seeded:
+                return out
+            if self.base is not None:
+                self.base.update(open_time, h, lo, c)
+                out[self.interval] = self.base.direction
+            for d, (agg, state) in self.derived.items():
+                bar = agg.update(open_time, o, h, lo, c)
+                if bar is not None:
+                    state.update(bar[0], bar[2], bar[3], bar[4])
+                out[d] = state.direction
+        return out
+
+    def directions(self):
+        with self.lock:
+            out = {d: state.direction for d, (_agg, state) in self.derived.items()}
+            if self.base is not None:
+                out[self.interval] = self.base.direction
+            return out
+
+
+def _benchmark(symbols=150, bars=60, ticks=200):
+    """Akış mesajı başına: depodan tam yeniden hesaplama ile artımlı durum güncellemesi."""
+    import time
+
+    from binance_stub import synthetic_klines
+    from kline_store import KlineStore
+    from signal_calculator import supertrend_from_store, supertrend_limit
+    store = KlineStore(fresh_ttl_ms={})
+    names = [f"SYM{i:04d}USDT" for i in range(symbols)]
+    states = {}
+    for s in names:
+        store.merge_rows(s, '1h', synthetic_klines(s, '1h', bars + 1))
+        states[s] = StreamSupertrend('1h', ('4h',), window=supertrend_limit())
+        states[s].seed(store, s)
+    last = {s: store.series(s, '1h', 1, ('open_time', 'open', 'high', 'low', 'close')) for s in names}
+    t0 = time.perf_counter()
+    for k in range(ticks):
+        for s in names:
+            b = last[s]
+            c = float(b['close'][0]) * (1 + 0.0001 * (k % 7 - 3))
+            store.buffer(s, '1h').upsert(int(b['open_time'][0]), b['open'][0], b['high'][0], b['low'][0], c, 1.0)
+            supertrend_from_store(s, '1h', store=store)
+            supertrend_from_store(s, '4h', store=store)
+    full = (time.perf_counter() - t0) / (ticks * symbols)
+    t0 = time.perf_counter()
+    for k in range(ticks):
+        for s in names:
+            b = last[s]
+            c = float(b['close'][0]) * (1 + 0.0001 * (k % 7 - 3))
+            states[s].update(int(b['open_time'][0]), b['open'][0], b['high'][0], b['low'][0], c)
+    inc = (time.perf_counter() - t0) / (ticks * symbols)
+    print(f"mesaj başına (1h + türetilen 4h): tam={full * 1e6:8.1f}µs artımlı={inc * 1e6:6.1f}µs "
+          f"hızlanma={full / inc:5.1f}x")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,82 @@
+# indicator_memo.py
+# Gösterge sonuçları için sınırlı LRU önbellek (memoization).
+# Anahtar: (gösterge, parametreler, sembol, interval) + son mumun kimliği (tampon, mum sayısı,
+# açılış zamanı, high/low/close). Son mum değişmediyse (W1/1M'de ve az işlem gören sembollerde sık)
+# hesap yapılmadan önceki sonuç döner. İsabet oranları interval başına tutulur.
+
+import threading
+from collections import OrderedDict
+
+try:
+    from settings import INDICATOR_MEMO_MAX_ENTRIES
+except ImportError:
+    INDICATOR_MEMO_MAX_ENTRIES = 20_000
+
+
+class IndicatorMemo:
+    """
+    OrderedDict tabanlı LRU. get_or_compute(key, interval, fn): anahtar varsa sonucu döndürür (hit),
+    yoksa fn()'i çalıştırıp saklar (miss); kapasite aşılınca en eski kullanılan atılır.
+    """
+    def __init__(self, max_entries=INDICATOR_MEMO_MAX_ENTRIES):
+        self.max_entries = int(max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {}  # {interval: [hit, miss]}
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, interval, fn):
+        with self._lock:
+            counts = self._stats.setdefault(interval, [0, 0])
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                counts[0] += 1
+                return self._entries[key]
+            counts[1] += 1
+        # Hesap kilit dışında: aynı anahtarı aynı anda hesaplayan iki thread aynı sonucu yazar
+        value = fn()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+            self.evictions = 0
+
+    def hit_ratios(self):
+        """{interval: {'hits', 'misses', 'ratio'}} ve 'total' satırı."""
+        with self._lock:
+            stats = {k: tuple(v) for k, v in self._stats.items()}
+        out = {}
+        for interval, (hits, misses) in sorted(stats.items()):
+            out[interval] = {'hits': hits, 'misses': misses,
+                             'ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0}
+        hits = sum(h for h, _m in stats.values())
+        misses = sum(m for _h, m in stats.values())
+        out['total'] = {'hits': hits, 'misses': misses,
+                        'ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0}
+        return out
+
+    def format_hit_ratios(self):
+        """Günlük için tek satırlık özet: '1h=%87.5 1d=%99.0 ... toplam=%91.2 (1234 kayıt)'."""
+        ratios = self.hit_ratios()
+        total = ratios.pop('total')
+        parts = [f"{interval}=%{v['ratio'] * 100:.1f}" for interval, v in ratios.items()]
+        return " ".join(parts + [f"toplam=%{total['ratio'] * 100:.1f} ({len(self)} kayıt)"])
+
+
+_default_memo = IndicatorMemo()
+
+
+def get_indicator_memo():
+    """Süreç genelinde paylaşılan gösterge önbelleği."""
+    return _default_memo
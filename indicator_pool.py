@@ -0,0 +1,216 @@
+# indicator_pool.py
+# Gösterge hesabını ayrı süreçlere (process pool) taşır; böylece yoğun Supertrend döngüleri
+# Tk ana döngüsüyle aynı GIL için yarışmaz.
+# Mum dizileri paylaşılan belleğe (multiprocessing.shared_memory) yazılır, işçiler sembol
+# aralıklarına (shard) bölünmüş satırları okur ve sadece sembol başına int8 yön döndürür.
+
+import atexit
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from supertrend_batch import direction_names, supertrend_batch
+
+try:
+    from settings import INDICATOR_POOL_WORKERS
+except ImportError:
+    INDICATOR_POOL_WORKERS = 0
+
+# Bundan az satırlık gruplar süreçler arası iletişime değmez; aynı süreçte hesaplanır
+MIN_POOL_ROWS = 64
+
+# İşçi sürecinde açık tutulan paylaşılan bellek blokları: {ad: SharedMemory}
+_attached = {}
+
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        # Eski (büyütülüp bırakılmış) bloklar kapatılır
+        for old in list(_attached):
+            _attached.pop(old).close()
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+def _supertrend_shard(name, shape, start, stop, atr_period, multiplier, source):
+    """İşçi sürecinde: paylaşılan bellekteki (3, N, L) dizinin [start:stop] satırları için int8 yönler."""
+    shm = _attach(name)
+    arr = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    out = supertrend_batch(arr[0, start:stop], arr[1, start:stop], arr[2, start:stop],
+                           atr_period, multiplier, source)['direction']
+    return out.tobytes()
+
+
+class IndicatorPool:
+    """
+    Sembole göre bölünmüş (sharded) gösterge hesabı için süreç havuzu.
+    Paylaşılan bellek bloğu çağrılar arasında yeniden kullanılır; gerektiğinde büyütülür.
+    """
+    def __init__(self, workers=None, mp_context="spawn"):
+        self.workers = max(1, int(workers or INDICATOR_POOL_WORKERS or 1))
+        self._ctx = get_context(mp_context)
+        self._executor = None
+        self._shm = None
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'rows': 0, 'local_rows': 0}
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._ctx)
+            # İşçileri önceden başlat (ilk çağrıda spawn gecikmesi olmasın)
+            list(self._executor.map(time.sleep, [0] * self.workers))
+        return self
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def _buffer(self, nbytes):
+        if self._shm is None or self._shm.size < nbytes:
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+            self._shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1 << 16))
+        return self._shm
+
+    def supertrend_directions(self, highs, lows, closes, atr_period=10, multiplier=3.0, source='hl2'):
+        """(N, L) dizilerden N sembolün son Supertrend yönü: int8 (1 yukarı, -1 aşağı, 0 yetersiz)."""
+        n, length = np.shape(closes)
+        if n < MIN_POOL_ROWS:
+            self.stats['local_rows'] += n
+            return supertrend_batch(highs, lows, closes, atr_period, multiplier, source)['direction']
+        self.start()
+        shape = (3, n, length)
+        with self._lock:
+            shm = self._buffer(3 * n * length * 8)
+            arr = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            arr[0], arr[1], arr[2] = highs, lows, closes
+            bounds = np.linspace(0, n, self.workers + 1).astype(int)
+            futures = [self._executor.submit(_supertrend_shard, shm.name, shape, int(a), int(b),
+                                             atr_period, multiplier, source)
+                       for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+            out = np.concatenate([np.frombuffer(f.result(), dtype=np.int8) for f in futures])
+            del arr
+        self.stats['calls'] += 1
+        self.stats['rows'] += n
+        return out
+
+    def supertrend_signals_from_store(self, symbols, interval, store=None, atr_period=10, multiplier=3.0,
+                                      source='hl2'):
+        """supertrend_batch.supertrend_signals_from_store ile aynı sonuç; hesap süreç havuzunda."""
+        import resample
+        from kline_store import get_kline_store
+        from signal_calculator import supertrend_limit
+        store = store or get_kline_store()
+        limit = supertrend_limit(atr_period)
+        groups = {}
+        result = {}
+        for symbol in symbols:
+            snap = resample.series(store, symbol, interval, limit)
+            if snap is None or len(snap['close']) < atr_period + 2:
+                result[symbol] = 'neutral'
+                continue
+            groups.setdefault(len(snap['close']), []).append((symbol, snap))
+        for items in groups.values():
+            direction = self.supertrend_directions(np.stack([s['high'] for _sym, s in items]),
+                                                   np.stack([s['low'] for _sym, s in items]),
+                                                   np.stack([s['close'] for _sym, s in items]),
+                                                   atr_period, multiplier, source)
+            for (symbol, _snap), name in zip(items, direction_names(direction)):
+                result[symbol] = name
+        return result
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_indicator_pool():
+    """settings.INDICATOR_POOL_WORKERS > 0 ise paylaşılan süreç havuzu, değilse None."""
+    global _default_pool
+    if INDICATOR_POOL_WORKERS <= 0:
+        return None
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = IndicatorPool(INDICATOR_POOL_WORKERS)
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+def _benchmark(symbol_count=650, intervals=8, bars=60, bursts=3, workers=4, threads=8):
+    """
+    UI thread'i tepkiselliği: 10 ms'lik bir "ana döngü" thread'inin gecikmesi, yenileme patlamasında
+    hesap aynı süreçteki thread'lerde (havuz kapalı) veya süreç havuzunda (açık) yapılırken ölçülür.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from signal_calculator import compute_supertrend
+    rng = np.random.default_rng(11)
+    n = symbol_count * intervals
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(n, bars)), axis=1))
+    highs = closes * (1 + rng.uniform(0, 0.01, size=(n, bars)))
+    lows = closes * (1 - rng.uniform(0, 0.01, size=(n, bars)))
+    hl, ll, cl = highs.tolist(), lows.tolist(), closes.tolist()
+
+    def ui_loop(stop, lags):
+        tick = 0.010
+        next_t = time.perf_counter() + tick
+        while not stop.is_set():
+            time.sleep(max(0.0, next_t - time.perf_counter()))
+            now = time.perf_counter()
+            lags.append((now - next_t) * 1000.0)
+            sum(range(200))  # küçük bir UI geri çağrısı
+            next_t = now + tick
+
+    def run(label, burst):
+        stop, lags = threading.Event(), []
+        t = threading.Thread(target=ui_loop, args=(stop, lags))
+        t.start()
+        time.sleep(0.1)
+        t0 = time.perf_counter()
+        for _ in range(bursts):
+            burst()
+        elapsed = (time.perf_counter() - t0) / bursts
+        stop.set()
+        t.join()
+        lags = np.asarray(lags)
+        print(f"{label:>12}: patlama={elapsed * 1000:7.1f}ms | UI gecikmesi p50={np.percentile(lags, 50):5.2f}ms "
+              f"p99={np.percentile(lags, 99):6.2f}ms max={lags.max():6.2f}ms")
+
+    def threaded():
+        with ThreadPoolExecutor(max_workers=threads) as ex:
+            list(ex.map(lambda k: compute_supertrend(hl[k], ll[k], cl[k]), range(n)))
+
+    def batched():
+        # Aynı vektörel çekirdek, ama UI ile aynı süreçte (ayrı thread'de)
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            ex.submit(supertrend_batch, highs, lows, closes).result()
+
+    print(f"{symbol_count} sembol x {intervals} TF x {bars} mum, {workers} süreç")
+    run("havuz kapalı", threaded)
+    run("toplu/thread", batched)
+    with IndicatorPool(workers) as pool:
+        run("havuz açık", lambda: pool.supertrend_directions(highs, lows, closes))
+        expected = np.array([{'up': 1, 'down': -1}.get(compute_supertrend(hl[k], ll[k], cl[k]), 0)
+                             for k in range(n)], dtype=np.int8)
+        assert np.array_equal(pool.supertrend_directions(highs, lows, closes), expected)
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,407 @@
+# indicator_registry.py
+# Bağımlılıkları bildirilen göstergeler ve paylaşılan ara hesaplar.
+# Her gösterge adıyla kaydedilir ve hangi ara değerlere (örn. ATR -> TR, MACD -> EMA12 + EMA26)
+# dayandığını bildirir. Bir (sembol, TF, mum) için her ara değer bir kez hesaplanır ve onu isteyen
+# tüm tüketiciler (worker, kural motoru, AnalizPanel, zamanlayıcı) aynı sonucu kullanır.
+
+import threading
+import time
+
+import numpy as np
+
+import resample
+from kline_store import get_kline_store
+
+# Mumun ham alanları; bağımlılık olarak doğrudan kullanılabilir
+BAR_FIELDS = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+
+SUPERTREND_ATR_PERIOD = 10
+SUPERTREND_MULTIPLIER = 3.0
+BB_PERIOD = 20
+BB_STDDEV = 2.0
+RSI_PERIOD = 14
+STOCH_PERIOD = 14
+
+# Gösterge sonuç türleri: sayı dizisi, yön ('up' / 'down' / 'neutral') ya da başka ara değer (örn. tuple)
+SERIES, DIRECTION, STATE = 'series', 'direction', 'state'
+
+
+class IndicatorRegistry:
+    """
+    Ad -> (bağımlılıklar, hesap fonksiyonu, sonuç türü). Bağımlılıklar kayıt anında var olmalıdır;
+    böylece grafik her zaman döngüsüzdür ve kayıt sırası geçerli bir hesap sırasıdır.
+    """
+    def __init__(self):
+        self._defs = {}
+
+    def register(self, name, deps=(), kind=SERIES):
+        if kind not in (SERIES, DIRECTION, STATE):
+            raise ValueError(f"{name}: bilinmeyen sonuç türü {kind}")
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self._defs and dep not in BAR_FIELDS:
+                raise ValueError(f"{name}: bilinmeyen bağımlılık {dep}")
+
+        def decorator(func):
+            self._defs[name] = (deps, func, kind)
+            return func
+        return decorator
+
+    def names(self):
+        return list(self._defs)
+
+    def deps(self, name):
+        return self._defs[name][0]
+
+    def dependencies(self, name):
+        """`name` için gereken tüm göstergeler, hesap sırasıyla (kendisi dahil, ham alanlar hariç)."""
+        order = []
+
+        def visit(n):
+            if n in BAR_FIELDS or n in order:
+                return
+            for dep in self._defs[n][0]:
+                visit(dep)
+            order.append(n)
+        visit(name)
+        return order
+
+    def func(self, name):
+        return self._defs[name][1]
+
+    def kind(self, name):
+        """SERIES / DIRECTION / STATE; ham mum alanları SERIES."""
+        return SERIES if name in BAR_FIELDS else self._defs[name][2]
+
+
+class IndicatorContext:
+    """
+    Tek (sembol, TF, mum sürümü) için hesaplanmış değerler.
+    get() bir göstergeyi (ve eksik bağımlılıklarını) ilk istekte hesaplar, sonrakilerde saklananı döndürür.
+    """
+    def __init__(self, registry, bars, version=None):
+        self.registry = registry
+        self.bars = bars
+        self.version = version
+        self.source = None  # sürümün ait olduğu KlineBuffer
+        self.values = {}
+        self.computed = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.bars['close'])
+
+    def get(self, name):
+        if name in BAR_FIELDS:
+            return self.bars[name]
+        with self._lock:
+            if name not in self.values:
+                self.values[name] = self.registry.func(name)(self)
+                self.computed += 1
+            return self.values[name]
+
+    def last(self, name):
+        """Serinin son değeri (float); tanımsızsa None. Seri olmayan değerler olduğu gibi döner."""
+        value = self.get(name)
+        if not isinstance(value, np.ndarray):
+            return value
+        if not len(value) or np.isnan(value[-1]):
+            return None
+        return float(value[-1])
+
+
+class IndicatorCache:
+    """
+    (sembol, TF) başına en son IndicatorContext. Kaynak tamponun sürümü (KlineBuffer.version)
+    değişmediyse aynı bağlam döner; değiştiyse son `bars` mumdan yeni bağlam kurulur.
+    Türetilen TF'ler kaynak interval'in sürümünü kullanır.
+    """
+    def __init__(self, registry=None, store=None, bars=None):
+        from signal_calculator import supertrend_limit
+        self.registry = registry or REGISTRY
+        self.store = store
+        self.bars = bars or supertrend_limit(SUPERTREND_ATR_PERIOD)
+        self._contexts = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def context(self, symbol, interval, store=None):
+        store = store or self.store or get_kline_store()
+        buf = store.get(symbol, resample.base_interval(interval) or interval)
+        if buf is None:
+            return None
+        # Sürüm kopyadan önce okunur: arada gelen güncelleme en kötü ihtimalle bir sonraki çağrıda yeniden hesaplatır
+        version = buf.version
+        key = (symbol, interval)
+        with self._lock:
+            ctx = self._contexts.get(key)
+            if ctx is not None and ctx.source is buf and ctx.version == version:
+                self.stats['hits'] += 1
+                return ctx
+            self.stats['misses'] += 1
+        snap = resample.series(store, symbol, interval, self.bars, BAR_FIELDS)
+        if snap is None:
+            return None
+        ctx = IndicatorContext(self.registry, snap, version)
+        ctx.source = buf
+        with self._lock:
+            self._contexts[key] = ctx
+        return ctx
+
+    def get(self, symbol, interval, name, store=None):
+        ctx = self.context(symbol, interval, store)
+        return None if ctx is None else ctx.get(name)
+
+    def latest(self, symbol, interval, names, store=None):
+        """{gösterge: son değer}; veri yoksa tüm değerler None."""
+        ctx = self.context(symbol, interval, store)
+        if ctx is None or not len(ctx):
+            return {name: None for name in names}
+        return {name: ctx.last(name) for name in names}
+
+
+REGISTRY = IndicatorRegistry()
+register = REGISTRY.register
+
+
+def _rolling(values, window, func):
+    """Kayan pencere fonksiyonu; ilk window-1 değer NaN."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        view = np.lib.stride_tricks.sliding_window_view(values, window)
+        out[window - 1:] = func(view, axis=1)
+    return out
+
+
+def _ema(values, span):
+    """pandas ewm(span, adjust=False) ile aynı: ilk değerden başlayan özyinelemeli EMA."""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty(len(values))
+    prev = None
+    for i, x in enumerate(values.tolist()):
+        prev = x if prev is None or prev != prev else (1 - alpha) * prev + alpha * x
+        out[i] = prev
+    return out
+
+
+# --- Ara değerler ---
+@register('hl2', deps=('high', 'low'))
+def _hl2(ctx):
+    return (ctx.get('high') + ctx.get('low')) / 2.0
+
+
+@register('hlc3', deps=('high', 'low', 'close'))
+def _hlc3(ctx):
+    return (ctx.get('high') + ctx.get('low') + ctx.get('close')) / 3.0
+
+
+@register('tr', deps=('high', 'low', 'close'))
+def _tr(ctx):
+    from signal_calculator import true_range
+    return np.asarray(true_range(ctx.get('high').tolist(), ctx.get('low').tolist(), ctx.get('close').tolist()),
+                      dtype=np.float64)
+
+
+@register('delta', deps=('close',))
+def _delta(ctx):
+    close = ctx.get('close')
+    return np.concatenate(([np.nan], np.diff(close))) if len(close) else close.copy()
+
+
+@register('ema12', deps=('close',))
+def _ema12(ctx):
+    return _ema(ctx.get('close'), 12)
+
+
+@register('ema26', deps=('close',))
+def _ema26(ctx):
+    return _ema(ctx.get('close'), 26)
+
+
+@register('sma20', deps=('close',))
+def _sma20(ctx):
+    return _rolling(ctx.get('close'), BB_PERIOD, np.mean)
+
+
+@register('std20', deps=('close',))
+def _std20(ctx):
+    return _rolling(ctx.get('close'), BB_PERIOD, np.std)
+
+
+@register('hh14', deps=('high',))
+def _hh14(ctx):
+    return _rolling(ctx.get('high'), STOCH_PERIOD, np.max)
+
+
+@register('ll14', deps=('low',))
+def _ll14(ctx):
+    return _rolling(ctx.get('low'), STOCH_PERIOD, np.min)
+
+
+# --- Göstergeler ---
+@register('atr', deps=('tr',))
+def _atr(ctx):
+    from signal_calculator import rma
+    p = SUPERTREND_ATR_PERIOD
+    out = np.asarray(rma(ctx.get('tr').tolist(), p), dtype=np.float64)
+    out[:p - 1] = np.nan
+    return out
+
+
+@register('supertrend_state', deps=('hl2', 'close', 'atr'), kind=STATE)
+def _supertrend_state(ctx):
+    """(yön, aktif band) — signal_calculator.compute_supertrend_state ile aynı."""
+    from signal_calculator import supertrend_from_atr
+    if len(ctx) < SUPERTREND_ATR_PERIOD + 2:
+        return 'neutral', None
+    return supertrend_from_atr(ctx.get('hl2').tolist(), ctx.get('close').tolist(), ctx.get('atr').tolist(),
+                               SUPERTREND_ATR_PERIOD, SUPERTREND_MULTIPLIER)
+
+
+@register('supertrend', deps=('supertrend_state',), kind=DIRECTION)
+def _supertrend(ctx):
+    return ctx.get('supertrend_state')[0]
+
+
+@register('bb_upper', deps=('sma20', 'std20'))
+def _bb_upper(ctx):
+    return ctx.get('sma20') + BB_STDDEV * ctx.get('std20')
+
+
+@register('bb_lower', deps=('sma20', 'std20'))
+def _bb_lower(ctx):
+    return ctx.get('sma20') - BB_STDDEV * ctx.get('std20')
+
+
+@register('bb', deps=('close', 'sma20', 'bb_upper', 'bb_lower'), kind=DIRECTION)
+def _bb(ctx):
+    """compute_bollinger ile aynı kurallar: 'up' / 'down' / 'neutral'."""
+    ma, upper, lower = ctx.last('sma20'), ctx.last('bb_upper'), ctx.last('bb_lower')
+    if ma is None:
+        return 'neutral'
+    last = float(ctx.get('close')[-1])
+    if last > upper:
+        return 'up'
+    elif last < lower:
+        return 'down'
+    elif last > ma:
+        return 'up'
+    elif last < ma:
+        return 'down'
+    return 'neutral'
+
+
+@register('rsi', deps=('delta',))
+def _rsi(ctx):
+    """UI'daki hesapla aynı: 14 mumluk basit ortalama kazanç/kayıp (pandas rolling mean)."""
+    delta = ctx.get('delta')
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = _rolling(gain, RSI_PERIOD, np.mean)
+    avg_loss = _rolling(loss, RSI_PERIOD, np.mean)
+    return 100 - 100 / (1 + avg_gain / (avg_loss + 1e-9))
+
+
+@register('ema', deps=('ema12',))
+def _ema_alias(ctx):
+    return ctx.get('ema12')
+
+
+@register('macd', deps=('ema12', 'ema26'))
+def _macd(ctx):
+    return ctx.get('ema12') - ctx.get('ema26')
+
+
+@register('macd_signal', deps=('macd',))
+def _macd_signal(ctx):
+    return _ema(ctx.get('macd'), 9)
+
+
+@register('macd_hist', deps=('macd', 'macd_signal'))
+def _macd_hist(ctx):
+    return ctx.get('macd') - ctx.get('macd_signal')
+
+
+@register('stoch_k', deps=('close', 'hh14', 'll14'))
+def _stoch_k(ctx):
+    hh, ll = ctx.get('hh14'), ctx.get('ll14')
+    rng = hh - ll
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(rng > 0, (ctx.get('close') - ll) / rng * 100.0, np.where(np.isnan(rng), np.nan, 50.0))
+
+
+@register('stoch_d', deps=('stoch_k',))
+def _stoch_d(ctx):
+    return _rolling(ctx.get('stoch_k'), 3, np.mean)
+
+
+@register('vwap', deps=('hlc3', 'volume'))
+def _vwap(ctx):
+    """Pencere başından itibaren hacim ağırlıklı ortalama fiyat."""
+    vol = ctx.get('volume')
+    cum_v = np.cumsum(vol)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(cum_v > 0, np.cumsum(ctx.get('hlc3') * vol) / cum_v, np.nan)
+
+
+# Tam gösterge seti (benchmark ve AnalizPanel)
+FULL_SET = ('supertrend', 'bb', 'rsi', 'macd', 'macd_signal', 'macd_hist', 'ema', 'atr', 'stoch_k', 'stoch_d',
+            'vwap')
+
+_default_cache = IndicatorCache()
+
+
+def get_indicator_cache():
+    """Süreç genelinde paylaşılan gösterge önbelleği (varsayılan mum deposu üzerinde)."""
+    return _default_cache
+
+
+def _benchmark(symbol_count=650, intervals=('5m', '1h', '4h', '1d'), repeat=3):
+    """
+    Tüm evrende tam gösterge seti: her gösterge kendi ara değerlerini ayrı hesaplarsa
+    (bağlam paylaşımı yok) ile ara değerler paylaşılırsa karşılaştırılır.
+    """
+    from binance_stub import synthetic_klines
+    from kline_store import KlineStore
+    store = KlineStore(fresh_ttl_ms={})
+    symbols = [f"SYM{i:04d}USDT" for i in range(symbol_count)]
+    for s in symbols:
+        for interval in {resample.base_interval(iv) or iv for iv in intervals}:
+            store.merge_rows(s, interval, synthetic_klines(s, interval, resample.history_for(interval, 60)))
+    pairs = [(s, iv) for s in symbols for iv in intervals]
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        separate = 0
+        for s, iv in pairs:
+            snap = resample.series(store, s, iv, 60, BAR_FIELDS)
+            for name in FULL_SET:
+                ctx = IndicatorContext(REGISTRY, snap)
+                ctx.get(name)
+                separate += ctx.computed
+    separate_t = (time.perf_counter() - t0) / repeat
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        cache = IndicatorCache(store=store)
+        shared = 0
+        for s, iv in pairs:
+            ctx = cache.context(s, iv)
+            for name in FULL_SET:
+                ctx.get(name)
+            shared += ctx.computed
+    shared_t = (time.perf_counter() - t0) / repeat
+
+    t0 = time.perf_counter()
+    for s, iv in pairs:
+        for name in FULL_SET:
+            cache.get(s, iv, name)
+    cached_t = time.perf_counter() - t0
+    print(f"{len(pairs)} (sembol, TF) x {len(FULL_SET)} gösterge")
+    print(f"  ayrı hesap:      {separate_t * 1000:8.1f}ms  ({separate} hesap)")
+    print(f"  paylaşılan ara:  {shared_t * 1000:8.1f}ms  ({shared} hesap)  hızlanma={separate_t / shared_t:4.1f}x")
+    print(f"  aynı mum (önbellek): {cached_t * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
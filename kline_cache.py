@@ -0,0 +1,288 @@
+# kline_cache.py
+# KlineStore için kalıcı (SQLite) mum önbelleği.
+# Açılışta depo diskten doldurulur, böylece yeniden başlatmada sadece eksik mumlar (delta) çekilir.
+# Kayıt periyodik ve artımlıdır (sadece son kayıttan sonraki mumlar); sıkıştırma eski mumları
+# ve uzun süredir kullanılmayan serileri siler, dosya boyutu üst sınırı aşarsa en eski seriler atılır.
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from settings import KLINE_CACHE_PATH, KLINE_CACHE_MAX_MB
+except ImportError:
+    KLINE_CACHE_PATH = os.path.join(os.path.dirname(__file__), "kline_cache.sqlite3")
+    KLINE_CACHE_MAX_MB = 200
+
+# Seri başına diskte tutulacak en fazla mum (tek istekte çekilebilen en fazla mum kadar)
+DEFAULT_KEEP_BARS = 1500
+# Bu kadar gün okunmayan seriler sıkıştırmada silinir
+DEFAULT_STALE_DAYS = 30
+DEFAULT_SAVE_INTERVAL = 60
+# Otomatik kayıtta her bu kadar kayıtta bir sıkıştırma (varsayılanla saatte bir)
+COMPACT_EVERY_SAVES = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS klines (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    open_time INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, interval, open_time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    capacity INTEGER NOT NULL,
+    exhausted INTEGER NOT NULL DEFAULT 0,
+    last_access INTEGER NOT NULL,
+    PRIMARY KEY (symbol, interval)
+) WITHOUT ROWID;
+"""
+
+
+class KlineCache:
+    """
+    (sembol, interval) mum serilerini tek bir SQLite dosyasında tutar.
+    Tüm erişim tek bağlantı ve kilit üzerinden yapılır; WAL kipi okuma/yazmayı hızlı tutar.
+    """
+    def __init__(self, path=KLINE_CACHE_PATH, max_mb=KLINE_CACHE_MAX_MB, keep_bars=DEFAULT_KEEP_BARS):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.keep_bars = int(keep_bars)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # (sembol, interval) -> diske yazılmış son açılış zamanı (o mum hâlâ oluşuyor olabilir)
+        self._saved_until = {}
+        # (sembol, interval) -> yüklenen/kaydedilen tamponun generation değeri; değişirse tampon
+        # temizlenmiştir ve diskteki eski mumlar yeni geçmişle karışmasın diye seri baştan yazılır
+        self._saved_generation = {}
+        self._autosave_stop = None
+        self.stats = {'loaded_series': 0, 'loaded_bars': 0, 'saved_bars': 0, 'saves': 0,
+                      'compactions': 0, 'evicted_series': 0}
+
+    def close(self):
+        if self._autosave_stop is not None:
+            self._autosave_stop.set()
+        with self._lock:
+            self._conn.close()
+
+    # --- Yükleme ---
+    def load_into(self, store):
+        """
+        Diskteki tüm serileri depoya yükler; yüklenen seri sayısını döndürür.
+        Tampon, kayıt anındaki kapasitesine büyütülür (türetilen TF'ler için uzun geçmiş korunur).
+        """
+        with self._lock:
+            keys = self._conn.execute("SELECT symbol, interval, capacity, exhausted FROM series").fetchall()
+            loaded = 0
+            for symbol, interval, capacity, exhausted in keys:
+                buf = store.buffer(symbol, interval)
+                limit = min(max(buf.capacity, capacity), self.keep_bars)
+                rows = self._conn.execute(
+                    "SELECT open_time, open, high, low, close, volume FROM klines "
+                    "WHERE symbol=? AND interval=? ORDER BY open_time DESC LIMIT ?",
+                    (symbol, interval, limit)).fetchall()
+                if not rows:
+                    continue
+                rows.reverse()
+                buf.reserve(limit)
+                buf.extend_rows(rows)
+                buf.history_exhausted = bool(exhausted)
+                self._saved_until[(symbol, interval)] = rows[-1][0]
+                self._saved_generation[(symbol, interval)] = buf.generation
+                self.stats['loaded_bars'] += len(rows)
+                loaded += 1
+            # Okunan seriler sıkıştırmada "okunmayan" sayılmasın
+            self._conn.execute("UPDATE series SET last_access=?", (int(time.time() * 1000),))
+            self._conn.commit()
+        self.stats['loaded_series'] += loaded
+        return loaded
+
+    # --- Kayıt ---
+    def save_store(self, store):
+        """Depodaki yeni/değişen mumları diske yazar (artımlı). Yazılan mum sayısını döndürür."""
+        now = int(time.time() * 1000)
+        written = 0
+        with self._lock:
+            for key in store.keys():
+                buf = store.get(*key)
+                if buf is None or not len(buf):
+                    continue
+                if self._saved_generation.get(key, buf.generation) != buf.generation:
+                    self._drop_series(key)
+                self._saved_generation[key] = buf.generation
+                snap = buf.snapshot()
+                times = snap['open_time']
+                since = self._saved_until.get(key)
+                start = 0 if since is None else int(times.searchsorted(since))
+                if start >= len(times):
+                    continue
+                rows = list(zip(times[start:].tolist(), snap['open'][start:].tolist(),
+                                snap['high'][start:].tolist(), snap['low'][start:].tolist(),
+                                snap['close'][start:].tolist(), snap['volume'][start:].tolist()))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO klines VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [key + r for r in rows])
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?)",
+                    key + (buf.capacity, int(buf.history_exhausted), now))
+                self._saved_until[key] = rows[-1][0]
+                written += len(rows)
+            self._conn.commit()
+        self.stats['saved_bars'] += written
+        self.stats['saves'] += 1
+        return written
+
+    def start_autosave(self, store, interval=DEFAULT_SAVE_INTERVAL):
+        """Arka planda periyodik kayıt (ve ara sıra sıkıştırma), çıkışta son kayıt."""
+        if self._autosave_stop is not None:
+            return
+        stop = threading.Event()
+        self._autosave_stop = stop
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.save_store(store)
+                    if self.stats['saves'] % COMPACT_EVERY_SAVES == 0:
+                        self.compact()
+                except sqlite3.Error as e:
+                    print(f"[KLINE CACHE HATA] kayıt: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
+        atexit.register(self._save_on_exit, store)
+
+    def _save_on_exit(self, store):
+        try:
+            self.save_store(store)
+        except sqlite3.Error as e:
+            print(f"[KLINE CACHE HATA] çıkış kaydı: {e}")
+
+    # --- Sıkıştırma ---
+    def size_bytes(self):
+        total = 0
+        for suffix in ('', '-wal'):
+            try:
+                total += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return total
+
+    def compact(self, stale_days=DEFAULT_STALE_DAYS):
+        """
+        Seri başına sadece son `capacity` (en fazla keep_bars) mumu tutar, stale_days gün okunmayan serileri siler.
+        Dosya hâlâ max_bytes'tan büyükse en uzun süredir okunmayan seriler atılır.
+        """
+        cutoff = int(time.time() * 1000) - stale_days * 86_400_000
+        with self._lock:
+            c = self._conn
+            stale = c.execute("SELECT symbol, interval FROM series WHERE last_access < ?", (cutoff,)).fetchall()
+            for key in stale:
+                self._drop_series(key)
+            for symbol, interval, capacity in c.execute("SELECT symbol, interval, capacity FROM series").fetchall():
+                c.execute(
+                    "DELETE FROM klines WHERE symbol=? AND interval=? AND open_time < ("
+                    "SELECT open_time FROM klines WHERE symbol=? AND interval=? "
+                    "ORDER BY open_time DESC LIMIT 1 OFFSET ?)",
+                    (symbol, interval, symbol, interval, min(capacity, self.keep_bars) - 1))
+            c.commit()
+            self._vacuum()
+            evicted = len(stale)
+            while self.size_bytes() > self.max_bytes:
+                oldest = c.execute("SELECT symbol, interval FROM series ORDER BY last_access LIMIT 8").fetchall()
+                if not oldest:
+                    break
+                for key in oldest:
+                    self._drop_series(key)
+                evicted += len(oldest)
+                c.commit()
+                self._vacuum()
+        self.stats['compactions'] += 1
+        self.stats['evicted_series'] += evicted
+        return evicted
+
+    def _drop_series(self, key):
+        self._conn.execute("DELETE FROM klines WHERE symbol=? AND interval=?", key)
+        self._conn.execute("DELETE FROM series WHERE symbol=? AND interval=?", key)
+        self._saved_until.pop(tuple(key), None)
+        self._saved_generation.pop(tuple(key), None)
+
+    def _vacuum(self):
+        self._conn.commit()
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._conn.execute("VACUUM")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_kline_cache():
+    """Süreç genelinde paylaşılan önbellek (settings.KLINE_CACHE_PATH)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = KlineCache()
+    return _cache
+
+
+def _benchmark(symbol_count=150, latency=0.05, concurrency=32):
+    """Soğuk (boş depo) ve sıcak (diskten yüklenmiş) açılışta sinyal tablosunun dolma süresi."""
+    import asyncio
+    import tempfile
+
+    import resample
+    from async_fetcher import AsyncKlineFetcher
+    from binance_stub import StubProcess
+    from kline_store import KlineStore
+    from rate_limiter import WeightRateLimiter
+    from signal_calculator import supertrend_from_store, supertrend_limit
+
+    intervals = ['5m', '15m', '1h', '4h', '6h', '1d', '1w', '1M']
+    symbols = [f"SYM{i:04d}USDT" for i in range(symbol_count)]
+    fetched, _derived = resample.fetch_plan([(i, i) for i in intervals])
+    history = {i: resample.history_for(i, supertrend_limit()) for _tf, i in fetched}
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+
+    def start(rest_url, warm):
+        t0 = time.perf_counter()
+        store = KlineStore(base_url=rest_url)
+        cache = KlineCache(path)
+        if warm:
+            cache.load_into(store)
+        loaded = time.perf_counter() - t0
+        fetcher = AsyncKlineFetcher(store, concurrency=concurrency,
+                                    limiter=WeightRateLimiter(limit_per_minute=10 ** 9))
+
+        async def go():
+            await fetcher.run_pass([(s, i) for _tf, i in fetched for s in symbols], history)
+            await fetcher.close()
+
+        asyncio.run(go())
+        for s in symbols:
+            for i in intervals:
+                supertrend_from_store(s, i, store=store)
+        total = time.perf_counter() - t0
+        return store, cache, loaded, total
+
+    with StubProcess(symbols, latency=latency) as (rest_url, _ws_url):
+        store, cache, _loaded, cold = start(rest_url, warm=False)
+        cache.save_store(store)
+        cache.close()
+        print(f"soğuk açılış: {cold:.2f}s (tam geçmiş: {store.stats['full_fetches']} istek)")
+        store, cache, loaded, warm = start(rest_url, warm=True)
+        print(f"sıcak açılış: {warm:.2f}s (diskten yükleme {loaded:.2f}s, "
+              f"tam geçmiş: {store.stats['full_fetches']}, delta: {store.stats['delta_fetches']} istek) "
+              f"dosya={cache.size_bytes() / 1e6:.1f}MB")
+        cache.close()
+
+
+if __name__ == "__main__":
+    _benchmark()
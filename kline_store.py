@@ -0,0 +1,370 @@
+# kline_store.py
+# (sembol, interval) başına paylaşılan, sabit kapasiteli NumPy mum deposu.
+# İndikatörler ve TF % değişimi aynı tampondan okur; yenilemede sadece eksik mumlar (delta) çekilir.
+
+import itertools
+import threading
+import time
+
+import numpy as np
+
+from singleflight import SingleFlight
+
+# Interval süreleri (ms); 1M için en uzun ay kullanılır (delta limiti ve boşluk tespiti için yeterli)
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 180_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '1h': 3_600_000,
+    '4h': 14_400_000,
+    '6h': 21_600_000,
+    '1d': 86_400_000,
+    '1w': 604_800_000,
+    '1M': 31 * 86_400_000,
+}
+
+DEFAULT_CAPACITY = 240
+_buffer_ids = itertools.count(1)
+MAX_KLINE_LIMIT = 1500  # /fapi/v1/klines tek istekte en fazla
+
+# Yenilenen tampon bu süre (ms) boyunca tazedir; aynı veriyi isteyen diğer tüketiciler ağa çıkmaz.
+# Süre dolmasa da yeni mumun açılış zamanı geçtiyse tampon bayat sayılır.
+DEFAULT_FRESH_TTL_MS = {
+    '1m': 1_000,
+    '3m': 1_000,
+    '5m': 3_000,
+    '15m': 3_000,
+    '1h': 3_000,
+    '4h': 5_000,
+    '6h': 5_000,
+    '1d': 5_000,
+    '1w': 10_000,
+    '1M': 10_000,
+}
+
+
+def next_open_time(open_time, interval):
+    """`open_time` ile açılan mumdan sonraki mumun açılış zamanı (1M için takvim ayı)."""
+    if interval == '1M':
+        month = np.datetime64(int(open_time), 'ms').astype('datetime64[M]') + 1
+        return int(month.astype('datetime64[ms]').astype(np.int64))
+    return int(open_time) + INTERVAL_MS.get(interval, 60_000)
+
+
+class KlineBuffer:
+    """
+    Tek (sembol, interval) için mum tamponu.
+    Diziler kapasite + boşluk (slack) kadar ayrılır; dolunca son `capacity` mum başa kaydırılır.
+    Böylece okuma her zaman bitişik bir dilimdir ve ekleme amortize O(1)'dir.
+    Yeni veri ya yeni mum ekler ya da hâlâ oluşan son mumun üzerine yazar.
+    """
+    FIELDS = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = int(capacity)
+        alloc = self.capacity + max(16, self.capacity // 4)
+        self.open_time = np.zeros(alloc, dtype=np.int64)
+        self.open = np.zeros(alloc, dtype=np.float64)
+        self.high = np.zeros(alloc, dtype=np.float64)
+        self.low = np.zeros(alloc, dtype=np.float64)
+        self.close = np.zeros(alloc, dtype=np.float64)
+        self.volume = np.zeros(alloc, dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        # Tam geçmiş isteği istenenden az mum döndürdüyse (yeni listelenen sembol) daha eskisi yoktur
+        self.history_exhausted = False
+        # Son REST yanıtı veya akış mesajının işlendiği zaman (ms)
+        self.refreshed_at = None
+        # Her veri değişikliğinde artar; türetilmiş değer önbellekleri (indicator_registry) anahtar olarak kullanır
+        self.version = 0
+        # Süreç boyunca tekil kimlik (id() gibi yeniden kullanılmaz); önbellek anahtarlarında depo ayrımı için
+        self.uid = next(_buffer_ids)
+        # clear() ile artar; kalıcı önbellek (kline_cache) diskteki eski seriyi bununla fark eder
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def last_open_time(self):
+        return int(self.open_time[self._end - 1]) if self._end > self._start else None
+
+    def last_bar(self):
+        """(uid, mum sayısı, son açılış, high, low, close); tampon boşsa None."""
+        with self.lock:
+            if self._end == self._start:
+                return None
+            i = self._end - 1
+            return (self.uid, self._end - self._start, int(self.open_time[i]), float(self.high[i]),
+                    float(self.low[i]), float(self.close[i]))
+
+    def reserve(self, capacity):
+        """Kapasiteyi en az `capacity` yapar (örn. türetilen TF'ler için daha uzun geçmiş gerektiğinde)."""
+        capacity = int(capacity)
+        with self.lock:
+            if capacity <= self.capacity:
+                return
+            alloc = capacity + max(16, capacity // 4)
+            n = self._end - self._start
+            for name in self.FIELDS:
+                old = getattr(self, name)
+                arr = np.zeros(alloc, dtype=old.dtype)
+                arr[:n] = old[self._start:self._end]
+                setattr(self, name, arr)
+            self._start, self._end = 0, n
+            self.capacity = capacity
+            self.history_exhausted = False
+
+    def clear(self):
+        """Tüm mumları siler (kapasite korunur); yeni veriyle arasında boşluk kalacak eski mumlar için."""
+        with self.lock:
+            self._start = self._end = 0
+            self.history_exhausted = False
+            self.version += 1
+            self.generation += 1
+
+    def _compact(self):
+        n = min(self._end - self._start, self.capacity)
+        src = slice(self._end - n, self._end)
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:n] = arr[src]
+        self._start, self._end = 0, n
+
+    def upsert(self, open_time, o, h, lo, c, v):
+        """Mumu ekler veya son mumu günceller. 'append', 'update' ya da 'ignored' döner."""
+        open_time = int(open_time)
+        with self.lock:
+            if self._end > self._start:
+                last = self.open_time[self._end - 1]
+                if open_time == last:
+                    i = self._end - 1
+                    self.open[i], self.high[i], self.low[i], self.close[i], self.volume[i] = o, h, lo, c, v
+                    self.version += 1
+                    return 'update'
+                if open_time < last:
+                    return 'ignored'
+            if self._end == len(self.open_time):
+                self._compact()
+            i = self._end
+            self.open_time[i] = open_time
+            self.open[i], self.high[i], self.low[i], self.close[i], self.volume[i] = o, h, lo, c, v
+            self._end += 1
+            if self._end - self._start > self.capacity:
+                self._start += 1
+            self.version += 1
+            return 'append'
+
+    def extend_rows(self, rows):
+        """
+        Artan sıralı (open_time, o, h, l, c, v) demetlerini toplu ekler (örn. disk önbelleğinden yükleme).
+        Son mumdan eski/aynı olanlar atlanır. Eklenen mum sayısını döndürür.
+        """
+        if not len(rows):
+            return 0
+        arr = np.asarray(rows, dtype=np.float64).reshape(len(rows), len(self.FIELDS))
+        t = arr[:, 0].astype(np.int64)
+        with self.lock:
+            if self._end > self._start:
+                newer = t > self.open_time[self._end - 1]
+                arr, t = arr[newer], t[newer]
+            n = min(len(t), self.capacity)
+            if not n:
+                return 0
+            arr, t = arr[-n:], t[-n:]
+            keep_old = min(self._end - self._start, self.capacity - n)
+            if self._end + n > len(self.open_time):
+                src = slice(self._end - keep_old, self._end)
+                for name in self.FIELDS:
+                    a = getattr(self, name)
+                    a[:keep_old] = a[src]
+                self._end = keep_old
+            self._start = self._end - keep_old
+            i = self._end
+            self.open_time[i:i + n] = t
+            for j, name in enumerate(self.FIELDS[1:], start=1):
+                getattr(self, name)[i:i + n] = arr[:, j]
+            self._end += n
+            self.version += 1
+            return n
+
+    def merge_rows(self, rows):
+        """Binance kline satırlarını (artan sırada) birleştirir. Eklenen mum sayısını döndürür."""
+        appended = 0
+        for r in rows:
+            try:
+                res = self.upsert(r[0], float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5]))
+            except (IndexError, ValueError, TypeError):
+                continue
+            if res == 'append':
+                appended += 1
+        return appended
+
+    def snapshot(self, n=None, fields=FIELDS):
+        """Son n mumun kopyasını {alan: ndarray} olarak döndürür."""
+        with self.lock:
+            size = self._end - self._start
+            n = size if n is None else min(int(n), size)
+            sl = slice(self._end - n, self._end)
+            return {name: getattr(self, name)[sl].copy() for name in fields}
+
+
+class KlineStore:
+    """
+    (sembol, interval) -> KlineBuffer eşlemesi.
+    refresh() tampon yeterince doluysa sadece son açık mumdan itibaren küçük bir delta isteği atar.
+    refresh() okumadan önce önbellek gibi davranır: tampon tazeyse ağa çıkmaz (hit), aynı
+    (uç nokta, sembol, interval) için devam eden bir istek varsa onu bekler (coalesced).
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, capacities=None, base_url=None, fresh_ttl_ms=None):
+        self.capacity = capacity
+        self.capacities = dict(capacities or {})  # {interval: kapasite}
+        self.base_url = base_url
+        # {interval: ms}; boş sözlük tazelik önbelleğini kapatır
+        self.fresh_ttl_ms = dict(DEFAULT_FRESH_TTL_MS if fresh_ttl_ms is None else fresh_ttl_ms)
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.stats = {'full_fetches': 0, 'delta_fetches': 0, 'appended': 0,
+                      'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    def buffer(self, symbol, interval):
+        key = (symbol, interval)
+        buf = self._buffers.get(key)
+        if buf is None:
+            with self._lock:
+                buf = self._buffers.get(key)
+                if buf is None:
+                    buf = KlineBuffer(self.capacities.get(interval, self.capacity))
+                    self._buffers[key] = buf
+        return buf
+
+    def get(self, symbol, interval):
+        return self._buffers.get((symbol, interval))
+
+    def keys(self):
+        with self._lock:
+            return list(self._buffers.keys())
+
+    def merge_rows(self, symbol, interval, rows):
+        return self.buffer(symbol, interval).merge_rows(rows)
+
+    def apply_stream_kline(self, k):
+        """WebSocket kline ('k') nesnesini uygular; (symbol, interval, sonuç, önceki son açılış) döner."""
+        symbol, interval = k['s'], k['i']
+        buf = self.buffer(symbol, interval)
+        prev_last = buf.last_open_time
+        res = buf.upsert(k['t'], float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v']))
+        buf.refreshed_at = int(time.time() * 1000)
+        return symbol, interval, res, prev_last
+
+    def plan_request(self, symbol, interval, min_bars):
+        """
+        Bir sonraki /fapi/v1/klines isteğinin parametreleri ve türü ('full' | 'delta').
+        - Tampon min_bars'tan azsa: min_bars kadar tam geçmiş.
+        - Değilse: son açık mumdan (startTime) itibaren sadece eksik mumlar.
+        - Eksik mum sayısı tampon kapasitesini ya da tek istek sınırını aşıyorsa (uzun süre kapalı kalmış
+          disk önbelleği) startTime'lı istek en eski eksik mumları getirir; bunun yerine güncel tam geçmiş.
+        """
+        buf = self.buffer(symbol, interval)
+        if min_bars > buf.capacity:
+            buf.reserve(min(min_bars, MAX_KLINE_LIMIT))
+        last = buf.last_open_time
+        params = {'symbol': symbol, 'interval': interval}
+        if last is None or (len(buf) < min(min_bars, buf.capacity) and not buf.history_exhausted):
+            params['limit'] = int(min(max(min_bars, 2), MAX_KLINE_LIMIT))
+            return params, 'full'
+        step = INTERVAL_MS.get(interval, 60_000)
+        missing = (int(time.time() * 1000) - last) // step + 2
+        if missing > min(buf.capacity, MAX_KLINE_LIMIT):
+            params['limit'] = int(min(max(min_bars, 2), MAX_KLINE_LIMIT))
+            return params, 'full'
+        params['limit'] = int(min(max(missing, 2), MAX_KLINE_LIMIT))
+        params['startTime'] = int(last)
+        return params, 'delta'
+
+    def apply_response(self, symbol, interval, kind, data, limit=None):
+        """plan_request ile atılan isteğin yanıtını tampona işler."""
+        self.stats['full_fetches' if kind == 'full' else 'delta_fetches'] += 1
+        buf = self.buffer(symbol, interval)
+        if isinstance(data, list):
+            last = buf.last_open_time
+            if kind == 'full' and data and last is not None and int(data[0][0]) > next_open_time(last, interval):
+                buf.clear()  # eski mumlarla yeni geçmiş arasında boşluk var
+            self.stats['appended'] += buf.merge_rows(data)
+            if kind == 'full' and limit is not None and len(data) < limit:
+                buf.history_exhausted = True
+            buf.refreshed_at = int(time.time() * 1000)
+        return buf
+
+    def _has_history(self, buf, min_bars):
+        return len(buf) >= min(min_bars, MAX_KLINE_LIMIT) or (buf.history_exhausted and len(buf) > 0)
+
+    def fresh_buffer(self, symbol, interval, min_bars, now_ms=None):
+        """
+        Tampon en az min_bars mum içeriyor, TTL içinde yenilenmiş ve yeni mum henüz açılmamışsa
+        tamponu döndürür (hit sayılır), değilse None.
+        """
+        buf = self.get(symbol, interval)
+        ttl = self.fresh_ttl_ms.get(interval, 0)
+        if buf is None or ttl <= 0 or buf.refreshed_at is None or not self._has_history(buf, min_bars):
+            return None
+        now = int(time.time() * 1000) if now_ms is None else now_ms
+        if now - buf.refreshed_at >= ttl or now >= next_open_time(buf.last_open_time, interval):
+            return None
+        self.stats['hits'] += 1
+        return buf
+
+    def refresh(self, symbol, interval, min_bars, timeout=8, priority=None):
+        """
+        Tamponu güncel hale getirir ve döndürür (bkz. plan_request, fresh_buffer).
+        Ağ hataları çağırana (ve aynı isteği bekleyenlere) iletilir.
+        """
+        buf = self.fresh_buffer(symbol, interval, min_bars)
+        if buf is not None:
+            return buf
+        key = ('/fapi/v1/klines', symbol, interval)
+        buf, shared = self._flight.do(key, lambda: self._fetch(symbol, interval, min_bars, timeout, priority))
+        if not shared:
+            self.stats['misses'] += 1
+            return buf
+        self.stats['coalesced'] += 1
+        # Beklenen istek daha kısa bir geçmiş için atılmış olabilir
+        if not self._has_history(buf, min_bars):
+            buf, _shared = self._flight.do(key, lambda: self._fetch(symbol, interval, min_bars, timeout, priority))
+        return buf
+
+    def _fetch(self, symbol, interval, min_bars, timeout, priority):
+        from signal_calculator import fetch_klines
+        params, kind = self.plan_request(symbol, interval, min_bars)
+        data = fetch_klines(symbol, interval, params['limit'], base_url=self.base_url, timeout=timeout,
+                            start_time=params.get('startTime'), priority=priority)
+        return self.apply_response(symbol, interval, kind, data, params['limit'])
+
+    def cache_stats(self):
+        """refresh() önbellek metrikleri: hit (taze tampon), miss (ağ isteği), coalesced (bekleyip paylaşan)."""
+        hits, misses, coalesced = self.stats['hits'], self.stats['misses'], self.stats['coalesced']
+        total = hits + misses + coalesced
+        return {
+            'hits': hits,
+            'misses': misses,
+            'coalesced': coalesced,
+            'in_flight': self._flight.in_flight(),
+            'saved_ratio': round((hits + coalesced) / total, 4) if total else 0.0,
+        }
+
+    def series(self, symbol, interval, n=None, fields=('high', 'low', 'close')):
+        buf = self.get(symbol, interval)
+        if buf is None:
+            return None
+        return buf.snapshot(n, fields)
+
+
+_default_store = KlineStore()
+
+
+def get_kline_store():
+    """Süreç genelinde paylaşılan mum deposu."""
+    return _default_store
@@ -0,0 +1,145 @@
+# price_feed.py
+# Binance tüm piyasa ticker akışı (!ticker@arr / !miniTicker@arr) ile fiyat tablosu.
+# Akış UI thread'i dışında işlenir; takip edilen semboller için fiyat / 24s % / quoteVolume
+# kompakt NumPy tablosunda tutulur ve UI'ya sadece değişen satırlar verilir.
+
+import json
+import threading
+import time
+
+import numpy as np
+
+from ws_utils import BINANCE_WS_URL, RECONNECT_BACKOFF_MAX
+
+try:
+    from settings import PRICE_FEED_STREAM
+except ImportError:
+    PRICE_FEED_STREAM = "!ticker@arr"
+
+# Son mesajdan bu kadar saniye geçtiyse akış canlı sayılmaz (Binance dizileri saniyede bir gönderir)
+LIVE_TIMEOUT = 5.0
+
+
+class PriceFeed:
+    """
+    Takip edilen semboller için canlı fiyat tablosu.
+    - price, change (24s %), quote_volume, event_time dizileri sembol sırasıyla tutulur.
+    - Değeri değişen satırlar işaretlenir; drain_changes() UI thread'inden çağrılıp sadece onları döndürür.
+    - !miniTicker@arr'da 24s % alanı yoktur; açılış fiyatından hesaplanır.
+    """
+    def __init__(self, symbols, ws_url=BINANCE_WS_URL, stream=PRICE_FEED_STREAM):
+        self.symbols = list(symbols)
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self.ws_url = ws_url.rstrip('/')
+        self.stream = stream
+        n = len(self.symbols)
+        self.price = np.full(n, np.nan)
+        self.change = np.full(n, np.nan)
+        self.quote_volume = np.full(n, np.nan)
+        self.event_time = np.zeros(n, dtype=np.int64)
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._app = None
+        self._thread = None
+        self.last_message_at = None
+        self.stats = {'messages': 0, 'rows_seen': 0, 'rows_changed': 0, 'reconnects': 0, 'errors': 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._app is not None:
+            try:
+                self._app.close()
+            except Exception:
+                pass
+
+    def is_live(self):
+        return self.last_message_at is not None and time.monotonic() - self.last_message_at < LIVE_TIMEOUT
+
+    # --- Bağlantı ---
+    def _run(self):
+        import websocket
+        backoff = 1
+        while not self._stop_event.is_set():
+            self._app = websocket.WebSocketApp(
+                f"{self.ws_url}/stream?streams={self.stream}",
+                on_message=self._on_message,
+                on_error=self._on_error,
+            )
+            opened_at = time.time()
+            try:
+                self._app.run_forever(ping_interval=180, ping_timeout=20)
+            except Exception as e:
+                self._on_error(self._app, e)
+            if self._stop_event.is_set():
+                break
+            self.stats['reconnects'] += 1
+            if time.time() - opened_at > 60:
+                backoff = 1
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
+    def _on_error(self, _ws, err):
+        self.stats['errors'] += 1
+        print(f"[FİYAT AKIŞI HATA] {err}")
+
+    # --- Veri ---
+    def _on_message(self, _ws, message):
+        try:
+            msg = json.loads(message)
+            rows = msg.get('data') if isinstance(msg, dict) else msg
+        except ValueError:
+            self.stats['errors'] += 1
+            return
+        if isinstance(rows, list):
+            self.apply_tickers(rows)
+
+    def apply_tickers(self, rows):
+        """Ticker dizisini tabloya işler; değişen satır sayısını döndürür."""
+        index = self._index
+        changed = 0
+        with self._lock:
+            for row in rows:
+                try:
+                    i = index.get(row['s'])
+                    if i is None:
+                        continue
+                    price = float(row['c'])
+                    if 'P' in row:
+                        change = float(row['P'])
+                    else:
+                        o = float(row['o'])
+                        change = (price - o) / o * 100.0 if o else 0.0
+                    qv = float(row.get('q', 0.0))
+                except (KeyError, TypeError, ValueError):
+                    self.stats['errors'] += 1
+                    continue
+                self.event_time[i] = int(row.get('E', 0))
+                if price == self.price[i] and change == self.change[i] and qv == self.quote_volume[i]:
+                    continue
+                self.price[i], self.change[i], self.quote_volume[i] = price, change, qv
+                self._dirty.add(i)
+                changed += 1
+            self.stats['messages'] += 1
+            self.stats['rows_seen'] += len(rows)
+            self.stats['rows_changed'] += changed
+        self.last_message_at = time.monotonic()
+        return changed
+
+    def drain_changes(self):
+        """Son çağrıdan beri değişen satırlar: {sembol: (fiyat, yüzde, quoteVolume, olay zamanı ms)}."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return {self.symbols[i]: (float(self.price[i]), float(self.change[i]),
+                                      float(self.quote_volume[i]), int(self.event_time[i])) for i in dirty}
+
+    def get(self, symbol):
+        i = self._index.get(symbol)
+        if i is None or np.isnan(self.price[i]):
+            return None
+        with self._lock:
+            return float(self.price[i]), float(self.change[i]), float(self.quote_volume[i])
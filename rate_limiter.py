@@ -0,0 +1,226 @@
+# rate_limiter.py
+# Binance fapi istek ağırlığı (request weight) farkındalıklı, süreç geneli token-bucket zamanlayıcı.
+# Tüm REST çağrıları binance_client üzerinden buradan geçer; 429/418 yasaklarını önlemeyi amaçlar.
+
+import threading
+import time
+
+# Binance USDT-M Futures: IP başına dakikada 2400 ağırlık
+DEFAULT_WEIGHT_LIMIT = 2400
+# Limite yaklaşıldığında normal/düşük öncelikli isteklerin dokunamayacağı pay
+DEFAULT_RESERVE_RATIO = 0.2
+# 429/418 yanıtında Retry-After yoksa beklenecek süre (sn)
+DEFAULT_RETRY_AFTER = 60
+
+PRIORITY_HIGH = 0    # ekranda görünen veya alarmı olan semboller
+PRIORITY_NORMAL = 1  # arka plan sinyal taraması
+PRIORITY_LOW = 2     # ön yükleme / yüzde değişim gibi ertelenebilir işler
+
+PRIORITY_NAMES = {PRIORITY_HIGH: 'high', PRIORITY_NORMAL: 'normal', PRIORITY_LOW: 'low'}
+
+
+def _klines_weight(params):
+    try:
+        limit = int((params or {}).get('limit', 500))
+    except (TypeError, ValueError):
+        limit = 500
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def _ticker_24hr_weight(params):
+    return 1 if (params or {}).get('symbol') else 40
+
+
+def _ticker_price_weight(params):
+    return 1 if (params or {}).get('symbol') else 2
+
+
+# Uç nokta -> sabit ağırlık veya parametreye bağlı ağırlık fonksiyonu
+ENDPOINT_WEIGHTS = {
+    '/fapi/v1/klines': _klines_weight,
+    '/fapi/v1/ticker/24hr': _ticker_24hr_weight,
+    '/fapi/v1/ticker/price': _ticker_price_weight,
+    '/fapi/v1/exchangeInfo': 1,
+    '/fapi/v1/time': 1,
+    '/fapi/v1/ping': 1,
+}
+
+
+def request_weight(path, params=None):
+    """Verilen uç nokta ve parametreler için Binance istek ağırlığı."""
+    w = ENDPOINT_WEIGHTS.get(path, 1)
+    return w(params) if callable(w) else w
+
+
+class WeightRateLimiter:
+    """
+    Ağırlık tabanlı token-bucket.
+    - Kova dakikalık limit kadar dolar ve saniyede limit/60 hızla yenilenir.
+    - Normal öncelik kovanın `reserve_ratio` kadarını, düşük öncelik iki katını yüksek önceliğe bırakır;
+      böylece limite yaklaşınca görünen/alarmlı semboller önce geçer.
+    - X-MBX-USED-WEIGHT-1m başlığı yerel tahminden kötüyse kova sunucu görüşüne çekilir.
+    - 429/418 yanıtında Retry-After süresince tüm istekler bekletilir.
+    """
+    def __init__(self, limit_per_minute=DEFAULT_WEIGHT_LIMIT, reserve_ratio=DEFAULT_RESERVE_RATIO,
+                 clock=time.monotonic):
+        self.limit = int(limit_per_minute)
+        self.reserve_ratio = float(reserve_ratio)
+        self._clock = clock
+        self._rate = self.limit / 60.0
+        self._tokens = float(self.limit)
+        self._last = clock()
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+        self.priority_symbols = frozenset()
+        self.counters = {
+            'requests': 0,
+            'weight': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'timeouts': 0,
+            'header_syncs': 0,
+            'last_used_weight': 0,
+            'throttled_429': 0,
+            'banned_418': 0,
+            'by_priority': {name: 0 for name in PRIORITY_NAMES.values()},
+        }
+
+    def _refill(self, now):
+        elapsed = now - self._last
+        if elapsed > 0:
+            self._tokens = min(float(self.limit), self._tokens + elapsed * self._rate)
+            self._last = now
+
+    def _floor(self, priority):
+        return self.limit * self.reserve_ratio * min(max(int(priority), 0), PRIORITY_LOW)
+
+    def set_priority_symbols(self, symbols):
+        """Ekranda görünen / alarmı olan semboller (yüksek öncelik)."""
+        self.priority_symbols = frozenset(symbols or ())
+
+    def priority_for(self, symbol):
+        return PRIORITY_HIGH if symbol and symbol in self.priority_symbols else PRIORITY_NORMAL
+
+    def acquire(self, weight, priority=PRIORITY_NORMAL, timeout=None):
+        """Ağırlık kadar token alır; timeout dolarsa False döner."""
+        weight = float(weight)
+        floor = self._floor(priority)
+        start = self._clock()
+        deadline = None if timeout is None else start + timeout
+        waited = False
+        with self._cond:
+            while True:
+                now = self._clock()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens - weight >= floor:
+                    self._tokens -= weight
+                    c = self.counters
+                    c['requests'] += 1
+                    c['weight'] += int(weight)
+                    c['by_priority'][PRIORITY_NAMES.get(priority, 'low')] += 1
+                    if waited:
+                        c['waits'] += 1
+                        c['wait_seconds'] += now - start
+                    return True
+                if now < self._blocked_until:
+                    need = self._blocked_until - now
+                else:
+                    need = (weight + floor - self._tokens) / self._rate
+                if deadline is not None:
+                    remaining = deadline - now
+                    # Beklesek de yetişmeyecekse hemen vazgeç
+                    if remaining <= 0 or need > remaining:
+                        self.counters['timeouts'] += 1
+                        return False
+                    need = min(need, remaining)
+                waited = True
+                self._cond.wait(need)
+
+    def try_acquire(self, weight, priority=PRIORITY_NORMAL):
+        """
+        Bloklamadan token almayı dener (asyncio çağıranlar için).
+        Alındıysa 0.0, alınamadıysa tahmini bekleme süresi (sn) döner.
+        """
+        weight = float(weight)
+        floor = self._floor(priority)
+        with self._cond:
+            now = self._clock()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens - weight < floor:
+                return (weight + floor - self._tokens) / self._rate
+            self._tokens -= weight
+            self.counters['requests'] += 1
+            self.counters['weight'] += int(weight)
+            self.counters['by_priority'][PRIORITY_NAMES.get(priority, 'low')] += 1
+            return 0.0
+
+    def update_from_headers(self, headers):
+        """Sunucunun bildirdiği dakikalık kullanılan ağırlıkla kovayı senkronize eder."""
+        try:
+            used = headers.get('X-MBX-USED-WEIGHT-1m') or headers.get('x-mbx-used-weight-1m')
+            if used is None:
+                return
+            used = int(used)
+        except (AttributeError, TypeError, ValueError):
+            return
+        with self._cond:
+            self._refill(self._clock())
+            self.counters['header_syncs'] += 1
+            self.counters['last_used_weight'] = used
+            remaining = float(self.limit - used)
+            if self._tokens > remaining:
+                self._tokens = remaining
+
+    def on_response(self, status_code, headers=None):
+        """Yanıt durumunu işler; 429/418'de Retry-After süresince istekleri durdurur."""
+        headers = headers or {}
+        self.update_from_headers(headers)
+        if status_code not in (429, 418):
+            return
+        try:
+            retry_after = float(headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+        except (TypeError, ValueError):
+            retry_after = DEFAULT_RETRY_AFTER
+        with self._cond:
+            if status_code == 429:
+                self.counters['throttled_429'] += 1
+            else:
+                self.counters['banned_418'] += 1
+            self._blocked_until = max(self._blocked_until, self._clock() + retry_after)
+            self._tokens = min(self._tokens, 0.0)
+            self._cond.notify_all()
+
+    def available(self):
+        with self._cond:
+            self._refill(self._clock())
+            return self._tokens
+
+    def blocked_for(self):
+        with self._cond:
+            return max(0.0, self._blocked_until - self._clock())
+
+    def snapshot(self):
+        """Okunabilir sayaç kopyası."""
+        with self._cond:
+            self._refill(self._clock())
+            out = dict(self.counters)
+            out['by_priority'] = dict(self.counters['by_priority'])
+            out['available'] = round(self._tokens, 2)
+            out['blocked_for'] = round(max(0.0, self._blocked_until - self._clock()), 2)
+            return out
+
+
+_limiter = WeightRateLimiter()
+
+
+def get_rate_limiter():
+    """Süreç genelinde paylaşılan limiter."""
+    return _limiter
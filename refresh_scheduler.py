@@ -0,0 +1,254 @@
+# refresh_scheduler.py
+# (sembol, interval) başına bir sonraki yenileme zamanını hesaplayan, heap tabanlı zamanlayıcı.
+# Sabit TF_UPDATE_INTERVALS yerine mum kapanış zamanı (Binance sunucu saatine göre), fiyatın
+# Supertrend bandına uzaklığı ve ayarlanabilir mum içi (intrabar) politika kullanılır.
+
+import heapq
+import threading
+import time
+from collections import deque
+
+from kline_store import INTERVAL_MS, get_kline_store, next_open_time
+
+try:
+    from settings import REFRESH_INTRABAR_POLICY
+except ImportError:
+    REFRESH_INTRABAR_POLICY = "adaptive"
+
+# Mum kapanışından sonra son mumun borsada oluşması için bekleme payı (ms)
+CLOSE_GRACE_MS = 1_500
+# Sunucu saatinin yeniden senkronize edileceği aralık (sn)
+CLOCK_RESYNC_SECONDS = 600
+
+# "adaptive" politikada mum içi yenileme aralığı (sn): fiyat banda yakınken en kısa, uzakken en uzun.
+INTRABAR_MIN_SECONDS = {
+    '1m': 2, '3m': 2, '5m': 10, '15m': 10, '1h': 10, '4h': 15, '6h': 15, '1d': 20, '1w': 30, '1M': 30,
+}
+INTRABAR_MAX_SECONDS = {
+    '1m': 10, '3m': 20, '5m': 60, '15m': 120, '1h': 300, '4h': 600, '6h': 600, '1d': 900, '1w': 1800,
+    '1M': 1800,
+}
+# Banda uzaklık (oran) bu değerin altındaysa en sık, FAR değerinin üstündeyse en seyrek yenilenir
+NEAR_BAND = 0.003
+FAR_BAND = 0.03
+
+POLICIES = ("closed", "adaptive", "fixed")
+
+
+class ServerClock:
+    """
+    Binance sunucu saati (ms). /fapi/v1/time ile yerel saat farkı ölçülür,
+    ağ gecikmesinin yarısı düzeltilir; senkronizasyon başarısızsa son fark kullanılmaya devam eder.
+    """
+    def __init__(self, base_url=None, resync_seconds=CLOCK_RESYNC_SECONDS, wall=time.time):
+        self.base_url = base_url
+        self.resync_seconds = resync_seconds
+        self._wall = wall
+        self.offset_ms = 0
+        self._synced_at = None
+
+    def sync(self):
+        from binance_client import fapi_get
+        from rate_limiter import PRIORITY_HIGH
+        import requests
+        t0 = self._wall()
+        try:
+            data = fapi_get('/fapi/v1/time', priority=PRIORITY_HIGH, timeout=5, base_url=self.base_url)
+            server = int(data['serverTime'])
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            print(f"[SAAT HATA] sunucu saati alınamadı: {e}")
+            self._synced_at = t0
+            return False
+        t1 = self._wall()
+        self.offset_ms = server - int((t0 + t1) * 500)
+        self._synced_at = t1
+        return True
+
+    def maybe_sync(self):
+        if self._synced_at is None or self._wall() - self._synced_at >= self.resync_seconds:
+            self.sync()
+
+    def now_ms(self):
+        return int(self._wall() * 1000) + self.offset_ms
+
+
+class RefreshScheduler:
+    """
+    (sembol, interval) için bir sonraki yenileme zamanlarını tutan min-heap.
+    - "closed": sadece mum kapanışında yenilenir.
+    - "adaptive": mum kapanışına ek olarak mum içinde, fiyat aktif Supertrend bandına yaklaştıkça sıklaşan
+      aralıklarla (INTRABAR_MIN/MAX_SECONDS) yenilenir.
+    - "fixed": eski sabit aralıklar (karşılaştırma için).
+    Türetilen TF'ler kaynak interval ile birlikte yenilendiğinden banda uzaklıkta onlar da dikkate alınır.
+    """
+    def __init__(self, policy=REFRESH_INTRABAR_POLICY, now_ms=None, store=None, derived_by_base=None,
+                 distance_func=None, fixed_intervals=None):
+        if policy not in POLICIES:
+            raise ValueError(f"bilinmeyen yenileme politikası: {policy}")
+        from signal_calculator import supertrend_band_distance
+        self.policy = policy
+        self._now_ms = now_ms or (lambda: int(time.time() * 1000))
+        self.store = store or get_kline_store()
+        self.derived_by_base = derived_by_base or {}
+        self.distance_func = distance_func or supertrend_band_distance
+        if fixed_intervals is None:
+            from ws_utils import TF_UPDATE_INTERVALS as fixed_intervals
+        self.fixed_intervals = fixed_intervals
+        self._heap = []
+        self._due = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._history = deque()  # (zaman ms, interval) — son bir saatlik yenilemeler
+        self.stats = {'scheduled': 0, 'fired': 0, 'at_close': 0, 'intrabar': 0}
+
+    def __len__(self):
+        return len(self._due)
+
+    def schedule(self, symbol, interval, due_ms):
+        """Çiftin zamanını ayarlar; eski kayıt heap'te kalır ama pop sırasında atlanır."""
+        key = (symbol, interval)
+        with self._lock:
+            self._seq += 1
+            self._due[key] = (due_ms, self._seq)
+            heapq.heappush(self._heap, (due_ms, self._seq, key))
+            self.stats['scheduled'] += 1
+
+    def schedule_all(self, pairs, spread_ms=0):
+        """İlk tur: tüm çiftler hemen (isteğe bağlı olarak spread_ms'e yayılarak) zamanlanır."""
+        now = self._now_ms()
+        n = max(len(pairs), 1)
+        for i, (symbol, interval) in enumerate(pairs):
+            self.schedule(symbol, interval, now + spread_ms * i // n)
+
+    def pop_due(self, limit=None):
+        """Zamanı gelmiş çiftleri (en erken önce) heap'ten çıkarır."""
+        now = self._now_ms()
+        out = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and (limit is None or len(out) < limit):
+                due_ms, seq, key = heapq.heappop(self._heap)
+                if self._due.get(key) != (due_ms, seq):
+                    continue
+                del self._due[key]
+                out.append(key)
+                self._history.append((now, key[1]))
+            self.stats['fired'] += len(out)
+            self._trim_history(now)
+        return out
+
+    def seconds_until_next(self, default=1.0):
+        with self._lock:
+            while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][:2]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return default
+            return max(0.0, (self._heap[0][0] - self._now_ms()) / 1000.0)
+
+    def next_refresh_ms(self, symbol, interval):
+        """Politika, mum kapanış zamanı ve banda uzaklığa göre bir sonraki yenileme zamanı."""
+        now = self._now_ms()
+        if self.policy == "fixed":
+            return now + int(self.fixed_intervals.get(interval, 5) * 1000)
+        buf = self.store.get(symbol, interval)
+        last = buf.last_open_time if buf is not None else None
+        if last is None:
+            return now + int(INTRABAR_MIN_SECONDS.get(interval, 10) * 1000)
+        close_at = next_open_time(last, interval) + CLOSE_GRACE_MS
+        # Kapanış kaçırıldıysa (ör. hata sonrası) kısa aralıkla tekrar dene
+        if close_at <= now:
+            return now + int(INTRABAR_MIN_SECONDS.get(interval, 10) * 1000)
+        if self.policy == "closed":
+            self.stats['at_close'] += 1
+            return close_at
+        intrabar = now + int(self._intrabar_seconds(symbol, interval) * 1000)
+        if intrabar < close_at:
+            self.stats['intrabar'] += 1
+            return intrabar
+        self.stats['at_close'] += 1
+        return close_at
+
+    def _intrabar_seconds(self, symbol, interval):
+        lo = INTRABAR_MIN_SECONDS.get(interval, 10)
+        hi = max(lo, INTRABAR_MAX_SECONDS.get(interval, INTERVAL_MS.get(interval, 60_000) // 4000))
+        distances = [self.distance_func(symbol, interval, store=self.store)]
+        for _tf, d_interval in self.derived_by_base.get(interval, ()):
+            distances.append(self.distance_func(symbol, d_interval, store=self.store))
+        distances = [d for d in distances if d is not None]
+        if not distances:
+            return lo
+        d = min(distances)
+        if d <= NEAR_BAND:
+            return lo
+        ratio = min(1.0, (d - NEAR_BAND) / (FAR_BAND - NEAR_BAND))
+        return lo + (hi - lo) * ratio
+
+    def reschedule(self, symbol, interval):
+        self.schedule(symbol, interval, self.next_refresh_ms(symbol, interval))
+
+    def _trim_history(self, now):
+        cutoff = now - 3_600_000
+        while self._history and self._history[0][0] < cutoff:
+            self._history.popleft()
+
+    def requests_per_hour(self):
+        """Son bir saatte interval başına yapılan yenileme sayısı (ve toplam)."""
+        with self._lock:
+            self._trim_history(self._now_ms())
+            out = {}
+            for _t, interval in self._history:
+                out[interval] = out.get(interval, 0) + 1
+        out['total'] = sum(out.values())
+        return out
+
+    def fixed_requests_per_hour(self, pairs):
+        """Aynı çiftlerin sabit TF_UPDATE_INTERVALS ile saatlik istek sayısı (karşılaştırma)."""
+        out = {}
+        for _symbol, interval in pairs:
+            out[interval] = out.get(interval, 0) + 3600 / self.fixed_intervals.get(interval, 5)
+        out = {k: int(v) for k, v in out.items()}
+        out['total'] = sum(out.values())
+        return out
+
+
+def _simulate(symbol_count=20, hours=6, policies=POLICIES):
+    """
+    Sanal saatle (ağsız) saatlik yenileme sayısını politikalar arasında karşılaştırır.
+    Her yenilemede depo, taklit sunucunun deterministik mumlarıyla o ana kadar doldurulur.
+    """
+    import resample
+    from binance_stub import synthetic_klines
+    from kline_store import KlineStore
+    from signal_calculator import supertrend_limit
+
+    pairs_tf = [('M5', '5m'), ('M15', '15m'), ('H1', '1h'), ('H4', '4h'),
+                ('H6', '6h'), ('D1', '1d'), ('W1', '1w'), ('1M', '1M')]
+    fetched, derived_by_base = resample.fetch_plan(pairs_tf)
+    symbols = [f"SYM{i:04d}USDT" for i in range(symbol_count)]
+    pairs = [(s, interval) for _tf, interval in fetched for s in symbols]
+    start = 1_700_000_000_000
+    for policy in policies:
+        clock = {'now': start}
+        store = KlineStore(fresh_ttl_ms={})
+        sched = RefreshScheduler(policy, now_ms=lambda: clock['now'], store=store,
+                                 derived_by_base=derived_by_base)
+        sched.schedule_all(pairs)
+        fired = 0
+        end = start + hours * 3_600_000
+        while clock['now'] < end:
+            for symbol, interval in sched.pop_due():
+                history = resample.history_for(interval, supertrend_limit())
+                buf = store.buffer(symbol, interval)
+                buf.reserve(history)
+                buf.merge_rows(synthetic_klines(symbol, interval, history, end_ms=clock['now'],
+                                                start_ms=buf.last_open_time))
+                sched.reschedule(symbol, interval)
+                fired += 1
+            clock['now'] += int(max(sched.seconds_until_next(), 0.5) * 1000)
+        per_hour = fired / hours
+        fixed = sched.fixed_requests_per_hour(pairs)['total']
+        print(f"{policy:>8}: {per_hour:>9.0f} istek/saat | sabit aralıklar: {fixed} istek/saat | "
+              f"oran={per_hour / fixed:.3f} (mum içi={sched.stats['intrabar']}, kapanış={sched.stats['at_close']})")
+
+
+if __name__ == "__main__":
+    _simulate()
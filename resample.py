@@ -0,0 +1,138 @@
+# resample.py
+# Üst zaman dilimlerini depodaki alt zaman dilimi mumlarından yerelde türetir (resampling).
+# Örn. H4/H6 H1'den, M15 M5'ten, W1/1M D1'den birleştirilir; böylece bu TF'ler Binance'ten ayrıca çekilmez.
+# Hizalama Binance ile aynıdır (UTC): sabit süreli TF'ler epoch katları, W1 pazartesi 00:00, 1M takvim ayı başı.
+
+import numpy as np
+
+from kline_store import INTERVAL_MS, MAX_KLINE_LIMIT
+
+try:
+    from settings import DERIVED_INTERVALS
+except ImportError:
+    DERIVED_INTERVALS = {}
+
+# 1970-01-01 perşembeydi; ilk pazartesi 1970-01-05 00:00 UTC
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def bucket_open_times(open_time, interval):
+    """Her mumun ait olduğu `interval` mumunun açılış zamanı (ms, UTC)."""
+    t = np.asarray(open_time, dtype=np.int64)
+    if interval == '1M':
+        months = t.astype('datetime64[ms]').astype('datetime64[M]')
+        return months.astype('datetime64[ms]').astype(np.int64)
+    step = INTERVAL_MS[interval]
+    offset = WEEK_OFFSET_MS if interval == '1w' else 0
+    return (t - offset) // step * step + offset
+
+
+def resample_bars(bars, interval, fields=('open', 'high', 'low', 'close', 'volume')):
+    """
+    Artan sıralı alt TF mumlarını ({alan: ndarray}, 'open_time' zorunlu) `interval` mumlarına birleştirir.
+    Başı eksik olan ilk kova (tamponun ortasından başlayan) atılır; son kova, Binance'teki gibi
+    hâlâ oluşan mumdur. Dönen sözlük 'open_time' ve istenen alanları içerir.
+    """
+    t = np.asarray(bars['open_time'], dtype=np.int64)
+    starts = bucket_open_times(t, interval)
+    first = 0
+    if len(t) and starts[0] != t[0]:
+        first = int(np.searchsorted(starts, starts[0], side='right'))
+    t, starts = t[first:], starts[first:]
+    if not len(t):
+        out = {'open_time': np.zeros(0, dtype=np.int64)}
+        out.update({name: np.zeros(0, dtype=np.float64) for name in fields})
+        return out
+    idx = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+    last = np.concatenate((idx[1:], [len(t)])) - 1
+    out = {'open_time': starts[idx]}
+    for name in fields:
+        col = np.asarray(bars[name], dtype=np.float64)[first:]
+        if name == 'open':
+            out[name] = col[idx]
+        elif name == 'close':
+            out[name] = col[last]
+        elif name == 'high':
+            out[name] = np.maximum.reduceat(col, idx)
+        elif name == 'low':
+            out[name] = np.minimum.reduceat(col, idx)
+        elif name == 'volume':
+            out[name] = np.add.reduceat(col, idx)
+        else:
+            raise KeyError(name)
+    return out
+
+
+def base_interval(interval, derived=None):
+    """`interval` türetiliyorsa kaynak interval'i, değilse None."""
+    return (DERIVED_INTERVALS if derived is None else derived).get(interval)
+
+
+def base_bars_needed(interval, n, derived=None):
+    """Son n türetilmiş mum için gereken kaynak mum sayısı (baştaki eksik kova payı dahil)."""
+    base = base_interval(interval, derived)
+    if base is None:
+        return n
+    ratio = -(-INTERVAL_MS[interval] // INTERVAL_MS[base])
+    return int(min((n + 1) * ratio, MAX_KLINE_LIMIT))
+
+
+def history_for(interval, n, derived=None):
+    """
+    Çekilen bir interval için tutulacak mum sayısı: kendi n mumu ile
+    ondan türetilen TF'lerin son n mumu için gerekenin büyüğü.
+    """
+    derived = DERIVED_INTERVALS if derived is None else derived
+    need = [base_bars_needed(d, n, derived) for d, b in derived.items() if b == interval]
+    return max([n] + need)
+
+
+def fetch_plan(timeframes, derived=None):
+    """
+    [(tf_adı, interval)] listesini ağdan çekilecekler ve türetilecekler olarak ayırır.
+    Dönüş: (fetched, derived_by_base)
+      fetched: [(tf_adı veya None, interval)] — TF listesinde olmayan kaynaklar None adıyla eklenir
+      derived_by_base: {kaynak interval: [(tf_adı, interval), ...]}
+    """
+    derived = DERIVED_INTERVALS if derived is None else derived
+    fetched = []
+    derived_by_base = {}
+    for tf_name, interval in timeframes:
+        base = derived.get(interval)
+        if base is None:
+            fetched.append((tf_name, interval))
+        else:
+            derived_by_base.setdefault(base, []).append((tf_name, interval))
+    have = {interval for _tf, interval in fetched}
+    for base in derived_by_base:
+        if base not in have:
+            fetched.append((None, base))
+            have.add(base)
+    return fetched, derived_by_base
+
+
+def refresh(store, symbol, interval, n, timeout=8, priority=None):
+    """
+    Son n mum için depoyu günceller; türetilen TF'lerde kaynak interval çekilir.
+    Kaynak tampon, ondan türetilen TF'lerin de ihtiyacını karşılayacak kadar tutulur.
+    """
+    base = base_interval(interval)
+    if base is None:
+        return store.refresh(symbol, interval, history_for(interval, n), timeout=timeout, priority=priority)
+    return store.refresh(symbol, base, max(base_bars_needed(interval, n), history_for(base, n)),
+                         timeout=timeout, priority=priority)
+
+
+def series(store, symbol, interval, n=None, fields=('high', 'low', 'close')):
+    """KlineStore.series ile aynı; türetilen TF'ler kaynak mumlardan anlık birleştirilir."""
+    base = base_interval(interval)
+    if base is None:
+        return store.series(symbol, interval, n, fields)
+    values = tuple(f for f in fields if f != 'open_time')
+    snap = store.series(symbol, base, None, ('open_time',) + values)
+    if snap is None:
+        return None
+    bars = resample_bars(snap, interval, values)
+    size = len(bars['open_time'])
+    n = size if n is None else min(int(n), size)
+    return {name: bars[name][size - n:] for name in fields}
@@ -0,0 +1,239 @@
+# rolling_indicators.py
+# Fiyat anlık görüntülerinden (ticker) RSI, MACD/sinyal ve kayan std; pandas DataFrame kurmadan.
+# Fiyat geçmişi önceden ayrılmış (sembol x history_length) float dizisinde tutulur; her yeni fiyatta
+# göstergeler sadece değişen semboller için, tüm semboller birlikte (vektörel) ve O(1) güncellenir.
+# Hesap UI thread'i dışında, kendi thread'inde yapılır; UI sadece son sonuç sözlüğünü okur.
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+RSI_PERIOD = 14
+STD_WINDOW = 14
+# pandas'taki CryptoDashboard._compute_indicators gibi en az bu kadar örnek birikmeden sonuç verilmez
+MIN_SAMPLES = 20
+
+
+class RollingIndicators:
+    """
+    ui.CryptoDashboard._compute_indicators'ın artımlı karşılığı:
+    - RSI: son RSI_PERIOD fiyat farkının basit ortalama kazanç/kaybı (pandas rolling mean)
+    - MACD: EMA12 - EMA26, sinyal EMA9 (pandas ewm(adjust=False))
+    - 'volume': son STD_WINDOW fiyatın örneklem standart sapması (pandas rolling std, ddof=1)
+    Kayan toplamlar sembolün ilk fiyatına göre kaydırılarak tutulur ve her `resum_every` örnekte
+    halkadan yeniden toplanır (birikimli hata sınırlı kalır).
+    EMA'lar ilk örnekten itibaren taşınır; pandas yolu ise son history_length örneğin başından yeniden
+    başlatıyordu, bu yüzden geçmiş dolduktan sonra MACD ~(1-α)^history_length oranında farklıdır.
+    """
+    def __init__(self, symbols, history_length=100, resum_every=256):
+        self.symbols = list(symbols)
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self.history_length = max(int(history_length), STD_WINDOW + 1)
+        self.resum_every = int(resum_every)
+        self.history = np.full((n, self.history_length), np.nan)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.last = np.full(n, np.nan)
+        self._gain = np.zeros((n, RSI_PERIOD))
+        self._loss = np.zeros((n, RSI_PERIOD))
+        self._gsum = np.zeros(n)
+        self._lsum = np.zeros(n)
+        self._shift = np.zeros(n)
+        self._s = np.zeros(n)
+        self._ss = np.zeros(n)
+        self.ema12 = np.zeros(n)
+        self.ema26 = np.zeros(n)
+        self.signal = np.zeros(n)
+
+    def index_of(self, symbols):
+        idx = [self._index.get(s, -1) for s in symbols]
+        return np.asarray(idx, dtype=np.intp)
+
+    def update(self, idx, prices):
+        """
+        Her sembol için bir yeni fiyat (idx benzersiz olmalı). Tüm adımlar idx üzerinde vektöreldir.
+        """
+        idx = np.asarray(idx, dtype=np.intp)
+        x = np.asarray(prices, dtype=np.float64)
+        keep = (idx >= 0) & np.isfinite(x)
+        idx, x = idx[keep], x[keep]
+        if not len(idx):
+            return
+        cnt = self.count[idx]
+        first = cnt == 0
+        self._shift[idx[first]] = x[first]
+        # RSI: ilk örnekte fark yok (pandas'ta NaN -> 0)
+        delta = np.where(first, 0.0, x - self.last[idx])
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        slot = cnt % RSI_PERIOD
+        self._gsum[idx] += gain - self._gain[idx, slot]
+        self._lsum[idx] += loss - self._loss[idx, slot]
+        self._gain[idx, slot] = gain
+        self._loss[idx, slot] = loss
+        # Kayan std: pencereden çıkan fiyat halkadan okunur (yeni fiyat yazılmadan önce)
+        L = self.history_length
+        full = cnt >= STD_WINDOW
+        old = self.history[idx, (cnt - STD_WINDOW) % L]
+        d_new = x - self._shift[idx]
+        d_old = np.where(full, old - self._shift[idx], 0.0)
+        self._s[idx] += d_new - d_old
+        self._ss[idx] += d_new * d_new - d_old * d_old
+        self.history[idx, cnt % L] = x
+        # EMA'lar (pandas ewm(adjust=False) ile aynı formül)
+        a12, a26, a9 = 2.0 / 13.0, 2.0 / 27.0, 2.0 / 10.0
+        e12 = np.where(first, x, (1 - a12) * self.ema12[idx] + a12 * x)
+        e26 = np.where(first, x, (1 - a26) * self.ema26[idx] + a26 * x)
+        macd = e12 - e26
+        self.signal[idx] = np.where(first, macd, (1 - a9) * self.signal[idx] + a9 * macd)
+        self.ema12[idx], self.ema26[idx] = e12, e26
+        self.last[idx] = x
+        self.count[idx] = cnt + 1
+        due = idx[(cnt + 1) % self.resum_every == 0]
+        if len(due):
+            self._resum(due)
+
+    def _resum(self, rows):
+        self._gsum[rows] = self._gain[rows].sum(axis=1)
+        self._lsum[rows] = self._loss[rows].sum(axis=1)
+        cnt = self.count[rows]
+        L = self.history_length
+        cols = (cnt[:, None] - 1 - np.arange(STD_WINDOW)[None, :]) % L
+        window = self.history[rows[:, None], cols]
+        self._shift[rows] = window[:, 0]
+        d = window - self._shift[rows][:, None]
+        self._s[rows] = d.sum(axis=1)
+        self._ss[rows] = (d * d).sum(axis=1)
+
+    def values(self):
+        """(rsi, macd, macd_signal, std) dizileri; yetersiz örnekte NaN."""
+        cnt = self.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rs = (self._gsum / RSI_PERIOD) / (self._lsum / RSI_PERIOD + 1e-9)
+            rsi = np.where(cnt >= RSI_PERIOD, 100 - 100 / (1 + rs), np.nan)
+            var = (self._ss - self._s * self._s / STD_WINDOW) / (STD_WINDOW - 1)
+            std = np.where(cnt >= STD_WINDOW, np.sqrt(np.maximum(var, 0.0)), np.nan)
+        macd = np.where(cnt > 0, self.ema12 - self.ema26, np.nan)
+        signal = np.where(cnt > 0, self.signal, np.nan)
+        return rsi, macd, signal, std
+
+    def indicators(self, min_samples=MIN_SAMPLES):
+        """{sembol: {'rsi', 'macd', 'macd_signal', 'volume'}} — coin_indicators ile aynı biçim."""
+        rsi, macd, signal, std = self.values()
+        out = {}
+        for i in np.flatnonzero(self.count >= min_samples).tolist():
+            out[self.symbols[i]] = {
+                'rsi': _opt(rsi[i]), 'macd': _opt(macd[i]), 'macd_signal': _opt(signal[i]), 'volume': _opt(std[i]),
+            }
+        return out
+
+    def ready(self, n=None):
+        """Tüm semboller en az n (varsayılan history_length) örnek biriktirdi mi?"""
+        return bool(len(self.count)) and int(self.count.min()) >= (n or self.history_length)
+
+
+def _opt(v):
+    return None if v != v else float(v)
+
+
+class RollingIndicatorWorker:
+    """
+    RollingIndicators'ı arka plan thread'inde işletir. UI thread'i submit() ile sadece
+    değişen fiyatları kuyruğa koyar; `latest` her işlenen partiden sonra yeni bir sözlükle değiştirilir.
+    """
+    def __init__(self, symbols, history_length=100):
+        self.engine = RollingIndicators(symbols, history_length)
+        self.latest = {}
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self.stats = {'batches': 0, 'samples': 0, 'compute_ms': 0.0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._queue.put(None)
+
+    def submit(self, prices):
+        """{sembol: fiyat} — UI thread'inden çağrılır, hesap yapmaz."""
+        if prices:
+            self._queue.put(prices)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            # Birikmiş partiler birleştirilir; aynı sembolün birden fazla fiyatı sırayla işlenir
+            batches = [item]
+            while True:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._process(batches)
+                    return
+                batches.append(nxt)
+            self._process(batches)
+
+    def _process(self, batches):
+        t0 = time.perf_counter()
+        for prices in batches:
+            symbols = list(prices)
+            self.engine.update(self.engine.index_of(symbols), [prices[s] for s in symbols])
+            self.stats['samples'] += len(symbols)
+        self.latest = self.engine.indicators()
+        self.stats['batches'] += len(batches)
+        self.stats['compute_ms'] += (time.perf_counter() - t0) * 1000.0
+
+
+def _benchmark(symbol_count=650, history_length=100, changed=300, refreshes=50):
+    """
+    Yenileme başına ana thread süresi: mevcut pandas yolu (sembol başına DataFrame) ile
+    artımlı dizi motoru (ana thread'de sadece kuyruğa koyma + sonuç okuma) karşılaştırılır.
+    """
+    from collections import deque
+
+    import pandas as pd
+
+    from ui import CryptoDashboard
+    rng = np.random.default_rng(5)
+    symbols = [f"SYM{i:04d}USDT" for i in range(symbol_count)]
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.001, size=(history_length + refreshes, symbol_count)),
+                                      axis=0))
+    history = {s: deque(maxlen=history_length) for s in symbols}
+    worker = RollingIndicatorWorker(symbols, history_length)
+    for t in range(history_length):
+        for j, s in enumerate(symbols):
+            history[s].append({'price': float(prices[t, j]), 'change': 0.0, 'timestamp': t})
+        worker.engine.update(np.arange(symbol_count), prices[t])
+    worker.start()
+
+    pandas_t = 0.0
+    main_t = 0.0
+    for t in range(history_length, history_length + refreshes):
+        cols = rng.choice(symbol_count, size=changed, replace=False)
+        batch = {symbols[j]: float(prices[t, j]) for j in cols}
+        t0 = time.perf_counter()
+        for s, p in batch.items():
+            history[s].append({'price': p, 'change': 0.0, 'timestamp': t})
+        result = {s: CryptoDashboard._compute_indicators(pd.DataFrame(list(h))) for s, h in history.items()}
+        pandas_t += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        worker.submit(batch)
+        result = worker.latest
+        main_t += time.perf_counter() - t0
+    worker.stop()
+    worker._thread.join()
+    assert len(result) == symbol_count
+    bg = worker.stats['compute_ms'] / max(worker.stats['batches'], 1)
+    print(f"{symbol_count} sembol, yenileme başına ana thread: pandas={pandas_t / refreshes * 1000:8.2f}ms "
+          f"dizi={main_t / refreshes * 1000:6.3f}ms (arka planda parti başına {bg:.2f}ms)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,177 @@
+# rule_compiler.py
+# rules.RULES kurallarını sütun dizileri üzerinde çalışan NumPy koşullarına derler.
+# Yorumlayıcı yol (signal_engine.evaluate_rule) her sembol x kural için indikatör/koşul metinlerini
+# tekrar yorumlar; derlenmiş kural ise tüm sembolleri tek bir dizi ifadesiyle değerlendirir,
+# örn. MA[5m] < MA[15m] veya RSI[15m] > 70. Sonuçlar sembol indeks dizileri olarak döner.
+# Sonuçlar evaluate_rule ile birebir aynıdır: eksik veri NaN'dır ve her karşılaştırmada False verir.
+
+import numpy as np
+
+
+class CompiledRule:
+    """
+    Tek bir kuralın derlenmiş hali. `expr` okunabilir ifade (örn. 'RSI[15m] > 70'), `columns` ihtiyaç
+    duyulan (indikatör, tf) sütunları, `terms` ifadenin (sol sütun, işlem, sağ sütun ya da sabit) parçası.
+    """
+    __slots__ = ('rule', 'name', 'expr', 'columns', 'terms')
+
+    def __init__(self, rule, expr, columns, terms):
+        self.rule = rule
+        self.name = rule.get("name", expr)
+        self.expr = expr
+        self.columns = columns
+        self.terms = terms
+
+    def __repr__(self):
+        return f"CompiledRule({self.name!r}: {self.expr})"
+
+
+_OPS = {'<': np.less, '>': np.greater}
+
+
+def compile_rule(rule):
+    """
+    Kuralı CompiledRule'a çevirir. evaluate_rule'un tanımadığı indikatör/koşullar her zaman False
+    (terms=None) olur; eksik timeframes gibi bozuk kurallar ValueError verir.
+    """
+    tfs = list(rule.get("timeframes", ()))
+    indicator = rule.get("indicator")
+    condition = rule.get("condition")
+    if indicator == "MA":
+        if len(tfs) < 2:
+            raise ValueError(f"MA kuralı iki zaman dilimi ister: {rule.get('name')}")
+        op = {'down_cross': '<', 'up_cross': '>'}.get(condition)
+        left, right = ("MA", tfs[0]), ("MA", tfs[1])
+        if op is None:
+            return CompiledRule(rule, "False", [left, right], None)
+        return CompiledRule(rule, f"MA[{tfs[0]}] {op} MA[{tfs[1]}]", [left, right], (left, op, right))
+    if indicator == "RSI":
+        if not tfs:
+            raise ValueError(f"RSI kuralı bir zaman dilimi ister: {rule.get('name')}")
+        col = ("RSI", tfs[0])
+        if condition == "over":
+            value = float(rule.get("value", 70))
+            return CompiledRule(rule, f"RSI[{tfs[0]}] > {value:g}", [col], (col, '>', value))
+        if condition == "under":
+            value = float(rule.get("value", 30))
+            return CompiledRule(rule, f"RSI[{tfs[0]}] < {value:g}", [col], (col, '<', value))
+        return CompiledRule(rule, "False", [col], None)
+    return CompiledRule(rule, "False", [], None)
+
+
+def columns_from_data(data, symbols=None, columns=None):
+    """
+    {sembol: {tf: {"MA": ..., "RSI": ...}}} yapısından sütun dizileri: {(indikatör, tf): float64[N]}.
+    Eksik değerler NaN'dır. `columns` verilirse sadece o sütunlar kurulur.
+    """
+    symbols = list(data) if symbols is None else list(symbols)
+    if columns is None:
+        columns = {(ind, tf) for tf_data in data.values() for tf, values in tf_data.items() for ind in values}
+    out = {}
+    for ind, tf in columns:
+        col = np.full(len(symbols), np.nan)
+        for i, symbol in enumerate(symbols):
+            value = data.get(symbol, {}).get(tf, {}).get(ind)
+            if value is not None:
+                col[i] = value
+        out[(ind, tf)] = col
+    return symbols, out
+
+
+class RuleSet:
+    """
+    Derlenmiş kural listesi. Aynı ifadeyi paylaşan kurallar (örn. farklı adlı aynı koşul) bir
+    değerlendirmede bir kez hesaplanır. Bozuk kurallar atlanır ve [HATA] ile bildirilir.
+    """
+    def __init__(self, rules):
+        self.compiled = []
+        for rule in rules:
+            try:
+                self.compiled.append(compile_rule(rule))
+            except ValueError as e:
+                print(f"[HATA] Kural derlenemedi: {e}")
+
+    def __len__(self):
+        return len(self.compiled)
+
+    def columns(self):
+        return sorted({col for c in self.compiled for col in c.columns})
+
+    def masks(self, columns, n):
+        """(kural sayısı, N) bool matris; satır sırası self.compiled ile aynı."""
+        out = np.zeros((len(self.compiled), n), dtype=bool)
+        seen = {}
+        nan = np.full(n, np.nan)
+        with np.errstate(invalid='ignore'):
+            for r, c in enumerate(self.compiled):
+                if c.terms is None:
+                    continue
+                row = seen.get(c.terms)
+                if row is None:
+                    left, op, right = c.terms
+                    rhs = right if isinstance(right, float) else columns.get(right, nan)
+                    _OPS[op](columns.get(left, nan), rhs, out=out[r])
+                    seen[c.terms] = r
+                else:
+                    out[r] = out[row]
+        return out
+
+    def evaluate(self, columns, n):
+        """Kural başına eşleşen sembol indeksleri: [(CompiledRule, int dizisi)]."""
+        masks = self.masks(columns, n)
+        return [(c, np.flatnonzero(masks[r])) for r, c in enumerate(self.compiled)]
+
+    def scan(self, data, symbols=None):
+        """signal_engine.scan_signals ile aynı çıktı (aynı sıra: sembol, sonra kural)."""
+        symbols, columns = columns_from_data(data, symbols, self.columns())
+        masks = self.masks(columns, len(symbols))
+        sym_idx, rule_idx = np.nonzero(masks.T)
+        return [{
+            "symbol": symbols[i],
+            "rule": self.compiled[r].name,
+            "description": self.compiled[r].rule.get("description", ""),
+        } for i, r in zip(sym_idx.tolist(), rule_idx.tolist())]
+
+
+def _benchmark(rule_count=1000, symbol_count=5000, seed=3):
+    """1000 kural x 5000 sembol: yorumlanan döngü (scan_signals) ile derlenmiş NumPy yolu."""
+    import time
+
+    from signal_engine import scan_signals
+    rng = np.random.default_rng(seed)
+    tfs = ["5m", "15m", "1h", "4h"]
+    rules = []
+    for k in range(rule_count):
+        if rng.random() < 0.5:
+            a, b = rng.choice(tfs, size=2, replace=False).tolist()
+            rules.append({"name": f"MA {k}", "timeframes": [a, b], "indicator": "MA",
+                          "condition": str(rng.choice(["down_cross", "up_cross"]))})
+        else:
+            over = rng.random() < 0.5
+            rules.append({"name": f"RSI {k}", "timeframes": [str(rng.choice(tfs))], "indicator": "RSI",
+                          "condition": "over" if over else "under",
+                          "value": int(rng.integers(60, 90) if over else rng.integers(10, 40))})
+    data = {}
+    for i in range(symbol_count):
+        # Sembollerin ~%5'inde bir TF eksik (yetersiz mum)
+        data[f"SYM{i:05d}USDT"] = {tf: {"MA": float(rng.normal(100, 5)), "RSI": float(rng.uniform(0, 100))}
+                                   for tf in tfs if rng.random() > 0.05}
+    t0 = time.perf_counter()
+    expected = scan_signals(data, rules)
+    interp = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ruleset = RuleSet(rules)
+    symbols, columns = columns_from_data(data, None, ruleset.columns())
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    hits = ruleset.evaluate(columns, len(symbols))
+    evaluate = time.perf_counter() - t0
+    got = ruleset.scan(data)
+    assert got == expected
+    print(f"{rule_count} kural x {symbol_count} sembol, {len(expected)} eşleşme: "
+          f"yorumlanan={interp * 1000:.0f}ms | derleme+sütun={build * 1000:.1f}ms "
+          f"değerlendirme={evaluate * 1000:.1f}ms ({sum(len(idx) for _c, idx in hits)} indeks)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,540 @@
+# rule_dsl.py
+# Kural ifade dili: "supertrend[H4] == 'up' and rsi[M15] < 30 and close > bb_upper[H1]".
+# İfade bir kez ayrıştırılır (parse), tip denetlenir ve tüm semboller üzerinde çalışan NumPy
+# closure'larına derlenir. Alanlar indicator_registry göstergeleridir (ham mum alanları dahil);
+# [TF] verilmezse DEFAULT_INTERVAL kullanılır. Aynı alt ifade (örn. rsi[M15] ya da rsi[M15] < 30)
+# kaç kuralda geçerse geçsin tick başına bir kez hesaplanır: düğümler yapısal olarak eşlenir (hash-consing).
+# Anlam signal_engine / rule_compiler ile aynıdır: eksik sayısal değer NaN'dır ve her karşılaştırmada
+# False verir; eksik yön 'neutral'dır.
+
+import math
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from indicator_registry import BAR_FIELDS, DIRECTION, REGISTRY, SERIES
+from signal_matrix import SIGNAL_CODES
+
+# Dashboard TF adları -> Binance interval; interval'ler de doğrudan yazılabilir (örn. rsi[15m])
+TF_INTERVALS = {'M5': '5m', 'M15': '15m', 'H1': '1h', 'H4': '4h', 'H6': '6h', 'D1': '1d', 'W1': '1w', '1M': '1M'}
+DEFAULT_INTERVAL = '5m'
+
+# Yön ('up' / 'down' / 'neutral') döndüren göstergeler; SERIES türündekiler sayısaldır, diğer
+# ara değerler (örn. supertrend_state tuple'ı) kurallarda kullanılamaz
+DIRECTION_FIELDS = frozenset(n for n in REGISTRY.names() if REGISTRY.kind(n) == DIRECTION)
+# Eski kural adları ve kısaltmalar
+FIELD_ALIASES = {'ma': 'sma20', 'price': 'close'}
+
+NUM, DIR, BOOL = 'num', 'dir', 'bool'
+
+
+class RuleSyntaxError(ValueError):
+    """Ayrıştırma ya da tip hatası; `pos` ifadedeki karakter konumu."""
+    def __init__(self, message, text=None, pos=None):
+        if text is not None and pos is not None:
+            message = f"{message} (konum {pos}: {text[:pos]}⟨{text[pos:pos + 12]}⟩)"
+        super().__init__(message)
+        self.pos = pos
+
+
+# kind: 'num' | 'str' | 'bool' (sabitler), 'field', 'neg', 'arith', 'cmp', 'not', 'and', 'or'
+# value: sabit, (alan, interval) ya da işleç; args: alt düğümler; type: NUM / DIR / BOOL
+Node = namedtuple('Node', 'kind value args type')
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+      (?P<num>\d+\.\d*|\.\d+|\d+)(?![A-Za-z_])
+    | (?P<str>'[^']*'|"[^"]*")
+    | (?P<tf>\[\s*[A-Za-z0-9]+\s*\])
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<op>==|!=|<=|>=|<|>|\+|-|\*|/|\(|\))
+    )""", re.VERBOSE)
+_KEYWORDS = {'and', 'or', 'not', 'true', 'false'}
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        m = _TOKEN_RE.match(text, pos)
+        if m is None or m.lastgroup is None:
+            raise RuleSyntaxError("Beklenmeyen karakter", text, pos + len(text[pos:]) - len(text[pos:].lstrip()))
+        kind = m.lastgroup
+        value = m.group(kind)
+        start = m.start(kind)
+        if kind == 'name' and value.lower() in _KEYWORDS:
+            kind, value = 'kw', value.lower()
+        tokens.append((kind, value, start))
+        pos = m.end()
+    tokens.append(('end', None, end))
+    return tokens
+
+
+def normalize_interval(tf, text=None, pos=None):
+    tf = tf.strip()
+    if tf in TF_INTERVALS:
+        return TF_INTERVALS[tf]
+    if tf.upper() in TF_INTERVALS and tf.upper() != '1M':
+        return TF_INTERVALS[tf.upper()]
+    if tf in TF_INTERVALS.values():
+        return tf
+    raise RuleSyntaxError(f"Bilinmeyen zaman dilimi: {tf}", text, pos)
+
+
+def _field_type(name):
+    if name in DIRECTION_FIELDS:
+        return DIR
+    if name in BAR_FIELDS or (name in REGISTRY.names() and REGISTRY.kind(name) == SERIES):
+        return NUM
+    return None
+
+
+class _Parser:
+    """
+    Öncelik (düşükten yükseğe): or, and, not, karşılaştırma, + -, * /, tekli -, atom.
+    Karşılaştırmalar zincirlenemez (a < b < c hata verir).
+    """
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.i = 0
+
+    def peek(self):
+        return self.tokens[self.i]
+
+    def take(self):
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def error(self, message, tok=None):
+        tok = tok or self.peek()
+        return RuleSyntaxError(message, self.text, tok[2])
+
+    def accept(self, kind, value=None):
+        tok = self.peek()
+        if tok[0] == kind and (value is None or tok[1] == value):
+            self.i += 1
+            return tok
+        return None
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek()[0] != 'end':
+            raise self.error("Fazladan ifade")
+        if node.type != BOOL:
+            raise RuleSyntaxError(f"Kural koşul olmalı (bool), {node.type} bulundu", self.text, 0)
+        return node
+
+    def _logic(self, kind, sub):
+        first = sub()
+        args = [first]
+        tok = self.peek()
+        while self.accept('kw', kind):
+            args.append(sub())
+        if len(args) == 1:
+            return first
+        for a in args:
+            if a.type != BOOL:
+                raise self.error(f"'{kind}' işleneni koşul olmalı, {a.type} bulundu", tok)
+        # Sıra anlamı değiştirmez: sıralı tuple ile "a and b" ve "b and a" aynı düğüm olur
+        return Node(kind, None, tuple(sorted(set(args), key=repr)), BOOL)
+
+    def parse_or(self):
+        return self._logic('or', self.parse_and)
+
+    def parse_and(self):
+        return self._logic('and', self.parse_not)
+
+    def parse_not(self):
+        tok = self.accept('kw', 'not')
+        if tok is None:
+            return self.parse_cmp()
+        arg = self.parse_not()
+        if arg.type != BOOL:
+            raise self.error(f"'not' işleneni koşul olmalı, {arg.type} bulundu", tok)
+        return Node('not', None, (arg,), BOOL)
+
+    def parse_cmp(self):
+        left = self.parse_sum()
+        tok = self.peek()
+        if tok[0] != 'op' or tok[1] not in ('==', '!=', '<', '>', '<=', '>='):
+            return left
+        self.take()
+        right = self.parse_sum()
+        nxt = self.peek()
+        if nxt[0] == 'op' and nxt[1] in ('==', '!=', '<', '>', '<=', '>='):
+            raise self.error("Karşılaştırmalar zincirlenemez; 'and' kullanın", nxt)
+        op = tok[1]
+        types = {left.type, right.type}
+        if types == {NUM}:
+            pass
+        elif types <= {DIR, 'str'} and op in ('==', '!='):
+            pass
+        else:
+            raise self.error(f"'{op}' {left.type} ile {right.type} karşılaştıramaz", tok)
+        return Node('cmp', op, (left, right), BOOL)
+
+    def _arith(self, ops, sub):
+        node = sub()
+        while True:
+            tok = self.peek()
+            if tok[0] != 'op' or tok[1] not in ops:
+                return node
+            self.take()
+            right = sub()
+            if node.type != NUM or right.type != NUM:
+                raise self.error(f"'{tok[1]}' sadece sayılarla kullanılır", tok)
+            node = Node('arith', tok[1], (node, right), NUM)
+
+    def parse_sum(self):
+        return self._arith(('+', '-'), self.parse_product)
+
+    def parse_product(self):
+        return self._arith(('*', '/'), self.parse_unary)
+
+    def parse_unary(self):
+        tok = self.accept('op', '-')
+        if tok is None:
+            return self.parse_atom()
+        arg = self.parse_unary()
+        if arg.type != NUM:
+            raise self.error("Tekli '-' sadece sayılarla kullanılır", tok)
+        if arg.kind == 'num':
+            return Node('num', -arg.value, (), NUM)
+        return Node('neg', None, (arg,), NUM)
+
+    def parse_atom(self):
+        tok = self.take()
+        kind, value, pos = tok
+        if kind == 'num':
+            return Node('num', float(value), (), NUM)
+        if kind == 'str':
+            sig = value[1:-1]
+            if sig not in SIGNAL_CODES:
+                raise RuleSyntaxError(f"Bilinmeyen yön: {value} ({', '.join(SIGNAL_CODES)})", self.text, pos)
+            return Node('str', sig, (), 'str')
+        if kind == 'kw' and value in ('true', 'false'):
+            return Node('bool', value == 'true', (), BOOL)
+        if kind == 'op' and value == '(':
+            node = self.parse_or()
+            if not self.accept('op', ')'):
+                raise self.error("')' bekleniyordu")
+            return node
+        if kind == 'name':
+            name = FIELD_ALIASES.get(value.lower(), value.lower())
+            ftype = _field_type(name)
+            if ftype is None:
+                if name in REGISTRY.names():
+                    raise RuleSyntaxError(f"Alan kuralda kullanılamaz (sayı ya da yön değil): {value}",
+                                          self.text, pos)
+                raise RuleSyntaxError(f"Bilinmeyen alan: {value}", self.text, pos)
+            tf_tok = self.accept('tf')
+            interval = DEFAULT_INTERVAL
+            if tf_tok is not None:
+                interval = normalize_interval(tf_tok[1].strip('[] \t'), self.text, tf_tok[2])
+            return Node('field', (name, interval), (), ftype)
+        if kind == 'end':
+            raise RuleSyntaxError("İfade eksik", self.text, pos)
+        raise RuleSyntaxError(f"Beklenmeyen: {value}", self.text, pos)
+
+
+def parse(text):
+    """İfadeyi tip denetimli düğüm ağacına çevirir; hatada RuleSyntaxError."""
+    if not isinstance(text, str) or not text.strip():
+        raise RuleSyntaxError("Boş ifade")
+    return _Parser(text).parse()
+
+
+def size(node):
+    """Ağaçtaki düğüm sayısı (ortak alt ifadeler paylaşılmasaydı hesaplanacak iş)."""
+    return 1 + sum(size(a) for a in node.args)
+
+
+def fields(node):
+    """İfadenin okuduğu (alan, interval) çiftleri."""
+    if node.kind == 'field':
+        return {node.value}
+    out = set()
+    for arg in node.args:
+        out |= fields(arg)
+    return out
+
+
+_ARITH = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+_CMP = {'==': np.equal, '!=': np.not_equal, '<': np.less, '>': np.greater, '<=': np.less_equal,
+        '>=': np.greater_equal}
+
+
+class RuleBook:
+    """
+    İfade kurallarının ortak programı. Kurallar {"name", "expr", "description"} sözlükleri ya da düz
+    ifadelerdir. Her benzersiz düğüm bir "yuva"ya derlenir; değerlendirme yuvaları sırayla bir kez
+    hesaplar ve kurallar kendi kök yuvalarını okur. Hatalı kurallar atlanır ve [HATA] ile bildirilir.
+    """
+    def __init__(self, rules=()):
+        self.rules = []   # [(kural sözlüğü, kök yuva)]
+        self._slots = {}  # {Node: yuva}
+        self._program = []  # yuva sırasıyla closure'lar: fn(değerler, sütunlar, n)
+        self.node_count = 0  # paylaşım olmasaydı hesaplanacak düğüm sayısı
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add(self, rule):
+        """Kuralı ekler; ifade hatalıysa [HATA] basar ve False döner."""
+        if isinstance(rule, str):
+            rule = {"name": rule, "expr": rule}
+        try:
+            tree = parse(rule.get("expr", ""))
+        except RuleSyntaxError as e:
+            print(f"[HATA] Kural derlenemedi ({rule.get('name')}): {e}")
+            return False
+        self.node_count += size(tree)
+        self.rules.append((rule, self._compile(tree)))
+        return True
+
+    def unique_nodes(self):
+        return len(self._program)
+
+    def columns(self):
+        return sorted({n.value for n in self._slots if n.kind == 'field'})
+
+    def _compile(self, node):
+        slot = self._slots.get(node)
+        if slot is not None:
+            return slot
+        args = [self._compile(a) for a in node.args]
+        fn = self._closure(node, args)
+        slot = len(self._program)
+        self._program.append(fn)
+        self._slots[node] = slot
+        return slot
+
+    @staticmethod
+    def _closure(node, args):
+        kind = node.kind
+        if kind == 'num':
+            value = node.value
+            return lambda v, cols, n: value
+        if kind == 'str':
+            code = SIGNAL_CODES[node.value]
+            return lambda v, cols, n: code
+        if kind == 'bool':
+            value = node.value
+            return lambda v, cols, n: value
+        if kind == 'field':
+            key = node.value
+            if node.type == DIR:
+                return lambda v, cols, n: cols.get(key, 0)  # eksik yön: neutral
+            return lambda v, cols, n: cols.get(key, np.nan)
+        if kind == 'neg':
+            a, = args
+            return lambda v, cols, n: np.negative(v[a])
+        if kind in ('arith', 'cmp'):
+            a, b = args
+            op = (_ARITH if kind == 'arith' else _CMP)[node.value]
+            return lambda v, cols, n: op(v[a], v[b])
+        if kind == 'not':
+            a, = args
+            return lambda v, cols, n: np.logical_not(v[a])
+        op = np.logical_and if kind == 'and' else np.logical_or
+        first, rest = args[0], args[1:]
+
+        def logic(v, cols, n):
+            out = v[first]
+            for s in rest:
+                out = op(out, v[s])
+            return out
+        return logic
+
+    def run(self, columns, n):
+        """Tüm yuvaların değerleri (yuva sırasıyla)."""
+        values = [None] * len(self._program)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for slot, fn in enumerate(self._program):
+                values[slot] = fn(values, columns, n)
+        return values
+
+    def masks(self, columns, n):
+        """(kural sayısı, N) bool matris; satır sırası self.rules ile aynı."""
+        values = self.run(columns, n)
+        out = np.zeros((len(self.rules), n), dtype=bool)
+        for r, (_rule, root) in enumerate(self.rules):
+            out[r] = values[root]  # sabit sonuç (örn. 'true') tüm satıra yayılır
+        return out
+
+    def evaluate(self, columns, n):
+        """Kural başına eşleşen sembol indeksleri: [(kural, int dizisi)]."""
+        masks = self.masks(columns, n)
+        return [(rule, np.flatnonzero(masks[r])) for r, (rule, _root) in enumerate(self.rules)]
+
+    def scan(self, symbols, cache=None, store=None):
+        """Mum deposundaki güncel göstergelerle tarama; signal_engine.scan_signals ile aynı çıktı biçimi."""
+        symbols = list(symbols)
+        columns = columns_from_cache(symbols, self.columns(), cache, store)
+        masks = self.masks(columns, len(symbols))
+        sym_idx, rule_idx = np.nonzero(masks.T)
+        return [{
+            "symbol": symbols[i],
+            "rule": self.rules[r][0].get("name", self.rules[r][0].get("expr")),
+            "description": self.rules[r][0].get("description", ""),
+        } for i, r in zip(sym_idx.tolist(), rule_idx.tolist())]
+
+
+def columns_from_cache(symbols, columns, cache=None, store=None):
+    """
+    Paylaşılan gösterge önbelleğinden (indicator_registry) sütun dizileri: {(alan, interval): dizi}.
+    Sayısal alanlar float64 (eksik NaN), yön alanları int8 koddur (eksik 0 = neutral).
+    """
+    from indicator_registry import get_indicator_cache
+    cache = cache or get_indicator_cache()
+    by_interval = {}
+    for name, interval in columns:
+        by_interval.setdefault(interval, []).append(name)
+    out = {}
+    for interval, names in by_interval.items():
+        cols = {name: (np.zeros(len(symbols), dtype=np.int8) if name in DIRECTION_FIELDS
+                       else np.full(len(symbols), np.nan)) for name in names}
+        for i, symbol in enumerate(symbols):
+            values = cache.latest(symbol, interval, names, store)
+            for name in names:
+                value = values[name]
+                if value is None:
+                    continue
+                cols[name][i] = SIGNAL_CODES.get(value, 0) if name in DIRECTION_FIELDS else value
+        for name, col in cols.items():
+            out[(name, interval)] = col
+    return out
+
+
+def interpret(node, tf_data):
+    """
+    Tek sembol için ağaç yürüten (sözlük tabanlı) yorumlayıcı: tf_data {interval: {alan: değer}}.
+    Derlenmiş yol ile aynı sonucu verir; test ve benchmark karşılaştırması için.
+    """
+    kind = node.kind
+    if kind in ('num', 'str', 'bool'):
+        return node.value
+    if kind == 'field':
+        name, interval = node.value
+        value = tf_data.get(interval, {}).get(name)
+        if value is None:
+            return 'neutral' if node.type == DIR else math.nan
+        return value
+    if kind == 'neg':
+        return -interpret(node.args[0], tf_data)
+    if kind == 'arith':
+        a, b = interpret(node.args[0], tf_data), interpret(node.args[1], tf_data)
+        if node.value == '/':
+            if b == 0:  # NumPy ile aynı: x/0 -> ±inf, 0/0 -> nan
+                return math.copysign(math.inf, a) if a == a and a != 0 else math.nan
+            return a / b
+        return {'+': a + b, '-': a - b, '*': a * b}[node.value]
+    if kind == 'cmp':
+        a, b = interpret(node.args[0], tf_data), interpret(node.args[1], tf_data)
+        return {'==': a == b, '!=': a != b, '<': a < b, '>': a > b, '<=': a <= b, '>=': a >= b}[node.value]
+    if kind == 'not':
+        return not interpret(node.args[0], tf_data)
+    if kind == 'and':
+        return all(interpret(a, tf_data) for a in node.args)
+    return any(interpret(a, tf_data) for a in node.args)
+
+
+def _benchmark(rule_count=2000, symbol_count=2000, seed=5):
+    """
+    Tick başına tüm kural x sembol değerlendirmesi:
+    - eski kural sözlükleri (MA/RSI): signal_engine.scan_signals ile ifade dili
+    - zengin ifadeler (supertrend / rsi / bb / close, çok TF): sözlük yorumlayıcı ile derlenmiş program
+    """
+    import time
+
+    from signal_engine import scan_signals
+    rng = np.random.default_rng(seed)
+    intervals = ['5m', '15m', '1h', '4h']
+    tf_names = {v: k for k, v in TF_INTERVALS.items()}
+    symbols = [f"SYM{i:05d}USDT" for i in range(symbol_count)]
+
+    # 1) Eski biçim: scan_signals'ın {sembol: {tf: {"MA", "RSI"}}} verisi
+    legacy_rules, legacy_exprs = [], []
+    for k in range(rule_count):
+        if rng.random() < 0.5:
+            a, b = rng.choice(intervals, size=2, replace=False).tolist()
+            cond = str(rng.choice(["down_cross", "up_cross"]))
+            legacy_rules.append({"name": f"MA {k}", "timeframes": [a, b], "indicator": "MA", "condition": cond})
+            legacy_exprs.append({"name": f"MA {k}", "expr": f"MA[{a}] {'<' if cond == 'down_cross' else '>'} MA[{b}]"})
+        else:
+            tf, value = str(rng.choice(intervals)), int(rng.integers(10, 90))
+            cond = "over" if value > 50 else "under"
+            legacy_rules.append({"name": f"RSI {k}", "timeframes": [tf], "indicator": "RSI", "condition": cond,
+                                 "value": value})
+            legacy_exprs.append({"name": f"RSI {k}", "expr": f"RSI[{tf}] {'>' if cond == 'over' else '<'} {value}"})
+    data = {s: {tf: {"MA": float(rng.normal(100, 5)), "RSI": float(rng.uniform(0, 100))} for tf in intervals}
+            for s in symbols}
+    t0 = time.perf_counter()
+    expected = scan_signals(data, legacy_rules)
+    interp_t = time.perf_counter() - t0
+    book = RuleBook(legacy_exprs)
+    columns = {(name, tf): np.array([data[s][tf][key] for s in symbols])
+               for name, key in (("sma20", "MA"), ("rsi", "RSI")) for tf in intervals}
+    t0 = time.perf_counter()
+    hits = book.evaluate(columns, symbol_count)
+    book_t = time.perf_counter() - t0
+    got = sorted((symbols[i], rule["name"]) for rule, idx in hits for i in idx.tolist())
+    assert got == sorted((r["symbol"], r["rule"]) for r in expected)
+    pairs = rule_count * symbol_count
+    print(f"eski kurallar {rule_count} x {symbol_count} sembol: scan_signals={interp_t * 1000:.0f}ms "
+          f"({pairs / interp_t / 1e6:.2f}M kural-sembol/sn) | ifade dili={book_t * 1000:.1f}ms "
+          f"({pairs / book_t / 1e6:.0f}M/sn), {book.unique_nodes()}/{book.node_count} düğüm")
+
+    # 2) Zengin ifadeler: sözlük yorumlayıcı (sembol başına ağaç yürütme) ile derlenmiş program
+    def rich_rule(k):
+        parts = []
+        for _ in range(int(rng.integers(2, 4))):
+            tf = tf_names[str(rng.choice(intervals))]
+            kind = rng.integers(0, 4)
+            if kind == 0:
+                parts.append(f"supertrend[{tf}] == '{rng.choice(['up', 'down'])}'")
+            elif kind == 1:
+                parts.append(f"rsi[{tf}] {'<' if rng.random() < 0.5 else '>'} {int(rng.integers(2, 8)) * 10}")
+            elif kind == 2:
+                parts.append(f"close > bb_upper[{tf}]" if rng.random() < 0.5 else f"close < bb_lower[{tf}]")
+            else:
+                parts.append(f"(macd[{tf}] - macd_signal[{tf}]) * 2 > atr[{tf}] / 10")
+        return {"name": f"R{k}", "expr": " and ".join(parts)}
+    rich = [rich_rule(k) for k in range(rule_count)]
+    book = RuleBook(rich)
+    num_fields = ('rsi', 'bb_upper', 'bb_lower', 'macd', 'macd_signal', 'atr', 'close')
+    tf_data = {}
+    for s in symbols:
+        tf_data[s] = {tf: {'supertrend': str(rng.choice(['up', 'down', 'neutral'])),
+                           'rsi': float(rng.uniform(0, 100)), 'close': float(rng.normal(100, 3)),
+                           'bb_upper': float(rng.normal(103, 1)), 'bb_lower': float(rng.normal(97, 1)),
+                           'macd': float(rng.normal(0, 1)), 'macd_signal': float(rng.normal(0, 1)),
+                           'atr': float(rng.uniform(0.5, 3))} for tf in intervals}
+    columns = {}
+    for name, tf in book.columns():
+        if name in DIRECTION_FIELDS:
+            columns[(name, tf)] = np.array([SIGNAL_CODES[tf_data[s][tf][name]] for s in symbols], dtype=np.int8)
+        elif name in num_fields:
+            columns[(name, tf)] = np.array([tf_data[s][tf][name] for s in symbols])
+    sample = symbols[:max(symbol_count // 20, 1)]
+    trees = [parse(r["expr"]) for r in rich]
+    t0 = time.perf_counter()
+    slow = [[interpret(tree, tf_data[s]) for s in sample] for tree in trees]
+    dict_t = (time.perf_counter() - t0) * symbol_count / len(sample)
+    t0 = time.perf_counter()
+    masks = book.masks(columns, symbol_count)
+    book_t = time.perf_counter() - t0
+    assert masks[:, :len(sample)].tolist() == slow
+    print(f"zengin ifadeler {rule_count} x {symbol_count} sembol: sözlük yorumlayıcı~{dict_t * 1000:.0f}ms "
+          f"({pairs / dict_t / 1e6:.2f}M/sn) | derlenmiş={book_t * 1000:.1f}ms ({pairs / book_t / 1e6:.0f}M/sn), "
+          f"{book.unique_nodes()}/{book.node_count} düğüm (ortak alt ifadeler bir kez), {int(masks.sum())} eşleşme")
+
+
+if __name__ == "__main__":
+    _benchmark()
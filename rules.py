@@ -34,4 +34,20 @@ RULES = [
     # Buraya istediğin kadar yeni kural ekleyebilirsin.
 ]
 
+# İfade kuralları (rule_dsl.py): göstergeler [TF] ile, 'and' / 'or' / 'not', karşılaştırma ve aritmetik.
+# Alanlar indicator_registry adlarıdır (supertrend, bb, rsi, sma20/ma, bb_upper, close, macd, atr ...);
+# TF verilmezse 5m kullanılır. Yön alanları 'up' / 'down' / 'neutral' ile karşılaştırılır.
+EXPR_RULES = [
+    {
+        "name": "H4 Trend Dip",
+        "expr": "supertrend[H4] == 'up' and rsi[M15] < 30",
+        "description": "4 saatlik trend yukarıyken 15 dakikalık RSI aşırı satımda."
+    },
+    {
+        "name": "H1 BB Breakout",
+        "expr": "supertrend[H4] == 'up' and close > bb_upper[H1]",
+        "description": "Fiyat 1 saatlik Bollinger üst bandını kırdı, 4 saatlik trend yukarı."
+    },
+]
+
 # Not: Bu dosya sadece kural tanımı içerir. Sinyal motoru ana kodda bu kuralları okuyacak.
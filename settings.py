@@ -1,3 +1,5 @@
+import os
+
 TIMEFRAMES = ["M5", "M15", "H1", "H4", "H6", "D1", "W1", "1M"]
 HEADERS = ["Sembol", "$ Fiyat", "24H %"]
 
@@ -11,3 +13,70 @@ COLUMN_WIDTHS = {
     # Zaman dilimleri
     "TIMEFRAME": 54
 }
+
+# Sinyal veri kaynağı: "ws" (Binance kline akışları), "async" (asyncio toplu REST)
+# veya "rest" (zaman dilimi başına thread ile yoklama)
+SIGNAL_INGESTION = "ws"
+
+# Yerelde türetilen zaman dilimleri: {türetilen interval: kaynak interval}.
+# Kaynak interval Binance'ten çekilir; türetilen mumlar depodaki kaynak mumlarından birleştirilir (resample.py).
+# Bir TF'yi tekrar doğrudan çekmek için buradan silmek yeterli; boş sözlükte her TF ayrı çekilir.
+DERIVED_INTERVALS = {
+    '15m': '5m',
+    '4h': '1h',
+    '6h': '1h',
+    '1w': '1d',
+    '1M': '1d',
+}
+
+# Kalıcı mum önbelleği (kline_cache.py): yeniden başlatmada depo diskten yüklenir, sadece eksik mumlar çekilir
+KLINE_CACHE_ENABLED = True
+KLINE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kline_cache.sqlite3")
+KLINE_CACHE_MAX_MB = 200
+
+# Sinyal yenileme politikası (refresh_scheduler.py):
+# "adaptive" (mum kapanışı + fiyat Supertrend bandına yaklaştıkça sıklaşan mum içi yenileme),
+# "closed" (sadece mum kapanışında) veya "fixed" (eski sabit TF_UPDATE_INTERVALS)
+REFRESH_INTRABAR_POLICY = "adaptive"
+
+# Fiyat / 24H % / hacim sütunları: tüm piyasa ticker akışı (price_feed.py).
+# "!ticker@arr" (24s % dahil) veya "!miniTicker@arr" (daha küçük; % açılış fiyatından hesaplanır).
+# Akış koparsa /fapi/v1/ticker/24hr yoklamasına dönülür.
+PRICE_FEED_ENABLED = True
+PRICE_FEED_STREAM = "!ticker@arr"
+# Değişen satırların UI'ya uygulanma aralığı (ms)
+PRICE_FEED_UI_MS = 250
+# Akış yokken / koparken REST (/fapi/v1/ticker/24hr, ağırlık 40) yoklama aralığı (ms)
+PRICE_REST_INTERVAL_MS = 10000
+
+# Sinyal veri yolu (signal_bus.py): işçilerin yayınladığı değişiklikler bu aralıkla (ms, bir UI karesi)
+# toplu olarak tabloya / kombinasyon paneline iletilir. Kombinasyon panelindeki fiyat / % / hacim
+# değerleri ayrıca COMBO_PRICE_REFRESH_MS'de bir tazelenir (sinyal değişikliği beklemeden).
+SIGNAL_BUS_FRAME_MS = 100
+COMBO_PRICE_REFRESH_MS = 30000
+
+# Gösterge hesabı için süreç havuzu (indicator_pool.py): 0 = kapalı (hesap aynı süreçte),
+# N > 0 = N işçi süreci. Mumlar paylaşılan bellekle gider, sadece int8 yönler döner.
+INDICATOR_POOL_WORKERS = 0
+
+# Gösterge memo'su (indicator_memo.py): son mum ve parametreler değişmediyse sonuç yeniden
+# hesaplanmaz. LRU ile en fazla bu kadar sonuç tutulur.
+INDICATOR_MEMO_MAX_ENTRIES = 20000
+
+# Ayar/durum dosyaları (config_store.py) bellekte tutulur; dış düzenlemeler bu aralıkla (sn) yoklanır
+CONFIG_WATCH_INTERVAL = 1.0
+
+# Alarm motoru (alarm_engine.py): alarm ekleme/silme/aç-kapa bu kadar (sn) bekletilip arka planda
+# tek seferde user_state.json'a yazılır
+ALARM_SAVE_DELAY = 1.0
+
+# user_state.json gecikmeli yazılır (config_store.py): bu süre (sn) içindeki değişiklikler bellekte
+# birleştirilip arka planda tek bir atomik yazmayla diske iner
+STATE_WRITE_DELAY = 0.5
+
+# Geriye dönük test (backtest.py): yerel mum klasörü (<klasör>/<interval>/<SEMBOL>.npz|csv ya da Binance
+# veri dökümleri <SEMBOL>-<interval>-YYYY-MM.zip), işçi süreç sayısı (0 = aynı süreç) ve ileri getiri
+# ufukları (taban mum sayısı)
+BACKTEST_DATA_DIR = "data/klines"
+BACKTEST_WORKERS = 0
+BACKTEST_HORIZONS = (1, 4, 24)
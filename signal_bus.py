@@ -0,0 +1,140 @@
+# signal_bus.py
+# Sinyal değişiklikleri için yayınla/abone ol (pub/sub) veri yolu.
+# SignalMatrix bir hücrenin durumu değiştiğinde (sembol, tf, eski, yeni, ts) olayını yayınlar; işçi
+# thread'leri sadece bekleyen olaylar sözlüğüne yazar. UI thread'i her karede (frame) drain() çağırır:
+# aynı hücrenin kare içindeki değişiklikleri birleştirilir (ilk eski -> son yeni; geri dönenler düşer)
+# ve aboneler olay listesini tek seferde alır. Böylece tablo, kombinasyon paneli, alarm kontrolü ve
+# AnalizPanel yoklama yerine sadece değişen hücreler için çalışır.
+
+import threading
+import time
+from collections import namedtuple
+
+try:
+    from settings import SIGNAL_BUS_FRAME_MS
+except ImportError:
+    SIGNAL_BUS_FRAME_MS = 100
+
+SignalEvent = namedtuple('SignalEvent', 'symbol tf old new ts')
+
+
+class SignalBus:
+    """
+    publish() herhangi bir thread'den çağrılabilir; drain() abonelerin çalıştığı thread'den (UI).
+    Bekleyen olaylar (sembol, tf) başına tutulur: bellek hücre sayısıyla sınırlıdır.
+    """
+    def __init__(self):
+        self._pending = {}  # {(sembol, tf): [eski, yeni, ts]}
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self.stats = {'published': 0, 'delivered': 0, 'coalesced': 0, 'batches': 0}
+
+    def subscribe(self, callback, timeframes=None):
+        """callback(olaylar): her karede değişen hücrelerin listesiyle. timeframes verilirse sadece onlar."""
+        self._subscribers.append((callback, None if timeframes is None else frozenset(timeframes)))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(cb, tfs) for cb, tfs in self._subscribers if cb is not callback]
+
+    def publish(self, symbol, tf, old, new, ts=None):
+        ts = time.time() if ts is None else ts
+        key = (symbol, tf)
+        with self._lock:
+            self.stats['published'] += 1
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [old, new, ts]
+            else:
+                entry[1], entry[2] = new, ts
+                self.stats['coalesced'] += 1
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def drain(self):
+        """Bekleyen olayları abonelere iletir; iletilen olay listesini döndürür."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        events = [SignalEvent(symbol, tf, old, new, ts)
+                  for (symbol, tf), (old, new, ts) in pending.items() if old != new]
+        if not events:
+            return events
+        self.stats['batches'] += 1
+        self.stats['delivered'] += len(events)
+        for callback, tfs in list(self._subscribers):
+            batch = events if tfs is None else [e for e in events if e.tf in tfs]
+            if not batch:
+                continue
+            try:
+                callback(batch)
+            except Exception as e:
+                print(f"[HATA] Sinyal abonesi: {e}")
+        return events
+
+
+_default_bus = SignalBus()
+
+
+def get_signal_bus():
+    """Süreç genelinde paylaşılan sinyal veri yolu (işçiler yayınlar, UI tüketir)."""
+    return _default_bus
+
+
+def _benchmark(symbol_count=150, timeframes=8, minutes=5, changes_per_minute=40, flaps_per_minute=20,
+               frame_ms=SIGNAL_BUS_FRAME_MS, seed=6):
+    """
+    UI işi / gerçek sinyal değişikliği: eski yoklama (10 sn'de bir tüm tablo, 5 sn'de bir tüm sembollerde
+    kombinasyon) ile veri yolu (kare başına sadece değişen hücreler). Aynı kare içinde gidip gelen
+    (flap) değişiklikler de eklenir; bunlar gerçek değişiklik sayılmaz.
+    """
+    import random
+
+    from signal_matrix import SignalMatrix
+    rng = random.Random(seed)
+    tfs = ['M5', 'M15', 'H1', 'H4', 'H6', 'D1', 'W1', '1M'][:timeframes]
+    symbols = [f"SYM{i:03d}USDT" for i in range(symbol_count)]
+    duration_ms = minutes * 60_000
+    writes = []
+    for _ in range(changes_per_minute * minutes):
+        writes.append((rng.randrange(duration_ms), rng.choice(symbols), rng.choice(tfs), None))
+    for _ in range(flaps_per_minute * minutes):
+        t = rng.randrange(duration_ms - 20)
+        writes.append((t, rng.choice(symbols), rng.choice(tfs), 'flap'))
+    writes.sort(key=lambda w: w[0])
+
+    bus = SignalBus()
+    matrix = SignalMatrix(symbols, tfs, bus=bus)
+    work = {'cells': 0, 'combo_passes': 0}
+    bus.subscribe(lambda events: work.__setitem__('cells', work['cells'] + len(events)))
+    bus.subscribe(lambda events: work.__setitem__('combo_passes', work['combo_passes'] + 1), tfs[:3])
+    real_changes = 0
+    w = 0
+    for frame_start in range(0, duration_ms, frame_ms):
+        while w < len(writes) and writes[w][0] < frame_start + frame_ms:
+            _t, symbol, tf, kind = writes[w]
+            old = matrix.get(symbol, tf)
+            if kind == 'flap':
+                # Aynı kare içinde değişip geri döner
+                matrix.set(symbol, tf, 'down' if old == 'up' else 'up')
+                matrix.set(symbol, tf, old)
+            else:
+                matrix.set(symbol, tf, 'down' if old == 'up' else 'up')
+                real_changes += 1
+            w += 1
+        bus.drain()
+    polling_cells = (duration_ms // 10_000) * symbol_count * len(tfs)
+    polling_combo = (duration_ms // 5_000) * symbol_count
+    print(f"{symbol_count} sembol x {len(tfs)} TF, {minutes} dk, {real_changes} gerçek değişiklik "
+          f"(+{flaps_per_minute * minutes} kare içi gidip gelme):")
+    print(f"  yoklama : {polling_cells} hücre çizimi + {polling_combo} kombinasyon sembol kontrolü "
+          f"-> değişiklik başına {(polling_cells + polling_combo) / max(real_changes, 1):.1f} iş")
+    print(f"  veri yolu: {work['cells']} hücre çizimi + {work['combo_passes']} kombinasyon geçişi "
+          f"-> değişiklik başına {(work['cells'] + work['combo_passes']) / max(real_changes, 1):.2f} iş "
+          f"(yayınlanan {bus.stats['published']}, birleştirilen {bus.stats['coalesced']}, "
+          f"{bus.stats['batches']} kare)")
+
+
+if __name__ == "__main__":
+    _benchmark()
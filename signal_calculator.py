@@ -1,107 +1,210 @@
 import requests
 from bb_config import get_tf_bb_setting
+from kline_store import get_kline_store
+from binance_client import fapi_get
+import resample
+
+def fetch_klines(symbol, interval, limit, base_url=None, timeout=8, start_time=None, priority=None):
+    """
+    /fapi/v1/klines ham listesini döndürür. Hata durumunda requests istisnası fırlatır.
+    start_time (ms) verilirse sadece o mumdan itibaren olanlar istenir (delta güncelleme).
+    İstek ağırlığı global rate limiter'dan düşülür.
+    """
+    params = {'symbol': symbol, 'interval': interval, 'limit': int(limit)}
+    if start_time is not None:
+        params['startTime'] = int(start_time)
+    return fapi_get('/fapi/v1/klines', params, symbol=symbol, priority=priority,
+                    timeout=timeout, base_url=base_url)
+
+def compute_bollinger(closes, period=20, stddev=2.0):
+    """
+    Kapanış serisinden BB sinyali: fiyat bandın/ortalamanın üstündeyse 'up', altındaysa 'down'.
+    """
+    if len(closes) < period:
+        return 'neutral'
+    window = closes[-period:]
+    ma = sum(window) / period
+    std = (sum((x - ma)**2 for x in window) / period) ** 0.5
+    upper = ma + stddev * std
+    lower = ma - stddev * std
+    last = closes[-1]
+    if last > upper:
+        return 'up'
+    elif last < lower:
+        return 'down'
+    elif last > ma:
+        return 'up'
+    elif last < ma:
+        return 'down'
+    else:
+        return 'neutral'
 
 def fetch_bollinger_signal(symbol, interval, tf):
     """
-    Binance'den son kapanış fiyatlarını çekip BB sinyali döndürür. Ayarları bb_config'tan okur.
+    Mum deposunu güncelleyip son kapanışlardan BB sinyali döndürür. Ayarları bb_config'tan okur.
     """
     try:
         bb_settings = get_tf_bb_setting(tf)
         period = bb_settings.get('period', 20)
         stddev = bb_settings.get('stddev', 2.0)
-        url = f"https://fapi.binance.com/fapi/v1/klines?symbol={symbol}&interval={interval}&limit={period+1}"
-        resp = requests.get(url, timeout=8)
-        data = resp.json()
-        closes = []
-        for c in data:
-            try:
-                if len(c) >= 5:
-                    closes.append(float(c[4]))
-            except (IndexError, ValueError, TypeError):
-                continue
-        if len(closes) < period:
-            return 'neutral'
-        ma = sum(closes[-period:]) / period
-        std = (sum((x - ma)**2 for x in closes[-period:]) / period) ** 0.5
-        upper = ma + stddev * std
-        lower = ma - stddev * std
-        last = closes[-1]
-        if last > upper:
-            return 'up'
-        elif last < lower:
-            return 'down'
-        elif last > ma:
-            return 'up'
-        elif last < ma:
-            return 'down'
-        else:
-            return 'neutral'
+        store = get_kline_store()
+        resample.refresh(store, symbol, interval, period + 1)
+        last = _last_bar_key(store, symbol, interval)
+
+        def compute():
+            closes = resample.series(store, symbol, interval, period + 1, ('close',))['close'].tolist()
+            return compute_bollinger(closes, period, stddev)
+        if last is None:
+            return compute()
+        from indicator_memo import get_indicator_memo
+        return get_indicator_memo().get_or_compute(('bb', period, stddev, symbol, interval) + last, interval, compute)
     except (requests.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
         print(f"[ERROR] fetch_bollinger_signal: {e}")
         return 'neutral'
 
+def compute_supertrend(highs, lows, closes, atr_period=10, multiplier=3.0, source='hl2'):
+    """
+    Hazır mum serilerinden Supertrend yönü hesaplar: 'up', 'down' veya 'neutral'.
+    fetch_supertrend_signal ve WebSocket akışı aynı hesabı kullanır.
+    """
+    return compute_supertrend_state(highs, lows, closes, atr_period, multiplier, source)[0]
+
+def compute_supertrend_state(highs, lows, closes, atr_period=10, multiplier=3.0, source='hl2'):
+    """
+    (yön, aktif band) döndürür. Aktif band, kesilirse trendin döneceği banddır:
+    yükseliş trendinde alt band, düşüş trendinde üst band. Yetersiz veride ('neutral', None).
+    """
+    if len(closes) < atr_period + 2:
+        return 'neutral', None
+    # Kaynak seri
+    if source == 'close':
+        src = closes
+    else:
+        src = [(h + l) / 2.0 for h, l in zip(highs, lows)]
+    atr = rma(true_range(highs, lows, closes), atr_period)
+    return supertrend_from_atr(src, closes, atr, atr_period, multiplier)
+
+def true_range(highs, lows, closes):
+    """True Range listesi; ilk mumda sadece high - low."""
+    tr = []
+    for i in range(len(closes)):
+        if i == 0:
+            tr.append(highs[i] - lows[i])
+        else:
+            tr.append(max(highs[i] - lows[i], abs(highs[i] - closes[i-1]), abs(lows[i] - closes[i-1])))
+    return tr
+
+def rma(values, period):
+    """
+    RMA (Wilder) listesi. Başlangıç: ilk `period` değerin SMA'sı (period-1. indekste);
+    öncesi 0.0 olarak bırakılır.
+    """
+    out = [0.0] * len(values)
+    if len(values) < period:
+        return out
+    out[period-1] = sum(values[:period]) / period
+    alpha = 1.0 / period
+    for i in range(period, len(values)):
+        out[i] = out[i-1] + alpha * (values[i] - out[i-1])
+    return out
+
+def supertrend_from_atr(src, closes, atr, atr_period=10, multiplier=3.0):
+    """Kaynak seri, kapanışlar ve ATR'den taşınan bandlar ve trend: (yön, aktif band)."""
+    if len(closes) < atr_period + 2:
+        return 'neutral', None
+    up = [None] * len(src)
+    dn = [None] * len(src)
+    trend = [0] * len(src)
+    for i in range(len(src)):
+        if i < atr_period-1:
+            continue
+        up[i] = src[i] + multiplier * atr[i]
+        dn[i] = src[i] - multiplier * atr[i]
+        if i == atr_period-1:
+            trend[i] = 1 if closes[i] > dn[i] else -1
+            continue
+        # Bandların devamlılığı (Pine mantığına yakınlaştırma)
+        up[i] = min(up[i], up[i-1] if up[i-1] is not None else up[i])
+        dn[i] = max(dn[i], dn[i-1] if dn[i-1] is not None else dn[i])
+        if trend[i-1] == -1 and closes[i] > up[i]:
+            trend[i] = 1
+        elif trend[i-1] == 1 and closes[i] < dn[i]:
+            trend[i] = -1
+        else:
+            trend[i] = trend[i-1]
+    last_trend = trend[-1] if trend[-1] != 0 else trend[-2]
+    if last_trend == 1:
+        return 'up', dn[-1]
+    return 'down', up[-1]
+
+def supertrend_limit(atr_period=10):
+    """Supertrend için çekilen/tutulan mum sayısı."""
+    return max(atr_period*3, 60)
+
+def _last_bar_key(store, symbol, interval):
+    """Memo anahtarı için son mumun kimliği; türetilen TF'lerde kaynak interval'in son mumu."""
+    buf = store.get(symbol, resample.base_interval(interval) or interval)
+    return None if buf is None else buf.last_bar()
+
+def _registry_state(symbol, interval, atr_period, multiplier, source, store):
+    """
+    Varsayılan ayarlarda Supertrend durumu paylaşılan gösterge önbelleğinden okunur: aynı mum için
+    worker, zamanlayıcı (banda uzaklık) ve diğer tüketiciler hesabı bir kez yapar. Aksi halde None.
+    """
+    import indicator_registry as ir
+    if (atr_period, multiplier, source) != (ir.SUPERTREND_ATR_PERIOD, ir.SUPERTREND_MULTIPLIER, 'hl2'):
+        return None
+    ctx = ir.get_indicator_cache().context(symbol, interval, store)
+    if ctx is None:
+        return 'neutral', None, None
+    return ctx.get('supertrend_state') + (float(ctx.get('close')[-1]) if len(ctx) else None,)
+
+def _compute_supertrend_state(symbol, interval, atr_period, multiplier, source, store):
+    shared = _registry_state(symbol, interval, atr_period, multiplier, source, store)
+    if shared is not None:
+        return shared
+    snap = resample.series(store, symbol, interval, supertrend_limit(atr_period))
+    if snap is None or len(snap['close']) < atr_period + 2:
+        return 'neutral', None, None
+    direction, band = compute_supertrend_state(snap['high'].tolist(), snap['low'].tolist(),
+                                               snap['close'].tolist(), atr_period, multiplier, source)
+    return direction, band, float(snap['close'][-1])
+
+def supertrend_state_from_store(symbol, interval, atr_period=10, multiplier=3.0, source='hl2', store=None):
+    """
+    Depodaki mumlardan (yön, aktif band, son kapanış). Son mum ve parametreler önceki hesaptakiyle
+    aynıysa sonuç indicator_memo'dan hesapsız döner.
+    """
+    from indicator_memo import get_indicator_memo
+    store = store or get_kline_store()
+    last = _last_bar_key(store, symbol, interval)
+    if last is None:
+        return 'neutral', None, None
+    key = ('supertrend', atr_period, multiplier, source, symbol, interval) + last
+    return get_indicator_memo().get_or_compute(
+        key, interval, lambda: _compute_supertrend_state(symbol, interval, atr_period, multiplier, source, store))
+
+def supertrend_from_store(symbol, interval, atr_period=10, multiplier=3.0, source='hl2', store=None):
+    """Depodaki son mumlardan (ağa çıkmadan) Supertrend yönü. Türetilen TF'ler kaynak mumlardan birleştirilir."""
+    return supertrend_state_from_store(symbol, interval, atr_period, multiplier, source, store)[0]
+
+def supertrend_band_distance(symbol, interval, atr_period=10, multiplier=3.0, source='hl2', store=None):
+    """Son kapanışın aktif Supertrend bandına oransal uzaklığı (0.01 = %1); veri yoksa None."""
+    _direction, band, last = supertrend_state_from_store(symbol, interval, atr_period, multiplier, source, store)
+    if band is None or not last:
+        return None
+    return abs(last - band) / abs(last)
+
 def fetch_supertrend_signal(symbol, interval, tf, atr_period=10, multiplier=3.0, source='hl2'):
     """
     Supertrend yönü: 'up' veya 'down'
     - ATR: RMA tabanlı
     - Kaynak: 'hl2' ( (high+low)/2 ) veya 'close'
+    Mumlar paylaşılan depodan okunur; depo sadece eksik mumları çeker.
     """
     try:
-        url = f"https://fapi.binance.com/fapi/v1/klines?symbol={symbol}&interval={interval}&limit={max(atr_period*3, 60)}"
-        resp = requests.get(url, timeout=8)
-        data = resp.json()
-        if not isinstance(data, list) or len(data) < atr_period + 2:
-            return 'neutral'
-        highs, lows, closes = [], [], []
-        for c in data:
-            try:
-                highs.append(float(c[2]))
-                lows.append(float(c[3]))
-                closes.append(float(c[4]))
-            except (IndexError, ValueError, TypeError):
-                return 'neutral'
-        # Kaynak seri
-        if source == 'close':
-            src = closes
-        else:
-            src = [(h + l) / 2.0 for h, l in zip(highs, lows)]
-        # True Range ve ATR (RMA)
-        tr = []
-        for i in range(len(closes)):
-            if i == 0:
-                tr.append(highs[i] - lows[i])
-            else:
-                tr.append(max(highs[i] - lows[i], abs(highs[i] - closes[i-1]), abs(lows[i] - closes[i-1])))
-        atr = [0.0] * len(tr)
-        # RMA başlangıç: ilk atr_period değerinin SMA'sı
-        seed = sum(tr[:atr_period]) / atr_period
-        atr[atr_period-1] = seed
-        alpha = 1.0 / atr_period
-        for i in range(atr_period, len(tr)):
-            atr[i] = atr[i-1] + alpha * (tr[i] - atr[i-1])
-        # Üst/alt bandlar ve trend
-        up = [None] * len(src)
-        dn = [None] * len(src)
-        trend = [0] * len(src)
-        for i in range(len(src)):
-            if i < atr_period-1:
-                continue
-            up[i] = src[i] + multiplier * atr[i]
-            dn[i] = src[i] - multiplier * atr[i]
-            if i == atr_period-1:
-                trend[i] = 1 if closes[i] > dn[i] else -1
-                continue
-            # Bandların devamlılığı (Pine mantığına yakınlaştırma)
-            up[i] = min(up[i], up[i-1] if up[i-1] is not None else up[i])
-            dn[i] = max(dn[i], dn[i-1] if dn[i-1] is not None else dn[i])
-            if trend[i-1] == -1 and closes[i] > up[i]:
-                trend[i] = 1
-            elif trend[i-1] == 1 and closes[i] < dn[i]:
-                trend[i] = -1
-            else:
-                trend[i] = trend[i-1]
-        last_trend = trend[-1] if trend[-1] != 0 else trend[-2]
-        return 'up' if last_trend == 1 else 'down'
+        resample.refresh(get_kline_store(), symbol, interval, supertrend_limit(atr_period))
+        return supertrend_from_store(symbol, interval, atr_period, multiplier, source)
     except (requests.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
         print(f"[ERROR] fetch_supertrend_signal: {e}")
         return 'neutral'
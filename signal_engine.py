@@ -2,12 +2,25 @@
 # Kuralları (rules.py) okuyup, veriyle karşılaştıran ve sinyal üreten temel motor
 
 import importlib
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Kural dosyasını dinamik olarak yükle
 rules_module = importlib.import_module("rules")
 RULES = rules_module.RULES
 
+# Kuraldaki indikatör adı -> indicator_registry göstergesi
+INDICATOR_KEYS = {
+    "MA": "sma20",
+    "EMA": "ema",
+    "RSI": "rsi",
+    "MACD": "macd",
+    "ATR": "atr",
+    "BB": "bb",
+    "SUPERTREND": "supertrend",
+    "STOCH": "stoch_k",
+    "VWAP": "vwap",
+}
+
 # Örnek veri formatı (gerçek veriyle değiştirilebilir)
 example_data = {
     "BTCUSDT": {
@@ -63,6 +76,47 @@ def scan_signals(data: Dict[str, Dict[str, Dict[str, Any]]], rules: List[Dict[st
                 })
     return results
 
+def build_tf_data(symbols: List[str], rules: List[Dict[str, Any]], cache=None,
+                  store=None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Kuralların istediği indikatörleri paylaşılan gösterge önbelleğinden (indicator_registry) okuyup
+    scan_signals'ın beklediği {sembol: {tf: {"MA": ..., "RSI": ...}}} yapısını kurar.
+    Değeri henüz hesaplanamayan (yetersiz mum) zaman dilimleri atlanır.
+    """
+    from indicator_registry import get_indicator_cache
+    cache = cache or get_indicator_cache()
+    timeframes = sorted({tf for rule in rules for tf in rule["timeframes"]})
+    keys = sorted({rule["indicator"] for rule in rules if rule["indicator"] in INDICATOR_KEYS})
+    names = [INDICATOR_KEYS[k] for k in keys]
+    data = {}
+    for symbol in symbols:
+        tf_data = {}
+        for tf in timeframes:
+            values = cache.latest(symbol, tf, names, store)
+            if any(values[name] is None for name in names):
+                continue
+            tf_data[tf] = {k: values[INDICATOR_KEYS[k]] for k in keys}
+        data[symbol] = tf_data
+    return data
+
+def scan_store(symbols: List[str], rules: Optional[List[Dict[str, Any]]] = None, cache=None, store=None):
+    """
+    Mum deposundaki güncel verilerle tarama. Sonuç scan_signals ile aynıdır; kurallar rule_compiler ile
+    derlenip tüm semboller için tek seferde (NumPy) değerlendirilir.
+    """
+    from rule_compiler import RuleSet
+    rules = RULES if rules is None else rules
+    return RuleSet(rules).scan(build_tf_data(symbols, rules, cache, store), symbols)
+
+def scan_expressions(symbols: List[str], rules: Optional[List[Dict[str, Any]]] = None, cache=None, store=None):
+    """
+    İfade kurallarıyla (rules.EXPR_RULES, rule_dsl) mum deposunda tarama. Çıktı scan_signals ile aynı
+    biçimdedir; ifadeler bir kez derlenir ve ortak alt ifadeler tüm kurallarda bir kez hesaplanır.
+    """
+    from rule_dsl import RuleBook
+    rules = getattr(rules_module, "EXPR_RULES", []) if rules is None else rules
+    return RuleBook(rules).scan(symbols, cache, store)
+
 if __name__ == "__main__":
     signals = scan_signals(example_data, RULES)
     print("Sinyal Alanlar:")
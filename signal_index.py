@@ -0,0 +1,109 @@
+# signal_index.py
+# (TF, yön) başına eşleşen sembollerin bit kümesi (bitset). Sinyal değiştikçe sadece ilgili bit
+# güncellenir; "tüm yeşil TF'ler up" birkaç bit kümesinin AND'i, "herhangi bir kırmızı TF down" OR'u olur.
+# Bit kümeleri Python tamsayılarıdır (i. bit = i. sembol): değiştirilemezler, bu yüzden anlık
+# kopya almak sözlüğü kopyalamak kadar ucuzdur.
+
+import numpy as np
+
+# Sadece yönlü durumlar indekslenir; neutral hiçbir bit kümesinde değildir
+INDEXED_CODES = (1, -1)
+
+
+class BitsetIndex:
+    """
+    SignalMatrix içinde tutulur: update(i, j, eski, yeni) kod değiştiğinde çağrılır.
+    bits[(j, kod)] -> int; kilitleme SignalMatrix'indir.
+    """
+    def __init__(self, tf_count):
+        self.bits = {(j, code): 0 for j in range(tf_count) for code in INDEXED_CODES}
+
+    def update(self, i, j, old, new):
+        if old == new:
+            return
+        bit = 1 << i
+        if old in INDEXED_CODES:
+            self.bits[(j, old)] &= ~bit
+        if new in INDEXED_CODES:
+            self.bits[(j, new)] |= bit
+
+
+def all_of(bits, tf_ids, code):
+    """Verilen TF'lerin hepsinde `code` olan sembollerin bit kümesi; TF listesi boşsa 0."""
+    if not tf_ids:
+        return 0
+    out = -1
+    for j in tf_ids:
+        out &= bits.get((j, code), 0)
+    return out
+
+
+def any_of(bits, tf_ids, code):
+    out = 0
+    for j in tf_ids:
+        out |= bits.get((j, code), 0)
+    return out
+
+
+def indices(b, n):
+    """Bit kümesindeki indeksler (artan sıra)."""
+    if b <= 0:
+        return np.zeros(0, dtype=np.intp)
+    raw = np.frombuffer(b.to_bytes((n + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little')[:n])
+
+
+def _benchmark(symbol_count=5000, rounds=200):
+    """
+    5 saniyelik kombinasyon + trend dönüşü sorgusu: get_signal döngüsü, snapshot maskeleri (int8 matris)
+    ve bit kümeleri. Yanıt süreleri sembol listesine çevirme dahil ölçülür.
+    """
+    import time
+
+    from signal_matrix import SignalMatrix
+    rng = np.random.default_rng(9)
+    symbols = [f"SYM{i:05d}USDT" for i in range(symbol_count)]
+    tfs = ['M5', 'M15', 'H1', 'H4', 'H6', 'D1', 'W1', '1M']
+    matrix = SignalMatrix(symbols, tfs)
+    values = rng.choice(['up', 'down', 'neutral'], p=[0.45, 0.45, 0.1], size=(symbol_count, len(tfs))).tolist()
+    for s, row in zip(symbols, values):
+        for tf, sig in zip(tfs, row):
+            matrix.set(s, tf, sig)
+    green, red = ['M5', 'M15', 'H1'], ['D1', 'W1']
+
+    def loop():
+        rise = [s for s in symbols if all(matrix.get(s, tf) == 'up' for tf in green)]
+        fall = [s for s in symbols if all(matrix.get(s, tf) == 'down' for tf in red)]
+        dip = {s for s in symbols if any(matrix.get(s, tf) == 'down' for tf in red)
+               and any(matrix.get(s, tf) == 'up' for tf in green) and matrix.get(s, 'H1') == 'up'}
+        return rise, fall, dip
+
+    def masks():
+        snap = matrix.snapshot()
+        h1 = snap.column('H1')
+        return (snap.select(snap.all_of(green, 'up')), snap.select(snap.all_of(red, 'down')),
+                set(snap.select(snap.any_of(red, 'down') & snap.any_of(green, 'up') & (h1 == 1))))
+
+    def bitsets():
+        snap = matrix.snapshot()
+        return (snap.select_bits(snap.all_bits(green, 'up')), snap.select_bits(snap.all_bits(red, 'down')),
+                set(snap.select_bits(snap.any_bits(red, 'down') & snap.any_bits(green, 'up')
+                                     & snap.all_bits(['H1'], 'up'))))
+
+    def query_only():
+        snap = matrix.snapshot()
+        return snap.all_bits(green, 'up'), snap.all_bits(red, 'down')
+
+    expected = loop()
+    assert masks() == expected and bitsets() == expected
+    for label, fn, n in (("get_signal döngüsü", loop, 5), ("int8 maskeler", masks, rounds),
+                         ("bit kümeleri", bitsets, rounds), ("sadece AND", query_only, rounds)):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        print(f"{label:>20}: {(time.perf_counter() - t0) / n * 1e6:9.1f} µs "
+              f"({symbol_count} sembol, rise={len(expected[0])} fall={len(expected[1])} dip={len(expected[2])})")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,217 @@
+# signal_matrix.py
+# İşçilerin sinyal önbelleği: iç içe defaultdict'teki metinler yerine (sembol x TF) int8 matris.
+# Sembol ve TF'ler tamsayı kimliklerle satır/sütuna eşlenir; her hücrenin son yazılma zamanı tutulur.
+# Okuyucular snapshot() ile sürümlü, değiştirilemez bir kopya alır: yazma sırasında yarım güncelleme
+# görülmez ve kombinasyon / trend taramaları tüm sembollerde dizi işlemleriyle yapılır.
+# (TF, yön) bit kümeleri (signal_index) her değişiklikte güncellenir; çok TF'li sorgular birkaç AND/OR'dur.
+
+import threading
+import time
+
+import numpy as np
+
+import signal_index
+
+SIGNAL_CODES = {'neutral': 0, 'up': 1, 'down': -1}
+# int8 kod -> ad (indeks -1 'down'a denk gelir)
+SIGNAL_NAMES = ('neutral', 'up', 'down')
+
+
+def _code(sig):
+    return SIGNAL_CODES.get(sig, 0)
+
+
+class SignalSnapshot:
+    """
+    SignalMatrix'in belirli bir sürümdeki değiştirilemez kopyası.
+    states: (N, T) int8 (1 up, -1 down, 0 neutral); updated_at: (N, T) son yazma zamanı (epoch sn, 0 = hiç).
+    """
+    __slots__ = ('symbols', 'timeframes', 'symbol_ids', 'tf_ids', 'states', 'updated_at', 'version', 'bits',
+                 '_names')
+
+    def __init__(self, symbols, timeframes, symbol_ids, tf_ids, states, updated_at, version, bits=None,
+                 names=None):
+        self.symbols = symbols
+        self._names = np.array(symbols, dtype=object) if names is None else names
+        self.timeframes = timeframes
+        self.symbol_ids = symbol_ids
+        self.tf_ids = tf_ids
+        states.flags.writeable = False
+        updated_at.flags.writeable = False
+        self.states = states
+        self.updated_at = updated_at
+        self.version = version
+        self.bits = bits or {}  # {(tf id, kod): bit kümesi} — signal_index
+
+    def get(self, symbol, tf_name):
+        i = self.symbol_ids.get(symbol)
+        j = self.tf_ids.get(tf_name)
+        if i is None or j is None:
+            return 'neutral'
+        return SIGNAL_NAMES[self.states[i, j]]
+
+    def _tf_ids(self, tf_names):
+        # Bilinmeyen TF'nin bit kümesi boştur (tüm semboller neutral)
+        return [self.tf_ids.get(tf, -1) for tf in tf_names]
+
+    def all_bits(self, tf_names, sig):
+        """all_of'un bit kümesi karşılığı (int): birkaç AND, sembol sayısından bağımsız."""
+        return signal_index.all_of(self.bits, self._tf_ids(tf_names), _code(sig))
+
+    def any_bits(self, tf_names, sig):
+        return signal_index.any_of(self.bits, self._tf_ids(tf_names), _code(sig))
+
+    def select_bits(self, bits):
+        """Bit kümesindeki sembol adları (satır sırasıyla)."""
+        return self._names[signal_index.indices(bits, len(self.symbols))].tolist()
+
+    def column(self, tf_name):
+        """TF'nin tüm sembollerdeki kodları; bilinmeyen TF'de sıfırlar (neutral)."""
+        j = self.tf_ids.get(tf_name)
+        if j is None:
+            return np.zeros(len(self.symbols), dtype=np.int8)
+        return self.states[:, j]
+
+    def all_of(self, tf_names, sig):
+        """Verilen TF'lerin hepsinde `sig` olan semboller (bool maske); TF listesi boşsa hiçbiri."""
+        mask = np.zeros(len(self.symbols), dtype=bool)
+        if tf_names:
+            mask[:] = True
+            code = _code(sig)
+            for tf in tf_names:
+                mask &= self.column(tf) == code
+        return mask
+
+    def any_of(self, tf_names, sig):
+        """Verilen TF'lerden en az birinde `sig` olan semboller (bool maske)."""
+        mask = np.zeros(len(self.symbols), dtype=bool)
+        code = _code(sig)
+        for tf in tf_names:
+            mask |= self.column(tf) == code
+        return mask
+
+    def select(self, mask):
+        """Maskedeki sembol adları (satır sırasıyla)."""
+        return self._names[np.flatnonzero(mask)].tolist()
+
+    def table(self, symbols, tf_names):
+        """[[ad, ...], ...]: her sembol için verilen TF'lerin sinyal adları (tablo yenilemesi için)."""
+        rows = [self.symbol_ids.get(s, -1) for s in symbols]
+        cols = [self.tf_ids.get(tf, -1) for tf in tf_names]
+        padded = np.zeros((self.states.shape[0] + 1, self.states.shape[1] + 1), dtype=np.int8)
+        padded[:-1, :-1] = self.states  # -1 indeksleri (bilinmeyen) son sıfır satır/sütuna düşer
+        codes = padded[np.ix_(rows, cols)].tolist()
+        return [[SIGNAL_NAMES[c] for c in row] for row in codes]
+
+
+class SignalMatrix:
+    """
+    Sabit sembol/TF kümesi için sinyal matrisi. set() tek hücreyi yazar (bilinmeyen sembol/TF yok sayılır),
+    get() tek hücreyi okur, snapshot() son sürümün kopyasını verir (sürüm değişmediyse aynı nesne).
+    bus verilirse her durum değişikliği (sembol, tf, eski, yeni, ts) olarak bir kez yayınlanır.
+    """
+    def __init__(self, symbols, timeframes, bus=None):
+        self.symbols = tuple(symbols)
+        self.bus = bus  # signal_bus.SignalBus: durum değişiklikleri yayınlanır
+        self.timeframes = tuple(timeframes)
+        self.symbol_ids = {s: i for i, s in enumerate(self.symbols)}
+        self.tf_ids = {tf: j for j, tf in enumerate(self.timeframes)}
+        shape = (len(self.symbols), len(self.timeframes))
+        self._states = np.zeros(shape, dtype=np.int8)
+        self._updated = np.zeros(shape, dtype=np.float64)
+        self._names = np.array(self.symbols, dtype=object)
+        self._index = signal_index.BitsetIndex(len(self.timeframes))
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.version = 0
+
+    def set(self, symbol, tf_name, sig):
+        """Hücreyi yazar; değer değiştiyse True."""
+        i = self.symbol_ids.get(symbol)
+        j = self.tf_ids.get(tf_name)
+        if i is None or j is None:
+            return False
+        code = _code(sig)
+        now = time.time()
+        with self._lock:
+            old = int(self._states[i, j])
+            changed = old != code
+            if changed:
+                self._index.update(i, j, old, code)
+            self._states[i, j] = code
+            self._updated[i, j] = now
+            self.version += 1
+            # Yayın kilit altında: aynı hücreye yazan iki thread'in olayları yazma sırasıyla veri yoluna girer
+            # (veri yolu kendi kilidinden başka bir şey almaz; abonelere drain'de, kilitsiz iletilir)
+            if changed and self.bus is not None:
+                self.bus.publish(symbol, tf_name, SIGNAL_NAMES[old], SIGNAL_NAMES[code], now)
+        return changed
+
+    def get(self, symbol, tf_name):
+        i = self.symbol_ids.get(symbol)
+        j = self.tf_ids.get(tf_name)
+        if i is None or j is None:
+            return 'neutral'
+        return SIGNAL_NAMES[self._states[i, j]]
+
+    def snapshot(self):
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or snap.version != self.version:
+                snap = SignalSnapshot(self.symbols, self.timeframes, self.symbol_ids, self.tf_ids,
+                                      self._states.copy(), self._updated.copy(), self.version,
+                                      dict(self._index.bits), self._names)
+                self._snapshot = snap
+            return snap
+
+    def nbytes(self):
+        return self._states.nbytes + self._updated.nbytes
+
+
+def _benchmark(symbol_count=5000, tf_count=8, reads=1200, rounds=20):
+    """
+    Eski defaultdict önbelleği ile matrisin bellek kullanımı, tablo okuması (~1200 get_signal) ve
+    kombinasyon taraması (tüm yeşil TF'ler 'up') süreleri.
+    """
+    import tracemalloc
+    from collections import defaultdict
+    rng = np.random.default_rng(2)
+    symbols = [f"SYM{i:05d}USDT" for i in range(symbol_count)]
+    tfs = ['M5', 'M15', 'H1', 'H4', 'H6', 'D1', 'W1', '1M'][:tf_count]
+    values = rng.choice(['up', 'down', 'neutral'], size=(symbol_count, tf_count)).tolist()
+
+    tracemalloc.start()
+    cache = defaultdict(lambda: defaultdict(lambda: 'neutral'))
+    for s, row in zip(symbols, values):
+        for tf, sig in zip(tfs, row):
+            cache[s][tf] = sig
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    matrix = SignalMatrix(symbols, tfs)
+    for s, row in zip(symbols, values):
+        for tf, sig in zip(tfs, row):
+            matrix.set(s, tf, sig)
+
+    table_syms = symbols[:reads // tf_count]
+    green = tfs[:3]
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        [[cache[s][tf] for tf in tfs] for s in table_syms]
+        [s for s in symbols if all(cache[s][tf] == 'up' for tf in green)]
+    dict_t = (time.perf_counter() - t0) / rounds
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        snap = matrix.snapshot()
+        snap.table(table_syms, tfs)
+        rise = snap.select(snap.all_of(green, 'up'))
+        matrix.set(symbols[0], tfs[0], values[0][0])  # her turda yeni sürüm (kopya maliyeti dahil)
+    matrix_t = (time.perf_counter() - t0) / rounds
+    assert rise == [s for s in symbols if all(cache[s][tf] == 'up' for tf in green)]
+    print(f"{symbol_count} sembol x {tf_count} TF: bellek dict={dict_bytes / 1024:.0f}KB "
+          f"matris={matrix.nbytes() / 1024:.0f}KB (int8 durum {symbol_count * tf_count / 1024:.0f}KB) | "
+          f"tablo({len(table_syms) * tf_count} okuma)+kombinasyon: dict={dict_t * 1000:.2f}ms "
+          f"matris={matrix_t * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,55 @@
+# singleflight.py
+# Aynı anahtar için eşzamanlı çağrıları tek bir çalıştırmada birleştirir (request coalescing).
+# İlk gelen çağıran işi yapar, aynı anda gelen diğerleri onun sonucunu (veya hatasını) bekleyip paylaşır.
+
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    do(key, fn): key için devam eden bir çağrı varsa onun sonucunu bekler, yoksa fn()'i çalıştırır.
+    (sonuç, paylaşıldı_mı) döndürür; fn'in hatası bekleyen herkese iletilir.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {'calls': 0, 'coalesced': 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['calls'] += 1
+            else:
+                self.stats['coalesced'] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,284 @@
+# supertrend_batch.py
+# Bir zaman dilimindeki tüm semboller için tek geçişte, NumPy ile Supertrend.
+# Girdi (sembol x mum) 2-B dizilerdir; döngü sadece mum ekseninde döner, her adım tüm sembolleri birlikte işler.
+# Sonuç signal_calculator.compute_supertrend ile bit düzeyinde aynıdır (aynı işlem sırası korunur).
+
+import time
+
+import numpy as np
+
+UP = 1
+DOWN = -1
+NEUTRAL = 0
+
+_SIGNAL_NAMES = {UP: 'up', DOWN: 'down', NEUTRAL: 'neutral'}
+
+
+def supertrend_batch(highs, lows, closes, atr_period=10, multiplier=3.0, source='hl2'):
+    """
+    (N, L) high/low/close dizilerinden N sembolün Supertrend'ini hesaplar.
+    Dönüş sözlüğü:
+      direction: (N,) int8 — son mumdaki yön (1 yukarı, -1 aşağı, 0 yetersiz veri)
+      trend:     (N, L) int8 — her mumdaki yön (ilk atr_period-1 mum 0)
+      upper, lower: (N, L) float64 — taşınan üst/alt bandlar (ilk atr_period-1 mum NaN)
+      atr:       (N, L) float64 — RMA ATR (ilk atr_period-1 mum NaN)
+      flip_bar:  (N,) int64 — yönün son değiştiği mum indeksi, hiç değişmediyse -1
+    """
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    closes = np.asarray(closes, dtype=np.float64)
+    n, length = closes.shape
+    p = int(atr_period)
+    trend = np.zeros((n, length), dtype=np.int8)
+    upper = np.full((n, length), np.nan)
+    lower = np.full((n, length), np.nan)
+    atr = np.full((n, length), np.nan)
+    out = {'direction': np.zeros(n, dtype=np.int8), 'trend': trend, 'upper': upper, 'lower': lower, 'atr': atr,
+           'flip_bar': np.full(n, -1, dtype=np.int64)}
+    if length < p + 2 or n == 0:
+        return out
+    src = closes if source == 'close' else (highs + lows) / 2.0
+    # True Range
+    tr = highs - lows
+    prev_close = closes[:, :-1]
+    tr[:, 1:] = np.maximum(np.maximum(tr[:, 1:], np.abs(highs[:, 1:] - prev_close)),
+                           np.abs(lows[:, 1:] - prev_close))
+    # RMA ATR: tohum ilk p değerin soldan sağa toplamı (Python sum ile aynı sıra), sonra özyineleme
+    seed = np.zeros(n)
+    for j in range(p):
+        seed = seed + tr[:, j]
+    atr[:, p - 1] = seed / p
+    alpha = 1.0 / p
+    for i in range(p, length):
+        prev = atr[:, i - 1]
+        atr[:, i] = prev + alpha * (tr[:, i] - prev)
+    # Bandlar taşınır: üst band hiç yükselmez, alt band hiç düşmez
+    upper[:, p - 1:] = np.minimum.accumulate(src[:, p - 1:] + multiplier * atr[:, p - 1:], axis=1)
+    lower[:, p - 1:] = np.maximum.accumulate(src[:, p - 1:] - multiplier * atr[:, p - 1:], axis=1)
+    # Trend durumu: mum ekseninde sıralı, sembol ekseninde vektörel
+    state = np.where(closes[:, p - 1] > lower[:, p - 1], UP, DOWN).astype(np.int8)
+    trend[:, p - 1] = state
+    flip_bar = out['flip_bar']
+    for i in range(p, length):
+        c = closes[:, i]
+        to_up = (state == DOWN) & (c > upper[:, i])
+        to_down = (state == UP) & (c < lower[:, i])
+        state = np.where(to_up, UP, np.where(to_down, DOWN, state)).astype(np.int8)
+        flip_bar[to_up | to_down] = i
+        trend[:, i] = state
+    out['direction'] = state.copy()
+    return out
+
+
+def _window_states(highs, lows, closes, p, multiplier, source, steps, first, block, block_elems, carry):
+    """
+    Her mum j için [max(first, j - steps + 1), j] penceresinin son durumu: {'state': (N, L) int8} ve
+    carry=True ise 'atr', 'upper', 'lower' (N, L). Pencerenin ilk mumunda TR sadece high - low.
+    Döngü pencere içindeki adımlar üzerindedir; her adım bir sembol x pencere sonu bloğunu (`block` sütun,
+    toplam ~`block_elems` eleman: önbelleğe sığar) birlikte işler. first: sembolün ilk geçerli mumu;
+    ondan önceki değerler (NaN olabilir) kullanılmaz.
+    """
+    n, length = closes.shape
+    res = {'state': np.zeros((n, length), dtype=np.int8)}
+    names = ('atr', 'upper', 'lower') if carry else ()
+    for name in names:
+        res[name] = np.full((n, length), np.nan)
+    if n == 0 or length == 0:
+        return res
+    src = closes if source == 'close' else (highs + lows) / 2.0
+    hl = highs - lows
+    tr = hl.copy()
+    prev_close = closes[:, :-1]
+    tr[:, 1:] = np.maximum(np.maximum(tr[:, 1:], np.abs(highs[:, 1:] - prev_close)),
+                           np.abs(lows[:, 1:] - prev_close))
+    alpha = 1.0 / p
+    rows = max(1, block_elems // block)
+    # Pencere başları s = 1 .. length - steps; pencere sonu s + steps - 1
+    for r0 in range(0, n, rows):
+        r = slice(r0, min(r0 + rows, n))
+        for b0 in range(1, length - steps + 1, block):
+            b1 = min(b0 + block, length - steps + 1)
+            seed = np.zeros((r.stop - r0, b1 - b0)) + hl[r, b0:b1]
+            for j in range(1, p):
+                seed = seed + tr[r, b0 + j:b1 + j]
+            atr = seed / p
+            k = p - 1
+            upper = src[r, b0 + k:b1 + k] + multiplier * atr
+            lower = src[r, b0 + k:b1 + k] - multiplier * atr
+            state = np.where(closes[r, b0 + k:b1 + k] > lower, UP, DOWN).astype(np.int8)
+            # Ara diziler yeniden kullanılır; işlem sırası supertrend_batch ile aynı (sonuç bit düzeyinde eş)
+            tmp = np.empty_like(atr)
+            band = np.empty_like(atr)
+            flip = np.empty(atr.shape, dtype=bool)
+            below = np.empty(atr.shape, dtype=bool)
+            is_up = np.empty(atr.shape, dtype=bool)
+            for k in range(p, steps):
+                np.subtract(tr[r, b0 + k:b1 + k], atr, out=tmp)
+                tmp *= alpha
+                atr += tmp
+                np.multiply(atr, multiplier, out=tmp)
+                s = src[r, b0 + k:b1 + k]
+                np.add(s, tmp, out=band)
+                np.minimum(upper, band, out=upper)
+                np.subtract(s, tmp, out=band)
+                np.maximum(lower, band, out=lower)
+                # Yukarıdaysa alt band, aşağıdaysa üst band kırılınca yön döner
+                c = closes[r, b0 + k:b1 + k]
+                np.greater(c, upper, out=flip)
+                np.less(c, lower, out=below)
+                np.greater(state, 0, out=is_up)
+                np.copyto(flip, below, where=is_up)
+                np.negative(state, out=state, where=flip)
+            cols = slice(b0 + steps - 1, b1 + steps - 1)
+            res['state'][r, cols] = state
+            if carry:
+                res['atr'][r, cols] = atr
+                res['upper'][r, cols] = upper
+                res['lower'][r, cols] = lower
+    # Baştaki mumlar: pencere ilk geçerli mumdan başlar, yani oradan başlayan tek geçişin durumu
+    span = min(steps, length)
+    cols = first[:, None] + np.arange(span)
+    inside = cols < length
+    at = (np.arange(n)[:, None], np.minimum(cols, length - 1))
+    head = supertrend_batch(highs[at], lows[at], closes[at], p, multiplier, source)
+    rr, cc = np.nonzero(inside)
+    res['state'][rr, cols[rr, cc]] = head['trend'][rr, cc]
+    for name in names:
+        res[name][rr, cols[rr, cc]] = head[name][rr, cc]
+    before = np.arange(length) < first[:, None]
+    res['state'][before] = 0
+    for name in names:
+        res[name][before] = np.nan
+    return res
+
+
+def _first(first, n):
+    return np.zeros(n, dtype=np.int64) if first is None else np.asarray(first, dtype=np.int64)
+
+
+def supertrend_windowed(highs, lows, closes, atr_period=10, multiplier=3.0, source='hl2', window=None,
+                        first=None, block=512, block_elems=25_000):
+    """
+    (N, L) dizilerde her mum için, o mumda biten son `window` mumla hesaplanan yön: (N, L) int8.
+    Canlı hesap (fetch_supertrend_signal) her seferinde son supertrend_limit(atr_period) mumu kullanır ve
+    bandları o pencerenin başından taşır; bu yüzden tüm geçmiş üzerinde tek geçiş aynı sonucu vermez.
+    first: (N,) sembolün ilk geçerli mumu (listelenme; varsayılan 0); pencereden kısa baştaki mumlar
+    oradan başlayan seriyle hesaplanır. Veri yetersizse (atr_period + 2 mumdan az) 0.
+    """
+    from signal_calculator import supertrend_limit
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    closes = np.asarray(closes, dtype=np.float64)
+    n, length = closes.shape
+    p = int(atr_period)
+    first = _first(first, n)
+    w = int(window or supertrend_limit(p))
+    out = _window_states(highs, lows, closes, p, multiplier, source, w, first, block, block_elems, False)['state']
+    out[np.arange(length) < (first + p + 1)[:, None]] = NEUTRAL
+    return out
+
+
+def supertrend_carry(highs, lows, closes, atr_period=10, multiplier=3.0, source='hl2', window=None,
+                     first=None, block=512, block_elems=25_000):
+    """
+    Oluşan (henüz kapanmamış) mumun eklenmesi için: her mum j'de biten son `window` - 1 mumun durumu
+    {'state', 'atr', 'upper', 'lower'} (N, L) (+ 'first', 'close'). supertrend_append ile canlı tablodaki gibi
+    "tamamlanmış mumlar + oluşan mum" penceresinin yönü bulunur.
+    """
+    from signal_calculator import supertrend_limit
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    closes = np.asarray(closes, dtype=np.float64)
+    n = closes.shape[0]
+    p = int(atr_period)
+    w = int(window or supertrend_limit(p))
+    res = _window_states(highs, lows, closes, p, multiplier, source, w - 1, _first(first, n), block,
+                         block_elems, True)
+    res['first'] = _first(first, n)
+    res['close'] = closes
+    return res
+
+
+def supertrend_append(carry, index, highs, lows, closes, atr_period=10, multiplier=3.0, source='hl2'):
+    """
+    carry (supertrend_carry) içindeki `index` (N, M) mumundan sonra gelen (N, M) high/low/close mumunun
+    eklenmesiyle oluşan yön: (N, M) int8. index < 0 veya pencere atr_period + 2 mumdan kısaysa 0.
+    """
+    p = int(atr_period)
+    index = np.asarray(index, dtype=np.int64)
+    rows = np.arange(index.shape[0])[:, None]
+    at = (rows, np.maximum(index, 0))
+    prev_close = carry['close'][at]
+    atr = carry['atr'][at]
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    closes = np.asarray(closes, dtype=np.float64)
+    tr = np.maximum(np.maximum(highs - lows, np.abs(highs - prev_close)), np.abs(lows - prev_close))
+    atr = atr + 1.0 / p * (tr - atr)
+    src = closes if source == 'close' else (highs + lows) / 2.0
+    upper = np.minimum(carry['upper'][at], src + multiplier * atr)
+    lower = np.maximum(carry['lower'][at], src - multiplier * atr)
+    state = carry['state'][at]
+    out = np.where((state == DOWN) & (closes > upper), UP,
+                   np.where((state == UP) & (closes < lower), DOWN, state)).astype(np.int8)
+    out[index < carry['first'][:, None] + p] = NEUTRAL
+    return out
+
+
+def direction_names(direction):
+    """int8 yön dizisini 'up' / 'down' / 'neutral' listesine çevirir."""
+    return [_SIGNAL_NAMES[int(d)] for d in direction]
+
+
+def supertrend_signals_from_store(symbols, interval, store=None, atr_period=10, multiplier=3.0, source='hl2'):
+    """
+    Depodaki mumlardan birden çok sembolün Supertrend yönü: {sembol: 'up'|'down'|'neutral'}.
+    Semboller mum sayısına göre gruplanır (yeni listelenenler daha kısa); her grup tek geçişte hesaplanır.
+    """
+    import resample
+    from kline_store import get_kline_store
+    from signal_calculator import supertrend_limit
+    store = store or get_kline_store()
+    limit = supertrend_limit(atr_period)
+    groups = {}
+    result = {}
+    for symbol in symbols:
+        snap = resample.series(store, symbol, interval, limit)
+        if snap is None or len(snap['close']) < atr_period + 2:
+            result[symbol] = 'neutral'
+            continue
+        groups.setdefault(len(snap['close']), []).append((symbol, snap))
+    for items in groups.values():
+        batch = supertrend_batch(np.stack([s['high'] for _sym, s in items]),
+                                 np.stack([s['low'] for _sym, s in items]),
+                                 np.stack([s['close'] for _sym, s in items]),
+                                 atr_period, multiplier, source)
+        for (symbol, _snap), name in zip(items, direction_names(batch['direction'])):
+            result[symbol] = name
+    return result
+
+
+def _benchmark(counts=(150, 1000, 5000), bars=60, repeat=3):
+    """Sembol başına saf Python döngüsü ile toplu NumPy çekirdeğini karşılaştırır."""
+    from signal_calculator import compute_supertrend
+    rng = np.random.default_rng(7)
+    for n in counts:
+        base = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(n, bars)), axis=1))
+        highs = base * (1 + rng.uniform(0, 0.01, size=(n, bars)))
+        lows = base * (1 - rng.uniform(0, 0.01, size=(n, bars)))
+        hl, ll, cl = highs.tolist(), lows.tolist(), base.tolist()
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            loop = [compute_supertrend(hl[k], ll[k], cl[k]) for k in range(n)]
+        loop_t = (time.perf_counter() - t0) / repeat
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            batch = direction_names(supertrend_batch(highs, lows, base)['direction'])
+        batch_t = (time.perf_counter() - t0) / repeat
+        assert batch == loop
+        print(f"{n:>5} sembol x {bars} mum | döngü={loop_t * 1000:8.2f}ms toplu={batch_t * 1000:7.2f}ms "
+              f"hızlanma={loop_t / batch_t:5.1f}x")
+
+
+if __name__ == "__main__":
+    _benchmark()
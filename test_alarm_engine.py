@@ -0,0 +1,65 @@
+import json
+
+from alarm_engine import AlarmEngine
+from config_store import ConfigStore
+
+
+def _engine(tmp_path, state=None, save_delay=60):
+    path = tmp_path / "state.json"
+    if state is not None:
+        path.write_text(json.dumps(state), encoding="utf-8")
+    store = ConfigStore()
+    store.register('user_state', str(path), {})
+    return AlarmEngine(store, save_delay=save_delay), store, path
+
+
+def test_index_and_trigger_lock(tmp_path):
+    alarms = [
+        {"id": "a", "symbol": "BTCUSDT", "direction": "UP", "tf": "H1", "enabled": True},
+        {"id": "b", "symbol": "BTCUSDT", "direction": "DOWN", "tf": "H1", "enabled": True},
+        {"id": "c", "symbol": "ETHUSDT", "direction": "UP", "tf": "H1", "enabled": False},
+    ]
+    engine, _store, _path = _engine(tmp_path, {"balance": 5.0, "alarms": alarms})
+    assert engine.symbols() == {"BTCUSDT"}
+    assert engine.evaluate("ETHUSDT", "H1", "up") == ([], [])  # kapalı alarm
+    matches, _ = engine.evaluate("BTCUSDT", "H1", "up")
+    assert [a["id"] for a in matches] == ["a"]
+    # Aynı koşul kilit kalkana kadar tekrar tetiklenmez
+    assert engine.evaluate("BTCUSDT", "H1", "up") == ([], [])
+    # Ters yöne dönüş: DOWN tetiklenir, UP kilidi kalkar
+    matches, cleared = engine.evaluate("BTCUSDT", "H1", "down")
+    assert [a["id"] for a in matches] == ["b"] and [a["id"] for a in cleared] == ["a"]
+    _, cleared = engine.evaluate("BTCUSDT", "H1", "neutral")
+    assert [a["id"] for a in cleared] == ["b"]
+    assert [a["id"] for a in engine.evaluate("BTCUSDT", "H1", "up")[0]] == ["a"]
+
+
+def test_debounced_atomic_save_keeps_other_keys(tmp_path):
+    engine, store, path = _engine(tmp_path, {"balance": 5.0, "selected_timeframes": ["H1"]})
+    first = engine.add("BTCUSDT", "UP", "H1")
+    engine.add("ETHUSDT", "DOWN", "M5")
+    engine.toggle(first["id"])
+    assert engine.remove(fallback={"symbol": "ETHUSDT", "direction": "DOWN", "tf": "M5"})
+    # Değişiklikler bellekte; disk henüz yazılmadı (gecikmeli tek yazma)
+    assert store.stats['writes'] == 0
+    assert engine.flush()
+    assert store.stats['writes'] == 1
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["balance"] == 5.0 and saved["selected_timeframes"] == ["H1"]
+    assert [(a["symbol"], a["enabled"]) for a in saved["alarms"]] == [("BTCUSDT", False)]
+    assert not (tmp_path / "state.json.tmp").exists()
+    # Alarmsız bir durum yazması bellekteki alarmları silmez; dış düzenleme yeniden yüklenir
+    store.set('user_state', {"balance": 7.0})
+    assert len(engine) == 1
+    path.write_text(json.dumps({"alarms": []}), encoding="utf-8")
+    store.poll()
+    assert len(engine) == 0
+
+
+def test_background_save_coalesces(tmp_path):
+    engine, store, path = _engine(tmp_path, {}, save_delay=0.05)
+    for i in range(20):
+        engine.add(f"SYM{i}USDT", "UP", "H1")
+    engine._timer.join(2)
+    assert store.stats['writes'] == 1
+    assert len(json.loads(path.read_text(encoding="utf-8"))["alarms"]) == 20
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import socket
+
+import pytest
+
+from async_fetcher import AsyncHTTPPool, AsyncKlineFetcher
+from binance_stub import BinanceStub
+from kline_store import KlineStore
+from rate_limiter import WeightRateLimiter
+
+PARAMS = {'symbol': 'BTCUSDT', 'interval': '1h', 'limit': 300}
+
+
+@pytest.mark.parametrize("mode, opened", [(None, 1), ("chunked", 1), ("gzip", 1), ("close", 2), ("eof", 2)])
+def test_pool_reads_every_body_shape(mode, opened):
+    async def go(url):
+        pool = AsyncHTTPPool(url)
+        bodies = []
+        for _ in range(2):
+            status, headers, body = await pool.get('/fapi/v1/klines', PARAMS, timeout=5)
+            assert status == 200 and 'X-MBX-USED-WEIGHT-1m' in headers
+            bodies.append(json.loads(body))
+        await pool.close()
+        return bodies, pool.stats
+
+    with BinanceStub(["BTCUSDT"]) as stub:
+        stub.response_mode = mode
+        bodies, stats = asyncio.run(go(stub.rest_url))
+    assert [len(b) for b in bodies] == [300, 300] and bodies[0][-1][0] <= bodies[1][-1][0]
+    # Keep-alive yanıtlarında bağlantı yeniden kullanılır; close / uzunluksuz gövdede kapatılır
+    assert stats['opened'] == opened and stats['reused'] == 2 - opened
+    assert stats['requests'] == 2 and stats['errors'] == 0
+
+
+def test_pool_timeout_drops_connection():
+    async def go(stub):
+        pool = AsyncHTTPPool(stub.rest_url)
+        stub.latency = 0.3
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.get('/fapi/v1/time', timeout=0.05)
+        stub.latency = 0
+        status, _headers, body = await pool.get('/fapi/v1/time', timeout=5)
+        await pool.close()
+        return status, json.loads(body), pool.stats
+
+    with BinanceStub(["BTCUSDT"]) as stub:
+        status, body, stats = asyncio.run(go(stub))
+    assert status == 200 and 'serverTime' in body
+    # Zaman aşımına uğrayan bağlantının durumu belirsizdir: yeniden kullanılmaz
+    assert stats == {'opened': 2, 'reused': 0, 'requests': 1, 'errors': 1}
+
+
+def _fetcher(url, **kwargs):
+    store = KlineStore(fresh_ttl_ms={}, base_url=url)
+    return AsyncKlineFetcher(store, limiter=WeightRateLimiter(limit_per_minute=10 ** 9), **kwargs)
+
+
+def test_run_pass_reports_failed_and_timed_out_requests():
+    results = []
+
+    def on_result(symbol, interval, ok):
+        results.append((symbol, interval, ok))
+
+    async def go(fetcher, pairs):
+        try:
+            return await fetcher.run_pass(pairs, 60, on_result)
+        finally:
+            await fetcher.close()
+
+    with BinanceStub(["BTCUSDT"]) as stub:
+        fetcher = _fetcher(stub.rest_url)
+        assert asyncio.run(go(fetcher, [("BTCUSDT", "1h"), ("BTCUSDT", "2h")])) == 1
+        assert sorted(results) == [("BTCUSDT", "1h", True), ("BTCUSDT", "2h", False)]
+        assert len(fetcher.store.get("BTCUSDT", "1h")) == 60
+
+        results.clear()
+        stub.latency = 0.3
+        fetcher = _fetcher(stub.rest_url, request_timeout=0.05)
+        assert asyncio.run(go(fetcher, [("ETHUSDT", "5m")])) == 0
+        assert results == [("ETHUSDT", "5m", False)]
+        assert fetcher.stats == {'ok': 0, 'failed': 1, 'timeouts': 1}
+
+    # Bağlantı reddedildi (OSError): istek başarısız sayılır, tur devam eder
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    results.clear()
+    fetcher = _fetcher(f"http://127.0.0.1:{port}")
+    assert asyncio.run(go(fetcher, [("BTCUSDT", "1h"), ("ETHUSDT", "1h")])) == 0
+    assert sorted(results) == [("BTCUSDT", "1h", False), ("ETHUSDT", "1h", False)]
+    assert fetcher.stats == {'ok': 0, 'failed': 2, 'timeouts': 0}
@@ -0,0 +1,124 @@
+import zipfile
+
+import numpy as np
+import pytest
+
+import backtest
+from binance_stub import synthetic_klines
+from resample import resample_bars
+from signal_calculator import compute_supertrend, supertrend_limit
+
+H1 = 3_600_000
+T0 = 1_704_067_200_000  # 2024-01-01 UTC (H4/D1 kova başı)
+CODES = {'up': 1, 'down': -1, 'neutral': 0}
+
+
+def _csv(rows, header=False, micros=False):
+    lines = ["open_time,open,high,low,close,volume,close_time"] if header else []
+    for r in rows:
+        t = r[0] * 1000 if micros else r[0]
+        lines.append(",".join([str(t)] + [str(v) for v in r[1:7]]))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_dump_files_load_sorted_and_deduplicated(tmp_path):
+    rows = synthetic_klines("BTCUSDT", "1h", 30, start_ms=T0)
+    with zipfile.ZipFile(tmp_path / "BTCUSDT-1h-2024-01.zip", "w") as zf:
+        zf.writestr("BTCUSDT-1h-2024-01.csv", _csv(rows[:20], header=True))
+    # Sonraki dosya: başlıksız, mikrosaniye zaman damgası, bir mum tekrar
+    (tmp_path / "BTCUSDT-1h-2024-02.csv").write_bytes(_csv(rows[19:][::-1], micros=True))
+    (tmp_path / "BTCUSDT-4h-2024-01.csv").write_bytes(_csv(rows[:5]))
+    save_path = tmp_path / "1h" / "ETHUSDT.npz"
+    files = backtest.find_files(str(tmp_path), "1h")
+    assert list(files) == ["BTCUSDT"] and len(files["BTCUSDT"]) == 2
+    bars = backtest.load_symbol(files["BTCUSDT"])
+    assert bars["open_time"].tolist() == [r[0] for r in rows]
+    assert bars["close"].tolist() == [float(r[4]) for r in rows]
+    backtest.save_npz(str(save_path), bars)
+    files = backtest.find_files(str(tmp_path), "1h", symbols=["ETHUSDT"])
+    assert files == {"ETHUSDT": [str(save_path)]}
+    again = backtest.load_symbol(files["ETHUSDT"])
+    assert all(np.array_equal(again[k], bars[k]) for k in bars)
+
+
+def _panel(symbol_count=3, bars=420, listing=(0, 48, 200), seed=5):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(symbol_count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+        high = close * (1 + rng.uniform(0, 0.01, bars))
+        low = close * (1 - rng.uniform(0, 0.01, bars))
+        s = listing[i]
+        data[f"S{i}USDT"] = {'open_time': T0 + H1 * np.arange(s, bars), 'high': high[s:], 'low': low[s:],
+                             'close': close[s:]}
+    return data, backtest.build_panel(data, '1h')
+
+
+@pytest.mark.parametrize("intrabar", [True, False])
+def test_signals_match_live_calculation(intrabar):
+    data, panel = _panel()
+    w = supertrend_limit(10)
+    got = {'1h': backtest.supertrend_signals(panel, '1h'),
+           '4h': backtest.supertrend_signals(panel, '4h', intrabar=intrabar)}
+    for i, bars in enumerate(data.values()):
+        first = int(panel['first'][i])
+        for t in range(first, panel['close'].shape[1]):
+            upto = {k: v[:t - first + 1] for k, v in bars.items()}
+            expected = compute_supertrend(*(upto[k][-w:].tolist() for k in ('high', 'low', 'close')))
+            assert got['1h'][i, t] == CODES[expected]
+            # Canlı tablo: oluşan H4 mumu dahil; intrabar=False: sadece kapanmış H4 mumları
+            h4 = resample_bars(upto, '4h', fields=('high', 'low', 'close'))
+            if not intrabar and (t + 1) % 4:
+                h4 = {k: v[:-1] for k, v in h4.items()}
+            expected = compute_supertrend(*(h4[k][-w:].tolist() for k in ('high', 'low', 'close')))
+            assert got['4h'][i, t] == CODES[expected]
+        assert not got['4h'][i, :first].any()
+
+
+def test_combinations_and_rule_stats():
+    rng = np.random.default_rng(2)
+    signals = {tf: rng.choice(np.array([-1, 0, 1], dtype=np.int8), size=(20, 50)) for tf in ('H1', 'H4', 'D1')}
+    masks = backtest.combination_masks(signals, {'H1': 1, 'H4': 1, 'D1': 2})
+    assert sorted(masks) == ['dip', 'fall', 'rise']  # D1 kırmızı: majör kırmızı
+    assert np.array_equal(masks['rise'], (signals['H1'] == 1) & (signals['H4'] == 1))
+    assert np.array_equal(masks['fall'], signals['D1'] == -1)
+    assert np.array_equal(masks['dip'], (signals['D1'] == -1) & (signals['H1'] == 1))
+    assert sorted(backtest.combination_masks(signals, {'H4': 2, 'D1': 1})) == ['fall', 'rise', 'top']
+    masks = backtest.combination_masks(signals, {'H4': 2, 'H1': 1, 'D1': 0})
+    assert np.array_equal(masks['dip'], (signals['H4'] == -1) & (signals['H1'] == 1))
+
+    close = np.array([[100.0, 110.0, 99.0, 99.0, 121.0, 110.0]])
+    cond = np.array([[True, True, False, True, True, False]])
+    live = np.ones_like(cond)
+    ret = close[:, 1:] / close[:, :-1] - 1
+    stats = backtest._rule_stats(cond, -1, close, live, ret, (1, 2))
+    assert stats['events'] == 2 and stats['count'] == [2, 2]
+    assert stats['sum'] == pytest.approx([-0.1 - 121 / 99 + 1, 0.01 - 110 / 99 + 1])
+    assert stats['hits'] == [0, 1]
+    assert stats['bar_count'].tolist() == [1, 1, 0, 1, 1]
+    row = backtest._summary({'name': 'x', 'side': 'short'}, (1, 2), stats['events'], stats['count'],
+                            stats['sum'], stats['hits'], stats['bar_sum'], stats['bar_count'])
+    assert row['horizons'][2]['hit_rate'] == 0.5
+    equity = np.cumprod(1 + np.array([-0.1, 0.1, 0.0, -22 / 99, 1 / 11]))  # kısa pozisyon getirileri
+    assert row['max_drawdown'] == pytest.approx(1 - equity.min())
+    assert row['total_return'] == pytest.approx(equity[-1] - 1)
+    with pytest.raises(ValueError):
+        backtest.run_backtest(files={}, interval='1h', timeframes=('M15',))
+
+
+def test_single_process_and_pool_agree(tmp_path):
+    files = backtest._synthetic_files(str(tmp_path), 6, 600)
+    combos = [{'H1': 1, 'H4': 2}]
+    single = backtest.run_backtest(str(tmp_path), combos=combos, timeframes=('H1', 'H4'), workers=0)
+    assert single['symbols'] == 6
+    assert [r['rule'] for r in single['rules']][-2:] == ['fall G=H1 R=H4', 'dip G=H1 R=H4']
+    # Supertrend kuralının olayları sinyal matrisinden doğrudan sayılır
+    panel = backtest.build_panel({s: backtest.load_symbol(p) for s, p in files.items()}, '1h')
+    up = backtest.supertrend_signals(panel, '1h') == 1
+    assert single['rules'][0]['events'] == int((up & ~np.pad(up, ((0, 0), (1, 0)))[:, :-1]).sum())
+    pooled = backtest.run_backtest(str(tmp_path), combos=combos, timeframes=('H1', 'H4'), workers=2, shard_size=2)
+    for a, b in zip(single['rules'], pooled['rules']):
+        assert a['events'] == b['events'] and a['horizons'][4]['count'] == b['horizons'][4]['count']
+        assert a['total_return'] == pytest.approx(b['total_return'])
+        assert a['max_drawdown'] == pytest.approx(b['max_drawdown'])
+    assert "isabet@24" in backtest.format_report(single)
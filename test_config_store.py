@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import config_store
+
+from bb_config import changed_timeframes
+from config_store import ConfigStore
+from ws_utils import SignalBackgroundWorker
+
+
+def _store(tmp_path):
+    store = ConfigStore()
+    store.register('bb', str(tmp_path / "bb.json"), {}, indent=2)
+    return store
+
+
+def test_reads_once_and_reloads_external_edits(tmp_path):
+    path = tmp_path / "bb.json"
+    path.write_text(json.dumps({'H1': {'period': 20, 'stddev': 2.0}}), encoding="utf-8")
+    store = _store(tmp_path)
+    events = []
+    store.subscribe('bb', lambda name, old, new: events.append((name, changed_timeframes(old, new))))
+    for _ in range(100):
+        value = store.get('bb')
+        value['H1']['period'] = 99  # kopya: depo etkilenmez
+    assert store.get('bb')['H1']['period'] == 20
+    assert store.stats['reads'] == 1
+    # Değişiklik yoksa yoklama dosyayı okumaz
+    assert store.poll() == []
+    assert store.stats['reads'] == 1
+    path.write_text(json.dumps({'H1': {'period': 20, 'stddev': 2.0}, 'D1': {'period': 50, 'stddev': 2.5}}),
+                    encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert store.poll() == ['bb']
+    assert store.get('bb')['D1'] == {'period': 50, 'stddev': 2.5}
+    assert events == [('bb', ['D1'])]
+
+
+def test_set_writes_file_and_notifies_without_reload(tmp_path):
+    store = _store(tmp_path)
+    events = []
+    store.subscribe('bb', lambda name, old, new: events.append(changed_timeframes(old, new)))
+    assert store.get('bb') == {}
+    store.update('bb', lambda v: {**v, 'H4': {'period': 30, 'stddev': 2.0}})
+    assert json.loads((tmp_path / "bb.json").read_text(encoding="utf-8"))['H4']['period'] == 30
+    assert store.poll() == []
+    assert events == [['H4']]
+    assert store.stats == {'reads': 0, 'writes': 1, 'reloads': 0, 'gets': 1, 'updates': 1}
+
+
+def test_worker_recomputes_only_changed_timeframe():
+    calls = []
+
+    def signal_func(symbol, interval, tf):
+        calls.append((symbol, interval, tf))
+        return 'up'
+    worker = SignalBackgroundWorker(['AUSDT', 'BUSDT'], [('H1', '1h'), ('D1', '1d')], signal_func)
+    worker._executor = ThreadPoolExecutor(max_workers=2)
+    assert worker.recompute_timeframe('D1') == 2
+    worker._executor.shutdown(wait=True)
+    assert sorted(calls) == [('AUSDT', '1d', 'D1'), ('BUSDT', '1d', 'D1')]
+    assert worker.get_signal('AUSDT', 'D1') == 'up'
+    assert worker.get_signal('AUSDT', 'H1') == 'neutral'
+
+
+def _state_store(tmp_path, write_delay=0.05):
+    store = ConfigStore()
+    store.register('state', str(tmp_path / "state.json"), {}, write_delay=write_delay)
+    return store
+
+
+def test_concurrent_writers_coalesce_into_valid_file(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"alarms": [{"id": "a"}]}), encoding="utf-8")
+    store = _state_store(tmp_path)
+    stop = threading.Event()
+    bad = []
+
+    def reader():
+        # Atomik yazma: dosya her an ya eski ya yeni tam belgedir
+        while not stop.is_set():
+            try:
+                json.loads(path.read_text(encoding="utf-8"))
+            except ValueError as e:
+                bad.append(e)
+
+    def writer(k):
+        for i in range(200):
+            store.patch('state', {f"w{k}": i})
+
+    watcher = threading.Thread(target=reader)
+    watcher.start()
+    threads = [threading.Thread(target=writer, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.close()
+    stop.set()
+    watcher.join()
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved == {"alarms": [{"id": "a"}], **{f"w{k}": 199 for k in range(8)}}
+    assert bad == []
+    assert store.stats['updates'] == 1600 and store.stats['writes'] < 100
+
+
+def test_delayed_write_runs_in_background(tmp_path):
+    store = _state_store(tmp_path)
+    t0 = time.perf_counter()
+    for i in range(50):
+        store.patch('state', {"balance": i})
+    assert store.stats['writes'] == 0 and store.pending() == ['state']
+    deadline = time.monotonic() + 5
+    while store.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.pending() == [] and store.stats['writes'] == 1
+    assert json.loads((tmp_path / "state.json").read_text(encoding="utf-8")) == {"balance": 49}
+    assert time.perf_counter() - t0 < 5
+
+
+def test_crash_mid_write_keeps_previous_file(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"balance": 1.0, "alarms": [{"id": "a"}]}), encoding="utf-8")
+    store = _state_store(tmp_path, write_delay=60)
+    store.patch('state', {"balance": 2.0})
+
+    def crash(src, dst):
+        raise OSError("disk gitti")
+    monkeypatch.setattr(config_store.os, "replace", crash)
+    assert store.flush() is False
+    monkeypatch.undo()
+    # Eski dosya bozulmadı, geçici dosya temizlendi, değişiklik bekliyor
+    assert json.loads(path.read_text(encoding="utf-8"))["balance"] == 1.0
+    assert not (tmp_path / "state.json.tmp").exists()
+    assert store.pending() == ['state']
+    assert store.flush() is True
+    assert json.loads(path.read_text(encoding="utf-8")) == {"balance": 2.0, "alarms": [{"id": "a"}]}
+    # Süreç yazma ortasında öldüyse kalan yarım geçici dosya yok sayılır
+    (tmp_path / "state.json.tmp").write_text('{"balance": 3', encoding="utf-8")
+    assert _state_store(tmp_path).get('state')["balance"] == 2.0
+    assert not (tmp_path / "state.json.tmp").exists()
+
+
+def test_failed_background_write_retries_after_delay(tmp_path, monkeypatch):
+    store = _state_store(tmp_path, write_delay=0.05)
+    attempts = []
+
+    def fail(path, text):
+        attempts.append(time.monotonic())
+        raise OSError("salt okunur")
+    monkeypatch.setattr(config_store, "_write_atomic", fail)
+    store.patch('state', {"balance": 1.0})
+    time.sleep(0.5)
+    # Her başarısız yazma write_delay sonra tekrar denenir; sıkı döngü yok
+    assert 2 <= len(attempts) <= 12
+    assert store.pending() == ['state'] and store.stats['writes'] == 0
+    monkeypatch.undo()
+    assert store.close() is True
+    assert json.loads((tmp_path / "state.json").read_text(encoding="utf-8")) == {"balance": 1.0}
+
+
+def test_save_user_state_keeps_alarms(tmp_path, monkeypatch):
+    ui = pytest.importorskip("ui")
+    store = _state_store(tmp_path, write_delay=60)
+    store.register('user_state', str(tmp_path / "user_state.json"), {}, write_delay=60)
+    store.set('user_state', {"balance": 1.0, "alarms": [{"id": "a", "symbol": "BTCUSDT"}]})
+    monkeypatch.setattr(config_store, "get_config_store", lambda: store)
+    ui.save_user_state(5.0, ["H1"], tf_states={"H1": 1})
+    assert store.flush()
+    saved = json.loads((tmp_path / "user_state.json").read_text(encoding="utf-8"))
+    assert saved == {"balance": 5.0, "selected_timeframes": ["H1"], "tf_states": {"H1": 1},
+                     "alarms": [{"id": "a", "symbol": "BTCUSDT"}]}
@@ -0,0 +1,25 @@
+from binance_client import fapi_get
+from binance_stub import BinanceStub
+from http_session import build_session, connection_stats
+from rate_limiter import WeightRateLimiter
+
+
+def test_pooled_session_reuses_connections():
+    session = build_session(pool_size=2)
+    with BinanceStub(["BTCUSDT"]) as stub:
+        for _ in range(10):
+            assert session.get(f"{stub.rest_url}/fapi/v1/time", timeout=5).status_code == 200
+    stats = connection_stats(session)
+    assert stats['requests'] == 10
+    assert stats['connections_opened'] == 1
+    assert stats['reuse_ratio'] == 0.9
+
+
+def test_fapi_get_goes_through_shared_session():
+    limiter = WeightRateLimiter()
+    before = connection_stats()['requests']
+    with BinanceStub(["BTCUSDT"]) as stub:
+        rows = fapi_get('/fapi/v1/klines', {'symbol': 'BTCUSDT', 'interval': '1h', 'limit': 3},
+                        base_url=stub.rest_url, limiter=limiter)
+    assert len(rows) == 3
+    assert connection_stats()['requests'] == before + 1
@@ -0,0 +1,101 @@
+import random
+
+from binance_stub import synthetic_klines
+from incremental import BollingerState, StreamSupertrend, SupertrendState
+from kline_store import KlineStore
+from signal_calculator import compute_bollinger, compute_supertrend_state, supertrend_from_store
+
+HOUR_MS = 3_600_000
+
+
+def _random_ops(rng, count):
+    """Rastgele akış: oluşan mum revizyonları, yeni mumlar ve ara sıra geri almalar."""
+    price = 100.0
+    t = 0
+    ops = []
+    for _ in range(count):
+        r = rng.random()
+        if r < 0.05:
+            ops.append(('rollback',))
+            continue
+        if r < 0.45 or not ops:
+            t += HOUR_MS
+        price *= 1 + rng.gauss(0, 0.01)
+        h = price * (1 + rng.uniform(0, 0.01))
+        lo = price * (1 - rng.uniform(0, 0.01))
+        ops.append(('bar', t, h, lo, price))
+    return ops
+
+
+def _replay(state, ops):
+    """Durumu işletir ve aynı akışın depodaki karşılığını (artan sıralı mumlar) döndürür."""
+    bars = {}
+    for op in ops:
+        if op[0] == 'rollback':
+            if state.rollback():
+                bars.pop(max(bars))
+            continue
+        _, t, h, lo, c = op
+        if state.update(t, h, lo, c) != 'ignored':
+            bars[t] = (h, lo, c)
+    return [bars[t] for t in sorted(bars)]
+
+
+def test_supertrend_state_matches_full_recompute():
+    for seed in range(40):
+        rng = random.Random(seed)
+        ops = _random_ops(rng, rng.randint(5, 400))
+        for window in (None, 60):
+            state = SupertrendState(window=window)
+            bars = _replay(state, ops)
+            if window:
+                bars = bars[-window:]
+            expected = compute_supertrend_state([b[0] for b in bars], [b[1] for b in bars],
+                                                [b[2] for b in bars])
+            assert (state.direction, state.band) == expected, (seed, window)
+
+
+def test_bollinger_state_matches_compute_bollinger():
+    checked = 0
+    for seed in range(40):
+        rng = random.Random(seed)
+        ops = _random_ops(rng, rng.randint(5, 400))
+        state = BollingerState(20, 2.0)
+        closes = {}
+        for op in ops:
+            if op[0] == 'rollback':
+                if state.rollback():
+                    closes.pop(max(closes))
+            elif state.update(op[1], op[4]) != 'ignored':
+                closes[op[1]] = op[4]
+        series = [closes[t] for t in sorted(closes)]
+        bands = state.bands()
+        if bands is not None:
+            # Kayan toplamlar bit düzeyinde aynı olmayabilir; sınırda (eşitliğe çok yakın) durumlar atlanır
+            last = series[-1]
+            if min(abs(last - x) for x in bands) < 1e-9 * abs(last):
+                continue
+            checked += 1
+        assert state.signal == compute_bollinger(series, 20, 2.0), seed
+    assert checked > 20
+
+
+def test_stream_state_matches_store_with_derived_interval():
+    store = KlineStore(fresh_ttl_ms={})
+    end = 1_700_000_000_000
+    rows = synthetic_klines("BTCUSDT", "1h", 400, end_ms=end)
+    store.merge_rows("BTCUSDT", "1h", rows[:300])
+    state = StreamSupertrend('1h', ('4h',), window=60)
+    state.seed(store, "BTCUSDT")
+    rng = random.Random(3)
+    for row in rows[300:]:
+        t, o, h, lo, c = int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4])
+        # Her mum önce birkaç mum içi revizyonla, sonra son değeriyle gelir
+        for _ in range(3):
+            tick = c * (1 + rng.uniform(-0.02, 0.02))
+            hi, low = max(h, tick), min(lo, tick)
+            store.buffer("BTCUSDT", "1h").upsert(t, o, hi, low, tick, 1.0)
+            out = state.update(t, o, hi, low, tick)
+            assert out == {'1h': supertrend_from_store("BTCUSDT", "1h", store=store),
+                           '4h': supertrend_from_store("BTCUSDT", "4h", store=store)}
+    assert state.base.stats['ticks'] > 0 and state.base.stats['rebuilds'] > 0
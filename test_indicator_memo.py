@@ -0,0 +1,47 @@
+from binance_stub import synthetic_klines
+from indicator_memo import IndicatorMemo, get_indicator_memo
+from kline_store import KlineStore
+from signal_calculator import supertrend_from_store
+
+
+def test_lru_evicts_least_recently_used():
+    memo = IndicatorMemo(max_entries=2)
+    calls = []
+
+    def compute(v):
+        return lambda: calls.append(v) or v
+    memo.get_or_compute('a', '1h', compute(1))
+    memo.get_or_compute('b', '1h', compute(2))
+    assert memo.get_or_compute('a', '1h', compute(99)) == 1
+    memo.get_or_compute('c', '4h', compute(3))
+    assert len(memo) == 2 and memo.evictions == 1
+    # 'b' atıldı, 'a' duruyor
+    assert memo.get_or_compute('b', '1h', compute(4)) == 4
+    assert calls == [1, 2, 3, 4]
+    ratios = memo.hit_ratios()
+    assert ratios['1h'] == {'hits': 1, 'misses': 3, 'ratio': 0.25}
+    assert ratios['4h']['misses'] == 1
+    assert ratios['total'] == {'hits': 1, 'misses': 4, 'ratio': 0.2}
+    assert memo.format_hit_ratios().startswith("1h=%25.0 4h=%0.0 toplam=%20.0")
+
+
+def test_supertrend_reuses_result_until_last_candle_changes():
+    memo = get_indicator_memo()
+    memo.clear()
+    store = KlineStore(fresh_ttl_ms={})
+    rows = synthetic_klines('MEMOUSDT', '1d', 200, end_ms=1_700_000_000_000)
+    store.merge_rows('MEMOUSDT', '1d', rows)
+    first = supertrend_from_store('MEMOUSDT', '1d', store=store)
+    assert supertrend_from_store('MEMOUSDT', '1w', store=store) in ('up', 'down', 'neutral')
+    assert supertrend_from_store('MEMOUSDT', '1d', store=store) == first
+    # Aynı değerlerle gelen güncelleme (değişmeyen son mum) yeniden hesaplatmaz
+    o, h, lo, c, v = (float(x) for x in rows[-1][1:6])
+    store.get('MEMOUSDT', '1d').upsert(rows[-1][0], o, h, lo, c, v)
+    supertrend_from_store('MEMOUSDT', '1w', store=store)
+    assert memo.hit_ratios()['1d']['hits'] == 1
+    assert memo.hit_ratios()['1w'] == {'hits': 1, 'misses': 1, 'ratio': 0.5}
+    # Kapanış değişince yeni anahtar
+    store.get('MEMOUSDT', '1d').upsert(rows[-1][0], o, max(h, c * 3), lo, c * 3, v)
+    assert supertrend_from_store('MEMOUSDT', '1d', store=store) == 'up'
+    assert memo.hit_ratios()['1d'] == {'hits': 1, 'misses': 2, 'ratio': round(1 / 3, 4)}
+    memo.clear()
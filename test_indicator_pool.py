@@ -0,0 +1,69 @@
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from binance_stub import BinanceStub, synthetic_klines
+from indicator_pool import MIN_POOL_ROWS, IndicatorPool
+from kline_store import KlineStore
+from signal_calculator import supertrend_from_store
+from supertrend_batch import supertrend_batch
+from ws_utils import AsyncSignalWorker
+
+
+def test_pool_matches_in_process_kernel():
+    rng = np.random.default_rng(4)
+    n, bars = MIN_POOL_ROWS * 3 + 5, 60
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(n, bars)), axis=1))
+    highs = closes * (1 + rng.uniform(0, 0.01, size=(n, bars)))
+    lows = closes * (1 - rng.uniform(0, 0.01, size=(n, bars)))
+    with IndicatorPool(workers=2) as pool:
+        got = pool.supertrend_directions(highs, lows, closes)
+        assert got.dtype == np.int8
+        assert np.array_equal(got, supertrend_batch(highs, lows, closes)['direction'])
+        # Küçük gruplar süreçlere gönderilmez
+        small = pool.supertrend_directions(highs[:3], lows[:3], closes[:3])
+        assert np.array_equal(small, got[:3])
+        assert pool.stats == {'calls': 1, 'rows': n, 'local_rows': 3}
+
+
+def test_async_worker_flushes_updated_symbols_through_pool():
+    store = KlineStore(fresh_ttl_ms={})
+    symbols = [f"SYM{i:03d}USDT" for i in range(MIN_POOL_ROWS + 6)]
+    for s in symbols:
+        store.merge_rows(s, '1h', synthetic_klines(s, '1h', 400, end_ms=1_700_000_000_000))
+    with IndicatorPool(workers=2) as pool:
+        worker = AsyncSignalWorker(symbols, [('H1', '1h'), ('H4', '4h')], store=store, pool=pool)
+        for s in symbols:
+            worker._on_result(s, '1h', True)
+        worker._flush_pool()
+        assert pool.stats['calls'] == 2
+    for s in symbols:
+        assert worker.get_signal(s, 'H1') == supertrend_from_store(s, '1h', store=store)
+        assert worker.get_signal(s, 'H4') == supertrend_from_store(s, '4h', store=store)
+
+
+class _BrokenPool:
+    calls = 0
+
+    def supertrend_signals_from_store(self, symbols, interval, store=None):
+        self.calls += 1
+        raise BrokenProcessPool("işçi süreç çöktü")
+
+
+def test_async_worker_falls_back_when_pool_fails():
+    symbols = ["BTCUSDT", "ETHUSDT"]
+    pool = _BrokenPool()
+    with BinanceStub(symbols) as stub:
+        worker = AsyncSignalWorker(symbols, [('H1', '1h'), ('H4', '4h')], rest_url=stub.rest_url, pool=pool)
+        worker.start()
+        deadline = time.time() + 10
+        while (worker.passes < 1 or worker.get_signal("ETHUSDT", 'H4') is None) and time.time() < deadline:
+            time.sleep(0.05)
+        # Havuz her çağrıda hata verse de tur döngüsü sürer ve sinyaller süreç içinde hesaplanır
+        assert worker._thread.is_alive() and pool.calls >= 2
+        worker.stop()
+        worker._thread.join(5)
+    for s in symbols:
+        assert worker.get_signal(s, 'H1') == supertrend_from_store(s, '1h', store=worker.store)
+        assert worker.get_signal(s, 'H4') == supertrend_from_store(s, '4h', store=worker.store)
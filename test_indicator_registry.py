@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import signal_engine
+from analiz_panel import analiz_rows
+from binance_stub import synthetic_klines
+from indicator_registry import REGISTRY, IndicatorCache, IndicatorRegistry
+from kline_store import KlineStore
+from signal_calculator import compute_bollinger, compute_supertrend_state
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+
+
+def _store():
+    store = KlineStore(fresh_ttl_ms={})
+    for s in SYMBOLS:
+        store.merge_rows(s, '5m', synthetic_klines(s, '5m', 200, end_ms=1_700_000_000_000))
+    return store
+
+
+def test_dependencies_are_declared_and_ordered():
+    assert REGISTRY.dependencies('macd_hist') == ['ema12', 'ema26', 'macd', 'macd_signal', 'macd_hist']
+    assert REGISTRY.dependencies('atr') == ['tr', 'atr']
+    registry = IndicatorRegistry()
+    with pytest.raises(ValueError):
+        registry.register('x', deps=('missing',))
+
+
+def test_intermediates_shared_per_bar_and_invalidated_on_update():
+    store = _store()
+    cache = IndicatorCache(store=store)
+    ctx = cache.context("BTCUSDT", '5m')
+    ctx.get('macd_hist')
+    ctx.get('ema')
+    ctx.get('supertrend')
+    # ema12 bir kez hesaplanır: macd, macd_hist ve 'ema' aynı değeri kullanır
+    assert ctx.computed == len(set(REGISTRY.dependencies('macd_hist') + ['ema']
+                                   + REGISTRY.dependencies('supertrend')))
+    assert cache.context("BTCUSDT", '5m') is ctx and cache.context("BTCUSDT", '15m') is not None
+    last = store.series("BTCUSDT", '5m', 1, ('open_time', 'open', 'high', 'low', 'close'))
+    store.buffer("BTCUSDT", '5m').upsert(int(last['open_time'][0]), last['open'][0], last['high'][0] * 2,
+                                         last['low'][0], last['close'][0] * 1.5, 1.0)
+    fresh = cache.context("BTCUSDT", '5m')
+    assert fresh is not ctx and fresh.get('close')[-1] == last['close'][0] * 1.5
+    assert cache.stats == {'hits': 1, 'misses': 3}
+
+
+def test_values_match_reference_implementations():
+    store = _store()
+    ctx = IndicatorCache(store=store).context("ETHUSDT", '5m')
+    h, lo, c = ctx.get('high').tolist(), ctx.get('low').tolist(), ctx.get('close').tolist()
+    assert ctx.get('supertrend_state') == compute_supertrend_state(h, lo, c)
+    assert ctx.get('bb') == compute_bollinger(c, 20, 2.0)
+    # UI'daki pandas hesabı
+    price = pd.Series(c)
+    delta = price.diff()
+    gain, loss = delta.where(delta > 0, 0), -delta.where(delta < 0, 0)
+    rsi = 100 - 100 / (1 + gain.rolling(14).mean() / (loss.rolling(14).mean() + 1e-9))
+    macd = price.ewm(span=12, adjust=False).mean() - price.ewm(span=26, adjust=False).mean()
+    np.testing.assert_allclose(ctx.get('rsi'), rsi.to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(ctx.get('macd'), macd.to_numpy(), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(ctx.get('macd_signal'), macd.ewm(span=9, adjust=False).mean().to_numpy(),
+                               rtol=1e-9, atol=1e-12)
+    assert 0 <= ctx.last('stoch_k') <= 100 and min(lo) <= ctx.last('vwap') <= max(h)
+
+
+def test_rule_engine_and_panel_read_from_registry():
+    store = _store()
+    cache = IndicatorCache(store=store)
+    rules = [{"name": "ma", "timeframes": ["5m", "15m"], "indicator": "MA", "condition": "up_cross"},
+             {"name": "rsi", "timeframes": ["5m"], "indicator": "RSI", "condition": "over", "value": -1}]
+    data = signal_engine.build_tf_data(SYMBOLS + ["NOPEUSDT"], rules, cache)
+    assert set(data["BTCUSDT"]) == {"5m", "15m"} and data["NOPEUSDT"] == {}
+    assert data["BTCUSDT"]["5m"]["MA"] == cache.context("BTCUSDT", '5m').last('sma20')
+    hits = signal_engine.scan_store(SYMBOLS, rules, cache)
+    assert {h["symbol"] for h in hits if h["rule"] == "rsi"} == set(SYMBOLS)
+    rows = analiz_rows(SYMBOLS, '5m', cache)
+    assert [r["Sembol"] for r in rows] == SYMBOLS
+    assert all(r["Sinyal"] in ("AL", "SAT") and r["Risk"].startswith("%") for r in rows)
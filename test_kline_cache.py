@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+
+from binance_stub import BinanceStub, synthetic_klines
+from kline_cache import KlineCache
+from kline_store import KlineBuffer, KlineStore
+
+
+def test_extend_rows_bulk_appends_and_keeps_capacity():
+    buf = KlineBuffer(capacity=5)
+    buf.upsert(0, 1.0, 1.0, 1.0, 1.0, 1.0)
+    assert buf.extend_rows([(t, 1.0, 2.0, 0.5, float(t), 3.0) for t in range(0, 4)]) == 3
+    assert buf.extend_rows([(t, 1.0, 2.0, 0.5, float(t), 3.0) for t in range(4, 30)]) == 5
+    assert buf.snapshot()['open_time'].tolist() == [25, 26, 27, 28, 29]
+    buf.reserve(8)
+    buf.extend_rows([(30, 1.0, 2.0, 0.5, 30.0, 3.0)])
+    assert buf.snapshot(None, ('close',))['close'].tolist() == [25.0, 26.0, 27.0, 28.0, 29.0, 30.0]
+
+
+def test_warm_start_loads_disk_and_fetches_only_delta(tmp_path):
+    path = str(tmp_path / "klines.sqlite3")
+    with BinanceStub(["BTCUSDT", "ETHUSDT"]) as stub:
+        store = KlineStore(base_url=stub.rest_url)
+        for symbol in ("BTCUSDT", "ETHUSDT"):
+            store.refresh(symbol, "1h", 300)
+            store.refresh(symbol, "5m", 60)
+        cache = KlineCache(path)
+        assert cache.save_store(store) == 2 * (300 + 60)
+        # Değişiklik yoksa sadece (hâlâ oluşan) son mum yeniden yazılır
+        assert cache.save_store(store) == 4
+        cache.close()
+
+        warm = KlineStore(base_url=stub.rest_url)
+        cache = KlineCache(path)
+        assert cache.load_into(warm) == 4
+        assert warm.get("BTCUSDT", "1h").capacity >= 300
+        assert (warm.series("ETHUSDT", "1h", 300)['close'] == store.series("ETHUSDT", "1h", 300)['close']).all()
+        warm.refresh("BTCUSDT", "1h", 300)
+        warm.refresh("ETHUSDT", "5m", 60)
+        assert warm.stats['full_fetches'] == 0 and warm.stats['delta_fetches'] == 2
+        cache.close()
+
+
+def test_stale_cache_refresh_reaches_latest_bar(tmp_path):
+    path = str(tmp_path / "klines.sqlite3")
+    step = 300_000
+    now = int(time.time() * 1000)
+    stale = KlineStore()
+    # Önbellek 10 gün (~2900 mum, tek istek sınırı 1500'ün üstünde) kapalı kalmış
+    stale.merge_rows("BTCUSDT", "5m", synthetic_klines("BTCUSDT", "5m", 200, end_ms=now - 10 * 86_400_000))
+    cache = KlineCache(path)
+    cache.save_store(stale)
+    cache.close()
+    with BinanceStub(["BTCUSDT"]) as stub:
+        warm = KlineStore(base_url=stub.rest_url)
+        cache = KlineCache(path)
+        assert cache.load_into(warm) == 1
+        warm.refresh("BTCUSDT", "5m", 60)
+        cache.close()
+    # Güncel tam geçmiş çekildi: son mum şimdiki mum, arada boşluk yok
+    assert warm.stats['full_fetches'] == 1 and warm.stats['delta_fetches'] == 0
+    t = warm.series("BTCUSDT", "5m", fields=('open_time',))['open_time']
+    assert t[-1] >= now - now % step and (np.diff(t) == step).all() and len(t) >= 60
+
+
+def test_cleared_buffer_replaces_series_on_disk(tmp_path):
+    path = str(tmp_path / "klines.sqlite3")
+    step = 300_000
+    now = int(time.time() * 1000)
+    stale = KlineStore()
+    stale.merge_rows("BTCUSDT", "5m", synthetic_klines("BTCUSDT", "5m", 200, end_ms=now - 10 * 86_400_000))
+    cache = KlineCache(path)
+    cache.save_store(stale)
+    cache.close()
+    with BinanceStub(["BTCUSDT"]) as stub:
+        warm = KlineStore(base_url=stub.rest_url)
+        cache = KlineCache(path)
+        cache.load_into(warm)
+        warm.refresh("BTCUSDT", "5m", 60)  # boşluk: tampon temizlenip güncel geçmiş çekilir
+        cache.save_store(warm)
+        cache.close()
+    again = KlineStore()
+    cache = KlineCache(path)
+    assert cache.load_into(again) == 1
+    t = again.series("BTCUSDT", "5m", fields=('open_time',))['open_time']
+    assert (np.diff(t) == step).all() and t[0] > now - 10 * 86_400_000
+    assert t.tolist() == warm.series("BTCUSDT", "5m", fields=('open_time',))['open_time'].tolist()
+    cache.close()
+
+
+def test_compaction_trims_history_and_enforces_size_cap(tmp_path):
+    path = str(tmp_path / "klines.sqlite3")
+    store = KlineStore(capacity=100)
+    for i in range(40):
+        store.buffer(f"SYM{i}USDT", "1h").extend_rows(
+            [(t * 3_600_000, 1.0, 2.0, 0.5, 1.5, 10.0) for t in range(1000)])
+    cache = KlineCache(path, keep_bars=50)
+    cache.save_store(store)
+    assert cache.compact() == 0
+    count = cache._conn.execute("SELECT COUNT(*) FROM klines").fetchone()[0]
+    assert count == 40 * 50
+
+    cache.max_bytes = cache.size_bytes() // 2
+    assert cache.compact() > 0
+    assert cache.size_bytes() <= cache.max_bytes
+    cache.close()
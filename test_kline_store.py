@@ -0,0 +1,28 @@
+from binance_stub import BinanceStub, synthetic_klines
+from kline_store import KlineBuffer, KlineStore
+
+
+def test_buffer_appends_overwrites_and_keeps_capacity():
+    buf = KlineBuffer(capacity=5)
+    for t in range(20):
+        assert buf.upsert(t, 1.0, 2.0, 0.5, float(t), 10.0) == 'append'
+    assert buf.upsert(19, 1.0, 2.0, 0.5, 99.0, 10.0) == 'update'
+    assert buf.upsert(3, 1.0, 2.0, 0.5, 1.0, 1.0) == 'ignored'
+    snap = buf.snapshot()
+    assert snap['open_time'].tolist() == [15, 16, 17, 18, 19]
+    assert snap['close'].tolist() == [15.0, 16.0, 17.0, 18.0, 99.0]
+    assert buf.snapshot(2, ('close',))['close'].tolist() == [18.0, 99.0]
+
+
+def test_refresh_uses_delta_request_after_first_fill():
+    with BinanceStub(["BTCUSDT"]) as stub:
+        store = KlineStore(base_url=stub.rest_url, fresh_ttl_ms={})
+        buf = store.refresh("BTCUSDT", "1h", 60)
+        assert len(buf) == 60
+        store.refresh("BTCUSDT", "1h", 60)
+        store.refresh("BTCUSDT", "1h", 21)
+        assert store.stats == {'full_fetches': 1, 'delta_fetches': 2, 'appended': 60,
+                               'hits': 0, 'misses': 3, 'coalesced': 0}
+        expected = synthetic_klines("BTCUSDT", "1h", 60)
+        closes = buf.snapshot(60, ('close',))['close'].tolist()
+        assert closes == [float(r[4]) for r in expected]
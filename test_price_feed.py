@@ -0,0 +1,70 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from binance_stub import BinanceStub
+from price_feed import PriceFeed
+
+
+def _wait_for(cond, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_feed_tracks_symbols_and_drains_only_changed_rows():
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    with BinanceStub(symbols) as stub:
+        feed = PriceFeed(symbols[:2], ws_url=stub.ws_url)
+        feed.start()
+        try:
+            assert _wait_for(lambda: stub.subscribed_streams() == {"!ticker@arr"})
+            stub.push_tickers(prices={"BTCUSDT": 100.0, "ETHUSDT": 10.0}, extra_symbols=600)
+            assert _wait_for(feed.is_live)
+            changes = feed.drain_changes()
+            assert set(changes) == {"BTCUSDT", "ETHUSDT"}
+            assert changes["BTCUSDT"][0] == 100.0
+            assert feed.stats['rows_seen'] == 603
+
+            # Aynı değerler tekrar gelirse UI'ya satır gitmez; sadece değişen satır döner
+            stub.push_tickers(prices={"BTCUSDT": 100.0, "ETHUSDT": 10.0})
+            stub.push_tickers(prices={"BTCUSDT": 100.0, "ETHUSDT": 11.0})
+            assert _wait_for(lambda: feed.stats['messages'] == 3)
+            assert list(feed.drain_changes()) == ["ETHUSDT"]
+            assert feed.drain_changes() == {}
+        finally:
+            feed.stop()
+
+
+def test_mini_ticker_change_is_computed_from_open():
+    feed = PriceFeed(["BTCUSDT"])
+    assert feed.apply_tickers([{"s": "BTCUSDT", "c": "110", "o": "100", "q": "5", "E": 1},
+                               {"s": "XRPUSDT", "c": "1", "o": "1", "q": "1", "E": 1}]) == 1
+    price, change, quote_volume = feed.get("BTCUSDT")
+    assert (price, round(change, 6), quote_volume) == (110.0, 10.0, 5.0)
+    assert feed.get("XRPUSDT") is None
+
+
+def test_rest_fallback_keeps_base_interval_while_feed_is_down(monkeypatch):
+    ui = pytest.importorskip("ui")
+    clock = [0.0]
+    monkeypatch.setattr(ui.time, "monotonic", lambda: clock[0])
+    live = [False]
+    polls, scheduled, applied = [], [], []
+    fake = SimpleNamespace(
+        price_feed=SimpleNamespace(is_live=lambda: live[0], drain_changes=lambda: {"AUSDT": 1}),
+        _update_prices_once=lambda: polls.append(clock[0]),
+        _apply_price_changes=applied.append,
+        after=lambda ms, fn: scheduled.append(ms), _update_prices=None)
+    # 60 sn kopuk akış: saniyede bir kontrol, REST (ağırlık 40) sadece 10 sn'de bir
+    for _ in range(60):
+        ui.CryptoDashboard._update_prices(fake)
+        clock[0] += scheduled[-1] / 1000.0
+    assert polls == [0.0, 10.0, 20.0, 30.0, 40.0, 50.0]
+    live[0] = True
+    ui.CryptoDashboard._update_prices(fake)
+    assert applied == [{"AUSDT": 1}] and len(polls) == 6
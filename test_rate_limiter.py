@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from binance_client import RateLimitExceeded, fapi_get
+from binance_stub import BinanceStub
+from rate_limiter import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, WeightRateLimiter, request_weight
+
+
+def test_endpoint_weights():
+    assert request_weight('/fapi/v1/klines', {'limit': 60}) == 1
+    assert request_weight('/fapi/v1/klines', {'limit': 499}) == 2
+    assert request_weight('/fapi/v1/klines', {'limit': 1500}) == 10
+    assert request_weight('/fapi/v1/ticker/24hr') == 40
+    assert request_weight('/fapi/v1/ticker/24hr', {'symbol': 'BTCUSDT'}) == 1
+    assert request_weight('/fapi/v1/exchangeInfo') == 1
+
+
+def test_high_priority_passes_when_near_limit():
+    limiter = WeightRateLimiter(limit_per_minute=100, reserve_ratio=0.2)
+    assert limiter.acquire(75, PRIORITY_NORMAL, timeout=0)
+    # 25 kaldı: normal öncelik 20'lik rezerve dokunamaz, düşük öncelik 40'a
+    assert not limiter.acquire(10, PRIORITY_NORMAL, timeout=0)
+    assert not limiter.acquire(1, PRIORITY_LOW, timeout=0)
+    assert limiter.acquire(10, PRIORITY_HIGH, timeout=0)
+    snap = limiter.snapshot()
+    assert snap['by_priority'] == {'high': 1, 'normal': 1, 'low': 0}
+    assert snap['timeouts'] == 2
+
+
+def test_waiters_are_released_by_refill():
+    limiter = WeightRateLimiter(limit_per_minute=600, reserve_ratio=0.0)  # saniyede 10 ağırlık
+    assert limiter.acquire(600, timeout=0)
+    start = time.monotonic()
+    assert limiter.acquire(3, timeout=2)
+    assert 0.2 <= time.monotonic() - start < 1.0
+    assert limiter.snapshot()['waits'] == 1
+
+
+def test_headers_sync_and_injected_limits_against_stub():
+    limiter = WeightRateLimiter(limit_per_minute=2400)
+    with BinanceStub(["BTCUSDT"]) as stub:
+        stub.used_weight = 2000
+        stub._weight_minute = int(time.time() // 60)
+        fapi_get('/fapi/v1/time', base_url=stub.rest_url, limiter=limiter)
+        snap = limiter.snapshot()
+        assert snap['header_syncs'] == 1
+        assert snap['last_used_weight'] >= 2001
+        assert snap['available'] < 401
+
+        stub.inject_status(429, retry_after=1)
+        with pytest.raises(RateLimitExceeded):
+            fapi_get('/fapi/v1/time', base_url=stub.rest_url, limiter=limiter)
+        assert limiter.snapshot()['throttled_429'] == 1
+        assert limiter.blocked_for() > 0.5
+        # Retry-After süresi bitmeden istek atılmaz
+        with pytest.raises(RateLimitExceeded):
+            fapi_get('/fapi/v1/time', base_url=stub.rest_url, limiter=limiter, max_wait=0.1)
+        assert stub.request_counts['/fapi/v1/time'] == 2
+
+        stub.inject_status(418, retry_after=1)
+        with pytest.raises(RateLimitExceeded):
+            fapi_get('/fapi/v1/time', base_url=stub.rest_url, limiter=limiter, priority=PRIORITY_HIGH)
+        assert limiter.snapshot()['banned_418'] == 1
+
+
+def test_concurrent_callers_never_exceed_stub_limit():
+    limiter = WeightRateLimiter(limit_per_minute=60, reserve_ratio=0.0)
+    with BinanceStub(["BTCUSDT"]) as stub:
+        stub.weight_limit = 60
+        stub._weight_minute = int(time.time() // 60)
+        errors = []
+
+        def call():
+            try:
+                fapi_get('/fapi/v1/klines', {'symbol': 'BTCUSDT', 'interval': '1h', 'limit': 5},
+                         base_url=stub.rest_url, limiter=limiter, max_wait=0)
+            except RateLimitExceeded as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(80)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert limiter.snapshot()['throttled_429'] == 0
+        assert stub.request_counts['/fapi/v1/klines'] <= 60
+        assert len(errors) >= 20
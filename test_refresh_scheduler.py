@@ -0,0 +1,56 @@
+import time
+
+from binance_stub import BinanceStub
+from kline_store import KlineStore
+from refresh_scheduler import CLOSE_GRACE_MS, INTRABAR_MIN_SECONDS, RefreshScheduler, ServerClock
+
+HOUR_MS = 3_600_000
+
+
+def _scheduler(policy, clock, distance=None, **kw):
+    store = KlineStore()
+    store.buffer("BTCUSDT", "1h").upsert(10 * HOUR_MS, 1.0, 1.0, 1.0, 1.0, 1.0)
+    return RefreshScheduler(policy, now_ms=lambda: clock['now'], store=store,
+                            distance_func=lambda *_a, **_k: distance, **kw)
+
+
+def test_heap_pops_in_order_and_keeps_latest_schedule():
+    clock = {'now': 0}
+    sched = _scheduler("closed", clock)
+    sched.schedule("A", "1h", 300)
+    sched.schedule("B", "1h", 100)
+    sched.schedule("A", "1h", 200)
+    clock['now'] = 250
+    assert sched.pop_due() == [("B", "1h"), ("A", "1h")]
+    assert sched.pop_due() == [] and len(sched) == 0
+    assert sched.requests_per_hour() == {'1h': 2, 'total': 2}
+
+
+def test_policies_use_candle_close_and_band_distance():
+    close_at = 11 * HOUR_MS + CLOSE_GRACE_MS
+    clock = {'now': 10 * HOUR_MS + 60_000}
+
+    assert _scheduler("closed", clock).next_refresh_ms("BTCUSDT", "1h") == close_at
+    # Banda çok yakın: en kısa mum içi aralık
+    near = _scheduler("adaptive", clock, distance=0.001)
+    assert near.next_refresh_ms("BTCUSDT", "1h") == clock['now'] + INTRABAR_MIN_SECONDS['1h'] * 1000
+    # Banda uzak: seyrek, ama kapanıştan sonraya kaymaz
+    far = _scheduler("adaptive", clock, distance=0.5)
+    assert clock['now'] + 60_000 < far.next_refresh_ms("BTCUSDT", "1h") <= close_at
+    clock['now'] = close_at - 5_000
+    assert far.next_refresh_ms("BTCUSDT", "1h") == close_at
+
+    fixed = _scheduler("fixed", clock, fixed_intervals={'1h': 10})
+    assert fixed.next_refresh_ms("BTCUSDT", "1h") == clock['now'] + 10_000
+    assert fixed.fixed_requests_per_hour([("A", "1h"), ("B", "1h")]) == {'1h': 720, 'total': 720}
+
+
+def test_server_clock_syncs_offset_from_time_endpoint():
+    with BinanceStub(["BTCUSDT"]) as stub:
+        skewed = ServerClock(base_url=stub.rest_url, wall=lambda: 1_000.0)
+        assert skewed.sync()
+        # Yerel saat 1970'te kalmış olsa da sunucu saati doğru hesaplanır
+        assert abs(skewed.now_ms() - time.time() * 1000) < 5_000
+        assert skewed.offset_ms > 10 ** 12
+    broken = ServerClock(base_url="http://127.0.0.1:9")
+    assert not broken.sync() and broken.offset_ms == 0
@@ -0,0 +1,135 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import resample
+from binance_stub import BinanceStub, synthetic_kline
+from kline_store import KlineStore
+from signal_calculator import compute_supertrend, supertrend_from_store
+from ws_utils import KlineStreamWorker
+
+DAY_MS = 86_400_000
+
+
+def _ms(dt):
+    return int(dt.timestamp() * 1000)
+
+
+def _tape(symbol, interval, start, count):
+    """Kayıtlı veri yerine: taklit sunucunun deterministik mumları (Binance satır formatı)."""
+    step = {'5m': 300_000, '1h': 3_600_000}[interval]
+    return [synthetic_kline(symbol, interval, _ms(start) + i * step) for i in range(count)]
+
+
+def _bucket_key(t_ms, interval):
+    dt = datetime.fromtimestamp(t_ms / 1000, tz=timezone.utc)
+    day = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == '1M':
+        return day.replace(day=1)
+    if interval == '1w':
+        return day - timedelta(days=dt.weekday())
+    if interval == '1d':
+        return day
+    if interval.endswith('h'):
+        hours = int(interval[:-1])
+        return day + timedelta(hours=dt.hour - dt.hour % hours)
+    minutes = int(interval[:-1])
+    return dt.replace(minute=dt.minute - dt.minute % minutes, second=0, microsecond=0)
+
+
+def _reference(rows, interval):
+    """Borsanın yaptığı gibi takvimle (datetime) gruplayarak birleştirilmiş mumlar."""
+    groups = {}
+    for r in rows:
+        t = int(r[0])
+        key = _ms(_bucket_key(t, interval))
+        o, h, lo, c, v = (float(x) for x in r[1:6])
+        g = groups.get(key)
+        if g is None:
+            groups[key] = [key, o, h, lo, c, v, t]
+        else:
+            g[2], g[3], g[4], g[5] = max(g[2], h), min(g[3], lo), c, g[5] + v
+    # Başı kayıtta olmayan kova eksiktir
+    return [g[:6] for g in groups.values() if g[6] == g[0]]
+
+
+def _bars(rows):
+    return {
+        'open_time': np.array([int(r[0]) for r in rows], dtype=np.int64),
+        'open': np.array([float(r[1]) for r in rows]),
+        'high': np.array([float(r[2]) for r in rows]),
+        'low': np.array([float(r[3]) for r in rows]),
+        'close': np.array([float(r[4]) for r in rows]),
+        'volume': np.array([float(r[5]) for r in rows]),
+    }
+
+
+def _assert_same(derived, expected):
+    assert derived['open_time'].tolist() == [e[0] for e in expected]
+    for i, name in enumerate(('open', 'high', 'low', 'close'), start=1):
+        assert derived[name].tolist() == [e[i] for e in expected], name
+    assert np.allclose(derived['volume'], [e[5] for e in expected])
+
+
+def test_bucket_alignment_is_utc_calendar():
+    t = [_ms(datetime(2024, 2, 29, 13, 7, tzinfo=timezone.utc)),
+         _ms(datetime(2024, 3, 6, 23, 59, tzinfo=timezone.utc))]
+    assert resample.bucket_open_times(t, '1M').tolist() == [
+        _ms(datetime(2024, 2, 1, tzinfo=timezone.utc)), _ms(datetime(2024, 3, 1, tzinfo=timezone.utc))]
+    # Binance haftası pazartesi 00:00 UTC başlar
+    assert resample.bucket_open_times(t, '1w').tolist() == [
+        _ms(datetime(2024, 2, 26, tzinfo=timezone.utc)), _ms(datetime(2024, 3, 4, tzinfo=timezone.utc))]
+    assert resample.bucket_open_times(t, '6h').tolist() == [
+        _ms(datetime(2024, 2, 29, 12, tzinfo=timezone.utc)), _ms(datetime(2024, 3, 6, 18, tzinfo=timezone.utc))]
+
+
+def test_derived_candles_match_calendar_aggregation():
+    # Ortadan başlayan tampon: ilk (eksik) kovalar atılmalı
+    m5 = _tape("BTCUSDT", '5m', datetime(2024, 1, 1, 0, 10, tzinfo=timezone.utc), 3 * 288)
+    _assert_same(resample.resample_bars(_bars(m5), '15m'), _reference(m5, '15m'))
+
+    h1 = _tape("ETHUSDT", '1h', datetime(2022, 12, 30, 3, tzinfo=timezone.utc), 800 * 24)
+    for target in ('4h', '6h', '1d'):
+        _assert_same(resample.resample_bars(_bars(h1), target), _reference(h1, target))
+
+    # W1 ve 1M, borsanın D1 mumlarından türetilir
+    d1 = _reference(h1, '1d')
+    for target in ('1w', '1M'):
+        expected = _reference(d1, target)
+        assert expected[0][0] != d1[0][0]
+        _assert_same(resample.resample_bars(_bars(d1), target), expected)
+
+
+def test_store_series_and_signal_use_base_interval():
+    fetched, derived = resample.fetch_plan([('M5', '5m'), ('M15', '15m'), ('H1', '1h'), ('H4', '4h'),
+                                            ('H6', '6h'), ('D1', '1d'), ('W1', '1w'), ('1M', '1M')])
+    assert [i for _tf, i in fetched] == ['5m', '1h', '1d']
+    assert derived['1h'] == [('H4', '4h'), ('H6', '6h')]
+
+    h1 = _tape("SOLUSDT", '1h', datetime(2024, 3, 1, 5, tzinfo=timezone.utc), 400)
+    store = KlineStore()
+    store.merge_rows("SOLUSDT", '1h', h1)
+    expected = _reference(h1, '4h')[-60:]
+    snap = resample.series(store, "SOLUSDT", '4h', 60, ('open_time', 'high', 'low', 'close'))
+    assert snap['open_time'].tolist() == [e[0] for e in expected]
+    assert supertrend_from_store("SOLUSDT", '4h', store=store) == compute_supertrend(
+        [e[2] for e in expected], [e[3] for e in expected], [e[4] for e in expected])
+
+
+def test_stream_worker_subscribes_only_base_intervals():
+    symbols = ["BTCUSDT"]
+    pairs = [('M5', '5m'), ('M15', '15m'), ('H1', '1h'), ('H4', '4h')]
+    with BinanceStub(symbols) as stub:
+        worker = KlineStreamWorker(symbols, pairs, ws_url=stub.ws_url, rest_url=stub.rest_url)
+        worker.start()
+        try:
+            deadline = time.time() + 10
+            while worker.stats['backfills'] < 2 and time.time() < deadline:
+                time.sleep(0.02)
+            assert stub.subscribed_streams() == {"btcusdt@kline_5m", "btcusdt@kline_1h"}
+            assert len(worker.store.get("BTCUSDT", '1h')) >= resample.base_bars_needed('4h', 60)
+            assert worker.get_signal("BTCUSDT", "H4") in ("up", "down")
+            assert worker.get_signal("BTCUSDT", "M15") in ("up", "down")
+        finally:
+            worker.stop()
@@ -0,0 +1,67 @@
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from rolling_indicators import RollingIndicators, RollingIndicatorWorker
+from ui import CryptoDashboard
+
+SYMBOLS = [f"SYM{i}USDT" for i in range(6)]
+
+
+def _feed(engine, steps, history_length, seed=1):
+    """Her adımda rastgele bir sembol alt kümesi yeni fiyat alır (ticker akışındaki gibi)."""
+    rng = np.random.default_rng(seed)
+    history = {s: deque(maxlen=history_length) for s in SYMBOLS}
+    price = np.full(len(SYMBOLS), 100.0)
+    for _ in range(steps):
+        idx = np.flatnonzero(rng.random(len(SYMBOLS)) < 0.6)
+        price[idx] *= np.exp(rng.normal(0, 0.01, size=len(idx)))
+        engine.update(idx, price[idx])
+        for i in idx:
+            history[SYMBOLS[i]].append({'price': float(price[i]), 'change': 0.0, 'timestamp': 0})
+    return history
+
+
+def _pandas(history):
+    return {s: CryptoDashboard._compute_indicators(pd.DataFrame(list(h))) for s, h in history.items() if len(h) >= 20}
+
+
+def test_matches_pandas_path_while_history_fills():
+    engine = RollingIndicators(SYMBOLS, history_length=100, resum_every=7)
+    history = _feed(engine, 120, 100)
+    expected = _pandas(history)
+    got = engine.indicators()
+    assert set(got) == set(expected)
+    for s, exp in expected.items():
+        for key in ('rsi', 'macd', 'macd_signal', 'volume'):
+            assert np.isclose(got[s][key], exp[key], rtol=1e-8, atol=1e-10), (s, key)
+
+
+def test_windowed_values_match_after_history_wraps():
+    engine = RollingIndicators(SYMBOLS, history_length=30)
+    history = _feed(engine, 400, 30, seed=2)
+    expected = _pandas(history)
+    got = engine.indicators()
+    assert engine.ready()
+    for s, exp in expected.items():
+        assert np.isclose(got[s]['rsi'], exp['rsi'], rtol=1e-8), s
+        assert np.isclose(got[s]['volume'], exp['volume'], rtol=1e-8), s
+
+
+def test_worker_computes_off_caller_thread():
+    worker = RollingIndicatorWorker(SYMBOLS, history_length=50)
+    worker.start()
+    try:
+        for k in range(25):
+            worker.submit({s: 100.0 + k + i for i, s in enumerate(SYMBOLS)})
+        deadline = time.time() + 5
+        while len(worker.latest) < len(SYMBOLS) and time.time() < deadline:
+            time.sleep(0.01)
+        assert set(worker.latest) == set(SYMBOLS)
+        # Sürekli artan fiyatta kayıp yok: RSI ~100, std 1 adımlık artışların std'si
+        assert worker.latest[SYMBOLS[0]]['rsi'] > 99.9
+        assert np.isclose(worker.latest[SYMBOLS[0]]['volume'], np.std(np.arange(14.0), ddof=1))
+    finally:
+        worker.stop()
@@ -0,0 +1,37 @@
+import numpy as np
+
+from rule_compiler import RuleSet, columns_from_data, compile_rule
+from rules import RULES
+from signal_engine import example_data, scan_signals
+
+EXTRA_RULES = RULES + [
+    {"name": "RSI Oversold", "timeframes": ["5m"], "indicator": "RSI", "condition": "under", "value": 60},
+    {"name": "RSI Default", "timeframes": ["15m"], "indicator": "RSI", "condition": "over"},
+    {"name": "MA Same", "timeframes": ["5m", "15m"], "indicator": "MA", "condition": "down_cross"},
+    {"name": "MA Unknown", "timeframes": ["5m", "15m"], "indicator": "MA", "condition": "touch"},
+    {"name": "MACD", "timeframes": ["5m"], "indicator": "MACD", "condition": "over"},
+]
+
+
+def test_expressions_and_index_sets():
+    assert compile_rule(RULES[0]).expr == "MA[5m] < MA[15m]"
+    assert compile_rule(RULES[2]).expr == "RSI[15m] > 70"
+    ruleset = RuleSet(RULES)
+    symbols, columns = columns_from_data(example_data)
+    hits = {c.name: idx.tolist() for c, idx in ruleset.evaluate(columns, len(symbols))}
+    assert symbols == ["BTCUSDT", "ETHUSDT"]
+    assert hits == {"MA 5-15 Down Cross": [0, 1], "MA 5-15 Up Cross": [], "RSI Overbought": [0]}
+
+
+def test_matches_interpreted_scan_with_missing_data():
+    rng = np.random.default_rng(7)
+    data = {}
+    for i in range(300):
+        data[f"S{i}USDT"] = {tf: {"MA": float(rng.integers(95, 105)), "RSI": float(rng.uniform(0, 100))}
+                             for tf in ("5m", "15m") if rng.random() > 0.1}
+    assert RuleSet(EXTRA_RULES).scan(data) == scan_signals(data, EXTRA_RULES)
+
+
+def test_malformed_rule_is_skipped():
+    ruleset = RuleSet([{"name": "bad", "timeframes": ["5m"], "indicator": "MA", "condition": "up_cross"}] + RULES)
+    assert [c.name for c in ruleset.compiled] == [r["name"] for r in RULES]
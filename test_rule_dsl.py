@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+import signal_engine
+from binance_stub import synthetic_klines
+from indicator_registry import IndicatorCache
+from kline_store import KlineStore
+from rule_compiler import RuleSet, columns_from_data, compile_rule
+from rule_dsl import RuleBook, RuleSyntaxError, interpret, parse
+from rules import RULES
+from signal_engine import example_data
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+
+
+def test_parse_and_type_errors():
+    tree = parse("supertrend[H4]=='up' and rsi[M15] < 30 and close > bb_upper[H1]")
+    assert tree.kind == 'and' and len(tree.args) == 3
+    # TF adı ya da interval; 'MA' eski kural adı (sma20)
+    assert parse("MA[5m] < MA[M15]") == parse("sma20[M5] < ma[15m]")
+    for bad in ("rsi[M15] < 30 <", "rsi[M15] + 'up' > 1", "supertrend[H4] > 1", "rsi[M15]",
+                "supertrend[H4] == 'yukarı'", "foo[H1] > 1", "supertrend_state[H1] > 1", "rsi[H2] > 1", "rsi[M15] < 30 < 40", "not rsi[H1]"):
+        with pytest.raises(RuleSyntaxError):
+            parse(bad)
+
+
+def test_shared_subexpressions_and_matches_interpreter():
+    rules = ["rsi[M15] < 30 and supertrend[H4] == 'up'",
+             "supertrend[H4] == 'up' and rsi[M15] < 30",  # aynı koşul, farklı sıra
+             "rsi[M15] < 30 or close > bb_upper[H1]",
+             "not (close > bb_upper[H1]) and (macd[H1] - macd_signal[H1]) / atr[H1] > -0.5"]
+    book = RuleBook(rules)
+    assert book.rules[0][1] == book.rules[1][1]  # kök yuva paylaşılır
+    assert book.unique_nodes() < book.node_count
+    rng = np.random.default_rng(1)
+    n = 500
+    tf_data = []
+    for i in range(n):
+        d = {'15m': {'rsi': float(rng.uniform(0, 60))},
+             '4h': {'supertrend': str(rng.choice(['up', 'down', 'neutral']))},
+             '1h': {'bb_upper': float(rng.normal(100, 2)), 'macd': float(rng.normal()),
+                    'macd_signal': float(rng.normal()), 'atr': float(rng.choice([0.0, 1.0, 2.0]))},
+             '5m': {'close': float(rng.normal(100, 2))}}
+        if i % 10 == 0:
+            del d['15m']  # eksik veri: NaN / neutral
+        tf_data.append(d)
+    columns = {}
+    for name, tf in book.columns():
+        if name == 'supertrend':
+            columns[(name, tf)] = np.array([{'up': 1, 'down': -1}.get(d[tf][name], 0) for d in tf_data], dtype=np.int8)
+        else:
+            columns[(name, tf)] = np.array([d.get(tf, {}).get(name, np.nan) for d in tf_data])
+    masks = book.masks(columns, n)
+    expected = [[bool(interpret(parse(r), d)) for d in tf_data] for r in rules]
+    assert masks.tolist() == expected
+
+
+def test_legacy_rules_match_rule_compiler():
+    exprs = [{"name": r["name"], "expr": compile_rule(r).expr} for r in RULES]
+    symbols, columns = columns_from_data(example_data)
+    legacy = {c.name: idx.tolist() for c, idx in RuleSet(RULES).evaluate(columns, len(symbols))}
+    renamed = {('sma20' if ind == 'MA' else 'rsi', tf): col for (ind, tf), col in columns.items()}
+    got = {rule["name"]: idx.tolist() for rule, idx in RuleBook(exprs).evaluate(renamed, len(symbols))}
+    assert got == legacy
+
+
+def test_scan_from_store_and_bad_rules_skipped():
+    store = KlineStore(fresh_ttl_ms={})
+    for s in SYMBOLS:
+        store.merge_rows(s, '5m', synthetic_klines(s, '5m', 200, end_ms=1_700_000_000_000))
+    cache = IndicatorCache(store=store)
+    book = RuleBook([{"name": "bad", "expr": "rsi[M5] >"},
+                     {"name": "state", "expr": "supertrend_state[M5] > 1"},
+                     {"name": "any", "expr": "rsi[M5] >= 0 and close > 0"},
+                     {"name": "trend", "expr": "supertrend[M5] == 'up' or supertrend[M5] != 'up'"}])
+    assert [r["name"] for r, _slot in book.rules] == ["any", "trend"]
+    hits = book.scan(SYMBOLS, cache, store)
+    assert sorted((h["symbol"], h["rule"]) for h in hits) == sorted((s, r) for s in SYMBOLS for r in ("any", "trend"))
+    assert signal_engine.scan_expressions(SYMBOLS + ["NOPEUSDT"], [{"name": "x", "expr": "rsi[M5] >= 0"}],
+                                          cache, store) == [
+        {"symbol": s, "rule": "x", "description": ""} for s in SYMBOLS]
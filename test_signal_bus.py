@@ -0,0 +1,103 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import alarm_engine
+from alarm_engine import AlarmEngine
+from analiz_panel import AnalizPanel
+from config_store import ConfigStore
+from signal_bus import SignalBus
+from signal_matrix import SignalMatrix
+from ui import CryptoDashboard
+
+
+def test_transitions_are_coalesced_per_frame():
+    bus = SignalBus()
+    matrix = SignalMatrix(["AUSDT", "BUSDT"], ["H1", "D1"], bus=bus)
+    got, h1_only = [], []
+    bus.subscribe(got.append)
+    bus.subscribe(h1_only.append, timeframes=["H1"])
+    matrix.set("AUSDT", "H1", "up")
+    matrix.set("AUSDT", "H1", "down")
+    matrix.set("AUSDT", "H1", "down")   # değişiklik yok: yayınlanmaz
+    matrix.set("BUSDT", "D1", "up")
+    matrix.set("BUSDT", "D1", "neutral")  # kare içinde geri döndü
+    assert bus.pending() == 2
+    events = bus.drain()
+    assert [(e.symbol, e.tf, e.old, e.new) for e in events] == [("AUSDT", "H1", "neutral", "down")]
+    assert got == [events] and h1_only == [events]
+    assert bus.stats == {'published': 4, 'delivered': 1, 'coalesced': 2, 'batches': 1}
+    assert bus.drain() == [] and len(got) == 1
+
+
+class _SlowBus(SignalBus):
+    def publish(self, *args):
+        time.sleep(0)  # thread değişimine zorla: yazma ile yayın arasındaki pencere açılır
+        super().publish(*args)
+
+
+def test_concurrent_writers_publish_in_write_order():
+    bus = _SlowBus()
+    matrix = SignalMatrix(["AUSDT"], ["H1"], bus=bus)
+    seen = []
+    bus.subscribe(lambda events: seen.extend(events))
+
+    def writer(sigs):
+        for sig in sigs:
+            matrix.set("AUSDT", "H1", sig)
+    threads = [threading.Thread(target=writer, args=(["up", "down"] * 150,)),
+               threading.Thread(target=writer, args=(["down", "neutral", "up"] * 100,))]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        bus.drain()
+    for t in threads:
+        t.join()
+    bus.drain()
+    # Çizilen son durum matristeki durumla aynı; ardışık olaylar birbirine zincirlenir
+    assert seen and seen[-1].new == matrix.get("AUSDT", "H1")
+    assert all(a.new == b.old for a, b in zip(seen, seen[1:]))
+
+
+def test_dashboard_redraws_only_changed_cells():
+    bus = SignalBus()
+    matrix = SignalMatrix(["AUSDT", "BUSDT"], ["M5", "H1"], bus=bus)
+    drawn, combos = [], []
+    fake = SimpleNamespace(
+        _symbol_rows={"AUSDT": 0, "BUSDT": 1}, tf_states={"M5": 1, "H1": 0},
+        _render_signal_cell=lambda *args: drawn.append(args[:5]),
+        _refresh_combinations=lambda: combos.append(1))
+    bus.subscribe(lambda events: CryptoDashboard._on_signal_events(fake, events))
+    bus.subscribe(lambda events: CryptoDashboard._on_combo_signal_events(fake, events))
+    matrix.set("BUSDT", "M5", "up")
+    bus.drain()
+    assert drawn == [(1, 0, "BUSDT", "M5", "up")] and combos == [1]
+    matrix.set("AUSDT", "H1", "down")  # H1 trend filtresi için izlenir
+    bus.drain()
+    # Sütun settings.TIMEFRAMES sırasındandır (M5, M15, H1, ...)
+    assert drawn[-1] == (0, 2, "AUSDT", "H1", "down") and combos == [1, 1]
+
+
+def test_dashboard_evaluates_alarms_from_bus(tmp_path, monkeypatch):
+    store = ConfigStore()
+    store.register('user_state', str(tmp_path / "state.json"), {})
+    engine = AlarmEngine(store, save_delay=60)
+    engine.add("CUSDT", "UP", "H4")  # tabloda olmayan sembol de değerlendirilir
+    monkeypatch.setattr(alarm_engine, "_default_engine", engine)
+    bus = SignalBus()
+    matrix = SignalMatrix(["CUSDT"], ["H4"], bus=bus)
+    notified = []
+    fake = SimpleNamespace(_notify_alarm=lambda *args: notified.append(args))
+    bus.subscribe(lambda events: CryptoDashboard._on_alarm_signal_events(fake, events))
+    for sig in ("up", "down", "up", "neutral", "up"):
+        matrix.set("CUSDT", "H4", sig)
+        bus.drain()
+    # Kilit ters yöne / nötre dönünce kalkar: her yeni 'up' bir kez bildirilir
+    assert notified == [("CUSDT", "H4", "UP")] * 3
+
+
+def test_analiz_panel_ignores_unrelated_symbols():
+    calls = []
+    panel = SimpleNamespace(_shown=(["AUSDT"], "1h", None), update_signals=calls.append)
+    event = SimpleNamespace(symbol="BUSDT")
+    assert AnalizPanel.on_signal_events(panel, [event]) is False and calls == []
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from signal_matrix import SignalMatrix
+from ui import CryptoDashboard
+
+SYMBOLS = ["AUSDT", "BUSDT", "CUSDT", "DUSDT"]
+TFS = ["M5", "H1", "H4", "D1"]
+
+
+def _matrix():
+    m = SignalMatrix(SYMBOLS, TFS)
+    grid = {"AUSDT": ["up", "up", "up", "down"], "BUSDT": ["up", "down", "up", "down"],
+            "CUSDT": ["down", "down", "down", "down"], "DUSDT": ["up", "up", "neutral", "up"]}
+    for s, row in grid.items():
+        for tf, sig in zip(TFS, row):
+            m.set(s, tf, sig)
+    return m, grid
+
+
+def test_versioned_immutable_snapshots():
+    m, _grid = _matrix()
+    snap = m.snapshot()
+    assert m.snapshot() is snap and snap.version == 16
+    with pytest.raises(ValueError):
+        snap.states[0, 0] = 0
+    assert m.set("AUSDT", "M5", "down") is True
+    assert m.set("AUSDT", "M5", "down") is False
+    assert m.set("ZZZUSDT", "M5", "up") is False and m.get("ZZZUSDT", "M5") == "neutral"
+    # Eski kopya değişmez, yeni kopya yeni sürümdür
+    assert snap.get("AUSDT", "M5") == "up"
+    new = m.snapshot()
+    assert new.version == 18 and new.get("AUSDT", "M5") == "down"
+    assert new.updated_at[0, 0] >= snap.updated_at[0, 0] > 0
+    assert snap.states.dtype == np.int8
+
+
+def test_bulk_accessors():
+    m, grid = _matrix()
+    snap = m.snapshot()
+    assert snap.select(snap.all_of(["M5", "H4"], "up")) == ["AUSDT", "BUSDT"]
+    assert snap.select(snap.all_of([], "up")) == []
+    assert snap.select(snap.any_of(["H4", "D1"], "up")) == ["AUSDT", "BUSDT", "DUSDT"]
+    assert snap.table(SYMBOLS + ["NEWUSDT"], TFS + ["1M"]) == \
+        [grid[s] + ["neutral"] for s in SYMBOLS] + [["neutral"] * 5]
+
+
+def test_dashboard_combinations_use_snapshot():
+    m, grid = _matrix()
+    worker = SimpleNamespace(snapshot=m.snapshot, get_signal=m.get)
+    fake = SimpleNamespace(tf_states={"M5": 1, "H1": 1, "H4": 0, "D1": 2}, signal_worker=worker,
+                           coin_symbols=SYMBOLS)
+    rise, fall = CryptoDashboard._evaluate_combinations(fake)
+    assert rise == [s for s in SYMBOLS if grid[s][0] == grid[s][1] == "up"]
+    assert fall == [s for s in SYMBOLS if grid[s][3] == "down"]
+    # Majör kırmızı (D1): any(G up) & any(R down) & H1 up => dip
+    dip, top = CryptoDashboard._evaluate_trend_reversals(fake)
+    assert dip == {"AUSDT"} and top == set()
+
+
+def test_bitsets_follow_signal_changes():
+    import random
+    rng = random.Random(5)
+    symbols = [f"S{i}USDT" for i in range(200)]
+    m = SignalMatrix(symbols, TFS)
+    for _ in range(3000):
+        m.set(rng.choice(symbols), rng.choice(TFS), rng.choice(["up", "down", "neutral"]))
+    snap = m.snapshot()
+    for tfs in (["M5"], ["M5", "H4"], TFS):
+        for sig in ("up", "down"):
+            assert snap.select_bits(snap.all_bits(tfs, sig)) == snap.select(snap.all_of(tfs, sig))
+            assert snap.select_bits(snap.any_bits(tfs, sig)) == snap.select(snap.any_of(tfs, sig))
+    assert snap.all_bits([], "up") == 0 and snap.select_bits(snap.all_bits(["1M"], "up")) == []
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from binance_stub import BinanceStub
+from kline_store import KlineStore, next_open_time
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call_and_error():
+    flight = SingleFlight()
+    calls = []
+    gate = threading.Event()
+
+    def slow():
+        calls.append(1)
+        gate.wait(2)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(results) == [(42, False)] + [(42, True)] * 7
+    assert flight.stats == {'calls': 1, 'coalesced': 7}
+
+    def boom():
+        raise ValueError("x")
+
+    try:
+        flight.do("k", boom)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("hata iletilmedi")
+    assert flight.in_flight() == 0
+
+
+def test_store_refresh_coalesces_and_serves_fresh_buffer():
+    with BinanceStub(["BTCUSDT"], latency=0.2) as stub:
+        store = KlineStore(base_url=stub.rest_url)
+        threads = [threading.Thread(target=store.refresh, args=("BTCUSDT", "1h", 60)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert stub.request_counts.get('/fapi/v1/klines') == 1
+        buf = store.refresh("BTCUSDT", "5m", 30)
+        store.refresh("BTCUSDT", "5m", 30)
+        assert stub.request_counts['/fapi/v1/klines'] == 2
+        stats = store.cache_stats()
+        assert (stats['misses'], stats['coalesced'], stats['hits']) == (2, 3, 1)
+
+        # TTL dolmasa da yeni mum açıldıysa tampon bayattır
+        boundary = next_open_time(buf.last_open_time, "5m")
+        buf.refreshed_at = boundary - 100
+        assert store.fresh_buffer("BTCUSDT", "5m", 30, now_ms=boundary - 1) is buf
+        assert store.fresh_buffer("BTCUSDT", "5m", 30, now_ms=boundary) is None
+        # Daha uzun geçmiş isteyen çağıran taze sayılmaz
+        assert store.fresh_buffer("BTCUSDT", "5m", 100) is None
@@ -0,0 +1,53 @@
+import numpy as np
+
+from binance_stub import synthetic_klines
+from kline_store import KlineStore
+from signal_calculator import compute_supertrend, compute_supertrend_state
+from supertrend_batch import direction_names, supertrend_batch, supertrend_signals_from_store
+
+
+def _series(symbols, interval, bars, end_ms):
+    rows = [synthetic_klines(s, interval, bars, end_ms=end_ms) for s in symbols]
+    pick = lambda k: np.array([[float(r[k]) for r in sym_rows] for sym_rows in rows])
+    return pick(2), pick(3), pick(4)
+
+
+def test_batch_matches_per_symbol_function_exactly():
+    symbols = [f"SYM{i:03d}USDT" for i in range(120)]
+    cases = [_series(symbols, interval, 60, 1_700_000_000_000) for interval in ('5m', '1h', '1d')]
+    # Tam sayı fiyatlar: kapanışın banda eşit olduğu sınır durumları
+    rng = np.random.default_rng(3)
+    closes = np.cumsum(rng.integers(-3, 4, size=(200, 45)), axis=1).astype(float) + 100
+    cases.append((closes + rng.integers(0, 3, size=closes.shape), closes - rng.integers(0, 3, size=closes.shape),
+                  closes))
+    for highs, lows, closes in cases:
+        for source, period, mult in (('hl2', 10, 3.0), ('close', 7, 1.5)):
+            batch = supertrend_batch(highs, lows, closes, period, mult, source)
+            for k in range(len(closes)):
+                h, lo, c = highs[k].tolist(), lows[k].tolist(), closes[k].tolist()
+                direction, band = compute_supertrend_state(h, lo, c, period, mult, source)
+                assert direction_names(batch['direction'][k:k + 1]) == [direction]
+                active = batch['lower'][k, -1] if direction == 'up' else batch['upper'][k, -1]
+                assert active == band
+                # Nedensel hesap: her mumdaki yön, o muma kadarki serinin sonucu ile aynı
+                for i in (period + 1, len(c) // 2, len(c) - 1):
+                    expected = compute_supertrend(h[:i + 1], lo[:i + 1], c[:i + 1], period, mult, source)
+                    assert batch['trend'][k, i] == (1 if expected == 'up' else -1)
+                flips = np.flatnonzero(np.diff(batch['trend'][k, period - 1:])) + period
+                assert batch['flip_bar'][k] == (flips[-1] if len(flips) else -1)
+
+
+def test_short_series_are_neutral_and_store_helper_groups_by_length():
+    out = supertrend_batch(np.ones((3, 8)), np.ones((3, 8)), np.ones((3, 8)))
+    assert direction_names(out['direction']) == ['neutral'] * 3
+
+    store = KlineStore()
+    store.merge_rows("AAAUSDT", '1h', synthetic_klines("AAAUSDT", '1h', 60, end_ms=1_700_000_000_000))
+    store.merge_rows("BBBUSDT", '1h', synthetic_klines("BBBUSDT", '1h', 25, end_ms=1_700_000_000_000))
+    store.merge_rows("CCCUSDT", '1h', synthetic_klines("CCCUSDT", '1h', 5, end_ms=1_700_000_000_000))
+    signals = supertrend_signals_from_store(["AAAUSDT", "BBBUSDT", "CCCUSDT", "DDDUSDT"], '1h', store)
+    for symbol in ("AAAUSDT", "BBBUSDT"):
+        snap = store.series(symbol, '1h', 60)
+        assert signals[symbol] == compute_supertrend(snap['high'].tolist(), snap['low'].tolist(),
+                                                     snap['close'].tolist())
+    assert signals["CCCUSDT"] == signals["DDDUSDT"] == 'neutral'
@@ -0,0 +1,52 @@
+import time
+
+from binance_stub import BinanceStub
+from ws_utils import KlineStreamWorker
+
+
+def _wait_for(cond, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_stream_updates_signal_and_shards():
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    pairs = [('M5', '5m'), ('H1', '1h')]
+    with BinanceStub(symbols) as stub:
+        worker = KlineStreamWorker(symbols, pairs, ws_url=stub.ws_url, rest_url=stub.rest_url,
+                                   streams_per_connection=2)
+        worker.start()
+        try:
+            assert len(worker.shards()) == 3
+            assert _wait_for(lambda: stub.connection_count() == 3)
+            assert _wait_for(lambda: stub.subscribed_streams() == set(worker.stream_names()))
+            assert _wait_for(lambda: worker.stats['backfills'] == 6)
+            assert worker.get_signal("BTCUSDT", "M5") in ("up", "down")
+
+            stub.push_kline("ETHUSDT", "1h", close_price=1e9)
+            assert _wait_for(lambda: worker.get_signal("ETHUSDT", "H1") == "up")
+            stub.push_kline("ETHUSDT", "1h", close_price=1e-9)
+            assert _wait_for(lambda: worker.get_signal("ETHUSDT", "H1") == "down")
+            assert worker.latencies_ms
+        finally:
+            worker.stop()
+
+
+def test_stream_reconnects_and_resubscribes():
+    symbols = ["BTCUSDT"]
+    with BinanceStub(symbols) as stub:
+        worker = KlineStreamWorker(symbols, [('H1', '1h')], ws_url=stub.ws_url, rest_url=stub.rest_url)
+        worker.start()
+        try:
+            assert _wait_for(lambda: stub.subscribed_streams() == {"btcusdt@kline_1h"})
+            stub.drop_connections()
+            assert _wait_for(lambda: worker.stats['reconnects'] >= 1)
+            assert _wait_for(lambda: stub.subscribed_streams() == {"btcusdt@kline_1h"}, timeout=15)
+            stub.push_kline("BTCUSDT", "1h", close_price=1e9)
+            assert _wait_for(lambda: worker.get_signal("BTCUSDT", "H1") == "up")
+        finally:
+            worker.stop()
@@ -1,34 +1,27 @@
-import pandas as pd
 import tkinter as tk
 import time
 import concurrent.futures
 APP_VERSION = "1.0.0"
 import customtkinter as ctk
-from settings import TIMEFRAMES, HEADERS, COLUMN_WIDTHS
-import json
-from collections import deque, defaultdict
+from settings import TIMEFRAMES, HEADERS, COLUMN_WIDTHS, PRICE_FEED_UI_MS, PRICE_REST_INTERVAL_MS, COMBO_PRICE_REFRESH_MS
+from collections import defaultdict
 import os
 import logging
 USER_STATE_PATH = os.path.join(os.path.dirname(__file__), "user_state.json")
 logger = logging.getLogger(__name__)
 
 def load_user_state():
-    try:
-        with open(USER_STATE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError, OSError) as e:
-        print(f"[HATA]: {e}")
-        return {"balance": 1000.0, "selected_timeframes": [tf for tf in TIMEFRAMES]}
+    # Dosya bir kez okunur; sonraki çağrılar config_store'daki bellek kopyasını döndürür
+    from config_store import get_config_store
+    return get_config_store().get('user_state')
 
 def save_user_state(balance, selected_timeframes, tf_states=None):
-    try:
-        payload = {"balance": balance, "selected_timeframes": selected_timeframes}
-        if tf_states is not None:
-            payload["tf_states"] = tf_states
-        with open(USER_STATE_PATH, "w", encoding="utf-8") as f:
-            json.dump(payload, f)
-    except (OSError, TypeError) as e:
-        print(f"[HATA]: {e}")
+    # Sadece bu anahtarlar güncellenir (alarmlar vb. korunur); diske arka planda, birleştirilerek yazılır
+    from config_store import get_config_store
+    payload = {"balance": balance, "selected_timeframes": selected_timeframes}
+    if tf_states is not None:
+        payload["tf_states"] = dict(tf_states)
+    get_config_store().patch('user_state', payload)
 
 def run_app():
     app = CryptoDashboard()
@@ -45,19 +38,14 @@ class CryptoDashboard(ctk.CTk):
         # Pencereyi tam ekran başlat
         self.after(100, self._cb_zoom_fullscreen)
         # --- Kullanıcı ayarlarını yükle ---
-        # FIFO veri depolama: Her coin için fiyat/hacim geçmişi
-        self.coin_history = None
-        self.coin_history = {}  # {'BTCUSDT': deque([...]), ...}
+        # Fiyat geçmişi ve RSI/MACD/std: (sembol x history_length) dizisinde, arka plan thread'inde
+        self.indicator_worker = None
         self.history_length = 100  # Son 100 veri saklanacak
         self.coin_indicators = None
         self.coin_indicators = {}  # {'BTCUSDT': {'rsi':..., 'macd':..., 'volume':...}, ...}
         # TF bazlı yüzde değişim için cache ve thread havuzu
         self._tf_change_cache = {}  # { (symbol, interval): (pct_float, ts_float) }
-        try:
-            import requests as _req
-            self._http_session = _req.Session()
-        except Exception:
-            self._http_session = None
+        # HTTP istekleri http_session'daki paylaşılan havuzdan geçer (bkz. binance_client)
         self._pct_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8)
         # Kombinasyon sıralama durumu: 0=normal, 1=yüzde azalan, 2=yüzde artan
         self._combo_sort_state = {'rise': 0, 'fall': 0}
@@ -512,7 +500,7 @@ class CryptoDashboard(ctk.CTk):
             nxt = (cur + 1) % 3
             self._combo_sort_state[side] = nxt
             # Anında UI yenile
-            self._schedule_combination_refresh()
+            self._refresh_combinations()
             self._update_combo_buttons_ui()
             # Tooltip metnini anında güncelle
             try:
@@ -530,7 +518,7 @@ class CryptoDashboard(ctk.CTk):
             nxt = (cur + 1) % 3
             self._combo_volume_sort_state[side] = nxt
             # Anında UI yenile
-            self._schedule_combination_refresh()
+            self._refresh_combinations()
             self._update_combo_buttons_ui()
             # Tooltip metnini anında güncelle
             try:
@@ -767,9 +755,48 @@ class CryptoDashboard(ctk.CTk):
     def _show_update_popup(latest_version):
         print(f"Yeni sürüm mevcut: {latest_version}")
 
-    @staticmethod
-    def _open_bb_popup(tf_name):
-        print(f"Bollinger ayarları açıldı: {tf_name}")
+    def _open_bb_popup(self, tf_name):
+        """TF'nin BB periyot/sapma ayarını düzenler; kayıt sadece o TF'nin sinyallerini yeniden hesaplatır."""
+        import bb_config
+        current = bb_config.get_tf_bb_setting(tf_name)
+        popup = tk.Toplevel(self)
+        popup.title(f"Bollinger ayarları: {tf_name}")
+        popup.configure(bg="#18206A")
+        popup.resizable(False, False)
+        fields = {}
+        for row, (key, label) in enumerate((('period', "Periyot"), ('stddev', "Standart sapma"))):
+            tk.Label(popup, text=label, bg="#18206A", fg="#FFD700", font=("Arial", 11)).grid(
+                row=row, column=0, padx=10, pady=6, sticky="w")
+            entry = tk.Entry(popup, width=8, font=("Arial", 11))
+            entry.insert(0, str(current.get(key, '')))
+            entry.grid(row=row, column=1, padx=10, pady=6)
+            fields[key] = entry
+
+        def save():
+            try:
+                period = int(fields['period'].get())
+                stddev = float(fields['stddev'].get())
+            except ValueError:
+                print(f"[HATA] Geçersiz BB ayarı: {tf_name}")
+                return
+            if period < 2 or stddev <= 0:
+                print(f"[HATA] Geçersiz BB ayarı: {tf_name}")
+                return
+            bb_config.set_tf_bb_setting(tf_name, period, stddev)
+            popup.destroy()
+
+        btns = tk.Frame(popup, bg="#18206A")
+        btns.grid(row=2, column=0, columnspan=2, pady=(4, 10))
+        tk.Button(btns, text="Kaydet", command=save, bg="#4CAF50", fg="#FFF", width=8).pack(side="left", padx=6)
+        tk.Button(btns, text="Kapat", command=popup.destroy, bg="#444", fg="#FFF", width=8).pack(side="left", padx=6)
+
+    def _on_bb_settings_changed(self, tfs):
+        # config_store izleyici thread'inden çağrılır: Tk'ye dokunmaz, sadece etkilenen TF'leri yeniden hesaplatır
+        recompute = getattr(getattr(self, 'signal_worker', None), 'recompute_timeframe', None)
+        if recompute is None:
+            return
+        for tf in tfs:
+            recompute(tf)
 
     def _create_panel(self):
         # Panel ana çerçevesi artık scrollable_panel olacak!
@@ -873,13 +900,17 @@ class CryptoDashboard(ctk.CTk):
         table_bg = self._table_bg
         table_fg = "#FFD700"
         cell_fg = "#FFF"
-        from ws_utils import SignalBackgroundWorker
+        from ws_utils import SignalBackgroundWorker, KlineStreamWorker, AsyncSignalWorker
         from signal_calculator import fetch_supertrend_signal
+        from settings import SIGNAL_INGESTION, KLINE_CACHE_ENABLED, PRICE_FEED_ENABLED
+        from signal_bus import get_signal_bus
         # Binance API'den en yüksek hacimli 37 coin'i çek
         import requests
+        from binance_client import fapi_get
+        from rate_limiter import PRIORITY_HIGH
         try:
             # --- Binance USDT Futures: Sadece aktif ve fiyatı olan coinler ---
-            exch_info = requests.get('https://fapi.binance.com/fapi/v1/exchangeInfo').json()
+            exch_info = fapi_get('/fapi/v1/exchangeInfo', priority=PRIORITY_HIGH, timeout=10)
             active_symbols = set(
                 s['symbol'] for s in exch_info['symbols']
                 if s['contractType'] == 'PERPETUAL' and s['quoteAsset'] == 'USDT' and s['status'] == 'TRADING'
@@ -893,7 +924,7 @@ class CryptoDashboard(ctk.CTk):
                 }
             except Exception:
                 self._onboard_date = {}
-            ticker_data = requests.get('https://fapi.binance.com/fapi/v1/ticker/24hr').json()
+            ticker_data = fapi_get('/fapi/v1/ticker/24hr', priority=PRIORITY_HIGH, timeout=10)
             filtered_pairs = [
                 item for item in ticker_data
                 if item['symbol'] in active_symbols and float(item.get('lastPrice', 0)) > 0
@@ -1001,21 +1032,53 @@ class CryptoDashboard(ctk.CTk):
         for col_idx in range(total_columns):
             self.panel.grid_columnconfigure(col_idx, weight=1)
         # Sinyal sistemi başlat
+        # Kalıcı mum önbelleği: depo diskten dolar, işçiler sadece eksik mumları çeker
+        if KLINE_CACHE_ENABLED:
+            import sqlite3
+            from kline_cache import get_kline_cache
+            from kline_store import get_kline_store
+            try:
+                kline_cache = get_kline_cache()
+                kline_cache.load_into(get_kline_store())
+                kline_cache.start_autosave(get_kline_store())
+            except sqlite3.Error as e:
+                print(f"[KLINE CACHE HATA] {e}")
         tf_pairs = [(tf, {'M5':'5m','M15':'15m','H1':'1h','H4':'4h','H6':'6h','D1':'1d','W1':'1w','1M':'1M'}[tf]) for tf in TIMEFRAMES]
-        self.signal_worker = SignalBackgroundWorker(self.coin_symbols, tf_pairs, fetch_supertrend_signal)
+        if SIGNAL_INGESTION == "ws":
+            self.signal_worker = KlineStreamWorker(self.coin_symbols, tf_pairs, bus=get_signal_bus())
+        elif SIGNAL_INGESTION == "async":
+            self.signal_worker = AsyncSignalWorker(self.coin_symbols, tf_pairs, bus=get_signal_bus())
+        else:
+            self.signal_worker = SignalBackgroundWorker(self.coin_symbols, tf_pairs, fetch_supertrend_signal,
+                                                        bus=get_signal_bus())
         self.signal_worker.start()
+        # Sinyal değişiklikleri yoklanmaz: işçiler veri yoluna yayınlar, UI her karede toplu alır
+        get_signal_bus().subscribe(self._on_signal_events)
+        get_signal_bus().subscribe(self._on_combo_signal_events)
+        get_signal_bus().subscribe(self._on_alarm_signal_events)
+        import bb_config
+        bb_config.subscribe(self._on_bb_settings_changed)
+        # Fiyat / 24H % / hacim: tüm piyasa ticker akışı (UI thread'i dışında işlenir)
+        self._symbol_rows = {s: i for i, s in enumerate(self.coin_symbols)}
+        from rolling_indicators import RollingIndicatorWorker
+        self.indicator_worker = RollingIndicatorWorker(self.coin_symbols, self.history_length)
+        self.indicator_worker.start()
+        self.price_feed = None
+        if PRICE_FEED_ENABLED:
+            from price_feed import PriceFeed
+            self.price_feed = PriceFeed(self.coin_symbols)
+            self.price_feed.start()
         self._refresh_signals_table()
+        self._pump_signal_bus()
         self._update_prices()
         # Veri birikimi kontrolü başlat
         self._start_history_collection()
         self._schedule_combination_refresh()
+        self.after(60000, self._log_memo_stats)
 
     def _refresh_signals_table(self, force=None):
-        if force is None:
-            force = False
+        # Tam tablo çizimi (açılış ve TF aç/kapa); sonraki değişiklikler sinyal veri yolundan hücre hücre gelir
         self._refresh_signals_table_once()
-        if not force:
-            self.after(10000, self._refresh_signals_table)
 
     def _toggle_row_selection(self, symbol):
         # Tekil seçim:
@@ -1068,88 +1131,150 @@ class CryptoDashboard(ctk.CTk):
             pass
 
     def _update_prices(self):
-        self._update_prices_once()
-        self.after(10000, self._update_prices)
+        # Akış canlıysa sadece değişen satırlar uygulanır; değilse REST ile yoklanır. /ticker/24hr ağırlığı
+        # yüksek (40): akış kopukken de en fazla PRICE_REST_INTERVAL_MS'de bir çekilir, akışın geri gelmesi
+        # ise saniyede bir kontrol edilir
+        feed = getattr(self, 'price_feed', None)
+        if feed is not None and feed.is_live():
+            self._apply_price_changes(feed.drain_changes())
+            self.after(PRICE_FEED_UI_MS, self._update_prices)
+            return
+        now = time.monotonic()
+        if now - getattr(self, '_rest_prices_at', float('-inf')) >= PRICE_REST_INTERVAL_MS / 1000.0:
+            self._rest_prices_at = now
+            self._update_prices_once()
+        self.after(PRICE_REST_INTERVAL_MS if feed is None else 1000, self._update_prices)
+
+    def _apply_price_changes(self, changes):
+        """{sembol: (fiyat, yüzde, quoteVolume, zaman)} değişikliklerini tabloya ve geçmişe işler."""
+        prices = {}
+        for symbol, (price, change, quote_volume, ts) in changes.items():
+            row_idx = self._symbol_rows.get(symbol)
+            if row_idx is None:
+                continue
+            self._volume_map[symbol] = quote_volume
+            prices[symbol] = price
+            self.coin_rows[row_idx][1].configure(text=f"{price:.2f}")
+            color = "#00FF00" if change > 0 else ("#FF4C4C" if change < 0 else "#FFD700")
+            self.coin_rows[row_idx][2].configure(text=f"{change:+.2f}%", text_color=color)
+        # Göstergeler arka planda güncellenir; UI thread'i sadece kuyruğa koyar
+        if self.indicator_worker is not None:
+            self.indicator_worker.submit(prices)
 
     def _refresh_signals_table_once(self):
         import time
-        if not hasattr(self, '_signal_flash_states'):
-            self._signal_flash_states = {}
         now = time.time()
+        # Tek bir sürümlü kopyadan okunur: tablo yarım yazılmış bir güncellemeyi göstermez
+        table = self.signal_worker.snapshot().table(self.coin_symbols, TIMEFRAMES)
         for row_idx, symbol in enumerate(self.coin_symbols):
             for tf_idx, tf_val in enumerate(TIMEFRAMES):
-                label = self.signal_labels[row_idx][tf_idx]
-                key = (symbol, tf_val)
-                if not self.active_timeframes[tf_val]:
-                    label.configure(text="", text_color="#223066")
-                    continue
-                raw_sig = self.signal_worker.get_signal(symbol, tf_val)
-                flash = self._signal_flash_states.get(key)
-                # Neutral yok: önceki geçerli duruma map et, yoksa varsayılan 'down'
-                if raw_sig in ("up", "down"):
-                    display_sig = raw_sig
-                else:
-                    prev = flash['sig'] if isinstance(flash, dict) else None
-                    display_sig = prev if prev in ("up", "down") else "down"
-                try:
-                    self._check_trigger_for(symbol, tf_val, display_sig)
-                except (KeyError, AttributeError, ValueError):
-                    pass
-                if flash is None or flash.get('sig') != display_sig:
-                    # up<->down geçişlerinde flash başlat
-                    if flash is not None and ((flash.get('sig') == 'up' and display_sig == 'down') or (flash.get('sig') == 'down' and display_sig == 'up')):
-                        self._signal_flash_states[key] = {'sig': display_sig, 'ts': now}
-                    else:
-                        self._signal_flash_states[key] = {'sig': display_sig, 'ts': 0}
-                    flash = self._signal_flash_states[key]
-                elapsed = now - flash['ts']
-                if display_sig == "up":
-                    color = "#7FFF00" if 0 < flash['ts'] and elapsed < 15 else "#00611C"
-                else:  # display_sig == 'down'
-                    color = "#FF0000" if 0 < flash['ts'] and elapsed < 15 else "#800000"
-                if 0 < flash['ts'] and elapsed < 15:
-                    label.configure(text="●", text_color=color, font=("Arial", 18, "bold"))
-                else:
-                    label.configure(text="●", text_color=color, font=("Arial", 15, "bold"))
+                self._render_signal_cell(row_idx, tf_idx, symbol, tf_val, table[row_idx][tf_idx], now)
+
+    def _render_signal_cell(self, row_idx, tf_idx, symbol, tf_val, raw_sig, now):
+        """Tek sinyal hücresini çizer (tam tablo ve sinyal veri yolu ortak)."""
+        if not hasattr(self, '_signal_flash_states'):
+            self._signal_flash_states = {}
+        label = self.signal_labels[row_idx][tf_idx]
+        key = (symbol, tf_val)
+        if not self.active_timeframes[tf_val]:
+            label.configure(text="", text_color="#223066")
+            return
+        flash = self._signal_flash_states.get(key)
+        # Neutral yok: önceki geçerli duruma map et, yoksa varsayılan 'down'
+        if raw_sig in ("up", "down"):
+            display_sig = raw_sig
+        else:
+            prev = flash['sig'] if isinstance(flash, dict) else None
+            display_sig = prev if prev in ("up", "down") else "down"
+        if flash is None or flash.get('sig') != display_sig:
+            # up<->down geçişlerinde flash başlat
+            if flash is not None and ((flash.get('sig') == 'up' and display_sig == 'down') or (flash.get('sig') == 'down' and display_sig == 'up')):
+                self._signal_flash_states[key] = {'sig': display_sig, 'ts': now}
+                # Flash süresi bitince hücre bir kez daha çizilir (periyodik tam tablo taraması yok)
+                self.after(15100, lambda: self._render_signal_cell(
+                    row_idx, tf_idx, symbol, tf_val, self.signal_worker.get_signal(symbol, tf_val), time.time()))
+            else:
+                self._signal_flash_states[key] = {'sig': display_sig, 'ts': 0}
+            flash = self._signal_flash_states[key]
+        elapsed = now - flash['ts']
+        if display_sig == "up":
+            color = "#7FFF00" if 0 < flash['ts'] and elapsed < 15 else "#00611C"
+        else:  # display_sig == 'down'
+            color = "#FF0000" if 0 < flash['ts'] and elapsed < 15 else "#800000"
+        if 0 < flash['ts'] and elapsed < 15:
+            label.configure(text="●", text_color=color, font=("Arial", 18, "bold"))
+        else:
+            label.configure(text="●", text_color=color, font=("Arial", 15, "bold"))
+
+    def _pump_signal_bus(self):
+        # UI karesi başına bir kez: işçilerin yayınladığı değişiklikler birleştirilip abonelere iletilir
+        from signal_bus import SIGNAL_BUS_FRAME_MS, get_signal_bus
+        try:
+            get_signal_bus().drain()
+        except Exception as e:
+            print(f"[HATA] Sinyal veri yolu: {e}")
+        self.after(SIGNAL_BUS_FRAME_MS, self._pump_signal_bus)
+
+    def _on_signal_events(self, events):
+        """Sinyal veri yolu abonesi: sadece değişen hücreler çizilir."""
+        now = time.time()
+        tf_index = {tf: i for i, tf in enumerate(TIMEFRAMES)}
+        for event in events:
+            row_idx = self._symbol_rows.get(event.symbol)
+            tf_idx = tf_index.get(event.tf)
+            if row_idx is None or tf_idx is None:
+                continue
+            self._render_signal_cell(row_idx, tf_idx, event.symbol, event.tf, event.new, now)
+
+    def _on_alarm_signal_events(self, events):
+        """Sinyal veri yolu abonesi: değişen hücreler alarm motorunda değerlendirilir (tablo dışı semboller dahil)."""
+        from alarm_engine import get_alarm_engine
+        engine = get_alarm_engine()
+        for event in events:
+            matches, _cleared = engine.evaluate(event.symbol, event.tf, event.new)
+            if matches:
+                self._notify_alarm(event.symbol, event.tf, matches[0].get('direction'))
+
+    def _notify_alarm(self, symbol, tf, direction):
+        """Tetiklenen alarm: yöne göre ses ve kısa süreli bildirim."""
+        from alarm_popup_snapshot import AlarmMixinSnapshot
+        AlarmMixinSnapshot._play_alarm_sound(direction)
+        try:
+            toast = tk.Toplevel(self)
+            toast.overrideredirect(True)
+            toast.configure(bg="#223066")
+            toast.geometry("280x36+50+50")
+            tk.Label(toast, text=f"ALARM: {symbol} {direction} {tf}", bg="#223066", fg="#FFF",
+                     font=("Arial", 10)).pack(fill="both", expand=True, padx=8, pady=6)
+            toast.after(1500, toast.destroy)
+        except tk.TclError as e:
+            print(f"[HATA] Alarm bildirimi gösterilemedi: {e}")
+
+    def _on_combo_signal_events(self, events):
+        """Kombinasyon paneli: sadece seçili (yeşil/kırmızı) TF'lerde ya da H1'de değişiklik varsa yeniden hesaplanır."""
+        watched = {tf for tf, st in self.tf_states.items() if st in (1, 2)} | {'H1'}
+        if any(event.tf in watched for event in events):
+            self._refresh_combinations()
 
     def _update_prices_once(self):
         import requests
-        prices = {}
+        from binance_client import fapi_get
+        from rate_limiter import PRIORITY_HIGH
         changes = {}
         try:
-            url = "https://fapi.binance.com/fapi/v1/ticker/24hr"
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
+            data = fapi_get('/fapi/v1/ticker/24hr', priority=PRIORITY_HIGH, timeout=10)
             for coin in data:
                 symbol = coin['symbol']
-                if symbol in self.coin_symbols:
-                    price = float(coin['lastPrice'])
-                    prices[symbol] = price
-                    changes[symbol] = float(coin['priceChangePercent'])
+                if symbol in self._symbol_rows:
                     try:
-                        self._volume_map[symbol] = float(coin.get('quoteVolume', 0.0))
-                    except Exception:
-                        pass
-                    if symbol not in self.coin_history:
-                        self.coin_history[symbol] = deque(maxlen=self.history_length)
-                    self.coin_history[symbol].append({
-                        'price': price,
-                        'change': changes[symbol],
-                        'timestamp': coin.get('closeTime', None)
-                    })
+                        quote_volume = float(coin.get('quoteVolume', 0.0))
+                    except (TypeError, ValueError):
+                        quote_volume = self._volume_map.get(symbol, 0.0)
+                    changes[symbol] = (float(coin['lastPrice']), float(coin['priceChangePercent']),
+                                       quote_volume, coin.get('closeTime', None))
         except (requests.RequestException, ValueError, KeyError) as e:
             print(f"[Fiyat güncelleme hatası]: {e}")
-        for row_idx, symbol in enumerate(self.coin_symbols):
-            price = prices.get(symbol)
-            price_str = f"{price:.2f}" if price is not None else self.coin_rows[row_idx][1].cget("text")
-            self.coin_rows[row_idx][1].configure(text=price_str)
-            change = changes.get(symbol)
-            change_str = f"{change:+.2f}%" if change is not None else self.coin_rows[row_idx][2].cget("text")
-            if change is not None:
-                color = "#00FF00" if change > 0 else ("#FF4C4C" if change < 0 else "#FFD700")
-            else:
-                color = "#FFD700"
-            self.coin_rows[row_idx][2].configure(text=change_str, text_color=color)
+        self._apply_price_changes(changes)
 
     def _refresh_all_now(self):
         try:
@@ -1169,7 +1294,7 @@ class CryptoDashboard(ctk.CTk):
         except Exception as e:
             print(f"[MANUAL REFRESH ERROR]: {e}")
 
-    def _schedule_combination_refresh(self):
+    def _refresh_combinations(self):
         try:
             rise, fall = self._evaluate_combinations()
             try:
@@ -1178,9 +1303,30 @@ class CryptoDashboard(ctk.CTk):
             except Exception:
                 pass
             self._update_combination_ui(rise, fall)
+            self._update_priority_symbols(rise, fall)
         except Exception as e:
             print(f"[Kombinasyon Hatası]: {e}")
-        self.after(5000, self._schedule_combination_refresh)
+
+    def _schedule_combination_refresh(self):
+        # Sinyal değişiklikleri veri yolundan anında gelir (_on_combo_signal_events); bu döngü sadece
+        # paneldeki fiyat / % / hacim değerlerini tazeler
+        self._refresh_combinations()
+        self.after(COMBO_PRICE_REFRESH_MS, self._schedule_combination_refresh)
+
+    def _update_priority_symbols(self, rise, fall):
+        """Ekranda görünen ve alarmı olan sembolleri rate limiter'da öne al."""
+        from rate_limiter import get_rate_limiter
+        symbols = set(rise) | set(fall) | set(self._selected_rows)
+        # Ana tabloda görünen satırlar (kaydırma konumuna göre)
+        try:
+            first, last = self.canvas.yview()
+            n = len(self.coin_symbols)
+            symbols.update(self.coin_symbols[int(first * n):int(last * n) + 1])
+        except (tk.TclError, AttributeError):
+            pass
+        from alarm_engine import get_alarm_engine
+        symbols.update(get_alarm_engine().symbols())
+        get_rate_limiter().set_priority_symbols(symbols)
 
     def _highest_active_interval(self):
         # Seçili (state>0) TF'ler arasında en yüksek TF'yi bul ve Binance interval döndür
@@ -1200,19 +1346,19 @@ class CryptoDashboard(ctk.CTk):
         entry = self._tf_change_cache.get(key)
         if entry and (now_ts - entry[1] < ttl):
             return entry[0]
-        # İstek yap
+        # Paylaşılan mum deposundan oku (sadece eksik mumlar çekilir)
         try:
-            session = self._http_session
-            if session is None:
-                import requests
-                session = requests
-            url = f"https://fapi.binance.com/fapi/v1/klines?symbol={symbol}&interval={interval}&limit=2"
-            resp = session.get(url, timeout=8)
-            data = resp.json()
-            if not isinstance(data, list) or len(data) < 2:
+            import resample
+            from kline_store import get_kline_store
+            from rate_limiter import PRIORITY_LOW
+            store = get_kline_store()
+            # Türetilen TF'lerde (örn. H4) kaynak mumlar çekilip birleştirilir
+            resample.refresh(store, symbol, interval, 2, priority=PRIORITY_LOW)
+            closes = resample.series(store, symbol, interval, 2, ('close',))['close']
+            if len(closes) < 2:
                 return None
-            prev_close = float(data[-2][4])
-            last_close = float(data[-1][4])
+            prev_close = float(closes[-2])
+            last_close = float(closes[-1])
             if prev_close == 0:
                 return None
             pct = (last_close - prev_close) / prev_close * 100.0
@@ -1255,45 +1401,19 @@ class CryptoDashboard(ctk.CTk):
         for sym in missing:
             self._pct_executor.submit(_task, sym)
         # Yakında taze değerler gelecek, nazikçe yeniden çiz
-        self.after(1200, lambda: self._schedule_combination_refresh())
+        self.after(1200, self._refresh_combinations)
 
     def _evaluate_combinations(self):
         green_tfs = [tf for tf, st in self.tf_states.items() if st == 1]
         red_tfs = [tf for tf, st in self.tf_states.items() if st == 2]
         if not green_tfs and not red_tfs:
             return [], []
-        symbols = getattr(self, 'coin_symbols', [])
-        rise_matches = []
-        fall_matches = []
-        # Yeşil kombinasyon: tüm seçili yeşil TF'lerde "up" olmalı
-        if green_tfs:
-            for symbol in symbols:
-                ok = True
-                for tf in green_tfs:
-                    try:
-                        s = self.signal_worker.get_signal(symbol, tf)
-                    except Exception:
-                        s = None
-                    if s != "up":
-                        ok = False
-                        break
-                if ok:
-                    rise_matches.append(symbol)
-        # Kırmızı kombinasyon: tüm seçili kırmızı TF'lerde "down" olmalı
-        if red_tfs:
-            for symbol in symbols:
-                ok = True
-                for tf in red_tfs:
-                    try:
-                        s = self.signal_worker.get_signal(symbol, tf)
-                    except Exception:
-                        s = None
-                    if s != "down":
-                        ok = False
-                        break
-                if ok:
-                    fall_matches.append(symbol)
-        print(f"[KOMBİNE] rise={len(rise_matches)} fall={len(fall_matches)} | green_tfs={green_tfs} red_tfs={red_tfs}")
+        # (TF, yön) bit kümeleri: yeşil TF'lerin hepsinde "up" / kırmızıların hepsinde "down" birkaç AND
+        snap = self.signal_worker.snapshot()
+        rise_matches = snap.select_bits(snap.all_bits(green_tfs, "up"))
+        fall_matches = snap.select_bits(snap.all_bits(red_tfs, "down"))
+        logger.debug("[KOMBİNE] rise=%d fall=%d | green_tfs=%s red_tfs=%s",
+                     len(rise_matches), len(fall_matches), green_tfs, red_tfs)
         return rise_matches, fall_matches
 
     def _evaluate_trend_reversals(self):
@@ -1303,7 +1423,6 @@ class CryptoDashboard(ctk.CTk):
           * Majör=YEŞİL ve (any(G up) & any(R down)) => zirve adayı (top)
           * Majör=KIRMIZI ve (any(R down) & any(G up)) => dip adayı (dip)
         Not: Sayaç/cooldown yok; ek yük yaratmaz."""
-        symbols = getattr(self, 'coin_symbols', [])
         dip_set, top_set = set(), set()
         green_tfs = [tf for tf, st in self.tf_states.items() if st == 1]
         red_tfs = [tf for tf, st in self.tf_states.items() if st == 2]
@@ -1321,39 +1440,16 @@ class CryptoDashboard(ctk.CTk):
 
         major = 'green' if max_g > max_r else ('red' if max_r > max_g else 'tie')
 
-        for symbol in symbols:
-            # any up/down check; nötr yok sayılır
-            g_up = False
-            for tf in green_tfs:
-                try:
-                    s = self.signal_worker.get_signal(symbol, tf)
-                except Exception:
-                    s = None
-                if s == 'up':
-                    g_up = True
-                    break
-            r_down = False
-            for tf in red_tfs:
-                try:
-                    s = self.signal_worker.get_signal(symbol, tf)
-                except Exception:
-                    s = None
-                if s == 'down':
-                    r_down = True
-                    break
-            # H1 filtresi: major=green için H1=down, major=red için H1=up
-            try:
-                h1_sig = self.signal_worker.get_signal(symbol, 'H1')
-            except Exception:
-                h1_sig = None
-            if major == 'green':
-                if g_up and r_down and h1_sig == 'down':
-                    top_set.add(symbol)
-            elif major == 'red':
-                if r_down and g_up and h1_sig == 'up':
-                    dip_set.add(symbol)
-            else:  # tie: hiçbir taraf belirgin büyük değil; tutucu davran
-                pass
+        # any up/down kontrolü bit kümelerinin OR'u; nötr yok sayılır
+        snap = self.signal_worker.snapshot()
+        g_up = snap.any_bits(green_tfs, 'up')
+        r_down = snap.any_bits(red_tfs, 'down')
+        # H1 filtresi: major=green için H1=down, major=red için H1=up
+        if major == 'green':
+            top_set = set(snap.select_bits(g_up & r_down & snap.all_bits(['H1'], 'down')))
+        elif major == 'red':
+            dip_set = set(snap.select_bits(r_down & g_up & snap.all_bits(['H1'], 'up')))
+        # tie: hiçbir taraf belirgin büyük değil; tutucu davran
         return dip_set, top_set
 
     def _update_combination_ui(self, rise_matches, fall_matches):
@@ -1577,12 +1673,17 @@ class CryptoDashboard(ctk.CTk):
                     items.pop(sym_old, None)
             self._combo_items[side] = items
 
+    def _log_memo_stats(self):
+        # Gösterge memo'sunun TF başına isabet oranları (W1/1M'de yüksek olması beklenir)
+        from indicator_memo import get_indicator_memo
+        logger.info("Gösterge memo isabet oranı: %s", get_indicator_memo().format_hit_ratios())
+        self.after(60000, self._log_memo_stats)
+
     def _start_history_collection(self):
         self.after(5000, self._check_history_ready)
 
     def _check_history_ready(self):
-        ready = all(len(q) >= self.history_length for q in self.coin_history.values() if q)
-        if ready and len(self.coin_history) == len(self.coin_symbols):
+        if self.indicator_worker is not None and self.indicator_worker.engine.ready():
             self._calculate_indicators()
             self._send_chat_message("RSI/MACD/hacim hesaplaması başladı!")
         else:
@@ -1603,14 +1704,13 @@ class CryptoDashboard(ctk.CTk):
             print(f"[SOHBET PANELİ]: Mesaj gönderilemedi. Hata: {e}")
 
     def _calculate_indicators(self):
-        for symbol, history in self.coin_history.items():
-            if len(history) < 20:
-                continue
-            df = pd.DataFrame(list(history))
-            self.coin_indicators[symbol] = self._compute_indicators(df)
+        # Hesap RollingIndicatorWorker thread'inde yapılır; burada sadece son sonuç okunur
+        self.coin_indicators = self.indicator_worker.latest
+        self.after(5000, self._calculate_indicators)
 
     @staticmethod
     def _compute_indicators(df):
+        # pandas referans hesabı (rolling_indicators karşılaştırması ve benchmark'ı için)
         delta = df['price'].diff()
         gain = delta.where(delta > 0, 0)
         loss = -delta.where(delta < 0, 0)
@@ -1,8 +1,17 @@
+import json
+import queue
 import threading
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
-# Her zaman dilimi için güncelleme aralığı (saniye)
+import resample
+from kline_store import INTERVAL_MS, KlineStore, get_kline_store
+from signal_matrix import SignalMatrix
+
+# Her zaman dilimi için sabit güncelleme aralığı (saniye).
+# İşçiler artık refresh_scheduler ile mum kapanışına göre yenilenir; bu tablo "fixed" politikası ve
+# karşılaştırma için duruyor.
 TF_UPDATE_INTERVALS = {
     '1m': 2,
     '3m': 2,
@@ -16,40 +25,479 @@ TF_UPDATE_INTERVALS = {
     '1M': 20,
 }
 
+def _batch_signals(pool, symbols, interval, store):
+    """
+    Supertrend sinyallerini toplu hesaplar: havuz verilmişse işçilerinde, havuz hata verirse
+    (örn. çöken işçi, paylaşılan bellek hatası) o çağrı için süreç içinde supertrend_batch ile.
+    """
+    from supertrend_batch import supertrend_signals_from_store
+    if pool is not None:
+        try:
+            return pool.supertrend_signals_from_store(symbols, interval, store)
+        except Exception as e:
+            print(f"[HATA] Gösterge havuzu ({interval}): {e}; süreç içinde hesaplanıyor")
+    return supertrend_signals_from_store(symbols, interval, store)
+
+
+def _prime_signals(signals, store, symbols, timeframes, compute_func, pool=None):
+    """
+    Depoda (örn. disk önbelleğinden yüklenmiş) mumu olan (sembol, TF)'lerin sinyalini ağ beklemeden hesaplar.
+    Varsayılan Supertrend için her TF tüm sembollerde tek geçişte (supertrend_batch) hesaplanır;
+    süreç havuzu (indicator_pool) verilirse hesap onun işçilerinde yapılır.
+    """
+    from signal_calculator import supertrend_from_store
+    for tf_name, interval in timeframes:
+        source = resample.base_interval(interval) or interval
+        ready = [symbol for symbol in symbols if store.get(symbol, source) is not None]
+        if compute_func is supertrend_from_store:
+            for symbol, sig in _batch_signals(pool, ready, interval, store).items():
+                signals.set(symbol, tf_name, sig)
+            continue
+        for symbol in ready:
+            signals.set(symbol, tf_name, compute_func(symbol, interval, store=store))
+
+
 class SignalBackgroundWorker:
     """
-    Her coin ve zaman dilimi için arka planda veri çekip cache'e yazar.
+    Her coin ve zaman dilimi için arka planda veri çekip sinyal matrisine (signal_matrix) yazar.
     WebSocket ile anlık veri için ayrı bir yapı eklenebilir. Şimdilik REST ile BB sinyali.
+    Türetilen TF'ler (settings.DERIVED_INTERVALS) ayrıca çekilmez; kaynak TF güncellendikçe
+    derived_func(symbol, interval) ile depodan hesaplanır.
+    Yenileme zamanları RefreshScheduler'dan gelir: tek bir dağıtıcı thread zamanı gelen (sembol, TF)
+    çiftlerini küçük bir thread havuzuna verir.
+    bus (signal_bus.SignalBus) verilirse değişen sinyaller yayınlanır; diğer işçilerde de aynıdır.
     """
-    def __init__(self, coin_symbols, timeframes, signal_func):
+    def __init__(self, coin_symbols, timeframes, signal_func, derived_func=None, max_workers=8,
+                 scheduler=None, clock=None, bus=None):
+        from refresh_scheduler import RefreshScheduler, ServerClock
+        from signal_calculator import supertrend_from_store
         self.coin_symbols = coin_symbols
         self.timeframes = timeframes  # örn. [('M1', '1m'), ...]
         self.signal_func = signal_func  # signal_calculator.fetch_bollinger_signal
-        self.cache = defaultdict(lambda: defaultdict(lambda: 'neutral'))
+        self.derived_func = derived_func or supertrend_from_store
+        self.signals = SignalMatrix(coin_symbols, [tf_name for tf_name, _b in timeframes], bus=bus)
+        self._fetched, self._derived_by_base = resample.fetch_plan(timeframes)
+        self._tf_by_interval = {tf_binance: tf_name for tf_name, tf_binance in self._fetched}
+        self.clock = clock or ServerClock()
+        self.scheduler = scheduler or RefreshScheduler(now_ms=self.clock.now_ms,
+                                                       derived_by_base=self._derived_by_base)
+        self.max_workers = max_workers
+        self._executor = None
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        from signal_calculator import supertrend_from_store
+        prime_func = self.derived_func
+        if prime_func is not supertrend_from_store:
+            prime_func = lambda symbol, interval, store: self.derived_func(symbol, interval)
+        from indicator_pool import get_indicator_pool
+        threading.Thread(target=_prime_signals, daemon=True,
+                         args=(self.signals, get_kline_store(), self.coin_symbols, self.timeframes,
+                               prime_func, get_indicator_pool())).start()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.scheduler.schedule_all([(s, b) for _tf, b in self._fetched for s in self.coin_symbols])
+        t = threading.Thread(target=self._dispatch_loop, daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch_loop(self):
+        while not self._stop_event.is_set():
+            self.clock.maybe_sync()
+            for symbol, tf_binance in self.scheduler.pop_due():
+                self._executor.submit(self._refresh_one, symbol, tf_binance)
+            self._stop_event.wait(min(max(self.scheduler.seconds_until_next(), 0.05), 0.5))
+
+    def _refresh_one(self, symbol, tf_binance):
+        try:
+            tf_name = self._tf_by_interval.get(tf_binance)
+            sig = self.signal_func(symbol, tf_binance, tf_name)
+            if tf_name is not None:
+                self.signals.set(symbol, tf_name, sig)
+            for d_name, d_interval in self._derived_by_base.get(tf_binance, ()):
+                self.signals.set(symbol, d_name, self.derived_func(symbol, d_interval))
+        finally:
+            if not self._stop_event.is_set():
+                self.scheduler.reschedule(symbol, tf_binance)
+
+    def recompute_timeframe(self, tf_name):
+        """
+        Sadece tf_name'in sinyallerini yeniden hesaplar (örn. o TF'nin BB ayarı değişti); diğer TF'lere ve
+        zamanlayıcıya dokunmaz. Gönderilen iş sayısını döndürür.
+        """
+        if self._executor is None:
+            return 0
+        fetched = [b for name, b in self._fetched if name == tf_name]
+        derived = [d for pairs in self._derived_by_base.values() for name, d in pairs if name == tf_name]
+        for symbol in self.coin_symbols:
+            for interval in fetched:
+                self._executor.submit(self._recompute_one, symbol, interval, tf_name, self.signal_func)
+            for interval in derived:
+                self._executor.submit(self._recompute_one, symbol, interval, tf_name,
+                                      lambda s, i, _tf: self.derived_func(s, i))
+        return len(self.coin_symbols) * (len(fetched) + len(derived))
+
+    def _recompute_one(self, symbol, interval, tf_name, func):
+        self.signals.set(symbol, tf_name, func(symbol, interval, tf_name))
+
+    def get_signal(self, symbol, tf_name):
+        return self.signals.get(symbol, tf_name)
+
+    def snapshot(self):
+        """Sinyallerin değiştirilemez, sürümlü kopyası (signal_matrix.SignalSnapshot)."""
+        return self.signals.snapshot()
+
+
+# Binance USDT-M Futures WebSocket adresi ve bağlantı başına akış sınırı
+BINANCE_WS_URL = "wss://fstream.binance.com"
+STREAMS_PER_CONNECTION = 200
+# SUBSCRIBE mesajı başına akış sayısı (Binance: bağlantı başına saniyede en fazla 10 mesaj)
+SUBSCRIBE_CHUNK = 50
+RECONNECT_BACKOFF_MAX = 30
+
+
+class KlineStreamWorker:
+    """
+    Binance birleşik <symbol>@kline_<interval> akışlarıyla sinyal üretir (REST yoklaması yerine).
+    - Akışlar STREAMS_PER_CONNECTION'lık parçalara (shard) bölünür, her parça ayrı bağlantıdır.
+    - Bağlantı koparsa üstel bekleme ile yeniden bağlanır, SUBSCRIBE'ları tekrar gönderir
+      ve kopukluk sırasında kaçan mumları REST ile tamamlar.
+    - Mumlar paylaşılan KlineStore'a yazılır; her güncellemede ilgili (sembol, TF) sinyali yeniden hesaplanır.
+    - Türetilen TF'lere abone olunmaz; kaynak TF'nin her güncellemesinde onlar da yeniden hesaplanır.
+    - Varsayılan Supertrend'de (incremental) her (sembol, interval) için artımlı durum tutulur: REST
+      tamamlamasından sonra depodan bir kez kurulur, akış mesajlarında mum başına O(1) güncellenir.
+    get_signal(symbol, tf_name) API'si SignalBackgroundWorker ile aynıdır.
+    """
+    def __init__(self, coin_symbols, timeframes, compute_func=None, ws_url=BINANCE_WS_URL,
+                 rest_url=None, streams_per_connection=STREAMS_PER_CONNECTION, history=None, store=None,
+                 incremental=None, bus=None):
+        from signal_calculator import supertrend_from_store, supertrend_limit
+        self.coin_symbols = coin_symbols
+        self.timeframes = timeframes  # örn. [('M5', '5m'), ...]
+        # compute_func(symbol, interval, store=...) depodaki mumlardan sinyal üretir
+        self.compute_func = compute_func or supertrend_from_store
+        self.ws_url = ws_url.rstrip('/')
+        self.streams_per_connection = max(1, int(streams_per_connection))
+        self.history = history or supertrend_limit()
+        self.signals = SignalMatrix(coin_symbols, [tf_name for tf_name, _b in timeframes], bus=bus)
+        # rest_url verilirse (örn. yerel taklit sunucu) ayrı bir depo kullanılır
+        self.store = store or (KlineStore(base_url=rest_url) if rest_url else get_kline_store())
+        self._fetched, self._derived_by_base = resample.fetch_plan(timeframes)
+        self._tf_by_interval = {tf_binance: tf_name for tf_name, tf_binance in self._fetched}
+        # Artımlı durum sadece varsayılan Supertrend için (özel compute_func depodan hesaplanır)
+        self.incremental = compute_func is None if incremental is None else incremental
+        self._states = {}
         self._stop_event = threading.Event()
         self._threads = []
+        self._apps = []
+        self._backfill_queue = queue.Queue()
+        self._sub_id = 0
+        self.stats = {'messages': 0, 'updates': 0, 'reconnects': 0, 'backfills': 0, 'errors': 0}
+        self.latencies_ms = deque(maxlen=20000)
+
+    def stream_names(self):
+        return [f"{s.lower()}@kline_{tf_binance}" for _tf, tf_binance in self._fetched for s in self.coin_symbols]
+
+    def shards(self):
+        streams = self.stream_names()
+        n = self.streams_per_connection
+        return [streams[i:i + n] for i in range(0, len(streams), n)]
 
     def start(self):
-        for tf_name, tf_binance in self.timeframes:
-            t = threading.Thread(target=self._worker, args=(tf_name, tf_binance), daemon=True)
+        t = threading.Thread(target=self._backfill_loop, daemon=True)
+        t.start()
+        self._threads.append(t)
+        for idx, shard in enumerate(self.shards()):
+            t = threading.Thread(target=self._run_shard, args=(idx, shard), daemon=True)
             t.start()
             self._threads.append(t)
-            # Küçük bir gecikme ile başlat (yükü dağıtmak için)
+
+    def stop(self):
+        self._stop_event.set()
+        self._backfill_queue.put(None)
+        for app in list(self._apps):
             try:
-                time.sleep(0.2)
+                app.close()
             except Exception:
                 pass
 
-    def stop(self):
-        self._stop_event.set()
+    def get_signal(self, symbol, tf_name):
+        return self.signals.get(symbol, tf_name)
+
+    def snapshot(self):
+        """Sinyallerin değiştirilemez, sürümlü kopyası (signal_matrix.SignalSnapshot)."""
+        return self.signals.snapshot()
+
+    # --- Bağlantı yönetimi ---
+    def _run_shard(self, idx, streams):
+        import websocket
+        backoff = 1
+        while not self._stop_event.is_set():
+            app = websocket.WebSocketApp(
+                f"{self.ws_url}/stream",
+                on_open=lambda ws: self._on_open(ws, streams),
+                on_message=self._on_message,
+                on_error=lambda _ws, err: self._on_error(idx, err),
+            )
+            self._apps.append(app)
+            opened_at = time.time()
+            try:
+                app.run_forever(ping_interval=180, ping_timeout=20)
+            except Exception as e:
+                self._on_error(idx, e)
+            finally:
+                try:
+                    self._apps.remove(app)
+                except ValueError:
+                    pass
+            if self._stop_event.is_set():
+                break
+            self.stats['reconnects'] += 1
+            # Uzun süre açık kalmış bağlantıda beklemeyi sıfırla
+            if time.time() - opened_at > 60:
+                backoff = 1
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
+    def _on_open(self, ws, streams):
+        # Her (yeniden) bağlantıda abonelikleri gönder ve mum geçmişini REST ile tamamla
+        for i in range(0, len(streams), SUBSCRIBE_CHUNK):
+            self._sub_id += 1
+            ws.send(json.dumps({"method": "SUBSCRIBE", "params": streams[i:i + SUBSCRIBE_CHUNK], "id": self._sub_id}))
+            if i + SUBSCRIBE_CHUNK < len(streams):
+                time.sleep(0.12)
+        for stream in streams:
+            sym, _, interval = stream.partition('@kline_')
+            self._backfill_queue.put((sym.upper(), interval))
 
-    def _worker(self, tf_name, tf_binance):
-        interval = TF_UPDATE_INTERVALS.get(tf_binance, 5)
+    def _on_error(self, idx, err):
+        self.stats['errors'] += 1
+        print(f"[WS HATA] shard={idx}: {err}")
+
+    # --- Mum verisi ---
+    def _backfill_loop(self):
+        from indicator_pool import get_indicator_pool
+        _prime_signals(self.signals, self.store, self.coin_symbols, self.timeframes, self.compute_func,
+                       get_indicator_pool())
         while not self._stop_event.is_set():
-            for symbol in self.coin_symbols:
-                sig = self.signal_func(symbol, tf_binance, tf_name)
-                self.cache[symbol][tf_name] = sig
-            time.sleep(interval)
+            item = self._backfill_queue.get()
+            if item is None:
+                break
+            symbol, interval = item
+            try:
+                # Depo doluysa sadece son açık mumdan itibaren eksikler çekilir
+                self.store.refresh(symbol, interval, resample.history_for(interval, self.history))
+            except Exception as e:
+                print(f"[WS BACKFILL HATA] {symbol} {interval}: {e}")
+                continue
+            self._recompute(symbol, interval)
+            # Sayaç sinyal yazıldıktan sonra artar (tamamlanan backfill'i bekleyenler sonucu görür)
+            self.stats['backfills'] += 1
+
+    def _on_message(self, _ws, message):
+        try:
+            msg = json.loads(message)
+            data = msg.get('data') if isinstance(msg, dict) else None
+            if not data or data.get('e') != 'kline':
+                return
+            symbol, interval, res, prev_last = self.store.apply_stream_kline(data['k'])
+        except (ValueError, KeyError, TypeError):
+            self.stats['errors'] += 1
+            return
+        self.stats['messages'] += 1
+        if res == 'ignored':
+            return
+        # Önceki mumdan birden fazla interval atlandıysa kapanışlar kaçmıştır: REST ile tamamla
+        k = data['k']
+        gap = res == 'append' and prev_last is not None and int(k['t']) - prev_last > INTERVAL_MS.get(interval, 0)
+        if gap:
+            self._backfill_queue.put((symbol, interval))
+        state = self._states.get((symbol, interval))
+        if state is not None and not gap:
+            self._apply_directions(symbol, interval,
+                                   state.update(k['t'], float(k['o']), float(k['h']), float(k['l']), float(k['c'])))
+            self.stats['updates'] += 1
+        else:
+            self._recompute(symbol, interval)
+        try:
+            self.latencies_ms.append(time.time() * 1000.0 - float(data['E']))
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    def _state_for(self, symbol, interval):
+        from incremental import StreamSupertrend
+        state = self._states.get((symbol, interval))
+        if state is None:
+            derived = [d_interval for _d, d_interval in self._derived_by_base.get(interval, ())]
+            state = self._states.setdefault((symbol, interval), StreamSupertrend(
+                interval, derived, include_base=self._tf_by_interval.get(interval) is not None, window=self.history))
+        return state
+
+    def _apply_directions(self, symbol, interval, directions):
+        tf_name = self._tf_by_interval.get(interval)
+        if tf_name is not None and interval in directions:
+            self.signals.set(symbol, tf_name, directions[interval])
+        for d_name, d_interval in self._derived_by_base.get(interval, ()):
+            if d_interval in directions:
+                self.signals.set(symbol, d_name, directions[d_interval])
+
+    def _recompute(self, symbol, interval):
+        if self.store.get(symbol, interval) is None:
+            return
+        if self.incremental:
+            # Depodan bir kez kur (REST tamamlaması/kopukluk sonrası); sonraki mesajlar artımlı işlenir
+            state = self._state_for(symbol, interval)
+            state.seed(self.store, symbol)
+            self._apply_directions(symbol, interval, state.directions())
+            self.stats['updates'] += 1
+            return
+        tf_name = self._tf_by_interval.get(interval)
+        if tf_name is not None:
+            self.signals.set(symbol, tf_name, self.compute_func(symbol, interval, store=self.store))
+        for d_name, d_interval in self._derived_by_base.get(interval, ()):
+            self.signals.set(symbol, d_name, self.compute_func(symbol, d_interval, store=self.store))
+        self.stats['updates'] += 1
+
+
+class AsyncSignalWorker:
+    """
+    Tüm (sembol, TF) çiftlerini tek bir asyncio döngüsünde, sınırlı eşzamanlılıkla yeniler.
+    Zaman dilimi başına thread ve sıralı requests.get yerine AsyncKlineFetcher kullanır:
+    yavaş bir sembol diğerlerini bekletmez, her yanıt gelir gelmez sinyal matrise yazılır.
+    Hangi çiftin ne zaman yenileneceğine RefreshScheduler karar verir.
+    Süreç havuzu (pool / settings.INDICATOR_POOL_WORKERS) açıksa varsayılan Supertrend yanıt başına
+    hesaplanmaz: tur boyunca güncellenen semboller interval başına toplanıp havuzda tek seferde hesaplanır.
+    get_signal(symbol, tf_name) API'si SignalBackgroundWorker ile aynıdır.
+    """
+    def __init__(self, coin_symbols, timeframes, compute_func=None, concurrency=None,
+                 store=None, rest_url=None, history=None, scheduler=None, clock=None, pool=None, bus=None):
+        from async_fetcher import DEFAULT_CONCURRENCY
+        from indicator_pool import get_indicator_pool
+        from refresh_scheduler import RefreshScheduler, ServerClock
+        from signal_calculator import supertrend_from_store, supertrend_limit
+        self.coin_symbols = coin_symbols
+        self.timeframes = timeframes  # örn. [('M5', '5m'), ...]
+        self.compute_func = compute_func or supertrend_from_store
+        self.concurrency = concurrency or DEFAULT_CONCURRENCY
+        self.store = store or (KlineStore(base_url=rest_url) if rest_url else get_kline_store())
+        self.history = history or supertrend_limit()
+        self.signals = SignalMatrix(coin_symbols, [tf_name for tf_name, _b in timeframes], bus=bus)
+        self._fetched, self._derived_by_base = resample.fetch_plan(timeframes)
+        self._tf_by_interval = {tf_binance: tf_name for tf_name, tf_binance in self._fetched}
+        self.clock = clock or ServerClock(base_url=rest_url)
+        self.scheduler = scheduler or RefreshScheduler(now_ms=self.clock.now_ms, store=self.store,
+                                                       derived_by_base=self._derived_by_base)
+        # Havuz sadece varsayılan Supertrend için (özel compute_func yanıt başına hesaplanır)
+        self.pool = (pool or get_indicator_pool()) if compute_func is None else None
+        self._pending = defaultdict(set)  # {interval: {sembol}} — havuzda hesaplanacaklar
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.fetcher = None
+        self.passes = 0
+
+    def start(self):
+        import asyncio
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
 
     def get_signal(self, symbol, tf_name):
-        return self.cache[symbol][tf_name]
+        return self.signals.get(symbol, tf_name)
+
+    def snapshot(self):
+        """Sinyallerin değiştirilemez, sürümlü kopyası (signal_matrix.SignalSnapshot)."""
+        return self.signals.snapshot()
+
+    def _on_result(self, symbol, interval, ok):
+        if ok and self.pool is not None:
+            self._pending[interval].add(symbol)
+        elif ok:
+            tf_name = self._tf_by_interval.get(interval)
+            if tf_name is not None:
+                self.signals.set(symbol, tf_name, self.compute_func(symbol, interval, store=self.store))
+            for d_name, d_interval in self._derived_by_base.get(interval, ()):
+                self.signals.set(symbol, d_name, self.compute_func(symbol, d_interval, store=self.store))
+        self.scheduler.reschedule(symbol, interval)
+
+    def _flush_pool(self):
+        """Turda güncellenen sembollerin kaynak ve türetilen TF sinyallerini havuzda toplu hesaplar."""
+        pending, self._pending = self._pending, defaultdict(set)
+        for interval, symbols in pending.items():
+            symbols = sorted(symbols)
+            targets = [(self._tf_by_interval.get(interval), interval)] + list(self._derived_by_base.get(interval, ()))
+            for tf_name, target in targets:
+                if tf_name is None:
+                    continue
+                for symbol, sig in _batch_signals(self.pool, symbols, target, self.store).items():
+                    self.signals.set(symbol, tf_name, sig)
+
+    async def _main(self):
+        import asyncio
+        from async_fetcher import AsyncKlineFetcher
+        self.fetcher = AsyncKlineFetcher(self.store, concurrency=self.concurrency)
+        _prime_signals(self.signals, self.store, self.coin_symbols, self.timeframes, self.compute_func, self.pool)
+        history = {tf_binance: resample.history_for(tf_binance, self.history) for _tf, tf_binance in self._fetched}
+        self.scheduler.schedule_all([(s, b) for _tf, b in self._fetched for s in self.coin_symbols])
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._stop_event.is_set():
+                await loop.run_in_executor(None, self.clock.maybe_sync)
+                due = self.scheduler.pop_due()
+                if due:
+                    await self.fetcher.run_pass(due, history, on_result=self._on_result)
+                    if self.pool is not None:
+                        try:
+                            await loop.run_in_executor(None, self._flush_pool)
+                        except Exception as e:
+                            print(f"[HATA] Sinyaller hesaplanamadı: {e}")
+                    self.passes += 1
+                wait = self.scheduler.seconds_until_next()
+                await asyncio.sleep(min(max(wait, 0.05), 0.5))
+        finally:
+            await self.fetcher.close()
+
+
+def _benchmark_stream(symbol_count, tf_pairs, rounds=5):
+    """Yerel taklit sunucuya karşı güncelleme gecikmesi ve CPU maliyetini ölçer."""
+    from binance_stub import BinanceStub
+    symbols = [f"SYM{i:04d}USDT" for i in range(symbol_count)]
+    with BinanceStub(symbols) as stub:
+        worker = KlineStreamWorker(symbols, tf_pairs, ws_url=stub.ws_url, rest_url=stub.rest_url)
+        worker.start()
+        streamed = [interval for _tf, interval in worker._fetched]
+        expected = len(symbols) * len(streamed)
+        deadline = time.time() + 120
+        while worker.stats['backfills'] < expected and time.time() < deadline:
+            time.sleep(0.1)
+        worker.latencies_ms.clear()
+        updates0 = worker.stats['updates']
+        cpu0 = time.process_time()
+        for _ in range(rounds):
+            for interval in streamed:
+                for s in symbols:
+                    stub.push_kline(s, interval)
+                # Gerçek akış gibi yayılmış olarak gönder (toplu kuyruk gecikmesini ölçmemek için)
+                time.sleep(0.2)
+        while worker.stats['updates'] - updates0 < expected * rounds and time.time() < deadline:
+            time.sleep(0.05)
+        cpu = time.process_time() - cpu0
+        worker.stop()
+    lat = sorted(worker.latencies_ms) or [float('nan')]
+    n = worker.stats['updates'] - updates0
+    print(f"{symbol_count:>5} sembol x {len(tf_pairs)} TF ({len(streamed)} akış TF) | güncelleme={n} "
+          f"p50={lat[len(lat) // 2]:.2f}ms p99={lat[int(len(lat) * 0.99) - 1]:.2f}ms "
+          f"CPU/güncelleme={cpu / max(n, 1) * 1e6:.0f}µs (sunucu dahil) shard={len(worker.shards())}")
+
+
+if __name__ == "__main__":
+    pairs = [('M5', '5m'), ('M15', '15m'), ('H1', '1h'), ('H4', '4h'),
+             ('H6', '6h'), ('D1', '1d'), ('W1', '1w'), ('1M', '1M')]
+    for count in (150, 500):
+        _benchmark_stream(count, pairs)